@@ -3,6 +3,15 @@ ASGI config for core project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+Views based on ``core.async_views.AsyncAPIView`` (catálogo, árvore do curso,
+painel do aluno e caixa de notificações) rodam no event loop; as demais
+continuam síncronas e são executadas em threads pelo Django. Compare as duas
+implantações com ``python manage.py benchmark_asgi``.
+
+Sob ASGI, mantenha ``DB_CONN_MAX_AGE = 0`` (padrão) e reaproveite conexões
+com ``DB_POOL``: conexões persistentes ficam presas às threads de
+``sync_to_async`` e não são fechadas.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
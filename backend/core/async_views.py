@@ -0,0 +1,118 @@
+"""
+Views assíncronas do Django REST Framework.
+
+O ``APIView`` do DRF é síncrono: sob ASGI, cada requisição é executada em
+uma thread por meio de ``sync_to_async``. ``AsyncAPIView`` mantém o
+restante do DRF (parsers, renderers, permissões, tratamento de exceções e o
+schema do drf_yasg), mas despacha para handlers ``async def``, que usam a
+API assíncrona do ORM (``aget``, ``afirst``, ``acount``, ``aiterator``).
+
+A autenticação também é assíncrona: são usados os autenticadores de
+``DEFAULT_AUTHENTICATION_CLASSES`` que implementam ``aauthenticate`` (ver
+``users.authentication.CachedJWTAuthentication``); os demais são ignorados
+nessas views.
+
+A resposta é renderizada na própria view e devolvida como ``HttpResponse``
+simples, para que o handler do Django não precise renderizá-la em uma
+thread.
+"""
+import inspect
+
+from django.http import HttpResponse
+from rest_framework.views import APIView
+
+
+class AsyncAPIView(APIView):
+    """
+    ``APIView`` com handlers assíncronos (``async def get``, ...).
+
+    Throttles e autenticadores síncronos não são suportados.
+    """
+
+    throttle_classes = []
+    pagination_class = None
+
+    @property
+    def paginator(self):
+        """Instância de ``pagination_class`` (como em ``GenericAPIView``)."""
+        if not hasattr(self, "_paginator"):
+            pagination_class = self.pagination_class
+            self._paginator = pagination_class() if pagination_class else None
+        return self._paginator
+
+    async def apaginate_queryset(self, queryset):
+        """Página de ``queryset``, lida com a API assíncrona do ORM."""
+        return await self.paginator.apaginate_queryset(
+            queryset, self.request, view=self
+        )
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    async def perform_aauthentication(self, request):
+        """Autentica com o primeiro autenticador assíncrono que aceitar."""
+        for authenticator in self.get_authenticators():
+            if not hasattr(authenticator, "aauthenticate"):
+                continue
+            try:
+                result = await authenticator.aauthenticate(request)
+            except Exception:
+                # Mesmo comportamento de Request._authenticate
+                request._not_authenticated()
+                raise
+            if result is not None:
+                request._authenticator = authenticator
+                request.user, request.auth = result
+                return
+        request._not_authenticated()
+
+    async def ainitial(self, request, *args, **kwargs):
+        """Versão assíncrona de ``APIView.initial``."""
+        self.format_kwarg = self.get_format_suffix(**kwargs)
+        neg = self.perform_content_negotiation(request)
+        request.accepted_renderer, request.accepted_media_type = neg
+        version, scheme = self.determine_version(request, *args, **kwargs)
+        request.version, request.versioning_scheme = version, scheme
+
+        await self.perform_aauthentication(request)
+        self.check_permissions(request)
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await self.ainitial(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(
+                    self, request.method.lower(), self.http_method_not_allowed
+                )
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if inspect.isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        response = self.finalize_response(request, response, *args, **kwargs)
+        self.response = response
+        if hasattr(response, "render"):
+            response = _rendered(response)
+        return response
+
+
+def _rendered(response) -> HttpResponse:
+    """Renderiza uma ``Response`` do DRF em um ``HttpResponse`` simples."""
+    response.render()
+    plain = HttpResponse(
+        response.content,
+        status=response.status_code,
+        headers=dict(response.items()),
+    )
+    for cookie in response.cookies.values():
+        plain.cookies[cookie.key] = cookie
+    return plain
@@ -0,0 +1,3 @@
+"""
+Backend PostgreSQL com métricas de conexão (ver ``base``).
+"""
@@ -0,0 +1,114 @@
+"""
+Backend PostgreSQL do projeto.
+
+Igual ao backend ``django.db.backends.postgresql``, mas mede cada obtenção
+de conexão: com conexões persistentes ou por requisição, o handshake
+completo com o servidor (TCP + TLS + autenticação); com o pool do
+psycopg 3, a espera por uma conexão livre. ``connection_stats`` junta essas
+medidas às estatísticas do próprio pool.
+
+As medidas são do processo atual (somadas entre as threads).
+"""
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from django.db import connections
+from django.db.backends.postgresql import base
+
+
+@dataclass
+class CheckoutStats:
+    """
+    Obtenções de conexão de um alias no processo atual.
+
+    Attributes:
+        checkouts: Conexões obtidas (abertas ou retiradas do pool)
+        checkout_ms: Tempo total gasto obtendo conexões, em milissegundos
+        max_checkout_ms: Maior tempo de uma única obtenção
+        errors: Falhas ao obter uma conexão
+    """
+
+    checkouts: int = 0
+    checkout_ms: float = 0.0
+    max_checkout_ms: float = 0.0
+    errors: int = 0
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _record(alias: str, elapsed_ms: float, failed: bool) -> None:
+    with _stats_lock:
+        stats = _stats.setdefault(alias, CheckoutStats())
+        if failed:
+            stats.errors += 1
+            return
+        stats.checkouts += 1
+        stats.checkout_ms += elapsed_ms
+        stats.max_checkout_ms = max(stats.max_checkout_ms, elapsed_ms)
+
+
+def reset_connection_stats() -> None:
+    """Zera as medidas de todos os aliases."""
+    with _stats_lock:
+        _stats.clear()
+
+
+def connection_stats(alias: str = "default") -> dict:
+    """
+    Métricas de conexão de um alias.
+
+    Args:
+        alias: Alias em ``settings.DATABASES``
+
+    Returns:
+        Dicionário com ``mode`` (``"pool"``, ``"persistent"`` ou
+        ``"per_request"``), as medidas de ``CheckoutStats``,
+        ``avg_checkout_ms`` e, com o pool, ``pool_size``,
+        ``pool_available``, ``pool_min``, ``pool_max``,
+        ``requests_waiting`` e ``requests_wait_ms``
+    """
+    connection = connections[alias]
+    with _stats_lock:
+        stats = asdict(_stats.get(alias, CheckoutStats()))
+    stats["avg_checkout_ms"] = (
+        stats["checkout_ms"] / stats["checkouts"]
+        if stats["checkouts"]
+        else 0.0
+    )
+
+    pool = getattr(connection, "pool", None)
+    if pool is not None:
+        stats["mode"] = "pool"
+        pool_stats = pool.get_stats()
+        for key in (
+            "pool_min",
+            "pool_max",
+            "pool_size",
+            "pool_available",
+            "requests_waiting",
+            "requests_wait_ms",
+        ):
+            stats[key] = pool_stats.get(key, 0)
+    elif connection.settings_dict.get("CONN_MAX_AGE"):
+        stats["mode"] = "persistent"
+        stats["conn_max_age"] = connection.settings_dict["CONN_MAX_AGE"]
+    else:
+        stats["mode"] = "per_request"
+    return stats
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """Backend PostgreSQL que mede a obtenção de conexões."""
+
+    def get_new_connection(self, conn_params):
+        started = time.perf_counter()
+        try:
+            connection = super().get_new_connection(conn_params)
+        except Exception:
+            _record(self.alias, 0.0, failed=True)
+            raise
+        _record(self.alias, (time.perf_counter() - started) * 1000, False)
+        return connection
@@ -1,32 +1,46 @@
 """
 Módulo contendo classes de modelo base que serão utilizadas por todos os apps.
 Otimizado para uso com Supabase como banco de dados.
+
+Para acessar objetos relacionados sem consultas repetidas, use
+``core.identity_map.get_related``.
 """
 
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
-import uuid
-from typing import cast, Optional, TypeVar, Generic, Type
+from typing import Optional, Tuple
 
-# Tipo genérico para modelos
-T = TypeVar("T", bound=models.Model)
+from core.ids import default_pk
 
 
-class SupabaseBaseModel(models.Model):
+class UUIDModel(models.Model):
     """
-    Modelo base para todos os modelos que serão armazenados no Supabase.
+    Modelo base com chave primária UUID.
 
-    Implementa campos comuns como id (UUID), timestamps para criação
-    e atualização, e funcionalidades de acesso seguro.
+    A chave é gerada por ``core.ids.default_pk`` (uuid4 ou, se habilitado
+    em ``PRIMARY_KEY_GENERATOR``, uuid7 ordenado pelo tempo).
     """
 
     id = models.UUIDField(
         primary_key=True,
-        default=uuid.uuid4,
+        default=default_pk,
         editable=False,
         help_text=_("Identificador único universal"),
     )
+
+    class Meta:
+        abstract = True
+
+
+class SupabaseBaseModel(UUIDModel):
+    """
+    Modelo base para todos os modelos que serão armazenados no Supabase.
+
+    Implementa campos comuns como id (UUID), timestamps para criação
+    e atualização, e funcionalidades de acesso seguro.
+    """
+
     created_at = models.DateTimeField(
         _("criado em"),
         default=timezone.now,
@@ -42,55 +56,38 @@ class SupabaseBaseModel(models.Model):
         abstract = True
 
 
-class RelatedObjectCache(Generic[T]):
+class DatabaseManagedFieldsMixin:
     """
-    Classe utilitária para armazenar em cache objetos relacionados.
-
-    Implementa um padrão de acesso seguro a objetos relacionados,
-    armazenando-os em cache para evitar múltiplas consultas ao banco.
+    Impede que ``save()`` regrave campos mantidos pelo banco.
+
+    Contadores e versões atualizados por UPDATEs atômicos (``F() + delta``)
+    ficam em ``db_managed_fields``. Ao salvar uma linha existente sem
+    ``update_fields``, esses campos ficam fora do UPDATE: o valor em memória
+    pode estar desatualizado, e regravá-lo desfaria os incrementos feitos
+    nesse meio tempo (por exemplo, uma edição no admin concorrente com uma
+    matrícula). Na criação, os campos são gravados normalmente, e um
+    ``update_fields`` explícito é respeitado.
     """
 
-    def __init__(self, model_class: Type[T]):
-        self.model_class = model_class
-        self._cache: Optional[T] = None
-
-    def get(self, instance: models.Model, field_name: str) -> Optional[T]:
-        """
-        Recupera o objeto relacionado, usando cache quando disponível.
-
-        Args:
-            instance: Instância do modelo que possui o relacionamento
-            field_name: Nome do campo ForeignKey ou OneToOne
-
-        Returns:
-            O objeto relacionado ou None se não encontrado
-        """
-        if self._cache is not None:
-            return self._cache
-
-        try:
-            related_field = getattr(instance, field_name)
-            if related_field is None:
-                return None
-
-            obj = cast(self.model_class, related_field)
-            self._cache = obj
-            return obj
-        except Exception:
-            return None
-
-    def set(self, obj: Optional[T]) -> None:
-        """
-        Define explicitamente o objeto em cache.
-
-        Args:
-            obj: Objeto a ser armazenado em cache
-        """
-        self._cache = obj
-
-    def clear(self) -> None:
-        """Limpa o cache."""
-        self._cache = None
+    db_managed_fields: Tuple[str, ...] = ()
+
+    def save(self, *args, **kwargs):
+        if (
+            self.db_managed_fields
+            and not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and not field.generated
+                and field.name not in self.db_managed_fields
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
 
 
 # Funções utilitárias para acesso seguro a atributos
@@ -0,0 +1,168 @@
+"""
+Mapa de identidade por requisição (ou tarefa).
+
+Objetos relacionados carregados por ``get_related`` são registrados em um
+mapa ``(modelo, pk) -> instância`` guardado em uma ``ContextVar``. Todas as
+instâncias carregadas durante a mesma requisição passam a compartilhar o
+mesmo objeto relacionado: 500 aulas de um mesmo módulo buscam o módulo uma
+única vez.
+
+O escopo é aberto pelo ``IdentityMapMiddleware`` em cada requisição e pode
+ser aberto manualmente em comandos e tarefas com ``identity_scope()``. Fora
+de um escopo, ``get_related`` se comporta como o acesso normal ao campo
+(com o cache da própria instância do Django).
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Optional, Tuple, Type
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.db import models
+
+IdentityKey = Tuple[str, object]
+
+
+class IdentityMap:
+    """
+    Instâncias de modelos indexadas por ``(label do modelo, pk)``.
+
+    Cada escopo pertence a uma única requisição ou tarefa, por isso o mapa
+    não usa travas.
+    """
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self._objects: Dict[IdentityKey, models.Model] = {}
+
+    @staticmethod
+    def key(model: Type[models.Model], pk) -> IdentityKey:
+        return (model._meta.concrete_model._meta.label, pk)
+
+    def get(self, model: Type[models.Model], pk) -> Optional[models.Model]:
+        """Retorna a instância registrada, contabilizando acerto ou falha."""
+        obj = self._objects.get(self.key(model, pk))
+        if obj is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return obj
+
+    def add(self, obj: models.Model) -> models.Model:
+        """
+        Registra uma instância e retorna a instância canônica.
+
+        Se já houver uma instância com o mesmo modelo e pk, ela é mantida e
+        retornada.
+        """
+        return self._objects.setdefault(self.key(type(obj), obj.pk), obj)
+
+    def clear(self) -> None:
+        """Descarta as instâncias e zera os contadores."""
+        self._objects.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._objects)
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna os contadores do mapa."""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+
+_current: ContextVar[Optional[IdentityMap]] = ContextVar(
+    "identity_map", default=None
+)
+
+
+def current_identity_map() -> Optional[IdentityMap]:
+    """Mapa de identidade do contexto atual, se houver um escopo aberto."""
+    return _current.get()
+
+
+@contextmanager
+def identity_scope() -> Iterator[IdentityMap]:
+    """
+    Abre um escopo de mapa de identidade.
+
+    Escopos aninhados reutilizam o mapa do escopo mais externo.
+    """
+    identity_map = _current.get()
+    if identity_map is not None:
+        yield identity_map
+        return
+
+    identity_map = IdentityMap()
+    token = _current.set(identity_map)
+    try:
+        yield identity_map
+    finally:
+        _current.reset(token)
+
+
+def get_related(
+    instance: models.Model, field_name: str
+) -> Optional[models.Model]:
+    """
+    Acessa de forma segura um ``ForeignKey``/``OneToOne`` de uma instância.
+
+    A instância relacionada é buscada primeiro no cache da própria
+    instância, depois no mapa de identidade do contexto e só então no
+    banco; o resultado é registrado em ambos.
+
+    Args:
+        instance: Instância do modelo que possui o relacionamento
+        field_name: Nome do campo ForeignKey ou OneToOne
+
+    Returns:
+        O objeto relacionado ou None se não encontrado
+    """
+    try:
+        field = instance._meta.get_field(field_name)
+        if field.is_cached(instance):
+            return field.get_cached_value(instance)
+
+        pk = getattr(instance, field.attname)
+        if pk is None:
+            return None
+
+        # Só chaves que apontam para o pk do modelo relacionado são mapeadas
+        identity_map = _current.get()
+        if not field.target_field.primary_key:
+            identity_map = None
+        if identity_map is not None:
+            obj = identity_map.get(field.related_model, pk)
+            if obj is not None:
+                field.set_cached_value(instance, obj)
+                return obj
+
+        obj = getattr(instance, field_name)
+        if obj is not None and identity_map is not None:
+            obj = identity_map.add(obj)
+            field.set_cached_value(instance, obj)
+        return obj
+    except Exception:
+        return None
+
+
+class IdentityMapMiddleware:
+    """Abre um escopo de mapa de identidade para cada requisição."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with identity_scope():
+            return self.get_response(request)
+
+    async def __acall__(self, request):
+        with identity_scope():
+            return await self.get_response(request)
@@ -0,0 +1,103 @@
+"""
+Geração de chaves primárias UUID.
+
+``uuid4`` espalha as inserções por toda a B-tree da chave primária. Em
+tabelas que só crescem (tentativas, respostas, matrículas, progresso) isso
+causa divisões de página e falhas de cache. ``uuid7`` gera UUIDs ordenados
+pelo tempo (layout da versão 7 da RFC 9562): inserções novas caem sempre
+nas últimas folhas do índice.
+
+``default_pk`` é o ``default`` das chaves primárias dos modelos e usa o
+gerador escolhido em ``PRIMARY_KEY_GENERATOR`` (``"uuid4"``, padrão, ou
+``"uuid7"``). Trocar o gerador não exige migração de dados: as chaves
+existentes continuam válidas e apenas as novas passam a ser ordenadas.
+"""
+import os
+import threading
+import time
+import uuid
+
+from django.conf import settings
+
+_RANDOM_BITS = 62
+_COUNTER_MAX = 0xFFF
+
+_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def _reset_after_fork() -> None:
+    """Recria o estado no processo filho (a trava pode ter sido copiada presa)."""
+    global _lock, _last_ms, _counter
+    _lock = threading.Lock()
+    _last_ms = 0
+    _counter = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def uuid7() -> uuid.UUID:
+    """
+    Gera um UUID versão 7 ordenado pelo tempo.
+
+    Layout: 48 bits de timestamp Unix em milissegundos, versão, 12 bits de
+    contador, variante e 62 bits aleatórios.
+
+    Dentro de um processo os valores são estritamente crescentes: no mesmo
+    milissegundo (ou se o relógio voltar) o contador é incrementado e, ao
+    estourar, o timestamp avança um milissegundo. O contador começa em um
+    valor aleatório a cada milissegundo e os 62 bits finais vêm de
+    ``os.urandom``, então processos diferentes não geram valores iguais na
+    prática; entre processos a ordem é apenas aproximada (por milissegundo).
+
+    Returns:
+        uuid.UUID com ``version == 7``
+    """
+    global _last_ms, _counter
+    with _lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _last_ms:
+            _last_ms = now_ms
+            # Metade inferior do espaço, para sobrar margem de incremento
+            _counter = int.from_bytes(os.urandom(2), "big") >> 5
+        else:
+            _counter += 1
+            if _counter > _COUNTER_MAX:
+                _last_ms += 1
+                _counter = 0
+        timestamp, counter = _last_ms, _counter
+
+    tail = int.from_bytes(os.urandom(8), "big") >> (64 - _RANDOM_BITS)
+    return uuid.UUID(
+        int=(timestamp << 80)
+        | (0x7 << 76)
+        | (counter << 64)
+        | (0b10 << _RANDOM_BITS)
+        | tail
+    )
+
+
+GENERATORS = {
+    "uuid4": uuid.uuid4,
+    "uuid7": uuid7,
+}
+
+
+def default_pk() -> uuid.UUID:
+    """
+    Gera a chave primária de um novo registro.
+
+    Usa o gerador configurado em ``PRIMARY_KEY_GENERATOR``.
+    """
+    name = getattr(settings, "PRIMARY_KEY_GENERATOR", "uuid4")
+    try:
+        generator = GENERATORS[name]
+    except KeyError:
+        raise ValueError(
+            f"PRIMARY_KEY_GENERATOR inválido: {name!r} "
+            f"(opções: {', '.join(GENERATORS)})"
+        )
+    return generator()
@@ -0,0 +1,366 @@
+"""
+Utilitários de instrumentação de acesso ao banco de dados.
+
+Permitem medir quantas consultas SQL um trecho de código emite, sem depender
+de ``settings.DEBUG``, para que serviços em lote possam garantir um número
+constante de idas ao Supabase.
+
+- ``QueryCounter``: apenas conta as consultas de um trecho;
+- ``QueryProfiler``: conta, mede o tempo no banco e agrupa as consultas por
+  impressão digital (SQL sem valores), o que revela N+1 (a mesma consulta
+  repetida uma vez por linha);
+- ``assert_max_queries``: falha (``QueryBudgetExceeded``) se um trecho
+  passar de um número de consultas; útil em testes;
+- ``query_budget``: declara o orçamento de consultas de uma view;
+- ``QueryInstrumentationMiddleware``: perfila uma amostra das requisições
+  (``QUERY_INSTRUMENTATION_SAMPLE_RATE``), grava um log estruturado (JSON no
+  logger ``core.instrumentation``), devolve o cabeçalho ``Server-Timing`` e
+  confere o orçamento da view. Fora da amostra, o custo é um sorteio.
+"""
+import json
+import logging
+import random
+import re
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+_IN_LIST = re.compile(r"\bIN \((?:%s, )*%s\)", re.IGNORECASE)
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_WHITESPACE = re.compile(r"\s+")
+
+_SAVEPOINT_PREFIXES = (
+    "SAVEPOINT",
+    "RELEASE SAVEPOINT",
+    "ROLLBACK TO SAVEPOINT",
+)
+
+
+class QueryCounter:
+    """
+    Gerenciador de contexto que conta as consultas executadas em uma conexão.
+
+    Usa ``connection.execute_wrapper``, portanto conta apenas as consultas
+    realmente enviadas ao banco (incluindo as de ``bulk_update``), e funciona
+    com ``DEBUG=False``.
+
+    Exemplo:
+        with QueryCounter() as counter:
+            grade_attempt(attempt)
+        print(counter.count)
+    """
+
+    def __init__(self, using: str = DEFAULT_DB_ALIAS):
+        self.using = using
+        self.count = 0
+        self._wrapper_cm = None
+
+    def _wrapper(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict,
+    ) -> Any:
+        self.count += 1
+        return execute(sql, params, many, context)
+
+    def __enter__(self) -> "QueryCounter":
+        self._wrapper_cm = connections[self.using].execute_wrapper(
+            self._wrapper
+        )
+        self._wrapper_cm.__enter__()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._wrapper_cm is not None:
+            self._wrapper_cm.__exit__(exc_type, exc_value, traceback)
+            self._wrapper_cm = None
+
+
+def fingerprint(sql: str) -> str:
+    """
+    SQL sem valores, para agrupar execuções da mesma consulta.
+
+    Listas ``IN (%s, %s, ...)`` de qualquer tamanho viram ``IN (...)`` e
+    literais numéricos e de texto viram ``?``.
+    """
+    sql = _IN_LIST.sub("IN (...)", sql)
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    return _WHITESPACE.sub(" ", sql).strip()
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Um trecho de código ou view emitiu mais consultas que o permitido."""
+
+
+class QueryProfiler:
+    """
+    Gerenciador de contexto que perfila as consultas de um trecho.
+
+    Registra o número de consultas, o tempo total no banco e quantas vezes
+    cada impressão digital (``fingerprint``) foi executada. Por padrão,
+    observa todas as conexões configuradas.
+
+    Savepoints são contados à parte (``savepoints``): um ``atomic`` aninhado
+    só os emite dentro de outra transação (como nos testes), e o orçamento
+    de uma view não deve depender disso.
+
+    Exemplo:
+        with QueryProfiler() as profile:
+            list_courses(request)
+        print(profile.count, profile.duration_ms, profile.duplicates())
+    """
+
+    def __init__(
+        self,
+        using: Optional[Sequence[str]] = None,
+        slow_ms: Optional[float] = None,
+    ):
+        self.using = list(using) if using is not None else list(connections)
+        self.slow_ms = slow_ms
+        self.count = 0
+        self.savepoints = 0
+        self.duration_ms = 0.0
+        self.statements: Counter = Counter()
+        self.slow: List[Dict[str, Any]] = []
+        self._stack: Optional[ExitStack] = None
+
+    def _wrapper(
+        self,
+        execute: Callable[..., Any],
+        sql: str,
+        params: Any,
+        many: bool,
+        context: dict,
+    ) -> Any:
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = (time.perf_counter() - started) * 1000
+            self.duration_ms += elapsed
+            if sql.startswith(_SAVEPOINT_PREFIXES):
+                self.savepoints += 1
+            else:
+                self.count += 1
+                self.statements[sql] += 1
+            if self.slow_ms is not None and elapsed >= self.slow_ms:
+                self.slow.append(
+                    {"sql": fingerprint(sql), "ms": round(elapsed, 2)}
+                )
+
+    def duplicates(self, min_count: int = 2) -> List[Dict[str, Any]]:
+        """
+        Consultas executadas ao menos ``min_count`` vezes, das mais
+        repetidas para as menos.
+
+        Returns:
+            Lista de ``{"sql": impressão digital, "count": execuções}``
+        """
+        grouped: Counter = Counter()
+        # Agrupa pelo texto bruto antes de normalizar: cada SQL distinto é
+        # normalizado uma única vez
+        for sql, executions in self.statements.items():
+            grouped[fingerprint(sql)] += executions
+        return [
+            {"sql": sql, "count": executions}
+            for sql, executions in grouped.most_common()
+            if executions >= min_count
+        ]
+
+    def __enter__(self) -> "QueryProfiler":
+        self._stack = ExitStack()
+        for alias in self.using:
+            self._stack.enter_context(
+                connections[alias].execute_wrapper(self._wrapper)
+            )
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if self._stack is not None:
+            self._stack.__exit__(exc_type, exc_value, traceback)
+            self._stack = None
+
+
+def _budget_message(profile: QueryProfiler, max_queries: int, label: str):
+    lines = [
+        f"{label}: {profile.count} consultas (orçamento: {max_queries})."
+    ]
+    lines += [
+        f"  {item['count']}x {item['sql']}" for item in profile.duplicates()
+    ]
+    return "\n".join(lines)
+
+
+@contextmanager
+def assert_max_queries(
+    max_queries: int, using: Optional[Sequence[str]] = None
+) -> Iterator[QueryProfiler]:
+    """
+    Falha se o trecho emitir mais de ``max_queries`` consultas.
+
+    A mensagem lista as consultas repetidas, que costumam apontar o N+1.
+
+    Args:
+        max_queries: Número máximo de consultas
+        using: Aliases observados (padrão: todos)
+
+    Raises:
+        QueryBudgetExceeded: Se o orçamento for ultrapassado
+    """
+    with QueryProfiler(using) as profile:
+        yield profile
+    if profile.count > max_queries:
+        raise QueryBudgetExceeded(
+            _budget_message(profile, max_queries, "Trecho")
+        )
+
+
+def query_budget(max_queries: int):
+    """
+    Declara o número máximo de consultas de uma view.
+
+    Pode decorar uma view função ou uma classe de view (o mesmo que definir
+    o atributo ``query_budget``). Conferido pelo
+    ``QueryInstrumentationMiddleware``.
+
+    Exemplo:
+        @query_budget(5)
+        class CourseListView(APIView):
+            ...
+    """
+
+    def decorator(view):
+        view.query_budget = max_queries
+        return view
+
+    return decorator
+
+
+def view_query_budget(view_func) -> Optional[int]:
+    """Orçamento de consultas declarado para a view, se houver."""
+    budget = getattr(view_func, "query_budget", None)
+    if budget is None:
+        view_class = getattr(view_func, "view_class", None)
+        budget = getattr(view_class, "query_budget", None)
+    return budget
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Perfila as consultas SQL de uma amostra das requisições.
+
+    Configuração (settings):
+
+    - ``QUERY_INSTRUMENTATION_SAMPLE_RATE``: fração das requisições
+      perfiladas (0 desliga);
+    - ``QUERY_BUDGET_STRICT``: perfila todas as requisições e levanta
+      ``QueryBudgetExceeded`` quando a view passa do orçamento (ative nos
+      testes); sem ele, o excesso só é registrado no log;
+    - ``SLOW_QUERY_MS``: consultas a partir deste tempo são listadas no log;
+    - ``QUERY_DUPLICATE_THRESHOLD``: execuções da mesma consulta a partir
+      das quais ela é listada como repetida.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(
+            settings, "QUERY_INSTRUMENTATION_SAMPLE_RATE", 0.0
+        )
+        self.strict = getattr(settings, "QUERY_BUDGET_STRICT", False)
+        self.slow_ms = getattr(settings, "SLOW_QUERY_MS", 200)
+        self.duplicate_threshold = getattr(
+            settings, "QUERY_DUPLICATE_THRESHOLD", 3
+        )
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self) -> bool:
+        return self.strict or (
+            self.sample_rate > 0 and random.random() < self.sample_rate
+        )
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+        with QueryProfiler(slow_ms=self.slow_ms) as profile:
+            response = self.get_response(request)
+        return self._report(request, response, profile)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+        # Sob ASGI, o ORM roda na thread de ``sync_to_async`` da
+        # requisição, que tem as suas próprias conexões: o perfilador
+        # precisa ser instalado nelas, e não nas do event loop
+        profile = QueryProfiler(slow_ms=self.slow_ms)
+        await sync_to_async(profile.__enter__)()
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(profile.__exit__)(None, None, None)
+        return self._report(request, response, profile)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._query_budget = view_query_budget(view_func)
+        match = getattr(request, "resolver_match", None)
+        request._query_view = match.view_name if match else None
+
+    def _report(self, request, response, profile: QueryProfiler):
+        """Registra o log, o cabeçalho e confere o orçamento."""
+        budget = getattr(request, "_query_budget", None)
+        over_budget = budget is not None and profile.count > budget
+        if over_budget and self.strict:
+            raise QueryBudgetExceeded(
+                _budget_message(
+                    profile, budget, f"{request.method} {request.path}"
+                )
+            )
+
+        duplicates = profile.duplicates(self.duplicate_threshold)
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": getattr(request, "_query_view", None),
+            "status": response.status_code,
+            "queries": profile.count,
+            "db_ms": round(profile.duration_ms, 2),
+            "budget": budget,
+            "over_budget": over_budget,
+            "duplicates": duplicates,
+            "slow": profile.slow,
+        }
+        level = (
+            logging.WARNING
+            if over_budget or duplicates or profile.slow
+            else logging.INFO
+        )
+        logger.log(level, json.dumps(record, ensure_ascii=False))
+
+        timing = (
+            f'db;dur={profile.duration_ms:.2f};desc="{profile.count} queries"'
+        )
+        if response.has_header("Server-Timing"):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+        return response
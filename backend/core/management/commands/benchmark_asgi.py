@@ -0,0 +1,373 @@
+"""
+Teste de carga: a mesma aplicação servida pelo uvicorn via WSGI e via ASGI.
+
+Para cada modo, sobe ``uvicorn`` (``core.wsgi:application`` com
+``--interface wsgi`` e ``core.asgi:application``) e abre ``--connections``
+conexões HTTP/1.1 keep-alive simultâneas, cada uma repetindo requisições
+GET às rotas de ``--path`` durante ``--duration`` segundos. Reporta
+requisições por segundo, latências p50/p95/p99 e erros.
+
+Sob WSGI, cada requisição ocupa uma thread do pool do uvicorn enquanto
+espera o banco; sob ASGI, as views assíncronas (ver ``core.async_views``)
+liberam o event loop a cada consulta.
+
+O gerador de carga roda na mesma máquina que o servidor: para números
+representativos, rode-o em outra máquina (``--url``) ou ao menos com mais
+núcleos que ``--workers``.
+
+Uso:
+    python manage.py benchmark_asgi --connections 1000 --duration 20
+    python manage.py benchmark_asgi --path /api/courses/{course}/ \\
+        --course <uuid>
+    python manage.py benchmark_asgi --path /api/progress/dashboard/ \\
+        --user aluno@exemplo.com
+"""
+import asyncio
+import importlib.util
+import os
+import resource
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from courses.models import Course
+
+APPLICATIONS = {
+    "wsgi": ["core.wsgi:application", "--interface", "wsgi"],
+    "asgi": ["core.asgi:application", "--interface", "asgi3"],
+}
+
+DEFAULT_PATHS = ["/api/courses/", "/api/courses/{course}/"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara o throughput e as latências do uvicorn servindo a API via "
+        "WSGI e via ASGI."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=1000,
+            help="Conexões keep-alive simultâneas",
+        )
+        parser.add_argument(
+            "--duration",
+            type=float,
+            default=15.0,
+            help="Duração de cada medição em segundos",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=float,
+            default=3.0,
+            help="Aquecimento antes de cada medição em segundos",
+        )
+        parser.add_argument(
+            "--path",
+            action="append",
+            dest="paths",
+            help=(
+                "Rota requisitada (repetível). {course} é trocado por "
+                "--course. Padrão: catálogo e árvore de um curso"
+            ),
+        )
+        parser.add_argument(
+            "--course",
+            help="ID do curso (padrão: o curso ativo mais recente)",
+        )
+        parser.add_argument(
+            "--user",
+            help="E-mail do usuário autenticado nas requisições (JWT)",
+        )
+        parser.add_argument(
+            "--mode",
+            choices=sorted(APPLICATIONS),
+            action="append",
+            dest="modes",
+            help="Modo medido (repetível; padrão: wsgi e asgi)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Processos do uvicorn",
+        )
+        parser.add_argument(
+            "--port",
+            type=int,
+            default=8765,
+            help="Porta local do uvicorn",
+        )
+        parser.add_argument(
+            "--url",
+            help=(
+                "Mede um servidor já em execução (ex.: http://host:8000) "
+                "em vez de subir o uvicorn"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        uvicorn = importlib.util.find_spec("uvicorn")
+        if not options["url"] and uvicorn is None:
+            raise CommandError(
+                "uvicorn não está instalado "
+                "(pip install -r requirements.txt)."
+            )
+
+        paths = self._paths(options["paths"] or DEFAULT_PATHS, options)
+        headers = {}
+        if options["user"]:
+            user = (
+                get_user_model()
+                .objects.filter(email=options["user"])
+                .first()
+            )
+            if user is None:
+                raise CommandError(
+                    f"Usuário {options['user']} não encontrado."
+                )
+            headers["Authorization"] = f"Bearer {AccessToken.for_user(user)}"
+
+        _raise_open_files_limit(options["connections"] + 64)
+
+        results = {}
+        if options["url"]:
+            results["url"] = self._measure(
+                options["url"], paths, headers, options
+            )
+        else:
+            for mode in options["modes"] or ["wsgi", "asgi"]:
+                self.stdout.write(f"{mode}: subindo o uvicorn...")
+                with _uvicorn(mode, options["port"], options["workers"]):
+                    results[mode] = self._measure(
+                        f"http://127.0.0.1:{options['port']}",
+                        paths,
+                        headers,
+                        options,
+                    )
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'modo':<6} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} "
+            f"{'p99 ms':>8} {'não 2xx':>8} {'erros':>6}"
+        )
+        for mode, stats in results.items():
+            self.stdout.write(
+                f"{mode:<6} {stats['rps']:>9.1f} {stats['p50']:>8.1f} "
+                f"{stats['p95']:>8.1f} {stats['p99']:>8.1f} "
+                f"{stats['non_2xx']:>8} {stats['errors']:>6}"
+            )
+
+    def _paths(self, paths, options):
+        if not any("{course}" in path for path in paths):
+            return paths
+        course_id = options["course"] or (
+            Course.objects.filter(is_active=True)
+            .order_by("-created_at")
+            .values_list("pk", flat=True)
+            .first()
+        )
+        if course_id is None:
+            raise CommandError("Nenhum curso ativo; informe --course.")
+        return [path.replace("{course}", str(course_id)) for path in paths]
+
+    def _measure(self, base_url, paths, headers, options):
+        """Aquece o servidor e mede uma rodada de carga."""
+        url = urlsplit(base_url)
+        target = (url.hostname, url.port or 80)
+        if options["warmup"] > 0:
+            asyncio.run(
+                run_load(
+                    target,
+                    paths,
+                    headers,
+                    min(options["connections"], 50),
+                    options["warmup"],
+                )
+            )
+        stats = asyncio.run(
+            run_load(
+                target,
+                paths,
+                headers,
+                options["connections"],
+                options["duration"],
+            )
+        )
+        self.stdout.write(f"  {stats}")
+        return stats
+
+
+class _uvicorn:
+    """Sobe o uvicorn em um subprocesso e o encerra ao sair do bloco."""
+
+    def __init__(self, mode, port, workers):
+        self.command = [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            *APPLICATIONS[mode],
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--workers",
+            str(workers),
+            "--no-access-log",
+            "--log-level",
+            "warning",
+            "--backlog",
+            "4096",
+        ]
+        self.port = port
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            self.command, cwd=settings.BASE_DIR, env=os.environ.copy()
+        )
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise CommandError("O uvicorn encerrou ao iniciar.")
+            try:
+                socket.create_connection(("127.0.0.1", self.port), 1).close()
+                return self
+            except OSError:
+                time.sleep(0.2)
+        self.__exit__(None, None, None)
+        raise CommandError("O uvicorn não respondeu em 30s.")
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+def _raise_open_files_limit(needed):
+    """Garante descritores de arquivo suficientes para as conexões."""
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft >= needed:
+        return
+    if hard != resource.RLIM_INFINITY and hard < needed:
+        raise CommandError(
+            f"Limite de arquivos abertos ({hard}) menor que {needed}; "
+            "aumente com ulimit -n."
+        )
+    resource.setrlimit(resource.RLIMIT_NOFILE, (needed, hard))
+
+
+async def _read_response(reader):
+    """Lê uma resposta HTTP/1.1 e retorna (status, keep_alive)."""
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionResetError("conexão encerrada pelo servidor")
+    status = int(status_line.split(b" ", 2)[1])
+
+    length, chunked, keep_alive = 0, False, True
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b""):
+            break
+        name, _sep, value = line.partition(b":")
+        name, value = name.strip().lower(), value.strip().lower()
+        if name == b"content-length":
+            length = int(value)
+        elif name == b"transfer-encoding":
+            chunked = b"chunked" in value
+        elif name == b"connection":
+            keep_alive = value != b"close"
+
+    if chunked:
+        while True:
+            size = int((await reader.readline()).split(b";")[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    elif length:
+        await reader.readexactly(length)
+    return status, keep_alive
+
+
+async def _client(target, requests, deadline, latencies, counters):
+    """Uma conexão keep-alive repetindo as requisições até ``deadline``."""
+    reader = writer = None
+    index = 0
+    while time.monotonic() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(*target)
+            started = time.perf_counter()
+            writer.write(requests[index % len(requests)])
+            index += 1
+            status, keep_alive = await _read_response(reader)
+            latencies.append((time.perf_counter() - started) * 1000)
+            if not 200 <= status < 300:
+                counters["non_2xx"] += 1
+        except (OSError, asyncio.IncompleteReadError, ValueError):
+            counters["errors"] += 1
+            keep_alive = False
+            await asyncio.sleep(0.05)
+        if not keep_alive and writer is not None:
+            writer.close()
+            reader = writer = None
+    if writer is not None:
+        writer.close()
+
+
+async def run_load(target, paths, headers, connections, duration):
+    """
+    Gera carga com ``connections`` conexões simultâneas.
+
+    Returns:
+        Dicionário com ``requests``, ``rps``, ``p50``, ``p95``, ``p99``
+        (ms), ``non_2xx`` e ``errors``
+    """
+    host = f"{target[0]}:{target[1]}"
+    extra = "".join(f"{name}: {value}\r\n" for name, value in headers.items())
+    requests = [
+        (
+            f"GET {path} HTTP/1.1\r\nHost: {host}\r\n"
+            f"Accept: application/json\r\n{extra}\r\n"
+        ).encode()
+        for path in paths
+    ]
+    latencies = []
+    counters = {"non_2xx": 0, "errors": 0}
+
+    started = time.monotonic()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            _client(target, requests, deadline, latencies, counters)
+            for _ in range(connections)
+        )
+    )
+    elapsed = time.monotonic() - started
+
+    if len(latencies) >= 2:
+        cuts = statistics.quantiles(latencies, n=100)
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": p50,
+        "p95": p95,
+        "p99": p99,
+        **counters,
+    }
@@ -0,0 +1,160 @@
+"""
+Benchmark da reutilização de conexões com o banco.
+
+Simula ``--requests`` requisições (sinais ``request_started`` e
+``request_finished``, como o handler do Django) com ``--queries`` consultas
+simples cada, e compara a latência por requisição em três modos:
+
+- ``per_request``: ``CONN_MAX_AGE = 0``, um handshake por requisição;
+- ``persistent``: ``CONN_MAX_AGE`` > 0 com ``CONN_HEALTH_CHECKS``;
+- ``pool``: pool do psycopg 3 (ignorado se ``psycopg[pool]`` não estiver
+  instalado).
+
+Aponte ``SUPABASE_DB_HOST`` para um PostgreSQL local para medir sem a rede;
+contra o Supabase, a diferença inclui o TLS e a latência até o servidor.
+
+Uso:
+    python manage.py benchmark_connections --requests 500 --threads 4
+"""
+import importlib.util
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.core.signals import request_finished, request_started
+from django.db import connection, connections
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
+
+from core.backends.postgresql.base import (
+    connection_stats,
+    reset_connection_stats,
+)
+
+MODES = ("per_request", "persistent", "pool")
+
+
+def _pool_available() -> bool:
+    if not is_psycopg3:
+        return False
+    return importlib.util.find_spec("psycopg_pool") is not None
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a latência por requisição sem reutilização de conexões, "
+        "com conexões persistentes e com o pool do psycopg 3."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=500,
+            help="Requisições simuladas por thread",
+        )
+        parser.add_argument(
+            "--queries",
+            type=int,
+            default=3,
+            help="Consultas por requisição",
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=1,
+            help="Requisições simultâneas",
+        )
+        parser.add_argument(
+            "--pool-size",
+            type=int,
+            default=4,
+            help="Tamanho máximo do pool no modo pool",
+        )
+
+    def handle(self, *args, **options):
+        settings_dict = connection.settings_dict
+        original_max_age = settings_dict["CONN_MAX_AGE"]
+        original_options = dict(settings_dict["OPTIONS"])
+        original_options.pop("pool", None)
+
+        results = {}
+        try:
+            for mode in MODES:
+                if mode == "pool" and not _pool_available():
+                    self.stdout.write(
+                        "pool: ignorado (psycopg 3 com psycopg_pool não "
+                        "está instalado)"
+                    )
+                    continue
+                self._configure(mode, original_options, options["pool_size"])
+                results[mode] = self._run(
+                    options["requests"],
+                    options["queries"],
+                    options["threads"],
+                )
+        finally:
+            connections.close_all()
+            connection.close_pool()
+            settings_dict["CONN_MAX_AGE"] = original_max_age
+            settings_dict["OPTIONS"] = original_options
+
+        self.stdout.write("")
+        self.stdout.write(
+            f"{'modo':<12} {'p50 ms':>8} {'p95 ms':>8} {'média ms':>9} "
+            f"{'conexões':>9} {'obtenção ms':>12}"
+        )
+        for mode, (latencies, stats) in results.items():
+            latencies.sort()
+            self.stdout.write(
+                f"{mode:<12} "
+                f"{statistics.median(latencies):>8.2f} "
+                f"{latencies[int(len(latencies) * 0.95) - 1]:>8.2f} "
+                f"{statistics.fmean(latencies):>9.2f} "
+                f"{stats['checkouts']:>9} "
+                f"{stats['avg_checkout_ms']:>12.2f}"
+            )
+        for mode, (_latencies, stats) in results.items():
+            self.stdout.write(f"{mode}: {stats}")
+
+    def _configure(self, mode, options, pool_size):
+        """Fecha as conexões atuais e aplica as configurações do modo."""
+        connections.close_all()
+        connection.close_pool()
+        settings_dict = connection.settings_dict
+        settings_dict["OPTIONS"] = dict(options)
+        settings_dict["CONN_MAX_AGE"] = 60 if mode == "persistent" else 0
+        if mode == "pool":
+            settings_dict["OPTIONS"]["pool"] = {
+                "min_size": 1,
+                "max_size": pool_size,
+            }
+        reset_connection_stats()
+
+    def _run(self, requests, queries, threads):
+        """Executa as requisições simuladas e retorna latências e métricas."""
+        latencies = []
+        lock = threading.Lock()
+
+        def worker():
+            local = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                request_started.send(sender=self.__class__)
+                with connections["default"].cursor() as cursor:
+                    for _ in range(queries):
+                        cursor.execute("SELECT 1")
+                        cursor.fetchone()
+                request_finished.send(sender=self.__class__)
+                local.append((time.perf_counter() - started) * 1000)
+            # Conexão persistente da thread (ou devolvida ao pool)
+            connections.close_all()
+            with lock:
+                latencies.extend(local)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return latencies, connection_stats()
@@ -0,0 +1,122 @@
+"""
+Benchmark do mapa de identidade por requisição.
+
+Cria dados temporários (descartados ao final via rollback): um curso com um
+módulo e ``--rows`` aulas. Mede o tempo de instanciar todas as aulas e o
+número de consultas e o tempo de chamar ``str()`` em cada uma (o que acessa
+módulo e curso), sem e com ``identity_scope()``.
+
+Uso:
+    python manage.py benchmark_identity_map --rows 10000
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.identity_map import identity_scope
+from core.instrumentation import QueryCounter
+from courses.models import Course, Lesson, Module
+
+
+class _Rollback(Exception):
+    """Usada para descartar os dados do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o custo de instanciar aulas e as consultas de __str__ com e "
+        "sem o mapa de identidade (os dados criados são descartados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10000,
+            help="Número de aulas carregadas",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        try:
+            with transaction.atomic():
+                module = self._create_fixtures(rows)
+                results = self._run(module)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(f"Aulas carregadas: {rows}")
+        self.stdout.write(
+            f"Instanciação: {results['load_ms']:.1f} ms "
+            f"({results['load_ms'] * 1000 / rows:.2f} µs por linha)"
+        )
+        self.stdout.write(f"{'':>14} {'consultas':>10} {'tempo (ms)':>12}")
+        for label in ("sem mapa", "com mapa"):
+            queries, elapsed = results[label]
+            self.stdout.write(f"{label:>14} {queries:>10} {elapsed:>12.1f}")
+        self.stdout.write(f"Mapa de identidade: {results['stats']}")
+
+    def _create_fixtures(self, rows):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create(
+            username=f"bench-teacher-{suffix}", user_type="teacher"
+        )
+        course = Course.objects.create(
+            title="Benchmark",
+            slug=f"benchmark-{suffix}",
+            description="Curso temporário de benchmark",
+            created_by=owner,
+        )
+        module = Module.objects.create(
+            course=course, title="Módulo", description="", order=1
+        )
+        Lesson.objects.bulk_create(
+            (
+                Lesson(
+                    module=module,
+                    title=f"Aula {i}",
+                    description="",
+                    video_url="https://example.com/video",
+                    duration=10,
+                    order=i,
+                )
+                for i in range(rows)
+            ),
+            batch_size=2000,
+        )
+        return module
+
+    def _run(self, module):
+        queryset = Lesson.objects.filter(module=module).order_by("order")
+        results = {}
+
+        started = time.perf_counter()
+        list(queryset.all())
+        results["load_ms"] = (time.perf_counter() - started) * 1000
+
+        lessons = list(queryset.all())
+        started = time.perf_counter()
+        with QueryCounter() as counter:
+            for lesson in lessons:
+                str(lesson)
+        results["sem mapa"] = (
+            counter.count,
+            (time.perf_counter() - started) * 1000,
+        )
+
+        lessons = list(queryset.all())
+        started = time.perf_counter()
+        with identity_scope() as identity_map, QueryCounter() as counter:
+            for lesson in lessons:
+                str(lesson)
+        results["com mapa"] = (
+            counter.count,
+            (time.perf_counter() - started) * 1000,
+        )
+        results["stats"] = identity_map.stats()
+        return results
@@ -0,0 +1,88 @@
+"""
+Benchmark de chaves primárias uuid4 x uuid7.
+
+Para cada gerador de ``core.ids``, cria uma tabela temporária com chave
+primária UUID, insere ``--rows`` linhas em lotes (gerando as chaves no
+Python, como faz o ``default`` dos modelos) e mostra a vazão de inserção e
+o tamanho do índice da chave primária ao final. As tabelas são temporárias
+e somem com a conexão.
+
+Uso:
+    python manage.py benchmark_primary_keys --rows 1000000
+"""
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from core.ids import GENERATORS
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara vazão de inserção e tamanho do índice da chave primária "
+        "com uuid4 e uuid7 (em tabelas temporárias)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1_000_000,
+            help="Número de linhas inseridas por gerador",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=10_000,
+            help="Linhas por INSERT",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        batch_size = options["batch_size"]
+
+        self.stdout.write(
+            f"{'gerador':>8} {'linhas/s':>12} {'índice (MB)':>12} "
+            f"{'tabela (MB)':>12}"
+        )
+        for name, generator in GENERATORS.items():
+            rate, index_size, table_size = self._run(
+                name, generator, rows, batch_size
+            )
+            self.stdout.write(
+                f"{name:>8} {rate:>12,.0f} {index_size / 2**20:>12.1f} "
+                f"{table_size / 2**20:>12.1f}"
+            )
+
+    def _run(self, name, generator, rows, batch_size):
+        table = f"benchmark_pk_{name}"
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {table}")
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {table} ("
+                "id uuid PRIMARY KEY, "
+                "created_at timestamptz NOT NULL DEFAULT now(), "
+                "payload integer NOT NULL)"
+            )
+
+            started = time.perf_counter()
+            for offset in range(0, rows, batch_size):
+                size = min(batch_size, rows - offset)
+                ids = [generator() for _ in range(size)]
+                with transaction.atomic():
+                    cursor.execute(
+                        f"INSERT INTO {table} (id, payload) "
+                        "SELECT unnest(%s::uuid[]), generate_series(1, %s)",
+                        [ids, size],
+                    )
+            elapsed = time.perf_counter() - started
+
+            cursor.execute(
+                "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+                [f"{table}_pkey", table],
+            )
+            index_size, table_size = cursor.fetchone()
+            cursor.execute(f"DROP TABLE {table}")
+
+        return rows / elapsed, index_size, table_size
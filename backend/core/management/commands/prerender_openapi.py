@@ -0,0 +1,49 @@
+"""
+Pré-renderiza o documento OpenAPI da API (ver ``core.schema``).
+
+Gera o documento uma vez e grava JSON e YAML, com as versões gzip (e
+brotli, se disponível), em ``--output`` (padrão: ``OPENAPI_SCHEMA_DIR``).
+Rode no deploy, depois de ``collectstatic``: os processos da aplicação leem
+os arquivos em vez de introspectar todas as views.
+
+Uso:
+    python manage.py prerender_openapi
+    python manage.py prerender_openapi --output /srv/handfluency/openapi
+"""
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.schema import render_schema, schema_directory, write_schema
+
+
+class Command(BaseCommand):
+    help = "Gera e grava o documento OpenAPI pré-renderizado."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            help="Diretório de destino (padrão: OPENAPI_SCHEMA_DIR)",
+        )
+
+    def handle(self, *args, **options):
+        directory = (
+            Path(options["output"]) if options["output"] else schema_directory()
+        )
+        if directory is None:
+            raise CommandError(
+                "Informe --output ou defina OPENAPI_SCHEMA_DIR."
+            )
+
+        started = time.perf_counter()
+        document = render_schema()
+        elapsed = time.perf_counter() - started
+        for path in write_schema(directory, document):
+            self.stdout.write(f"{path} ({path.stat().st_size} bytes)")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Documento OpenAPI gerado em {elapsed:.2f}s "
+                f"(ETag {document['.json'].etag('identity')})."
+            )
+        )
@@ -0,0 +1,413 @@
+"""
+Paginação por chave (keyset) para as listagens da API.
+
+``PageNumberPagination`` faz ``OFFSET`` (o banco percorre e descarta todas
+as linhas anteriores à página) e um ``COUNT(*)`` completo a cada
+requisição, o que fica caro em tabelas grandes como ``quiz_attempts``,
+``lesson_progress`` e ``class_notifications``. ``KeysetPagination``
+continua a listagem a partir dos valores da última linha entregue:
+
+    WHERE (created_at < :c) OR (created_at = :c AND id > :id)
+    ORDER BY created_at DESC, id
+    LIMIT :page_size + 1
+
+O custo de uma página é o mesmo no início ou no milionésimo registro. A
+linha extra indica se há próxima página, sem ``COUNT``. O total só é
+calculado se o cliente pedir (``?count=1``) e, mesmo assim, é uma
+estimativa do planejador do PostgreSQL (``pg_class.reltuples``).
+
+Os cursores são assinados (``django.core.signing``): o cliente não
+consegue alterá-los nem reaproveitá-los em uma listagem com outra ordem.
+"""
+import datetime
+import decimal
+import json
+import uuid
+from typing import List, Optional, Sequence, Tuple
+
+from django.core import signing
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.models import Q
+from django.utils.translation import gettext_lazy as _
+from rest_framework.compat import coreapi, coreschema
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+# Campo de desempate acrescentado às ordenações que não terminam em "id"
+TIEBREAKER = "id"
+
+SIGNING_SALT = "core.pagination.keyset"
+
+
+class KeysetPagination(BasePagination):
+    """
+    Paginação por cursor baseada na ordenação natural do modelo.
+
+    A ordenação vem, nesta ordem, de ``view.ordering``, de
+    ``Meta.ordering`` do modelo (se usar apenas campos do próprio modelo)
+    ou de ``-created_at``. Apenas campos não nulos da própria tabela são
+    aceitos. A ordenação sempre termina em ``id``, para que cada linha
+    tenha uma posição única. Ex.: ``("-created_at", "id")``,
+    ``("-sent_at", "id")``, ``("date", "start_time", "id")``.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    count_query_param = "count"
+    invalid_cursor_message = _("Cursor inválido.")
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        page = self._page_queryset(queryset, request, view)
+        if self._wants_count(request):
+            self.total = estimate_count(queryset.order_by())
+        return self._set_page(list(page))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        Versão assíncrona de ``paginate_queryset`` (ver
+        ``core.async_views``).
+
+        A página é lida com ``aiterator()``. O total estimado (``?count=1``)
+        não é calculado, pois depende de uma consulta SQL direta.
+        """
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        page = self._page_queryset(queryset, request, view)
+        return self._set_page([row async for row in page.aiterator()])
+
+    def _page_queryset(self, queryset, request, view):
+        """Consulta da página pedida, com uma linha a mais."""
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(queryset, view)
+        self.fields = [
+            _resolve_field(queryset.model, name)
+            for name, _desc in self.ordering
+        ]
+        self.total = None
+
+        position, reverse = self.decode_cursor(request)
+        self.position, self.reverse = position, reverse
+        ordering = self.ordering
+        if reverse:
+            ordering = [(name, not desc) for name, desc in ordering]
+
+        queryset = queryset.order_by(
+            *[f"-{name}" if desc else name for name, desc in ordering]
+        )
+        if position is not None:
+            queryset = queryset.filter(_after(ordering, position))
+        return queryset[: self.page_size + 1]
+
+    def _set_page(self, rows):
+        """Guarda o estado da página lida e retorna suas linhas."""
+        position, reverse = self.position, self.reverse
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+
+        # Em uma página obtida voltando, "há mais" vale para trás
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = (
+            position is not None if not reverse else has_more
+        )
+        self.first = rows[0] if rows else None
+        self.last = rows[-1] if rows else None
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        }
+        if self.total is not None:
+            payload["count"] = self.total
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "count": {
+                    "type": "integer",
+                    "description": "Total estimado (apenas com ?count=1)",
+                },
+                "results": schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size,
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_ordering(self, queryset, view) -> List[Tuple[str, bool]]:
+        """
+        Ordenação da listagem como pares ``(campo, descendente)``.
+
+        Raises:
+            ImproperlyConfigured: Se ``view.ordering`` usar campos que não
+                pertencem ao modelo
+        """
+        model = queryset.model
+        ordering = getattr(view, "ordering", None)
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+        if not ordering:
+            ordering = model._meta.ordering
+            if not all(_is_local(model, name) for name in ordering):
+                ordering = ("-created_at",) if _is_local(
+                    model, "created_at"
+                ) else ()
+
+        pairs = []
+        for name in ordering:
+            if not isinstance(name, str) or name == "?":
+                raise ImproperlyConfigured(
+                    f"Ordenação não suportada pela paginação: {name!r}"
+                )
+            desc = name.startswith("-")
+            name = name.lstrip("-")
+            if name == "pk":
+                name = TIEBREAKER
+            if not _is_local(model, name):
+                raise ImproperlyConfigured(
+                    f"{model.__name__}.{name} não pode ser usado na "
+                    "paginação por chave (use campos não nulos do próprio "
+                    "modelo)."
+                )
+            pairs.append((_resolve_field(model, name).attname, desc))
+
+        if TIEBREAKER not in [name for name, _desc in pairs]:
+            pairs.append((TIEBREAKER, False))
+        return pairs
+
+    # Cursores
+
+    def encode_cursor(self, obj, reverse: bool) -> str:
+        position = [
+            _dump_value(getattr(obj, field.attname)) for field in self.fields
+        ]
+        token = signing.dumps(
+            {"o": self._signature(), "p": position, "r": reverse},
+            salt=SIGNING_SALT,
+            compress=True,
+        )
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, token
+        )
+
+    def decode_cursor(self, request) -> Tuple[Optional[list], bool]:
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = signing.loads(token, salt=SIGNING_SALT)
+            if payload["o"] != self._signature():
+                raise ValueError
+            position = [
+                field.to_python(value)
+                for field, value in zip(self.fields, payload["p"], strict=True)
+            ]
+            return position, bool(payload["r"])
+        except (signing.BadSignature, KeyError, TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or self.last is None:
+            return None
+        return self.encode_cursor(self.last, reverse=False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous or self.first is None:
+            return None
+        return self.encode_cursor(self.first, reverse=True)
+
+    def _signature(self) -> str:
+        return ",".join(
+            f"-{name}" if desc else name for name, desc in self.ordering
+        )
+
+    def _wants_count(self, request) -> bool:
+        value = request.query_params.get(self.count_query_param, "")
+        return value.lower() in {"1", "true", "yes"}
+
+    # Esquema
+
+    def get_schema_fields(self, view):
+        assert coreapi is not None, (
+            "coreapi must be installed to use `get_schema_fields()`"
+        )
+        assert coreschema is not None, (
+            "coreschema must be installed to use `get_schema_fields()`"
+        )
+        return [
+            coreapi.Field(
+                name=self.cursor_query_param,
+                required=False,
+                location="query",
+                schema=coreschema.String(
+                    description="Cursor de paginação (links next/previous)"
+                ),
+            ),
+            coreapi.Field(
+                name=self.page_size_query_param,
+                required=False,
+                location="query",
+                schema=coreschema.Integer(
+                    description="Número de resultados por página"
+                ),
+            ),
+            coreapi.Field(
+                name=self.count_query_param,
+                required=False,
+                location="query",
+                schema=coreschema.Boolean(
+                    description="Inclui o total estimado de registros"
+                ),
+            ),
+        ]
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Cursor de paginação (links next/previous)",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Número de resultados por página",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Inclui o total estimado de registros",
+                "schema": {"type": "boolean"},
+            },
+        ]
+
+
+def estimate_count(queryset) -> int:
+    """
+    Estimativa do número de linhas de uma consulta, sem ``COUNT(*)``.
+
+    Sem filtros, usa ``pg_class.reltuples`` da tabela (atualizado por
+    ``ANALYZE``/autovacuum). Com filtros, usa a estimativa de linhas do
+    plano (``EXPLAIN``), que também não executa a consulta.
+
+    Args:
+        queryset: Consulta cujas linhas serão estimadas
+
+    Returns:
+        int: Número estimado de linhas (0 se não houver estatísticas)
+    """
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if not queryset.query.where:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = to_regclass(%s)",
+                [connection.ops.quote_name(queryset.model._meta.db_table)],
+            )
+            row = cursor.fetchone()
+            return max(int(row[0]), 0) if row else 0
+
+        sql, params = queryset.values("pk").query.sql_with_params()
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def _is_local(model, name) -> bool:
+    """Indica se ``name`` é um campo não nulo da própria tabela do modelo."""
+    if not isinstance(name, str):
+        return False
+    name = name.lstrip("-")
+    if name == "pk":
+        return True
+    field = next(
+        (
+            f
+            for f in model._meta.concrete_fields
+            if name in (f.name, f.attname)
+        ),
+        None,
+    )
+    return field is not None and not field.null
+
+
+def _resolve_field(model, name: str):
+    if name == "pk":
+        return model._meta.pk
+    for field in model._meta.concrete_fields:
+        if name in (field.name, field.attname):
+            return field
+    raise ImproperlyConfigured(f"{model.__name__} não possui o campo {name}")
+
+
+def _after(ordering: Sequence[Tuple[str, bool]], position: Sequence) -> Q:
+    """
+    Condição "depois de ``position``" para uma ordenação com direções mistas.
+
+    Para ``(a, b, c)``: ``a > va OR (a = va AND b > vb) OR (a = va AND
+    b = vb AND c > vc)``, com ``<`` nos campos descendentes. O limite
+    redundante ``a >= va`` é acrescentado para que o PostgreSQL use o
+    índice como condição de acesso (um ``OR`` sozinho vira apenas filtro,
+    e cada página percorreria o índice desde o início).
+    """
+    condition = Q()
+    equal = {}
+    for (name, desc), value in zip(ordering, position):
+        lookup = "lt" if desc else "gt"
+        condition |= Q(**equal, **{f"{name}__{lookup}": value})
+        equal[name] = value
+
+    name, desc = ordering[0]
+    bound = Q(**{f"{name}__{'lte' if desc else 'gte'}": position[0]})
+    return bound & condition
+
+
+def _dump_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    return value
+
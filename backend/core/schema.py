@@ -0,0 +1,186 @@
+"""
+Documento OpenAPI pré-renderizado.
+
+Gerar o schema com o drf_yasg percorre todas as views e serializers da API.
+Como o documento é público (o mesmo para qualquer usuário) e só muda com o
+código, ele é gerado uma única vez por processo (na primeira requisição) ou
+lido dos arquivos gravados no deploy pelo comando ``prerender_openapi``.
+
+Cada formato (``.json`` e ``.yaml``) fica guardado já codificado em bytes,
+junto com as versões comprimidas (gzip e, se o pacote ``brotli`` estiver
+instalado, brotli) e um ETag derivado do conteúdo. ``OpenAPISchemaView``
+apenas escolhe a variante e responde, com suporte a GET condicional.
+"""
+import gzip
+import hashlib
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional
+
+from django.conf import settings
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson, OpenAPICodecYaml
+from drf_yasg.generators import OpenAPISchemaGenerator
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - dependência opcional
+    brotli = None
+
+API_INFO = openapi.Info(
+    title="Hand Fluency API",
+    default_version="v1",
+    description="API para a plataforma de ensino de Libras",
+    terms_of_service="https://www.handfluency.com/terms/",
+    contact=openapi.Contact(email="contact@handfluency.com"),
+    license=openapi.License(name="MIT License"),
+)
+
+# Formato na URL -> (tipo de conteúdo, codec do drf_yasg)
+FORMATS = {
+    ".json": ("application/json", OpenAPICodecJson),
+    ".yaml": ("application/yaml", OpenAPICodecYaml),
+}
+
+# Extensão de arquivo de cada codificação
+ENCODINGS = {"identity": "", "gzip": ".gz", "br": ".br"}
+
+FILE_NAME = "openapi"
+
+
+@dataclass(frozen=True)
+class EncodedSchema:
+    """
+    Um formato do documento, pronto para ser enviado.
+
+    Attributes:
+        content_type: Tipo de conteúdo (``application/json``, ...)
+        digest: Hash do conteúdo sem compressão
+        variants: Corpo de cada codificação (``identity``, ``gzip``, ``br``)
+    """
+
+    content_type: str
+    digest: str
+    variants: Dict[str, bytes]
+
+    def etag(self, encoding: str) -> str:
+        """ETag forte da variante (cada codificação tem o seu)."""
+        if encoding == "identity":
+            return f'"{self.digest}"'
+        return f'"{self.digest}-{encoding}"'
+
+
+def _compress(content: bytes) -> Dict[str, bytes]:
+    variants = {
+        "identity": content,
+        # mtime fixo: o mesmo documento gera sempre os mesmos bytes
+        "gzip": gzip.compress(content, compresslevel=9, mtime=0),
+    }
+    if brotli is not None:
+        variants["br"] = brotli.compress(content)
+    return variants
+
+
+def _encoded(content_type: str, variants: Dict[str, bytes]) -> EncodedSchema:
+    digest = hashlib.sha256(variants["identity"]).hexdigest()[:32]
+    return EncodedSchema(content_type, digest, variants)
+
+
+def render_schema() -> Dict[str, EncodedSchema]:
+    """
+    Gera o documento OpenAPI público e o codifica em todos os formatos.
+
+    Returns:
+        Dicionário ``{formato: EncodedSchema}``
+    """
+    generator = OpenAPISchemaGenerator(API_INFO)
+    schema = generator.get_schema(request=None, public=True)
+    return {
+        fmt: _encoded(
+            content_type, _compress(codec_class(validators=[]).encode(schema))
+        )
+        for fmt, (content_type, codec_class) in FORMATS.items()
+    }
+
+
+def write_schema(directory: Path, document: Dict[str, EncodedSchema]) -> list:
+    """
+    Grava todas as variantes do documento em ``directory``.
+
+    Args:
+        directory: Diretório de destino (criado se não existir)
+        document: Resultado de ``render_schema``
+
+    Returns:
+        Lista dos arquivos gravados
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    written = []
+    for fmt, encoded in document.items():
+        for encoding, content in encoded.variants.items():
+            path = directory / f"{FILE_NAME}{fmt}{ENCODINGS[encoding]}"
+            path.write_bytes(content)
+            written.append(path)
+    return written
+
+
+def read_schema(directory: Path) -> Optional[Dict[str, EncodedSchema]]:
+    """
+    Lê o documento gravado por ``write_schema``.
+
+    Returns:
+        Dicionário ``{formato: EncodedSchema}`` ou None se faltar algum
+        formato
+    """
+    document = {}
+    for fmt, (content_type, _codec) in FORMATS.items():
+        variants = {}
+        for encoding, suffix in ENCODINGS.items():
+            path = directory / f"{FILE_NAME}{fmt}{suffix}"
+            if path.is_file():
+                variants[encoding] = path.read_bytes()
+        if "identity" not in variants:
+            return None
+        if "gzip" not in variants:
+            variants["gzip"] = _compress(variants["identity"])["gzip"]
+        document[fmt] = _encoded(content_type, variants)
+    return document
+
+
+_document: Optional[Dict[str, EncodedSchema]] = None
+_lock = threading.Lock()
+
+
+def schema_directory() -> Optional[Path]:
+    """Diretório dos arquivos pré-renderizados (``OPENAPI_SCHEMA_DIR``)."""
+    directory = getattr(settings, "OPENAPI_SCHEMA_DIR", "")
+    return Path(directory) if directory else None
+
+
+def get_schema_document() -> Dict[str, EncodedSchema]:
+    """
+    Documento OpenAPI do processo, carregado ou gerado uma única vez.
+
+    Usa os arquivos de ``OPENAPI_SCHEMA_DIR``, se existirem; senão, gera o
+    documento na primeira chamada.
+
+    Returns:
+        Dicionário ``{formato: EncodedSchema}``
+    """
+    global _document
+    if _document is not None:
+        return _document
+    with _lock:
+        if _document is None:
+            directory = schema_directory()
+            document = read_schema(directory) if directory else None
+            _document = document or render_schema()
+    return _document
+
+
+def clear_schema_document() -> None:
+    """Descarta o documento do processo (a próxima chamada o recarrega)."""
+    global _document
+    with _lock:
+        _document = None
@@ -48,6 +48,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Third party apps
     "rest_framework",
     "rest_framework_simplejwt",
@@ -55,6 +56,7 @@ INSTALLED_APPS = [
     "corsheaders",
     "django_extensions",
     # Local apps
+    "core",
     "users",
     "courses",
     "scheduling",
@@ -64,6 +66,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.instrumentation.QueryInstrumentationMiddleware",
+    "core.identity_map.IdentityMapMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",  # CORS middleware
     "django.middleware.common.CommonMiddleware",
@@ -97,10 +101,34 @@ WSGI_APPLICATION = "core.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Conexões (ver core.backends.postgresql)
+# Segundos que uma conexão é reaproveitada entre requisições, evitando um
+# novo handshake TCP + TLS + autenticação a cada requisição (0 fecha a
+# conexão ao fim de cada requisição). Desligado por padrão: sob ASGI
+# (core.asgi, views assíncronas) as conexões do Django pertencem às threads
+# de sync_to_async, e conexões persistentes ficam abertas nelas sem serem
+# reaproveitadas nem fechadas. Sob ASGI, use DB_POOL; apenas em
+# implantações exclusivamente WSGI vale definir, por exemplo, 60
+DB_CONN_MAX_AGE = config("DB_CONN_MAX_AGE", default=0, cast=int)
+# Pool nativo do psycopg 3 (requer "psycopg[pool]"); substitui as conexões
+# persistentes e é a forma de reaproveitar conexões sob ASGI
+DB_POOL = config("DB_POOL", default=False, cast=bool)
+DB_POOL_MIN_SIZE = config("DB_POOL_MIN_SIZE", default=2, cast=int)
+DB_POOL_MAX_SIZE = config("DB_POOL_MAX_SIZE", default=10, cast=int)
+# Segundos que uma requisição espera por uma conexão livre do pool
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=10, cast=float)
+# Banco atrás de um pooler em modo transação (PgBouncer, Supavisor na porta
+# 6543): sem cursores no servidor nem prepared statements. O papel do banco
+# deve ter "timezone" = UTC (ALTER ROLE ... SET timezone TO 'UTC') para que
+# o Django não precise alterar o fuso da sessão
+DB_TRANSACTION_POOLER = config(
+    "DB_TRANSACTION_POOLER", default=False, cast=bool
+)
+
 # Configuração do Supabase PostgreSQL
 DATABASES = {
     "default": {
-        "ENGINE": "django.db.backends.postgresql",
+        "ENGINE": "core.backends.postgresql",
         "NAME": config("SUPABASE_DB_NAME", default="handfluency"),
         "USER": config("SUPABASE_DB_USER", default="postgres"),
         "PASSWORD": config("SUPABASE_DB_PASSWORD", default="Admin@"),
@@ -108,12 +136,28 @@ DATABASES = {
             "SUPABASE_DB_HOST", default="db.wgqdcxlzfxtewxzyyyhu.supabase.co"
         ),
         "PORT": config("SUPABASE_DB_PORT", default="5432"),
+        # O pool já reaproveita as conexões; com ele, o Django as devolve
+        # ao fim de cada requisição
+        "CONN_MAX_AGE": 0 if DB_POOL else DB_CONN_MAX_AGE,
+        # Testa a conexão reaproveitada antes da primeira consulta de cada
+        # requisição (e, com o pool, a cada retirada)
+        "CONN_HEALTH_CHECKS": True,
+        "DISABLE_SERVER_SIDE_CURSORS": DB_TRANSACTION_POOLER,
         "OPTIONS": {
             "sslmode": config("SUPABASE_SSL_MODE", default="require"),
         },
     }
 }
 
+if DB_POOL:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": DB_POOL_MIN_SIZE,
+        "max_size": DB_POOL_MAX_SIZE,
+        "timeout": DB_POOL_TIMEOUT,
+    }
+    if DB_TRANSACTION_POOLER:
+        DATABASES["default"]["OPTIONS"]["prepare_threshold"] = None
+
 # Alternativa: usar DATABASE_URL
 # DATABASE_URL = config('DATABASE_URL', default=None)
 # if DATABASE_URL:
@@ -169,8 +213,14 @@ STATIC_URL = "static/"
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
-# Alterado para UUIDField para compatibilidade com Supabase
-DEFAULT_AUTO_FIELD = "django.db.models.UUIDField"
+# Os modelos do projeto declaram chave primária UUID explicitamente
+# (core.base_models.UUIDModel, compatível com o Supabase); este valor vale
+# apenas para tabelas geradas automaticamente. Precisa ser um AutoField.
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Gerador das chaves primárias UUID (core.ids.default_pk): "uuid4" ou
+# "uuid7" (ordenado pelo tempo, melhor localidade nos índices B-tree)
+PRIMARY_KEY_GENERATOR = config("PRIMARY_KEY_GENERATOR", default="uuid4")
 
 # Django REST Framework settings
 REST_FRAMEWORK = {
@@ -178,13 +228,11 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticated",
     ],
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_SCHEMA_CLASS": "rest_framework.schemas.coreapi.AutoSchema",
-    "DEFAULT_PAGINATION_CLASS": (
-        "rest_framework.pagination.PageNumberPagination"
-        ),
+    "DEFAULT_PAGINATION_CLASS": "core.pagination.KeysetPagination",
     "PAGE_SIZE": 10,
 }
 
@@ -258,9 +306,154 @@ X_FRAME_OPTIONS = "DENY"
 SWAGGER_SETTINGS = {
     "SECURITY_DEFINITIONS": {
         "Bearer": {"type": "apiKey", "name": "Authorization", "in": "header"}
-    }
+    },
+    # Documento pré-renderizado (core.schema) em vez de gerá-lo a cada acesso
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+}
+REDOC_SETTINGS = {
+    "SPEC_URL": ("schema-json", {"format": ".json"}),
+}
+# Diretório com o documento OpenAPI gravado por "manage.py prerender_openapi"
+# no deploy (vazio: gerado na primeira requisição de cada processo)
+OPENAPI_SCHEMA_DIR = config("OPENAPI_SCHEMA_DIR", default="")
+# Tempo, em segundos, que clientes e proxies podem reutilizar o documento
+OPENAPI_SCHEMA_MAX_AGE = config(
+    "OPENAPI_SCHEMA_MAX_AGE", default=300, cast=int
+)
+
+# Cache
+# Em memória local por padrão; em produção, aponte para um cache
+# compartilhado (ex.: django.core.cache.backends.redis.RedisCache)
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="handfluency"),
+    },
+    # Campos de autenticação dos usuários (ver users.authentication)
+    "users": {
+        "BACKEND": config(
+            "AUTH_USER_CACHE_BACKEND",
+            default="django.core.cache.backends.locmem.LocMemCache",
+        ),
+        "LOCATION": config(
+            "AUTH_USER_CACHE_LOCATION", default="handfluency-users"
+        ),
+        "TIMEOUT": config("AUTH_USER_CACHE_TIMEOUT", default=60, cast=int),
+        "OPTIONS": {
+            "MAX_ENTRIES": config(
+                "AUTH_USER_CACHE_MAX_ENTRIES", default=10000, cast=int
+            ),
+        },
+    },
 }
 
+# Instrumentação de consultas (ver core.instrumentation)
+# Fração das requisições perfiladas (0 desliga; 1 perfila todas)
+QUERY_INSTRUMENTATION_SAMPLE_RATE = config(
+    "QUERY_INSTRUMENTATION_SAMPLE_RATE", default=0.0, cast=float
+)
+# Falha a requisição quando a view passa do orçamento de consultas (testes)
+QUERY_BUDGET_STRICT = config("QUERY_BUDGET_STRICT", default=False, cast=bool)
+# Consultas a partir deste tempo, em milissegundos, são listadas no log
+SLOW_QUERY_MS = config("SLOW_QUERY_MS", default=200, cast=float)
+# Execuções da mesma consulta na requisição a partir das quais ela é
+# listada como repetida (provável N+1)
+QUERY_DUPLICATE_THRESHOLD = config(
+    "QUERY_DUPLICATE_THRESHOLD", default=3, cast=int
+)
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "core.instrumentation": {
+            "handlers": ["console"],
+            "level": config("QUERY_LOG_LEVEL", default="INFO"),
+            "propagate": False,
+        },
+    },
+}
+
+# Cursos
+# Tempo, em segundos, que a árvore pré-serializada de um curso fica em cache
+COURSE_TREE_CACHE_TIMEOUT = config(
+    "COURSE_TREE_CACHE_TIMEOUT", default=3600, cast=int
+)
+
+# Quizzes
+# Número máximo de gabaritos mantidos no cache em processo (LRU)
+QUIZ_ANSWER_KEY_CACHE_SIZE = config(
+    "QUIZ_ANSWER_KEY_CACHE_SIZE", default=256, cast=int
+)
+
+# Progresso
+# Buffer de heartbeats do player de vídeo (ver progress.heartbeats)
+PROGRESS_HEARTBEAT_BUFFER = config(
+    "PROGRESS_HEARTBEAT_BUFFER",
+    default="progress.heartbeats.InMemoryHeartbeatBuffer",
+)
+# Intervalo, em segundos, entre gravações em lote dos heartbeats
+PROGRESS_HEARTBEAT_FLUSH_INTERVAL = config(
+    "PROGRESS_HEARTBEAT_FLUSH_INTERVAL", default=5.0, cast=float
+)
+# Número de pares (aluno, aula) pendentes que antecipa a gravação
+PROGRESS_HEARTBEAT_MAX_PENDING = config(
+    "PROGRESS_HEARTBEAT_MAX_PENDING", default=5000, cast=int
+)
+# Tentativas de gravação de um heartbeat antes de enviá-lo para a fila de
+# mensagens mortas (regravada com "manage.py replay_heartbeats")
+PROGRESS_HEARTBEAT_MAX_ATTEMPTS = config(
+    "PROGRESS_HEARTBEAT_MAX_ATTEMPTS", default=5, cast=int
+)
+PROGRESS_HEARTBEAT_DEAD_LETTER = config(
+    "PROGRESS_HEARTBEAT_DEAD_LETTER",
+    default="progress.heartbeats.FileDeadLetterStore",
+)
+# Arquivo da fila padrão (vazio: heartbeats.deadletter.jsonl em BASE_DIR)
+PROGRESS_HEARTBEAT_DEAD_LETTER_PATH = config(
+    "PROGRESS_HEARTBEAT_DEAD_LETTER_PATH", default=""
+)
+# Percentual assistido a partir do qual a aula é considerada concluída
+PROGRESS_COMPLETION_THRESHOLD = config(
+    "PROGRESS_COMPLETION_THRESHOLD", default=90, cast=int
+)
+
+# Tempo, em segundos, que cada seção do painel do aluno fica em cache
+DASHBOARD_CACHE_TIMEOUT = config(
+    "DASHBOARD_CACHE_TIMEOUT", default=300, cast=int
+)
+
+# Tempo, em segundos, que a análise de cada professor fica em cache (o
+# comando refresh_teacher_analytics a recalcula periodicamente)
+TEACHER_ANALYTICS_CACHE_TIMEOUT = config(
+    "TEACHER_ANALYTICS_CACHE_TIMEOUT", default=3600, cast=int
+)
+# Percentil de progresso até o qual um aluno é considerado atrasado
+TEACHER_ANALYTICS_LAGGING_PERCENTILE = config(
+    "TEACHER_ANALYTICS_LAGGING_PERCENTILE", default=0.25, cast=float
+)
+# Dias sem acesso a partir dos quais um aluno é considerado atrasado
+TEACHER_ANALYTICS_INACTIVE_DAYS = config(
+    "TEACHER_ANALYTICS_INACTIVE_DAYS", default=7, cast=int
+)
+
+# Agendamento
+# Antecedência, em minutos, com que os lembretes de aula são gerados
+CLASS_REMINDER_LOOKAHEAD = config(
+    "CLASS_REMINDER_LOOKAHEAD", default=60, cast=int
+)
+
+# Tempo, em segundos, que o número de notificações não lidas fica em cache
+NOTIFICATION_UNREAD_CACHE_TIMEOUT = config(
+    "NOTIFICATION_UNREAD_CACHE_TIMEOUT", default=300, cast=int
+)
+
 # Usuário personalizado
 AUTH_USER_MODEL = "users.User"
 
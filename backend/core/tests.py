@@ -0,0 +1,495 @@
+import gzip
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.db import OperationalError, connection, connections, transaction
+from django.db.backends.postgresql import base as postgresql_base
+from django.db.models import Q
+from django.http import HttpResponse
+from django.test import (
+    RequestFactory,
+    SimpleTestCase,
+    TestCase,
+    override_settings,
+)
+from django.urls import reverse
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from courses.models import Course, Lesson, Module
+from users.models import User
+
+from . import ids
+from .backends.postgresql.base import (
+    connection_stats,
+    reset_connection_stats,
+)
+from .identity_map import IdentityMap, get_related, identity_scope
+from .instrumentation import (
+    QueryBudgetExceeded,
+    QueryCounter,
+    QueryInstrumentationMiddleware,
+    QueryProfiler,
+    assert_max_queries,
+    fingerprint,
+    query_budget,
+)
+from .pagination import KeysetPagination, _after
+from .schema import _compress, _encoded, read_schema, write_schema
+from .views import accepted_encodings
+
+
+class IdentityMapTests(TestCase):
+    """Objetos relacionados compartilhados dentro de um escopo."""
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=teacher,
+        )
+        cls.module = Module.objects.create(
+            course=course, title="Módulo", description="-", order=1
+        )
+        cls.lesson_ids = [
+            Lesson.objects.create(
+                module=cls.module, title=f"Aula {order}", description="-",
+                video_url="https://example.com/aula.mp4", duration=10,
+                order=order,
+            ).pk
+            for order in range(1, 6)
+        ]
+
+    def _lessons(self):
+        return list(Lesson.objects.filter(pk__in=self.lesson_ids))
+
+    def test_scope_loads_each_related_object_once(self):
+        lessons = self._lessons()
+
+        with identity_scope() as identity_map:
+            with self.assertNumQueries(2):
+                titles = {str(lesson) for lesson in lessons}
+
+        self.assertEqual(len(titles), 5)
+        modules = {id(get_related(lesson, "module")) for lesson in lessons}
+        self.assertEqual(len(modules), 1)
+        self.assertEqual(len(identity_map), 2)
+        self.assertGreater(identity_map.hits, 0)
+
+    def test_without_scope_each_instance_loads_its_own(self):
+        lessons = self._lessons()
+
+        with self.assertNumQueries(10):
+            for lesson in lessons:
+                str(lesson)
+
+    def test_nested_scopes_share_the_outer_map(self):
+        with identity_scope() as outer:
+            with identity_scope() as inner:
+                self.assertIs(inner, outer)
+
+    def test_add_keeps_the_first_instance(self):
+        identity_map = IdentityMap()
+        first = Module(pk=self.module.pk)
+        second = Module(pk=self.module.pk)
+
+        self.assertIs(identity_map.add(first), first)
+        self.assertIs(identity_map.add(second), first)
+        self.assertIs(identity_map.get(Module, self.module.pk), first)
+        self.assertEqual(
+            identity_map.stats(), {"hits": 1, "misses": 0, "size": 1}
+        )
+
+
+class UUID7Tests(SimpleTestCase):
+    """UUIDs versão 7 ordenados pelo tempo."""
+
+    def setUp(self):
+        # Relógios simulados não podem vazar para os outros testes
+        ids._reset_after_fork()
+        self.addCleanup(ids._reset_after_fork)
+
+    def test_values_are_strictly_increasing(self):
+        values = [ids.uuid7() for _ in range(5000)]
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+        self.assertTrue(all(value.version == 7 for value in values))
+        self.assertTrue(
+            all(value.variant == "specified in RFC 4122" for value in values)
+        )
+
+    def test_timestamp_prefix_is_the_current_millisecond(self):
+        with mock.patch.object(
+            ids.time, "time_ns", return_value=1_700_000_000_123_456_789
+        ):
+            value = ids.uuid7()
+        self.assertEqual(value.int >> 80, 1_700_000_000_123)
+
+    def test_clock_going_back_keeps_the_order(self):
+        with mock.patch.object(
+            ids.time, "time_ns", return_value=2_000_000_000_000_000_000
+        ):
+            first = ids.uuid7()
+        with mock.patch.object(
+            ids.time, "time_ns", return_value=1_000_000_000_000_000_000
+        ):
+            second = ids.uuid7()
+        self.assertLess(first, second)
+
+    def test_counter_overflow_advances_the_timestamp(self):
+        with mock.patch.object(
+            ids.time, "time_ns", return_value=3_000_000_000_000_000_000
+        ):
+            values = [ids.uuid7() for _ in range(ids._COUNTER_MAX + 2)]
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(values[-1].int >> 80, (values[0].int >> 80) + 1)
+
+    @override_settings(PRIMARY_KEY_GENERATOR="uuid7")
+    def test_default_pk_uses_the_configured_generator(self):
+        self.assertEqual(ids.default_pk().version, 7)
+
+    @override_settings(PRIMARY_KEY_GENERATOR="serial")
+    def test_default_pk_rejects_unknown_generator(self):
+        with self.assertRaises(ValueError):
+            ids.default_pk()
+
+
+def _matches(condition: Q, row: dict) -> bool:
+    """Avalia em Python um ``Q`` de comparações simples sobre ``row``."""
+    results = []
+    for child in condition.children:
+        if isinstance(child, Q):
+            results.append(_matches(child, row))
+            continue
+        lookup, value = child
+        name, _sep, operator = lookup.partition("__")
+        results.append({
+            "gt": row[name] > value,
+            "gte": row[name] >= value,
+            "lt": row[name] < value,
+            "lte": row[name] <= value,
+            "": row[name] == value,
+        }[operator])
+    matched = all(results) if condition.connector == Q.AND else any(results)
+    return not matched if condition.negated else matched
+
+
+class KeysetConditionTests(SimpleTestCase):
+    """Condição ``_after`` com direções de ordenação mistas."""
+
+    ordering = [("a", False), ("b", True), ("id", False)]
+
+    def _sorted(self, rows):
+        return sorted(rows, key=lambda row: (row["a"], -row["b"], row["id"]))
+
+    def test_after_selects_exactly_the_following_rows(self):
+        rows = self._sorted(
+            {"a": a, "b": b, "id": i}
+            for i, (a, b) in enumerate(
+                (a, b) for a in range(3) for b in range(3) for _ in range(2)
+            )
+        )
+
+        for index, current in enumerate(rows):
+            position = [current["a"], current["b"], current["id"]]
+            condition = _after(self.ordering, position)
+            following = [row for row in rows if _matches(condition, row)]
+            self.assertEqual(following, rows[index + 1:])
+
+    def test_after_bounds_the_first_column(self):
+        condition = _after(self.ordering, [1, 2, 3])
+        self.assertIn(("a__gte", 1), condition.children)
+
+
+class KeysetPaginationTests(TestCase):
+    """Paginação por cursor assinado em ordenação mista."""
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        for index in range(7):
+            Course.objects.create(
+                title=f"Curso {index % 3}", slug=f"curso-{index}",
+                description="-", created_by=teacher,
+            )
+        cls.courses = Course.objects.filter(created_by=teacher)
+        cls.expected = list(
+            cls.courses.order_by("title", "-created_at", "id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def _page(self, url, ordering=("title", "-created_at")):
+        view = type("View", (), {"ordering": ordering})()
+        request = Request(APIRequestFactory().get(url))
+        paginator = KeysetPagination()
+        rows = paginator.paginate_queryset(self.courses, request, view)
+        return paginator, [row.pk for row in rows]
+
+    def test_walks_forward_and_back_over_every_row(self):
+        url = "/api/courses/?page_size=3"
+        seen, pages = [], []
+        while url:
+            paginator, ids = self._page(url)
+            seen.extend(ids)
+            pages.append(ids)
+            url = paginator.get_next_link()
+        self.assertEqual(seen, self.expected)
+
+        url = paginator.get_previous_link()
+        for expected in reversed(pages[:-1]):
+            paginator, ids = self._page(url)
+            self.assertEqual(ids, expected)
+            url = paginator.get_previous_link()
+        self.assertIsNone(url)
+
+    def _cursor(self):
+        paginator, _ids = self._page("/api/courses/?page_size=3")
+        link = paginator.get_next_link()
+        return link.split("cursor=", 1)[1].split("&", 1)[0]
+
+    def test_tampered_cursor_is_rejected(self):
+        cursor = self._cursor()
+        tampered = cursor[:-1] + ("A" if cursor[-1] != "A" else "B")
+
+        with self.assertRaises(NotFound):
+            self._page(f"/api/courses/?page_size=3&cursor={tampered}")
+
+    def test_cursor_from_another_ordering_is_rejected(self):
+        cursor = self._cursor()
+
+        with self.assertRaises(NotFound):
+            self._page(
+                f"/api/courses/?page_size=3&cursor={cursor}",
+                ordering=("-title", "-created_at"),
+            )
+
+
+class ConnectionStatsTests(TestCase):
+    """Medidas de obtenção de conexões do backend do projeto."""
+
+    def setUp(self):
+        reset_connection_stats()
+        self.addCleanup(reset_connection_stats)
+
+    def _connect(self):
+        # Conexão à parte: a do teste está dentro de uma transação
+        connection = connections.create_connection("default")
+        self.addCleanup(connection.close)
+        connection.ensure_connection()
+
+    def test_new_connection_is_measured(self):
+        self._connect()
+
+        stats = connection_stats("default")
+        self.assertEqual(stats["checkouts"], 1)
+        self.assertEqual(stats["errors"], 0)
+        self.assertGreater(stats["checkout_ms"], 0)
+        self.assertEqual(stats["avg_checkout_ms"], stats["checkout_ms"])
+        self.assertIn(stats["mode"], ("pool", "persistent", "per_request"))
+
+    def test_failed_connection_is_counted(self):
+        with mock.patch.object(
+            postgresql_base.DatabaseWrapper, "get_new_connection",
+            side_effect=OperationalError,
+        ):
+            with self.assertRaises(OperationalError):
+                self._connect()
+
+        stats = connection_stats("default")
+        self.assertEqual((stats["checkouts"], stats["errors"]), (0, 1))
+
+    def test_view_is_restricted_to_admins(self):
+        client = APIClient()
+        url = reverse("database-connection-stats")
+        user = User.objects.create(
+            username="aluno", email="aluno@example.com"
+        )
+
+        client.force_authenticate(user)
+        self.assertEqual(client.get(url).status_code, 403)
+
+        user.is_staff = True
+        client.force_authenticate(user)
+        response = client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("mode", response.json()["default"])
+
+
+class QueryInstrumentationTests(TestCase):
+    """Contagem, perfil e orçamento de consultas."""
+
+    def _select(self, value):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT %s", [value])
+
+    def test_fingerprint_drops_values(self):
+        self.assertEqual(
+            fingerprint(
+                "SELECT * FROM t WHERE a IN (%s, %s, %s)\n"
+                "  AND b = 'x''y' AND c > 10"
+            ),
+            "SELECT * FROM t WHERE a IN (...) AND b = ? AND c > ?",
+        )
+
+    def test_counter_counts_queries(self):
+        with QueryCounter() as counter:
+            self._select(1)
+            self._select(2)
+        self.assertEqual(counter.count, 2)
+
+    def test_profiler_groups_repeated_queries(self):
+        with QueryProfiler() as profile:
+            for value in range(3):
+                self._select(value)
+            with transaction.atomic():
+                User.objects.exists()
+
+        self.assertEqual(profile.count, 4)
+        self.assertEqual(profile.savepoints, 2)
+        self.assertEqual(profile.duplicates(), [
+            {"sql": "SELECT %s", "count": 3},
+        ])
+
+    def test_assert_max_queries_lists_duplicates(self):
+        with self.assertRaises(QueryBudgetExceeded) as raised:
+            with assert_max_queries(2):
+                for value in range(3):
+                    self._select(value)
+        self.assertIn("3x SELECT %s", str(raised.exception))
+
+    def _middleware(self, queries=3):
+        def get_response(request):
+            for value in range(queries):
+                self._select(value)
+            return HttpResponse()
+
+        @query_budget(2)
+        def view(request):
+            return HttpResponse()
+
+        middleware = QueryInstrumentationMiddleware(get_response)
+        request = RequestFactory().get("/api/courses/")
+        middleware.process_view(request, view, (), {})
+        return middleware, request
+
+    @override_settings(QUERY_BUDGET_STRICT=True)
+    def test_strict_middleware_enforces_the_budget(self):
+        middleware, request = self._middleware()
+
+        with self.assertRaises(QueryBudgetExceeded):
+            middleware(request)
+
+    @override_settings(
+        QUERY_BUDGET_STRICT=False, QUERY_INSTRUMENTATION_SAMPLE_RATE=1.0
+    )
+    def test_sampled_request_is_logged_with_server_timing(self):
+        middleware, request = self._middleware()
+
+        with self.assertLogs("core.instrumentation", "WARNING") as logs:
+            response = middleware(request)
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["queries"], 3)
+        self.assertEqual(record["budget"], 2)
+        self.assertTrue(record["over_budget"])
+        self.assertIn('desc="3 queries"', response["Server-Timing"])
+
+    @override_settings(
+        QUERY_BUDGET_STRICT=False, QUERY_INSTRUMENTATION_SAMPLE_RATE=0.0
+    )
+    def test_unsampled_request_is_not_profiled(self):
+        middleware, request = self._middleware()
+
+        response = middleware(request)
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class OpenAPISchemaViewTests(SimpleTestCase):
+    """Documento OpenAPI pré-renderizado com compressão e ETag."""
+
+    content = b'{"swagger": "2.0"}'
+
+    def setUp(self):
+        variants = _compress(self.content)
+        variants["br"] = b"brotli"
+        self.document = {".json": _encoded("application/json", variants)}
+        patcher = mock.patch(
+            "core.views.get_schema_document", return_value=self.document
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.url = reverse("schema-json", args=[".json"])
+
+    def test_accepted_encodings_ignore_zero_quality(self):
+        self.assertEqual(
+            accepted_encodings("gzip;q=0.5, br;q=0, Identity, x;q=abc"),
+            {"gzip", "identity"},
+        )
+
+    def test_identity_variant(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, self.content)
+        self.assertFalse(response.has_header("Content-Encoding"))
+        self.assertIn("Accept-Encoding", response["Vary"])
+        self.assertEqual(
+            response["ETag"], self.document[".json"].etag("identity")
+        )
+
+    def test_brotli_is_preferred_over_gzip(self):
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="gzip, deflate, br"
+        )
+
+        self.assertEqual(response["Content-Encoding"], "br")
+        self.assertEqual(response.content, b"brotli")
+
+    def test_gzip_variant(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")
+
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(gzip.decompress(response.content), self.content)
+        self.assertTrue(response["ETag"].endswith('-gzip"'))
+
+    def test_matching_etag_answers_not_modified(self):
+        etag = self.client.get(self.url, HTTP_ACCEPT_ENCODING="gzip")["ETag"]
+
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+        # O ETag de outra codificação não vale para esta variante
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_unknown_format_is_not_found(self):
+        response = self.client.get(reverse("schema-json", args=[".xml"]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_written_schema_is_read_back(self):
+        with tempfile.TemporaryDirectory() as directory:
+            directory = Path(directory)
+            write_schema(directory, self.document)
+
+            self.assertIsNone(read_schema(directory))
+            write_schema(directory, {".yaml": self.document[".json"]})
+            document = read_schema(directory)
+
+        self.assertEqual(document[".json"], self.document[".json"])
+        self.assertEqual(document[".yaml"].content_type, "application/yaml")
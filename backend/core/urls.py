@@ -15,21 +15,18 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import include, path
 from rest_framework import permissions
 from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
+
+from core.schema import API_INFO
+from core.views import DatabaseConnectionStatsView, OpenAPISchemaView
 
 # Swagger/OpenAPI configuration
+# As interfaces (swagger e redoc) só servem a página; o documento vem de
+# OpenAPISchemaView (SPEC_URL em settings), gerado uma vez por processo
 SchemaView = get_schema_view(
-    openapi.Info(
-        title="Hand Fluency API",
-        default_version='v1',
-        description="API para a plataforma de ensino de Libras",
-        terms_of_service="https://www.handfluency.com/terms/",
-        contact=openapi.Contact(email="contact@handfluency.com"),
-        license=openapi.License(name="MIT License"),
-    ),
+    API_INFO,
     public=True,
     permission_classes=(permissions.AllowAny,),
 )
@@ -37,8 +34,16 @@ SchemaView = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
 
+    # API
+    path('api/courses/', include('courses.urls')),
+    path('api/quizzes/', include('quizzes.urls')),
+    path('api/progress/', include('progress.urls')),
+    path('api/scheduling/', include('scheduling.urls')),
+    path('api/health/db/', DatabaseConnectionStatsView.as_view(),
+         name='database-connection-stats'),
+
     # Swagger/OpenAPI URLs
-    path('swagger<format>/', SchemaView.without_ui(cache_timeout=0),
+    path('swagger<format>/', OpenAPISchemaView.as_view(),
          name='schema-json'),
     path('swagger/', SchemaView.with_ui('swagger', cache_timeout=0),
          name='schema-swagger-ui'),
@@ -0,0 +1,96 @@
+"""
+Views de operação do projeto.
+"""
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import parse_etags
+from django.views import View
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.backends.postgresql.base import connection_stats
+from core.schema import get_schema_document
+
+# Codificações na ordem de preferência do servidor
+PREFERRED_ENCODINGS = ("br", "gzip")
+
+
+class DatabaseConnectionStatsView(APIView):
+    """
+    Métricas de conexão com o banco do processo que atendeu a requisição.
+
+    Com vários workers, cada um tem suas próprias conexões (e pool).
+    """
+
+    permission_classes = [IsAdminUser]
+
+    @swagger_auto_schema(responses={200: "Métricas por alias do banco"})
+    def get(self, request):
+        return Response(
+            {alias: connection_stats(alias) for alias in connections}
+        )
+
+
+def accepted_encodings(header: str) -> set:
+    """Codificações aceitas em ``Accept-Encoding`` (com ``q`` > 0)."""
+    accepted = set()
+    for item in header.split(","):
+        name, _sep, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name and quality > 0:
+            accepted.add(name.strip().lower())
+    return accepted
+
+
+class OpenAPISchemaView(View):
+    """
+    Documento OpenAPI pré-renderizado (ver ``core.schema``).
+
+    Responde com a variante comprimida aceita pelo cliente (brotli ou gzip)
+    e com 304 quando o ETag enviado em ``If-None-Match`` ainda vale.
+    """
+
+    def get(self, request, format):
+        encoded = get_schema_document().get(format)
+        if encoded is None:
+            raise Http404
+
+        accepted = accepted_encodings(
+            request.headers.get("Accept-Encoding", "")
+        )
+        encoding = next(
+            (
+                name
+                for name in PREFERRED_ENCODINGS
+                if name in accepted and name in encoded.variants
+            ),
+            "identity",
+        )
+        etag = encoded.etag(encoding)
+
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                encoded.variants[encoding], content_type=encoded.content_type
+            )
+            if encoding != "identity":
+                response["Content-Encoding"] = encoding
+        response["ETag"] = etag
+        patch_vary_headers(response, ["Accept-Encoding"])
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=getattr(settings, "OPENAPI_SCHEMA_MAX_AGE", 300),
+        )
+        return response
@@ -1,7 +1,46 @@
 from django.contrib import admin
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.db.models import Q
 from django.utils.translation import gettext_lazy as _
 
 from .models import Course, Module, Lesson, Enrollment, CourseRating
+from .search import is_searchable, search_queryset
+
+
+class CatalogSearchChangeList(ChangeList):
+    """Ordena por relevância quando há busca e nenhuma coluna escolhida."""
+
+    def get_ordering(self, request, queryset):
+        ordering = super().get_ordering(request, queryset)
+        if (
+            "search_rank" in queryset.query.annotations
+            and ORDER_VAR not in self.params
+        ):
+            ordering = ["-search_rank", *ordering]
+        return ordering
+
+
+class CatalogSearchAdminMixin:
+    """
+    Usa a busca do catálogo (texto completo + trigramas) na caixa de busca.
+
+    Os itens encontrados por ``search_fields`` (``icontains``, como o nome
+    do autor ou o título do curso) continuam aparecendo, somados aos da
+    busca do catálogo; termos curtos usam apenas ``search_fields``. Com a
+    busca ativa, a listagem é ordenada por relevância.
+    """
+
+    def get_changelist(self, request, **kwargs):
+        return CatalogSearchChangeList
+
+    def get_search_results(self, request, queryset, search_term):
+        if not is_searchable(search_term):
+            return super().get_search_results(request, queryset, search_term)
+        matched, _duplicates = super().get_search_results(
+            request, queryset, search_term
+        )
+        also = Q(pk__in=matched.values("pk"))
+        return search_queryset(queryset, search_term, also=also), False
 
 
 class ModuleInline(admin.TabularInline):
@@ -15,11 +54,12 @@ class LessonInline(admin.TabularInline):
 
 
 @admin.register(Course)
-class CourseAdmin(admin.ModelAdmin):
+class CourseAdmin(CatalogSearchAdminMixin, admin.ModelAdmin):
     list_display = ("title", "level", "is_active", "created_by", "created_at")
     list_filter = ("level", "is_active", "created_at")
     search_fields = ("title", "description", "created_by__username")
     prepopulated_fields = {"slug": ("title",)}
+    readonly_fields = ("total_students", "average_rating", "rating_count")
     inlines = [ModuleInline]
     fieldsets = (
         (
@@ -42,6 +82,7 @@ class CourseAdmin(admin.ModelAdmin):
                 "fields": (
                     "total_students",
                     "average_rating",
+                    "rating_count",
                 ),
                 "classes": ("collapse",),
             },
@@ -50,7 +91,7 @@ class CourseAdmin(admin.ModelAdmin):
 
 
 @admin.register(Module)
-class ModuleAdmin(admin.ModelAdmin):
+class ModuleAdmin(CatalogSearchAdminMixin, admin.ModelAdmin):
     list_display = ("title", "course", "order", "is_active")
     list_filter = ("course", "is_active")
     search_fields = ("title", "description", "course__title")
@@ -58,7 +99,7 @@ class ModuleAdmin(admin.ModelAdmin):
 
 
 @admin.register(Lesson)
-class LessonAdmin(admin.ModelAdmin):
+class LessonAdmin(CatalogSearchAdminMixin, admin.ModelAdmin):
     list_display = (
         "title",
         "module",
@@ -68,6 +109,7 @@ class LessonAdmin(admin.ModelAdmin):
         "is_active",
     )
     list_filter = ("module__course", "is_free", "is_active")
+    search_fields = ("title", "description")
     fieldsets = (
         (
             None,
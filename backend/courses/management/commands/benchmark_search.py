@@ -0,0 +1,155 @@
+"""
+Benchmark da busca do catálogo (``courses.search``).
+
+Cria um curso com ``--lessons`` aulas temporárias (descartadas ao final via
+rollback), com títulos e descrições sorteados de um vocabulário de Libras,
+e compara a latência (p50/p95) de ``search_catalog`` com a da busca antiga
+por ``icontains`` em título e descrição (a do admin), que percorre a
+tabela inteira.
+
+Uso:
+    python manage.py benchmark_search --lessons 100000
+"""
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from courses.models import Course, Lesson, Module
+from courses.search import search_catalog
+
+WORDS = (
+    "alfabeto", "saudações", "cumprimentos", "família", "números", "cores",
+    "animais", "alimentos", "profissões", "escola", "verbos", "perguntas",
+    "sentimentos", "tempo", "calendário", "transporte", "cidade", "casa",
+    "corpo", "saúde", "esportes", "viagem", "compras", "roupas", "natureza",
+    "datilologia", "expressões", "classificadores", "gramática", "diálogo",
+)
+
+QUERIES = (
+    "alfabeto",
+    "familia",
+    "expressões faciais",
+    "classificadres",
+    "verbos -tempo",
+    "saude",
+    '"diálogo na escola"',
+    "datilologia",
+)
+
+
+class _Rollback(Exception):
+    """Usada para descartar os dados do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara a busca do catálogo (texto completo + trigramas) com "
+        "icontains em aulas temporárias (os dados criados são descartados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lessons",
+            type=int,
+            default=100_000,
+            help="Número de aulas criadas",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=20,
+            help="Execuções de cada consulta",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._create_fixtures(options["lessons"])
+                self._run(options["repeat"])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _create_fixtures(self, lessons):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create(
+            username=f"bench-teacher-{suffix}", user_type="teacher"
+        )
+        course = Course.objects.create(
+            title="Benchmark",
+            slug=f"benchmark-{suffix}",
+            description="Curso temporário de benchmark",
+            created_by=owner,
+        )
+        module = Module.objects.create(
+            course=course, title="Benchmark", description="", order=1
+        )
+
+        rng = random.Random(42)
+        started = time.perf_counter()
+        Lesson.objects.bulk_create(
+            (
+                Lesson(
+                    module=module,
+                    title=" ".join(rng.sample(WORDS, 3)).capitalize(),
+                    description=(
+                        "Nesta aula praticamos "
+                        + ", ".join(rng.sample(WORDS, 8))
+                        + " em diálogos do dia a dia."
+                    ),
+                    video_url="https://example.com/video",
+                    duration=10,
+                    order=order,
+                )
+                for order in range(lessons)
+            ),
+            batch_size=5000,
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(f"ANALYZE {Lesson._meta.db_table}")
+        self.stdout.write(
+            f"{lessons} aulas criadas em "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+
+    def _run(self, repeat):
+        self.stdout.write(
+            f"{'consulta':<22} {'itens':>6} {'busca p50':>10} "
+            f"{'busca p95':>10} {'icontains p50':>14} {'icontains p95':>14}"
+        )
+        for term in QUERIES:
+            found = len(search_catalog(term))
+            search = self._measure(lambda: search_catalog(term), repeat)
+            baseline = self._measure(
+                lambda: list(
+                    Lesson.objects.filter(
+                        Q(title__icontains=term)
+                        | Q(description__icontains=term)
+                    ).values_list("id", "title")[:20]
+                ),
+                repeat,
+            )
+            self.stdout.write(
+                f"{term:<22} {found:>6} {search[0]:>10.2f} "
+                f"{search[1]:>10.2f} {baseline[0]:>14.2f} "
+                f"{baseline[1]:>14.2f}"
+            )
+        self.stdout.write("Tempos em ms.")
+
+    @staticmethod
+    def _measure(func, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        return statistics.median(timings), p95
@@ -0,0 +1,65 @@
+"""
+Verifica e corrige as estatísticas desnormalizadas dos cursos.
+
+Compara ``total_students``, ``rating_sum``, ``rating_count`` e
+``average_rating`` com as matrículas ativas e avaliações reais e corrige os
+cursos divergentes com um único UPDATE.
+
+Uso:
+    python manage.py reconcile_course_stats
+    python manage.py reconcile_course_stats --dry-run
+    python manage.py reconcile_course_stats --course <uuid>
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from courses.services import reconcile_course_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Encontra e corrige divergências em total_students e "
+        "average_rating dos cursos."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            action="append",
+            default=[],
+            help="ID de curso a verificar (pode ser repetido)",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas relata as divergências, sem corrigir",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drifts = reconcile_course_stats(
+            options["course"] or None, repair=not options["dry_run"]
+        )
+        elapsed = time.perf_counter() - started
+
+        for drift in drifts:
+            changes = [
+                f"{name} {stored} → {actual}"
+                for name in (
+                    "total_students",
+                    "rating_sum",
+                    "rating_count",
+                    "average_rating",
+                )
+                for stored, actual in [getattr(drift, name)]
+                if stored != actual
+            ]
+            self.stdout.write(f"{drift.course_id}: {', '.join(changes)}")
+
+        verb = "encontrados" if options["dry_run"] else "corrigidos"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(drifts)} cursos divergentes {verb} em {elapsed:.2f}s."
+            )
+        )
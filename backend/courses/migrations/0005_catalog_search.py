@@ -0,0 +1,99 @@
+# Generated by Django 5.1.6 on 2026-10-17 14:00
+
+import courses.models
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Busca do catálogo: coluna ``tsvector`` gerada (português) e índices GIN.
+
+    ``pg_trgm`` já é habilitada pelo schema do Supabase; a operação apenas
+    garante a extensão em outros bancos.
+    """
+
+    dependencies = [
+        ('courses', '0004_default_pk'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='course',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=courses.models.catalog_search_vector(),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                verbose_name='vetor de busca',
+            ),
+        ),
+        migrations.AddField(
+            model_name='module',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=courses.models.catalog_search_vector(),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                verbose_name='vetor de busca',
+            ),
+        ),
+        migrations.AddField(
+            model_name='lesson',
+            name='search_vector',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=courses.models.catalog_search_vector(),
+                output_field=django.contrib.postgres.search.SearchVectorField(),
+                verbose_name='vetor de busca',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='idx_course_search'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='course',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    'title', name='gin_trgm_ops'
+                ),
+                name='idx_course_title_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='idx_module_search'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='module',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    'title', name='gin_trgm_ops'
+                ),
+                name='idx_module_title_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=['search_vector'], name='idx_lesson_search'
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='lesson',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    'title', name='gin_trgm_ops'
+                ),
+                name='idx_lesson_title_trgm',
+            ),
+        ),
+    ]
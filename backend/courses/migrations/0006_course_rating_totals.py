@@ -0,0 +1,61 @@
+# Generated by Django 5.1.6 on 2026-10-17 14:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0005_catalog_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='course',
+            name='rating_sum',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text='Mantida pelos sinais de CourseRating',
+                verbose_name='soma das avaliações',
+            ),
+        ),
+        migrations.AddField(
+            model_name='course',
+            name='rating_count',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text='Mantido pelos sinais de CourseRating',
+                verbose_name='número de avaliações',
+            ),
+        ),
+        # Preenche as estatísticas dos cursos existentes em um único UPDATE
+        migrations.RunSQL(
+            sql="""
+                UPDATE courses
+                SET total_students = COALESCE(e.total, 0),
+                    rating_sum = COALESCE(r.total, 0),
+                    rating_count = COALESCE(r.count, 0),
+                    average_rating = CASE
+                        WHEN COALESCE(r.count, 0) > 0
+                        THEN ROUND(r.total::numeric / r.count, 2)
+                        ELSE 0
+                    END
+                FROM courses AS c
+                LEFT JOIN (
+                    SELECT course_id, COUNT(*) AS total
+                    FROM enrollments
+                    WHERE is_active
+                    GROUP BY course_id
+                ) AS e ON e.course_id = c.id
+                LEFT JOIN (
+                    SELECT course_id, SUM(rating) AS total, COUNT(*) AS count
+                    FROM course_ratings
+                    GROUP BY course_id
+                ) AS r ON r.course_id = c.id
+                WHERE courses.id = c.id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
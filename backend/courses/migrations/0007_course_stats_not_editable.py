@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('courses', '0006_course_rating_totals'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='course',
+            name='total_students',
+            field=models.PositiveIntegerField(
+                default=0,
+                editable=False,
+                help_text='Mantido pelos sinais de Enrollment',
+                verbose_name='total de alunos',
+            ),
+        ),
+        migrations.AlterField(
+            model_name='course',
+            name='average_rating',
+            field=models.DecimalField(
+                decimal_places=2,
+                default=0.0,
+                editable=False,
+                help_text='Mantida pelos sinais de CourseRating',
+                max_digits=3,
+                verbose_name='avaliação média',
+            ),
+        ),
+    ]
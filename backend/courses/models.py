@@ -2,24 +2,52 @@
 Modelos para o app courses, definindo estruturas de dados para cursos e aulas.
 Otimizado para uso com Supabase como banco de dados.
 """
-from django.db import models
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models, transaction
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from typing import Optional
 
 from core.base_models import (
+    DatabaseManagedFieldsMixin,
     SupabaseBaseModel, 
-    RelatedObjectCache,
     safe_get_related_str_field,
     get_display_name
 )
+from core.identity_map import get_related
 
+# Configuração de busca textual do PostgreSQL (stemming em português)
+SEARCH_CONFIG = "portuguese"
 
-class Course(SupabaseBaseModel):
+
+def catalog_search_vector():
+    """
+    ``tsvector`` de busca do catálogo: título (peso A) e descrição (peso B).
+
+    Usado nas colunas geradas ``search_vector`` de Course, Module e Lesson
+    (ver ``courses.search``).
+    """
+    return SearchVector("title", weight="A", config=SEARCH_CONFIG) + (
+        SearchVector("description", weight="B", config=SEARCH_CONFIG)
+    )
+
+
+class Course(DatabaseManagedFieldsMixin, SupabaseBaseModel):
     """
     Modelo representando um curso de Libras.
+
+    As estatísticas são mantidas por UPDATEs atômicos (ver
+    ``courses.services``) e nunca são regravadas por ``save()``.
     """
 
+    db_managed_fields = (
+        "total_students",
+        "average_rating",
+        "rating_sum",
+        "rating_count",
+    )
+
     LEVEL_CHOICES = [
         ("basic", _("Básico")),
         ("intermediate", _("Intermediário")),
@@ -66,21 +94,38 @@ class Course(SupabaseBaseModel):
     # Estatísticas
     total_students = models.PositiveIntegerField(
         _("total de alunos"), 
-        default=0
+        default=0,
+        editable=False,
+        help_text=_("Mantido pelos sinais de Enrollment")
     )
     average_rating = models.DecimalField(
         _("avaliação média"), 
         max_digits=3, 
         decimal_places=2, 
-        default=0.0
+        default=0.0,
+        editable=False,
+        help_text=_("Mantida pelos sinais de CourseRating")
+    )
+    rating_sum = models.PositiveIntegerField(
+        _("soma das avaliações"),
+        default=0,
+        editable=False,
+        help_text=_("Mantida pelos sinais de CourseRating")
+    )
+    rating_count = models.PositiveIntegerField(
+        _("número de avaliações"),
+        default=0,
+        editable=False,
+        help_text=_("Mantido pelos sinais de CourseRating")
+    )
+
+    # Busca do catálogo (coluna gerada pelo banco)
+    search_vector = models.GeneratedField(
+        expression=catalog_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name=_("vetor de busca"),
     )
-    
-    # Cache de objetos relacionados
-    _created_by_cache: Optional[RelatedObjectCache] = None
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._created_by_cache = RelatedObjectCache(models.Model)
 
     def __str__(self) -> str:
         """Representação em string do curso."""
@@ -96,7 +141,12 @@ class Course(SupabaseBaseModel):
         ordering = ["-created_at"]
         indexes = [
             models.Index(fields=["slug"], name="idx_course_slug"),
-            models.Index(fields=["is_active"], name="idx_course_active")
+            models.Index(fields=["is_active"], name="idx_course_active"),
+            GinIndex(fields=["search_vector"], name="idx_course_search"),
+            GinIndex(
+                OpClass("title", name="gin_trgm_ops"),
+                name="idx_course_title_trgm",
+            ),
         ]
         db_table = "courses"
 
@@ -123,13 +173,19 @@ class Module(SupabaseBaseModel):
         default=0,
         help_text=_("Duração estimada do módulo em minutos")
     )
-    
-    # Cache de objetos relacionados
-    _course_cache: Optional[RelatedObjectCache[Course]] = None
-    
+
+    # Busca do catálogo (coluna gerada pelo banco)
+    search_vector = models.GeneratedField(
+        expression=catalog_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name=_("vetor de busca"),
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._course_cache = RelatedObjectCache(Course)
+        # Curso original, usado pelos sinais que invalidam a árvore do curso
+        self._original_course_id = self.__dict__.get("course_id")
 
     class Meta:
         verbose_name = _("Módulo")
@@ -137,13 +193,18 @@ class Module(SupabaseBaseModel):
         ordering = ["course", "order"]
         unique_together = [["course", "order"]]
         indexes = [
-            models.Index(fields=["course", "order"], name="idx_module_order")
+            models.Index(fields=["course", "order"], name="idx_module_order"),
+            GinIndex(fields=["search_vector"], name="idx_module_search"),
+            GinIndex(
+                OpClass("title", name="gin_trgm_ops"),
+                name="idx_module_title_trgm",
+            ),
         ]
         db_table = "modules"
 
     def __str__(self) -> str:
         """Representação em string formatada como 'Curso - Módulo'."""
-        course = self._course_cache.get(self, "course")
+        course = get_related(self, "course")
         course_title = safe_get_related_str_field(
             course, 
             "title", 
@@ -199,13 +260,26 @@ class Lesson(SupabaseBaseModel):
         help_text=_("Lista de anexos em formato JSON com URLs para recursos")
     )
 
-    # Cache de objetos relacionados
-    _module_cache: Optional[RelatedObjectCache[Module]] = None
-    _course: Optional[Course] = None
-    
+    # Busca do catálogo (coluna gerada pelo banco)
+    search_vector = models.GeneratedField(
+        expression=catalog_search_vector(),
+        output_field=SearchVectorField(),
+        db_persist=True,
+        verbose_name=_("vetor de busca"),
+    )
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._module_cache = RelatedObjectCache(Module)
+        # Valores originais, usados pelos sinais que mantêm contadores
+        self._original_module_id = self.__dict__.get("module_id")
+        self._original_is_active = self.__dict__.get("is_active")
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        # Atualizados só depois de todos os receptores de post_save (de
+        # courses e de progress) lerem os valores originais
+        self._original_module_id = self.module_id
+        self._original_is_active = self.is_active
 
     class Meta:
         verbose_name = _("Aula")
@@ -214,13 +288,18 @@ class Lesson(SupabaseBaseModel):
         unique_together = [["module", "order"]]
         indexes = [
             models.Index(fields=["module", "order"], name="idx_lesson_order"),
-            models.Index(fields=["is_free"], name="idx_lesson_free")
+            models.Index(fields=["is_free"], name="idx_lesson_free"),
+            GinIndex(fields=["search_vector"], name="idx_lesson_search"),
+            GinIndex(
+                OpClass("title", name="gin_trgm_ops"),
+                name="idx_lesson_title_trgm",
+            ),
         ]
         db_table = "lessons"
 
     def __str__(self) -> str:
         """Representação em string formatada como 'Curso - Módulo - Aula'."""
-        module = self._module_cache.get(self, "module")
+        module = get_related(self, "module")
         
         if not module:
             return f"Aula {self.order}: {self.title}"
@@ -247,19 +326,10 @@ class Lesson(SupabaseBaseModel):
     @property
     def course(self) -> Optional[Course]:
         """Retorna o curso a qual esta aula pertence."""
-        if self._course:
-            return self._course
-            
-        try:
-            module = self._module_cache.get(self, "module")
-            if not module:
-                return None
-                
-            course = module._course_cache.get(module, "course")
-            self._course = course
-            return course
-        except Exception:
+        module = get_related(self, "module")
+        if not module:
             return None
+        return get_related(module, "course")
 
 
 class Enrollment(SupabaseBaseModel):
@@ -302,15 +372,17 @@ class Enrollment(SupabaseBaseModel):
         blank=True,
         help_text=_("Data em que o aluno completou o curso")
     )
-    
-    # Cache de objetos relacionados
-    _student_cache: Optional[RelatedObjectCache] = None
-    _course_cache: Optional[RelatedObjectCache[Course]] = None
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._student_cache = RelatedObjectCache(models.Model)
-        self._course_cache = RelatedObjectCache(Course)
+        # Valores originais, usados pelos sinais que mantêm total_students
+        self._original_course_id = self.__dict__.get("course_id")
+        self._original_is_active = self.__dict__.get("is_active")
+
+    def save(self, *args, **kwargs):
+        """Salva e ajusta ``Course.total_students`` na mesma transação."""
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
 
     class Meta:
         verbose_name = _("Matrícula")
@@ -325,8 +397,8 @@ class Enrollment(SupabaseBaseModel):
 
     def __str__(self) -> str:
         """Representação em string formatada como 'Aluno - Curso'."""
-        student = self._student_cache.get(self, "student")
-        course = self._course_cache.get(self, "course")
+        student = get_related(self, "student")
+        course = get_related(self, "course")
         
         student_name = ""
         if student:
@@ -369,15 +441,44 @@ class CourseRating(SupabaseBaseModel):
         choices=[(i, str(i)) for i in range(1, 6)]
     )
     comment = models.TextField(_("comentário"), blank=True)
-    
-    # Cache de objetos relacionados
-    _student_cache: Optional[RelatedObjectCache] = None
-    _course_cache: Optional[RelatedObjectCache[Course]] = None
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._student_cache = RelatedObjectCache(models.Model)
-        self._course_cache = RelatedObjectCache(Course)
+        # Valores originais, usados pelos sinais que mantêm average_rating
+        self._original_course_id = self.__dict__.get("course_id")
+        self._original_rating = self.__dict__.get("rating")
+
+    def _load_original(self, using=None) -> None:
+        """
+        Lê do banco o curso e a nota gravados quando a instância foi
+        carregada sem eles (``only()``/``defer()``).
+        """
+        if self._state.adding or (
+            self._original_course_id is not None
+            and self._original_rating is not None
+        ):
+            return
+        row = (
+            type(self)._base_manager.using(using or self._state.db)
+            .select_for_update()
+            .filter(pk=self.pk)
+            .values_list("course_id", "rating")
+            .first()
+        )
+        if row is not None:
+            self._original_course_id, self._original_rating = row
+
+    def save(self, *args, **kwargs):
+        """Salva e ajusta a média do curso na mesma transação."""
+        with transaction.atomic(using=kwargs.get("using")):
+            self._load_original(kwargs.get("using"))
+            super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        """Remove e retira a nota da média do curso na mesma transação."""
+        with transaction.atomic(using=kwargs.get("using")):
+            self._load_original(kwargs.get("using"))
+            return super().delete(*args, **kwargs)
 
     class Meta:
         verbose_name = _("Avaliação de curso")
@@ -392,8 +493,8 @@ class CourseRating(SupabaseBaseModel):
 
     def __str__(self) -> str:
         """Representação em string da avaliação de curso."""
-        student = self._student_cache.get(self, "student")
-        course = self._course_cache.get(self, "course")
+        student = get_related(self, "student")
+        course = get_related(self, "course")
         
         student_name = ""
         if student:
@@ -0,0 +1,232 @@
+"""
+Busca do catálogo (cursos, módulos e aulas).
+
+Combina duas técnicas do PostgreSQL, ambas atendidas por índices GIN:
+
+- busca textual na coluna gerada ``search_vector`` (título com peso A e
+  descrição com peso B, stemming em português), que encontra "sinais" ao
+  buscar "sinal";
+- similaridade de trigramas (``pg_trgm``) entre o termo e a palavra mais
+  parecida do título (``word_similarity``), que tolera erros de digitação
+  ("alfabto" encontra "Alfabeto em Libras").
+
+A relevância é ``ts_rank`` + similaridade do título. Os trechos destacados
+(``ts_headline``) são calculados apenas para os resultados retornados e são
+HTML seguro: o PostgreSQL delimita os termos com marcadores que não são
+HTML, o texto é escapado com ``html.escape`` e só então os marcadores viram
+``<mark>``/``</mark>``. Marcação presente na descrição chega ao cliente
+como texto.
+"""
+import html
+import uuid
+from dataclasses import dataclass
+from typing import List, Optional, Sequence
+
+from django.contrib.postgres.search import (
+    SearchHeadline,
+    SearchQuery,
+    SearchRank,
+    TrigramWordSimilarity,
+)
+from django.db.models import CharField, F, Func, Q, QuerySet, Value
+
+from .models import SEARCH_CONFIG, Course, Lesson, Module
+
+MIN_QUERY_LENGTH = 2
+MAX_RESULTS = 50
+
+KINDS = ("course", "module", "lesson")
+
+# Marcadores dos termos no ``ts_headline`` (caracteres de uso privado,
+# removidos da descrição antes do destaque)
+HIGHLIGHT_START = "\ue000"
+HIGHLIGHT_STOP = "\ue001"
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """
+    Item encontrado na busca do catálogo.
+
+    Attributes:
+        kind: ``"course"``, ``"module"`` ou ``"lesson"``
+        id: ID do item
+        course_id: Curso ao qual o item pertence
+        title: Título do item
+        snippet: Trecho da descrição em HTML escapado, com os termos
+            entre ``<mark>``
+        rank: Relevância (maior é melhor)
+    """
+
+    kind: str
+    id: uuid.UUID
+    course_id: uuid.UUID
+    title: str
+    snippet: str
+    rank: float
+
+
+def is_searchable(term: Optional[str]) -> bool:
+    """Indica se o termo tem tamanho suficiente para ser buscado."""
+    return bool(term) and len(term.strip()) >= MIN_QUERY_LENGTH
+
+
+def _query(term: str) -> SearchQuery:
+    return SearchQuery(term, search_type="websearch", config=SEARCH_CONFIG)
+
+
+def search_queryset(
+    queryset: QuerySet, term: str, also: Optional[Q] = None
+) -> QuerySet:
+    """
+    Filtra um queryset de Course, Module ou Lesson pelo termo buscado.
+
+    Adiciona a anotação ``search_rank`` e ordena por relevância.
+
+    Args:
+        queryset: Queryset de um dos modelos do catálogo
+        term: Texto buscado (sintaxe de busca web: aspas, ``-termo``, or)
+        also: Condição que também seleciona itens (OR com a busca)
+
+    Returns:
+        Queryset filtrado e ordenado por ``-search_rank``
+    """
+    term = term.strip()
+    query = _query(term)
+    condition = Q(search_vector=query) | Q(title__trigram_word_similar=term)
+    if also is not None:
+        condition |= also
+    return (
+        queryset.annotate(
+            search_rank=SearchRank(F("search_vector"), query)
+            + TrigramWordSimilarity(term, "title")
+        )
+        .filter(condition)
+        .order_by("-search_rank", "id")
+    )
+
+
+def _branch(queryset: QuerySet, kind: str, course_ref, term: str, limit):
+    """Melhores ``limit`` resultados de um modelo, com colunas uniformes."""
+    return (
+        search_queryset(queryset, term)
+        .annotate(
+            result_kind=Value(kind, output_field=CharField()),
+            result_id=F("id"),
+            result_course_id=course_ref,
+            result_title=F("title"),
+            # Calculado pelo PostgreSQL só depois do LIMIT
+            result_snippet=SearchHeadline(
+                Func(
+                    F("description"),
+                    Value(HIGHLIGHT_START + HIGHLIGHT_STOP),
+                    Value(""),
+                    function="TRANSLATE",
+                    output_field=CharField(),
+                ),
+                _query(term.strip()),
+                config=SEARCH_CONFIG,
+                start_sel=HIGHLIGHT_START,
+                stop_sel=HIGHLIGHT_STOP,
+                max_words=30,
+                min_words=10,
+                max_fragments=2,
+            ),
+            result_rank=F("search_rank"),
+        )
+        .values_list(
+            "result_kind",
+            "result_id",
+            "result_course_id",
+            "result_title",
+            "result_snippet",
+            "result_rank",
+        )[:limit]
+    )
+
+
+def _highlight(snippet: str) -> str:
+    """Escapa o trecho e troca os marcadores por ``<mark>``/``</mark>``."""
+    return (
+        html.escape(snippet)
+        .replace(HIGHLIGHT_START, "<mark>")
+        .replace(HIGHLIGHT_STOP, "</mark>")
+    )
+
+
+def search_catalog(
+    term: str,
+    limit: int = 20,
+    kinds: Sequence[str] = KINDS,
+) -> List[SearchResult]:
+    """
+    Busca cursos, módulos e aulas ativos em uma única consulta.
+
+    Cada tipo contribui com seus ``limit`` melhores resultados (``UNION
+    ALL``) e o conjunto é reordenado por relevância.
+
+    Args:
+        term: Texto buscado
+        limit: Número máximo de resultados (até ``MAX_RESULTS``)
+        kinds: Tipos de item incluídos na busca
+
+    Returns:
+        Lista de SearchResult, do mais para o menos relevante
+
+    Raises:
+        ValueError: Se o termo for curto demais ou ``kinds`` for inválido
+    """
+    if not is_searchable(term):
+        raise ValueError(
+            f"O termo deve ter ao menos {MIN_QUERY_LENGTH} caracteres."
+        )
+    unknown = set(kinds) - set(KINDS)
+    if unknown or not kinds:
+        raise ValueError(f"Tipos inválidos: {', '.join(sorted(unknown))}")
+    limit = max(1, min(int(limit), MAX_RESULTS))
+
+    branches = []
+    if "course" in kinds:
+        branches.append(
+            _branch(
+                Course.objects.filter(is_active=True),
+                "course",
+                F("id"),
+                term,
+                limit,
+            )
+        )
+    if "module" in kinds:
+        branches.append(
+            _branch(
+                Module.objects.filter(is_active=True, course__is_active=True),
+                "module",
+                F("course_id"),
+                term,
+                limit,
+            )
+        )
+    if "lesson" in kinds:
+        branches.append(
+            _branch(
+                Lesson.objects.filter(
+                    is_active=True,
+                    module__is_active=True,
+                    module__course__is_active=True,
+                ),
+                "lesson",
+                F("module__course_id"),
+                term,
+                limit,
+            )
+        )
+
+    if len(branches) == 1:
+        rows = branches[0]
+    else:
+        rows = branches[0].union(*branches[1:], all=True)
+        rows = rows.order_by("-result_rank")[:limit]
+    return [
+        SearchResult(kind, id, course_id, title, _highlight(snippet), rank)
+        for kind, id, course_id, title, snippet, rank in rows
+    ]
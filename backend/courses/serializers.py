@@ -0,0 +1,75 @@
+"""
+Serializers do app courses.
+"""
+from rest_framework import serializers
+
+from .models import Course
+from .search import KINDS, MAX_RESULTS, MIN_QUERY_LENGTH
+
+# Campos da listagem do catálogo (carregados com ``only()``)
+COURSE_LIST_FIELDS = (
+    "id",
+    "title",
+    "slug",
+    "level",
+    "cover_image",
+    "is_featured",
+    "total_students",
+    "average_rating",
+    "created_at",
+)
+
+# Estatísticas do curso, servidas fora da árvore pré-serializada
+COURSE_STATS_FIELDS = ("total_students", "average_rating", "rating_count")
+
+
+class CatalogSearchQuerySerializer(serializers.Serializer):
+    """Parâmetros da busca do catálogo."""
+
+    q = serializers.CharField(
+        min_length=MIN_QUERY_LENGTH,
+        max_length=200,
+        trim_whitespace=True,
+        help_text="Texto buscado (aceita aspas, -termo e or)",
+    )
+    limit = serializers.IntegerField(
+        min_value=1, max_value=MAX_RESULTS, required=False, default=20
+    )
+    kinds = serializers.MultipleChoiceField(
+        choices=KINDS,
+        required=False,
+        help_text="Tipos incluídos (course, module, lesson); padrão: todos",
+    )
+
+
+class SearchResultSerializer(serializers.Serializer):
+    """Item encontrado na busca do catálogo."""
+
+    kind = serializers.ChoiceField(choices=KINDS)
+    id = serializers.UUIDField()
+    course_id = serializers.UUIDField()
+    title = serializers.CharField()
+    snippet = serializers.CharField(
+        help_text=(
+            "Trecho da descrição em HTML seguro (texto escapado), com os "
+            "termos entre <mark>"
+        )
+    )
+    rank = serializers.FloatField()
+
+
+class CourseListSerializer(serializers.ModelSerializer):
+    """Curso na listagem pública do catálogo."""
+
+    class Meta:
+        model = Course
+        fields = COURSE_LIST_FIELDS
+        read_only_fields = fields
+
+
+class CourseStatsSerializer(serializers.ModelSerializer):
+    """Estatísticas de alunos e avaliações de um curso."""
+
+    class Meta:
+        model = Course
+        fields = COURSE_STATS_FIELDS
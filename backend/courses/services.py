@@ -0,0 +1,230 @@
+"""
+Serviços do app courses.
+
+Manutenção incremental das estatísticas desnormalizadas de ``Course``:
+
+- ``total_students``: matrículas ativas. Criar, remover ou (des)ativar uma
+  ``Enrollment`` aplica +1/-1 com ``F()``;
+- ``rating_sum``/``rating_count``: soma e número de ``CourseRating``.
+  ``average_rating`` é derivada deles no mesmo UPDATE, sem reler as
+  avaliações.
+
+Cada ajuste é um único UPDATE na linha do curso, executado na transação
+que alterou a matrícula ou a avaliação (ver ``courses.signals``). Operações
+que não disparam sinais (``bulk_create``, ``QuerySet.update``, SQL direto)
+deixam os contadores defasados; ``reconcile_course_stats`` (comando
+``reconcile_course_stats``) encontra e corrige essas divergências em lote.
+"""
+import uuid
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Iterable, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import Case, DecimalField, F, Value, When
+from django.db.models.functions import Cast, Greatest, Now, Round
+from django.db.models.lookups import GreaterThan
+
+from .models import Course, CourseRating, Enrollment
+
+
+def derived_average_rating(rating_sum, rating_count):
+    """
+    Expressão de ``average_rating`` a partir da soma e do número de notas.
+
+    Args:
+        rating_sum: Expressão com a nova soma das notas
+        rating_count: Expressão com o novo número de avaliações
+
+    Returns:
+        Expressão para ``QuerySet.update``
+    """
+    return Case(
+        When(
+            GreaterThan(rating_count, 0),
+            then=Round(
+                Cast(rating_sum, DecimalField(max_digits=12, decimal_places=4))
+                / rating_count,
+                2,
+            ),
+        ),
+        default=Value(Decimal("0")),
+        output_field=DecimalField(max_digits=3, decimal_places=2),
+    )
+
+
+def apply_enrollment_delta(course_id: uuid.UUID, delta: int) -> int:
+    """
+    Soma ``delta`` em ``total_students`` do curso.
+
+    Args:
+        course_id: ID do curso
+        delta: +1 (matrícula ativa criada) ou -1 (removida ou desativada)
+
+    Returns:
+        int: Número de cursos atualizados (0 ou 1)
+    """
+    if not delta or course_id is None:
+        return 0
+    updated = Course.objects.filter(pk=course_id).update(
+        total_students=Greatest(F("total_students") + Value(delta), Value(0)),
+        updated_at=Now(),
+    )
+    return updated
+
+
+def apply_rating_delta(
+    course_id: uuid.UUID, sum_delta: int, count_delta: int
+) -> int:
+    """
+    Ajusta a soma e o número de avaliações do curso e recalcula a média.
+
+    Args:
+        course_id: ID do curso
+        sum_delta: Variação da soma das notas
+        count_delta: +1 (avaliação criada), -1 (removida) ou 0 (nota
+            alterada)
+
+    Returns:
+        int: Número de cursos atualizados (0 ou 1)
+    """
+    if (not sum_delta and not count_delta) or course_id is None:
+        return 0
+    rating_sum = Greatest(F("rating_sum") + Value(sum_delta), Value(0))
+    rating_count = Greatest(F("rating_count") + Value(count_delta), Value(0))
+    updated = Course.objects.filter(pk=course_id).update(
+        rating_sum=rating_sum,
+        rating_count=rating_count,
+        average_rating=derived_average_rating(rating_sum, rating_count),
+        updated_at=Now(),
+    )
+    return updated
+
+
+@dataclass(frozen=True)
+class CourseStatsDrift:
+    """
+    Divergência entre as estatísticas gravadas em um curso e as reais.
+
+    Attributes:
+        course_id: ID do curso
+        total_students: ``(gravado, real)``
+        rating_sum: ``(gravado, real)``
+        rating_count: ``(gravado, real)``
+        average_rating: ``(gravado, real)``
+    """
+
+    course_id: uuid.UUID
+    total_students: tuple
+    rating_sum: tuple
+    rating_count: tuple
+    average_rating: tuple
+
+
+# Valores reais de cada curso, calculados com uma agregação por tabela.
+# ``drift`` seleciona apenas os cursos cujos valores gravados divergem.
+_DRIFT_SQL = """
+SELECT c.id,
+       c.total_students, COALESCE(e.total, 0),
+       c.rating_sum, COALESCE(r.total, 0),
+       c.rating_count, COALESCE(r.count, 0),
+       c.average_rating,
+       CASE WHEN COALESCE(r.count, 0) > 0
+            THEN ROUND(r.total::numeric / r.count, 2)
+            ELSE 0
+       END
+FROM {course} AS c
+LEFT JOIN (
+    SELECT course_id, COUNT(*) AS total
+    FROM {enrollment}
+    WHERE is_active {course_filter}
+    GROUP BY course_id
+) AS e ON e.course_id = c.id
+LEFT JOIN (
+    SELECT course_id, SUM(rating) AS total, COUNT(*) AS count
+    FROM {rating}
+    WHERE TRUE {course_filter}
+    GROUP BY course_id
+) AS r ON r.course_id = c.id
+WHERE TRUE {outer_filter}
+"""
+
+_DRIFT_WHERE = """
+SELECT * FROM ({stats}) AS drift (
+    id, total_students, real_students, rating_sum, real_sum,
+    rating_count, real_count, average_rating, real_average
+)
+WHERE total_students <> real_students
+   OR rating_sum <> real_sum
+   OR rating_count <> real_count
+   OR average_rating <> real_average
+"""
+
+_REPAIR_SQL = """
+UPDATE {course} AS c
+SET total_students = drift.real_students,
+    rating_sum = drift.real_sum,
+    rating_count = drift.real_count,
+    average_rating = drift.real_average,
+    updated_at = NOW()
+FROM ({drift}) AS drift
+WHERE c.id = drift.id
+RETURNING c.id, drift.total_students, drift.real_students,
+          drift.rating_sum, drift.real_sum,
+          drift.rating_count, drift.real_count,
+          drift.average_rating, drift.real_average
+"""
+
+
+def reconcile_course_stats(
+    course_ids: Optional[Iterable[uuid.UUID]] = None,
+    repair: bool = True,
+) -> List[CourseStatsDrift]:
+    """
+    Encontra (e, por padrão, corrige) estatísticas divergentes dos cursos.
+
+    Uma única consulta agrega matrículas ativas e avaliações por curso e
+    compara com os valores gravados; a correção é um UPDATE ... FROM sobre
+    a mesma consulta, que só toca os cursos divergentes.
+
+    Args:
+        course_ids: Cursos a verificar (padrão: todos)
+        repair: Corrige os cursos divergentes (False apenas relata)
+
+    Returns:
+        Lista de CourseStatsDrift com os valores anteriores à correção
+    """
+    params: list = []
+    course_filter = outer_filter = ""
+    if course_ids is not None:
+        course_ids = list(course_ids)
+        course_filter = "AND course_id = ANY(%s)"
+        outer_filter = "AND c.id = ANY(%s)"
+        params = [course_ids, course_ids, course_ids]
+
+    stats = _DRIFT_SQL.format(
+        course=Course._meta.db_table,
+        enrollment=Enrollment._meta.db_table,
+        rating=CourseRating._meta.db_table,
+        course_filter=course_filter,
+        outer_filter=outer_filter,
+    )
+    drift = _DRIFT_WHERE.format(stats=stats)
+    sql = drift
+    if repair:
+        sql = _REPAIR_SQL.format(course=Course._meta.db_table, drift=drift)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+
+    return [
+        CourseStatsDrift(
+            course_id=row[0],
+            total_students=(row[1], row[2]),
+            rating_sum=(row[3], row[4]),
+            rating_count=(row[5], row[6]),
+            average_rating=(row[7], row[8]),
+        )
+        for row in rows
+    ]
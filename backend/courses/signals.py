@@ -0,0 +1,112 @@
+"""
+Sinais do app courses.
+
+- Invalidam a árvore pré-serializada do curso (ver ``courses.tree``) sempre
+  que o curso, um de seus módulos ou uma de suas aulas muda.
+- Mantêm ``Course.total_students`` e ``Course.average_rating`` a partir das
+  matrículas e avaliações (ver ``courses.services``).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Course, CourseRating, Enrollment, Lesson, Module
+from .services import apply_enrollment_delta, apply_rating_delta
+from .tree import invalidate_course_tree
+
+
+def _courses_of_modules(*module_ids):
+    """IDs dos cursos aos quais os módulos pertencem."""
+    module_ids = {pk for pk in module_ids if pk is not None}
+    return Module.objects.filter(pk__in=module_ids).values_list(
+        "course_id", flat=True
+    )
+
+
+@receiver(post_save, sender=Course, dispatch_uid="course_tree_on_save")
+@receiver(post_delete, sender=Course, dispatch_uid="course_tree_on_delete")
+def course_changed(sender, instance: Course, **kwargs):
+    """``Course.save`` já avança ``updated_at``; basta descartar o cache."""
+    invalidate_course_tree([instance.pk], touch=False)
+
+
+@receiver(post_save, sender=Module, dispatch_uid="module_tree_on_save")
+def module_saved(sender, instance: Module, **kwargs):
+    """Invalida o curso do módulo (e o anterior, se o módulo mudou de curso)."""
+    invalidate_course_tree({instance._original_course_id, instance.course_id})
+    instance._original_course_id = instance.course_id
+
+
+@receiver(post_delete, sender=Module, dispatch_uid="module_tree_on_delete")
+def module_deleted(sender, instance: Module, **kwargs):
+    """Invalida o curso de um módulo removido."""
+    invalidate_course_tree([instance.course_id])
+
+
+@receiver(post_save, sender=Lesson, dispatch_uid="lesson_tree_on_save")
+def lesson_saved(sender, instance: Lesson, **kwargs):
+    """Invalida o curso da aula (e o anterior, se a aula mudou de módulo)."""
+    invalidate_course_tree(
+        _courses_of_modules(instance._original_module_id, instance.module_id)
+    )
+
+
+@receiver(post_delete, sender=Lesson, dispatch_uid="lesson_tree_on_delete")
+def lesson_deleted(sender, instance: Lesson, **kwargs):
+    """Invalida o curso de uma aula removida."""
+    invalidate_course_tree(_courses_of_modules(instance.module_id))
+
+
+@receiver(post_save, sender=Enrollment, dispatch_uid="enrollment_on_save")
+def enrollment_saved(sender, instance: Enrollment, created, **kwargs):
+    """Conta a matrícula ao criar, (des)ativar ou mudar de curso."""
+    was_active = not created and bool(instance._original_is_active)
+    old_course = instance._original_course_id
+    moved = not created and old_course != instance.course_id
+
+    if was_active and (moved or not instance.is_active):
+        apply_enrollment_delta(old_course, -1)
+    if instance.is_active and (created or moved or not was_active):
+        apply_enrollment_delta(instance.course_id, 1)
+
+    instance._original_course_id = instance.course_id
+    instance._original_is_active = instance.is_active
+
+
+@receiver(
+    post_delete, sender=Enrollment, dispatch_uid="enrollment_on_delete"
+)
+def enrollment_deleted(sender, instance: Enrollment, **kwargs):
+    """Desconta uma matrícula ativa removida."""
+    if instance._original_is_active:
+        apply_enrollment_delta(instance.course_id, -1)
+
+
+@receiver(post_save, sender=CourseRating, dispatch_uid="rating_on_save")
+def rating_saved(sender, instance: CourseRating, created, **kwargs):
+    """Aplica a nota nova (e retira a anterior) na soma do curso."""
+    if created:
+        apply_rating_delta(instance.course_id, instance.rating, 1)
+    elif instance._original_course_id != instance.course_id:
+        apply_rating_delta(
+            instance._original_course_id, -instance._original_rating, -1
+        )
+        apply_rating_delta(instance.course_id, instance.rating, 1)
+    else:
+        apply_rating_delta(
+            instance.course_id, instance.rating - instance._original_rating, 0
+        )
+
+    instance._original_course_id = instance.course_id
+    instance._original_rating = instance.rating
+
+
+@receiver(
+    post_delete, sender=CourseRating, dispatch_uid="rating_on_delete"
+)
+def rating_deleted(sender, instance: CourseRating, **kwargs):
+    """Retira a nota de uma avaliação removida."""
+    # Valores gravados (ver CourseRating._load_original): a linha já não
+    # existe para carregar campos adiados
+    apply_rating_delta(
+        instance._original_course_id, -(instance._original_rating or 0), -1
+    )
@@ -1,3 +1,202 @@
+import json
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+
+from users.models import User
+
+from .models import Course, CourseRating, Enrollment, Lesson, Module
+from .search import search_catalog
+from .tree import generation_key, get_course_tree
+
+
+class CourseStatsTests(TestCase):
+    """Estatísticas do curso mantidas por UPDATEs atômicos."""
+
+    def setUp(self):
+        self.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=self.teacher,
+        )
+
+    def test_stale_save_keeps_enrollment_count(self):
+        stale = Course.objects.get(pk=self.course.pk)
+        student = User.objects.create(
+            username="aluno", email="aluno@example.com"
+        )
+        Enrollment.objects.create(student=student, course=self.course)
+
+        stale.title = "Curso editado"
+        stale.save()
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.title, "Curso editado")
+        self.assertEqual(self.course.total_students, 1)
+
+    def _rate(self, rating):
+        student = User.objects.create(
+            username=f"aluno{rating}", email=f"aluno{rating}@example.com"
+        )
+        return CourseRating.objects.create(
+            student=student, course=self.course, rating=rating
+        )
+
+    def test_update_rating_loaded_without_value(self):
+        rating = self._rate(4)
+        self._rate(2)
+
+        deferred = CourseRating.objects.only("id", "course").get(
+            pk=rating.pk
+        )
+        deferred.rating = 5
+        deferred.save()
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.rating_sum, 7)
+        self.assertEqual(self.course.rating_count, 2)
+        self.assertEqual(str(self.course.average_rating), "3.50")
+
+    def test_delete_rating_loaded_without_value(self):
+        rating = self._rate(4)
+        self._rate(2)
+
+        CourseRating.objects.only("id").get(pk=rating.pk).delete()
+
+        self.course.refresh_from_db()
+        self.assertEqual(self.course.rating_sum, 2)
+        self.assertEqual(self.course.rating_count, 1)
+        self.assertEqual(str(self.course.average_rating), "2.00")
+
+
+class CatalogSearchTests(TestCase):
+    """Busca do catálogo com trechos destacados em HTML seguro."""
+
+    def setUp(self):
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.course = Course.objects.create(
+            title="Alfabeto em Libras", slug="alfabeto",
+            description=(
+                "Aprenda o alfabeto <img src=x onerror=alert(1)> com "
+                "<script>alert(2)</script> <mark>falso</mark> destaque "
+                "& exemplos."
+            ),
+            created_by=teacher,
+        )
+
+    def test_snippet_escapes_description_markup(self):
+        results = search_catalog("alfabeto", kinds=["course"])
+
+        self.assertEqual([r.id for r in results], [self.course.pk])
+        snippet = results[0].snippet
+        self.assertIn("<mark>alfabeto</mark>", snippet)
+        self.assertIn("&lt;img src=x onerror=alert(1)&gt;", snippet)
+        self.assertIn("&amp;", snippet)
+        # A única marcação no trecho é o destaque do termo buscado
+        text = snippet.replace("<mark>alfabeto</mark>", "")
+        self.assertNotIn("<", text)
+        self.assertNotIn(">", text)
+
+    def test_typo_matches_title_by_trigram(self):
+        results = search_catalog("alfabto", kinds=["course"])
+        self.assertEqual([r.id for r in results], [self.course.pk])
+
+
+class CourseTreeTests(TestCase):
+    """Árvore do curso pré-serializada, em cache e com ETag."""
+
+    def setUp(self):
+        cache.clear()
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=teacher,
+        )
+        self.modules = [
+            Module.objects.create(
+                course=self.course, title=f"Módulo {order}",
+                description="-", order=order, is_active=order < 3,
+            )
+            for order in (2, 1, 3)
+        ]
+        self.lessons = [
+            Lesson.objects.create(
+                module=self.modules[1], title=f"Aula {order}",
+                description="-", video_url="https://example.com/aula.mp4",
+                duration=10, order=order, is_active=order < 3,
+            )
+            for order in (2, 1, 3)
+        ]
+
+    def _document(self):
+        return json.loads(get_course_tree(self.course.pk).content)
+
+    def test_tree_lists_active_items_in_order(self):
+        document = self._document()
+
+        self.assertEqual(
+            [m["title"] for m in document["modules"]],
+            ["Módulo 1", "Módulo 2"],
+        )
+        self.assertEqual(
+            [l["title"] for l in document["modules"][0]["lessons"]],
+            ["Aula 1", "Aula 2"],
+        )
+        self.assertEqual(document["modules"][1]["lessons"], [])
+        self.assertEqual(document["total_lessons"], 2)
+        self.assertEqual(document["total_duration"], 20)
+        self.assertNotIn("total_students", document)
+
+    def test_cached_tree_makes_no_queries(self):
+        get_course_tree(self.course.pk)
+        with self.assertNumQueries(0):
+            get_course_tree(self.course.pk)
+
+    def test_lesson_change_replaces_the_cached_tree(self):
+        before = get_course_tree(self.course.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            lesson = self.lessons[0]
+            lesson.title = "Aula renomeada"
+            lesson.save()
+
+        after = get_course_tree(self.course.pk)
+        self.assertNotEqual(before.etag, after.etag)
+        self.assertIn(b"Aula renomeada", after.content)
+
+    def test_enrollment_keeps_the_cached_tree(self):
+        get_course_tree(self.course.pk)
+        generation = cache.get(generation_key(self.course.pk))
+        student = User.objects.create(
+            username="aluno", email="aluno@example.com"
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=student, course=self.course)
+
+        self.assertEqual(cache.get(generation_key(self.course.pk)), generation)
+
+    def test_view_answers_not_modified_for_the_same_etag(self):
+        url = reverse("courses:course-detail", args=[self.course.pk])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
 
-# Create your tests here.
+    def test_inactive_course_has_no_tree(self):
+        Course.objects.filter(pk=self.course.pk).update(is_active=False)
+        self.assertIsNone(get_course_tree(self.course.pk))
@@ -0,0 +1,280 @@
+"""
+Árvore pré-serializada de um curso (Curso → Módulos → Aulas).
+
+A página do curso precisa da lista de módulos e aulas ativos, em ordem.
+Em vez de percorrer ``Course.modules``/``Module.lessons`` (e os
+``__str__`` que buscam os pais novamente), a árvore é montada com duas
+consultas de ``values()`` e serializada uma única vez em JSON. O resultado
+(``CourseTree``) é imutável e fica no cache do Django, junto com o
+``updated_at`` que o originou.
+
+A chave da árvore inclui a geração atual do curso, guardada em uma chave
+própria. Os sinais de ``Course``, ``Module`` e ``Lesson`` (ver
+``courses.signals``) avançam ``Course.updated_at`` e, após o commit, trocam
+a geração. Uma leitura que montou a árvore a partir de um snapshot anterior
+ao commit a grava sob a geração antiga, que ninguém mais consulta, em vez
+de devolvê-la ao cache até ``COURSE_TREE_CACHE_TIMEOUT``.
+
+As estatísticas do curso (alunos e avaliações) mudam a cada matrícula e
+avaliação e por isso não fazem parte da árvore: são servidas à parte (ver
+``courses.views.CourseStatsView``). Com o cache em memória local (padrão),
+cada processo mantém sua própria cópia e ``COURSE_TREE_CACHE_TIMEOUT``
+limita o tempo em que outros processos podem servir uma versão antiga; em
+produção, configure um cache compartilhado.
+"""
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models.functions import Now
+
+from .models import Course, Lesson, Module
+
+CACHE_KEY_PREFIX = "courses:tree"
+GENERATION_KEY_PREFIX = "courses:tree-generation"
+
+COURSE_FIELDS = (
+    "id",
+    "title",
+    "slug",
+    "description",
+    "level",
+    "cover_image",
+    "preview_video",
+    "is_featured",
+    "updated_at",
+)
+MODULE_FIELDS = ("id", "title", "description", "order", "duration_minutes")
+LESSON_FIELDS = (
+    "id",
+    "module_id",
+    "title",
+    "description",
+    "duration",
+    "order",
+    "is_free",
+)
+
+
+@dataclass(frozen=True)
+class CourseTree:
+    """
+    Árvore de um curso já serializada.
+
+    Attributes:
+        course_id: ID do curso
+        version: ``Course.updated_at`` (ISO 8601) usado na montagem
+        content: Documento JSON codificado em UTF-8
+    """
+
+    course_id: uuid.UUID
+    version: str
+    content: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.course_id}:{self.version}"'
+
+
+def cache_key(course_id, generation: str) -> str:
+    """Chave da árvore de um curso, em uma geração, no cache."""
+    return f"{CACHE_KEY_PREFIX}:{course_id}:{generation}"
+
+
+def generation_key(course_id) -> str:
+    """Chave da geração atual da árvore de um curso no cache."""
+    return f"{GENERATION_KEY_PREFIX}:{course_id}"
+
+
+def _new_generation() -> str:
+    return uuid.uuid4().hex
+
+
+def _current_generation(course_id) -> str:
+    """Geração atual do curso, criada se ainda não existir."""
+    key = generation_key(course_id)
+    generation = cache.get(key)
+    if generation is None:
+        generation = _new_generation()
+        if not cache.add(key, generation, None):
+            generation = cache.get(key, generation)
+    return generation
+
+
+async def _acurrent_generation(course_id) -> str:
+    """Versão assíncrona de ``_current_generation``."""
+    key = generation_key(course_id)
+    generation = await cache.aget(key)
+    if generation is None:
+        generation = _new_generation()
+        if not await cache.aadd(key, generation, None):
+            generation = await cache.aget(key, generation)
+    return generation
+
+
+def _module_rows(course_id):
+    return (
+        Module.objects.filter(course_id=course_id, is_active=True)
+        .order_by("order")
+        .values(*MODULE_FIELDS)
+    )
+
+
+def _lesson_rows(course_id):
+    return (
+        Lesson.objects.filter(
+            module__course_id=course_id,
+            module__is_active=True,
+            is_active=True,
+        )
+        .order_by("module__order", "order")
+        .values(*LESSON_FIELDS)
+    )
+
+
+def _assemble_course_tree(
+    course: Course,
+    modules: List[Dict[str, object]],
+    lessons: Iterable[Dict[str, object]],
+) -> CourseTree:
+    """Agrupa as aulas nos módulos e serializa a árvore."""
+    by_module: Dict[uuid.UUID, List[Dict[str, object]]] = {}
+    for module in modules:
+        module["lessons"] = by_module.setdefault(module["id"], [])
+    for lesson in lessons:
+        by_module[lesson.pop("module_id")].append(lesson)
+
+    document = {field: getattr(course, field) for field in COURSE_FIELDS}
+    document["modules"] = modules
+    document["total_lessons"] = sum(len(items) for items in by_module.values())
+    document["total_duration"] = sum(
+        lesson["duration"] for items in by_module.values() for lesson in items
+    )
+
+    return CourseTree(
+        course_id=course.pk,
+        version=course.updated_at.isoformat(),
+        content=json.dumps(
+            document, cls=DjangoJSONEncoder, separators=(",", ":")
+        ).encode("utf-8"),
+    )
+
+
+def build_course_tree(course: Course) -> CourseTree:
+    """
+    Monta e serializa a árvore de um curso.
+
+    Executa duas consultas: módulos ativos e aulas ativas desses módulos,
+    ambas já ordenadas por ``order``.
+
+    Args:
+        course: Curso com os campos de ``COURSE_FIELDS`` carregados
+
+    Returns:
+        CourseTree com o JSON pronto para ser enviado
+    """
+    return _assemble_course_tree(
+        course, list(_module_rows(course.pk)), _lesson_rows(course.pk)
+    )
+
+
+async def abuild_course_tree(course: Course) -> CourseTree:
+    """Versão assíncrona de ``build_course_tree``."""
+    modules = [module async for module in _module_rows(course.pk)]
+    lessons = [lesson async for lesson in _lesson_rows(course.pk)]
+    return _assemble_course_tree(course, modules, lessons)
+
+
+def get_course_tree(course_id: uuid.UUID) -> Optional[CourseTree]:
+    """
+    Retorna a árvore de um curso ativo, montando-a em caso de falha no cache.
+
+    Em um acerto, nenhuma consulta é feita ao banco (duas leituras do
+    cache: a geração e a árvore).
+
+    Args:
+        course_id: ID do curso
+
+    Returns:
+        CourseTree ou None se o curso não existir ou estiver inativo
+    """
+    key = cache_key(course_id, _current_generation(course_id))
+    tree = cache.get(key)
+    if tree is not None:
+        return tree
+
+    course = (
+        Course.objects.filter(pk=course_id, is_active=True)
+        .only(*COURSE_FIELDS)
+        .first()
+    )
+    if course is None:
+        return None
+
+    tree = build_course_tree(course)
+    cache.set(key, tree, getattr(settings, "COURSE_TREE_CACHE_TIMEOUT", 3600))
+    return tree
+
+
+async def aget_course_tree(course_id: uuid.UUID) -> Optional[CourseTree]:
+    """Versão assíncrona de ``get_course_tree``."""
+    key = cache_key(course_id, await _acurrent_generation(course_id))
+    tree = await cache.aget(key)
+    if tree is not None:
+        return tree
+
+    course = (
+        await Course.objects.filter(pk=course_id, is_active=True)
+        .only(*COURSE_FIELDS)
+        .afirst()
+    )
+    if course is None:
+        return None
+
+    tree = await abuild_course_tree(course)
+    await cache.aset(
+        key, tree, getattr(settings, "COURSE_TREE_CACHE_TIMEOUT", 3600)
+    )
+    return tree
+
+
+def invalidate_course_tree(
+    course_ids: Iterable[uuid.UUID], touch: bool = True
+) -> None:
+    """
+    Descarta as árvores em cache dos cursos informados.
+
+    Após o commit da transação atual, cada curso recebe uma nova geração e
+    a árvore da geração anterior é removida. Uma leitura concorrente que
+    ainda grave a versão antiga o faz sob a geração anterior.
+
+    Args:
+        course_ids: IDs dos cursos alterados
+        touch: Também avança ``Course.updated_at`` (mudanças em módulos e
+            aulas, que não passam por ``Course.save``)
+    """
+    course_ids = {pk for pk in course_ids if pk is not None}
+    if not course_ids:
+        return
+    if touch:
+        Course.objects.filter(pk__in=course_ids).update(updated_at=Now())
+
+    transaction.on_commit(lambda: _next_generation(course_ids))
+
+
+def _next_generation(course_ids) -> None:
+    """Troca a geração dos cursos e remove as árvores da anterior."""
+    keys = {generation_key(pk): pk for pk in course_ids}
+    previous = cache.get_many(keys)
+    cache.set_many({key: _new_generation() for key in keys}, None)
+    cache.delete_many(
+        [
+            cache_key(keys[key], generation)
+            for key, generation in previous.items()
+        ]
+    )
@@ -0,0 +1,22 @@
+"""
+Rotas da API do app courses.
+"""
+from django.urls import path
+
+from .views import (
+    CatalogSearchView,
+    CourseDetailView,
+    CourseListView,
+    CourseStatsView,
+)
+
+app_name = "courses"
+
+urlpatterns = [
+    path("", CourseListView.as_view(), name="course-list"),
+    path("search/", CatalogSearchView.as_view(), name="catalog-search"),
+    path("<uuid:pk>/", CourseDetailView.as_view(), name="course-detail"),
+    path(
+        "<uuid:pk>/stats/", CourseStatsView.as_view(), name="course-stats"
+    ),
+]
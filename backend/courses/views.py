@@ -1,3 +1,136 @@
-from django.shortcuts import render
+"""
+Views da API do app courses.
+"""
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from core.async_views import AsyncAPIView
+from core.pagination import KeysetPagination
+
+from .models import Course
+from .search import KINDS, search_catalog
+from .serializers import (
+    COURSE_LIST_FIELDS,
+    COURSE_STATS_FIELDS,
+    CatalogSearchQuerySerializer,
+    CourseListSerializer,
+    CourseStatsSerializer,
+    SearchResultSerializer,
+)
+from .tree import aget_course_tree
+
+
+class CourseListView(AsyncAPIView):
+    """
+    Catálogo público: cursos ativos, dos mais recentes aos mais antigos.
+
+    Assíncrona (ver ``core.async_views``): a página é lida com
+    ``aiterator()`` e a view não ocupa uma thread enquanto espera o banco.
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    pagination_class = KeysetPagination
+    ordering = ("-created_at", "id")
+    query_budget = 1
+
+    @swagger_auto_schema(responses={200: CourseListSerializer(many=True)})
+    async def get(self, request):
+        queryset = Course.objects.filter(is_active=True).only(
+            *COURSE_LIST_FIELDS
+        )
+        page = await self.apaginate_queryset(queryset)
+        return self.get_paginated_response(
+            CourseListSerializer(page, many=True).data
+        )
+
+
+class CourseDetailView(AsyncAPIView):
+    """
+    Árvore pública de um curso ativo: dados do curso, módulos e aulas.
+    As estatísticas de alunos e avaliações ficam em ``CourseStatsView``.
+
+    O corpo é o JSON pré-serializado de ``courses.tree``. Sem autenticação,
+    para que um acerto no cache não faça nenhuma consulta ao banco.
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    query_budget = 3
+
+    @swagger_auto_schema(responses={200: "Árvore do curso", 304: "", 404: ""})
+    async def get(self, request, pk):
+        tree = await aget_course_tree(pk)
+        if tree is None:
+            raise Http404
+
+        if request.headers.get("If-None-Match") == tree.etag:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                tree.content, content_type="application/json"
+            )
+        response["ETag"] = tree.etag
+        return response
+
+
+class CourseStatsView(AsyncAPIView):
+    """
+    Número de alunos e avaliação média de um curso ativo.
+
+    Servidas à parte da árvore do curso: mudam a cada matrícula e
+    avaliação e, dentro da árvore, a descartariam do cache o tempo todo.
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    query_budget = 1
+
+    @swagger_auto_schema(responses={200: CourseStatsSerializer, 404: ""})
+    async def get(self, request, pk):
+        stats = await (
+            Course.objects.filter(pk=pk, is_active=True)
+            .values(*COURSE_STATS_FIELDS)
+            .afirst()
+        )
+        if stats is None:
+            raise Http404
+        return Response(CourseStatsSerializer(stats).data)
+
+
+class CatalogSearchView(APIView):
+    """
+    Busca pública de cursos, módulos e aulas ativos.
+
+    Tolera erros de digitação (trigramas) e variações de palavras (busca
+    textual em português). Os resultados vêm ordenados por relevância.
+    """
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    query_budget = 1
+
+    @swagger_auto_schema(
+        query_serializer=CatalogSearchQuerySerializer,
+        responses={200: SearchResultSerializer(many=True)},
+    )
+    def get(self, request):
+        params = CatalogSearchQuerySerializer(
+            data={
+                "q": request.query_params.get("q", ""),
+                "limit": request.query_params.get("limit", 20),
+                "kinds": request.query_params.getlist("kinds"),
+            }
+        )
+        params.is_valid(raise_exception=True)
+        results = search_catalog(
+            params.validated_data["q"],
+            limit=params.validated_data["limit"],
+            kinds=params.validated_data["kinds"] or KINDS,
+        )
+        return Response(
+            {"results": SearchResultSerializer(results, many=True).data}
+        )
@@ -7,6 +7,7 @@ from .models import (
     Achievement,
     StudentAchievement,
 )
+from .services import recompute_course_progress
 
 
 @admin.register(LessonProgress)
@@ -69,13 +70,12 @@ class CourseProgressAdmin(admin.ModelAdmin):
     actions = ['update_progress']
     
     def update_progress(self, request, queryset):
-        for progress in queryset:
-            progress.update_progress()
+        updated = recompute_course_progress(queryset)
         self.message_user(
             request,
             _(
                 'Progresso atualizado para {0} registros.'
-                ).format(queryset.count())
+                ).format(updated)
         )
     update_progress.short_description = _('Atualizar progresso selecionado')
 
@@ -0,0 +1,410 @@
+"""
+Análise dos alunos dos cursos de um professor.
+
+Os números são agregados pelo PostgreSQL, sem percorrer ``CourseProgress``
+ou ``LessonProgress`` em Python:
+
+- ``courses``: alunos por status (``COUNT(*) FILTER``), progresso e nota
+  média em quizzes e alunos com acesso nos últimos ``ACTIVE_DAYS`` dias,
+  com ``GROUP BY``;
+- ``funnel``: funil de conclusão por módulo (alunos que começaram e que
+  concluíram todas as aulas ativas de cada módulo), com a retenção em
+  relação ao módulo anterior (``LAG``);
+- ``lagging``: alunos atrasados, ou seja, abaixo do percentil
+  ``TEACHER_ANALYTICS_LAGGING_PERCENTILE`` de progresso do curso
+  (``PERCENT_RANK``) e sem acesso há ``TEACHER_ANALYTICS_INACTIVE_DAYS``
+  dias, com o percentil da nota em quizzes;
+- ``upcoming_classes``: próximas ``UPCOMING_CLASSES`` aulas agendadas do
+  professor, limitadas no banco (``ROW_NUMBER``).
+
+Cada seção é um JSON em colunas (``{"coluna": [valores, ...]}``): as chaves
+aparecem uma única vez, o que deixa o documento bem menor que uma lista de
+objetos para cursos com muitos alunos. As linhas são lidas do cursor aos
+poucos direto para as colunas.
+
+O documento de cada professor (``TeacherAnalytics``) é serializado uma vez
+e fica no cache do Django. O comando ``refresh_teacher_analytics``
+(periódico) recalcula os documentos de todos os professores com o mesmo
+número de consultas; a view monta o documento na hora apenas se ele ainda
+não estiver no cache.
+"""
+import datetime
+import json
+import uuid
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.utils import timezone
+
+from courses.models import Course, Lesson, Module
+from scheduling.models import ScheduledClass
+from users.models import User
+
+from .models import CourseProgress, LessonProgress
+
+CACHE_KEY_PREFIX = "progress:teacher-analytics"
+
+# Alunos atrasados listados por curso
+LAGGING_LIMIT = 20
+
+# Próximas aulas listadas por professor
+UPCOMING_CLASSES = 10
+
+# Janela, em dias, dos alunos ativos de cada curso
+ACTIVE_DAYS = 7
+
+# Linhas lidas do cursor por vez
+FETCH_SIZE = 1000
+
+_COURSES_SQL = """
+SELECT c.id, c.title, c.created_by_id,
+       COUNT(cp.id) AS learners,
+       COUNT(cp.id) FILTER (WHERE cp.status = 'not_started') AS not_started,
+       COUNT(cp.id) FILTER (WHERE cp.status = 'in_progress') AS in_progress,
+       COUNT(cp.id) FILTER (WHERE cp.status = 'completed') AS completed,
+       COUNT(cp.id) FILTER (WHERE cp.last_accessed >= %(active_since)s)
+           AS active_recently,
+       ROUND(AVG(cp.progress_percentage), 2) AS average_progress,
+       ROUND(AVG(cp.quiz_average_score), 2) AS average_quiz_score
+FROM {course} AS c
+LEFT JOIN {course_progress} AS cp ON cp.course_id = c.id
+WHERE c.created_by_id = ANY(%(teachers)s)
+GROUP BY c.id
+ORDER BY c.created_by_id, c.title, c.id
+"""
+
+_FUNNEL_SQL = """
+WITH module_lessons AS (
+    SELECT m.id AS module_id, m.course_id, m.title, m."order",
+           COUNT(l.id) AS lessons
+    FROM {module} AS m
+    JOIN {course} AS c ON c.id = m.course_id
+    JOIN {lesson} AS l ON l.module_id = m.id AND l.is_active
+    WHERE m.is_active AND c.created_by_id = ANY(%(teachers)s)
+    GROUP BY m.id
+),
+student_modules AS (
+    SELECT l.module_id, lp.student_id,
+           COUNT(*) FILTER (WHERE lp.status = 'completed') AS completed
+    FROM module_lessons AS ml
+    JOIN {lesson} AS l ON l.module_id = ml.module_id AND l.is_active
+    JOIN {lesson_progress} AS lp ON lp.lesson_id = l.id
+    GROUP BY l.module_id, lp.student_id
+),
+funnel AS (
+    SELECT ml.course_id, ml.module_id, ml.title, ml."order", ml.lessons,
+           COUNT(sm.student_id) AS started,
+           COUNT(sm.student_id) FILTER (WHERE sm.completed >= ml.lessons)
+               AS completed
+    FROM module_lessons AS ml
+    LEFT JOIN student_modules AS sm ON sm.module_id = ml.module_id
+    GROUP BY ml.course_id, ml.module_id, ml.title, ml."order", ml.lessons
+)
+SELECT course_id, module_id, title, "order", lessons, started, completed,
+       ROUND(
+           completed::numeric / NULLIF(
+               LAG(completed) OVER (
+                   PARTITION BY course_id ORDER BY "order", module_id
+               ),
+               0
+           ),
+           4
+       ) AS retention
+FROM funnel
+ORDER BY course_id, "order", module_id
+"""
+
+_LAGGING_SQL = """
+SELECT lagging.course_id, lagging.student_id, u.username,
+       u.first_name, u.last_name, lagging.progress_percentage,
+       lagging.quiz_average_score, lagging.last_accessed,
+       ROUND(lagging.progress_rank::numeric, 4),
+       ROUND(lagging.score_rank::numeric, 4)
+FROM (
+    SELECT ranked.*,
+           ROW_NUMBER() OVER (
+               PARTITION BY ranked.course_id
+               ORDER BY ranked.progress_percentage, ranked.last_accessed
+           ) AS position
+    FROM (
+        SELECT cp.course_id, cp.student_id, cp.status,
+               cp.progress_percentage, cp.quiz_average_score,
+               cp.last_accessed,
+               PERCENT_RANK() OVER (
+                   PARTITION BY cp.course_id
+                   ORDER BY cp.progress_percentage
+               ) AS progress_rank,
+               PERCENT_RANK() OVER (
+                   PARTITION BY cp.course_id
+                   ORDER BY cp.quiz_average_score
+               ) AS score_rank
+        FROM {course_progress} AS cp
+        JOIN {course} AS c ON c.id = cp.course_id
+        WHERE c.created_by_id = ANY(%(teachers)s)
+    ) AS ranked
+    WHERE ranked.status <> 'completed'
+      AND ranked.progress_rank <= %(percentile)s
+      AND ranked.last_accessed < %(inactive_since)s
+) AS lagging
+JOIN {user} AS u ON u.id = lagging.student_id
+WHERE lagging.position <= %(limit)s
+ORDER BY lagging.course_id, lagging.position
+"""
+
+# Aulas marcadas ou confirmadas que ainda não terminaram, limitadas por
+# professor no próprio banco
+_UPCOMING_SQL = """
+SELECT upcoming.teacher_id, upcoming.id, upcoming.date,
+       upcoming.start_time, upcoming.end_time, upcoming.status,
+       upcoming.topic, upcoming.student_id
+FROM (
+    SELECT sc.*,
+           ROW_NUMBER() OVER (
+               PARTITION BY sc.teacher_id
+               ORDER BY sc.date, sc.start_time, sc.id
+           ) AS position
+    FROM {scheduled_class} AS sc
+    WHERE sc.teacher_id = ANY(%(teachers)s)
+      AND sc.status IN ('scheduled', 'confirmed')
+      AND (
+          sc.date > %(today)s
+          OR (sc.date = %(today)s AND sc.end_time > %(local_time)s)
+      )
+) AS upcoming
+WHERE upcoming.position <= %(upcoming)s
+ORDER BY upcoming.teacher_id, upcoming.position
+"""
+
+COURSE_COLUMNS = (
+    "course_id",
+    "title",
+    "learners",
+    "not_started",
+    "in_progress",
+    "completed",
+    "active_recently",
+    "average_progress",
+    "average_quiz_score",
+)
+FUNNEL_COLUMNS = (
+    "course_id",
+    "module_id",
+    "title",
+    "order",
+    "lessons",
+    "started",
+    "completed",
+    "retention",
+)
+LAGGING_COLUMNS = (
+    "course_id",
+    "student_id",
+    "name",
+    "progress_percentage",
+    "quiz_average_score",
+    "last_accessed",
+    "progress_percentile",
+    "quiz_score_percentile",
+)
+CLASS_COLUMNS = (
+    "id",
+    "date",
+    "start_time",
+    "end_time",
+    "status",
+    "topic",
+    "student_id",
+)
+
+
+@dataclass(frozen=True)
+class TeacherAnalytics:
+    """
+    Documento de análise de um professor já serializado.
+
+    Attributes:
+        teacher_id: ID do professor
+        generated_at: Momento do cálculo (ISO 8601)
+        content: Documento JSON codificado em UTF-8
+    """
+
+    teacher_id: uuid.UUID
+    generated_at: str
+    content: bytes
+
+    @property
+    def etag(self) -> str:
+        return f'"{self.teacher_id}:{self.generated_at}"'
+
+
+def cache_key(teacher_id) -> str:
+    """Chave do documento de um professor no cache."""
+    return f"{CACHE_KEY_PREFIX}:{teacher_id}"
+
+
+def _empty(columns: Sequence[str]) -> Dict[str, list]:
+    return {column: [] for column in columns}
+
+
+def _stream(sql: str, params: dict):
+    """Executa ``sql`` e produz as linhas em blocos de ``FETCH_SIZE``."""
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(FETCH_SIZE)
+            if not rows:
+                break
+            yield from rows
+
+
+def _tables() -> Dict[str, str]:
+    return {
+        "course": Course._meta.db_table,
+        "module": Module._meta.db_table,
+        "lesson": Lesson._meta.db_table,
+        "course_progress": CourseProgress._meta.db_table,
+        "lesson_progress": LessonProgress._meta.db_table,
+        "user": User._meta.db_table,
+        "scheduled_class": ScheduledClass._meta.db_table,
+    }
+
+
+def _full_name(username, first_name, last_name) -> str:
+    return " ".join(part for part in (first_name, last_name) if part) or (
+        username
+    )
+
+
+def build_teacher_analytics(
+    teacher_ids: Iterable[uuid.UUID],
+) -> Dict[uuid.UUID, TeacherAnalytics]:
+    """
+    Calcula os documentos de análise dos professores informados.
+
+    Executa quatro consultas, qualquer que seja o número de professores,
+    cursos ou alunos.
+
+    Args:
+        teacher_ids: IDs dos professores
+
+    Returns:
+        Dicionário ``{teacher_id: TeacherAnalytics}``
+    """
+    teacher_ids = list({pk for pk in teacher_ids if pk is not None})
+    if not teacher_ids:
+        return {}
+
+    now = timezone.now()
+    local = timezone.localtime(now)
+    tables = _tables()
+    params = {
+        "teachers": teacher_ids,
+        "active_since": now - datetime.timedelta(days=ACTIVE_DAYS),
+        "inactive_since": now
+        - datetime.timedelta(
+            days=getattr(settings, "TEACHER_ANALYTICS_INACTIVE_DAYS", 7)
+        ),
+        "percentile": getattr(
+            settings, "TEACHER_ANALYTICS_LAGGING_PERCENTILE", 0.25
+        ),
+        "limit": LAGGING_LIMIT,
+        "today": local.date(),
+        "local_time": local.time(),
+        "upcoming": UPCOMING_CLASSES,
+    }
+    documents = {
+        pk: {
+            "courses": _empty(COURSE_COLUMNS),
+            "funnel": _empty(FUNNEL_COLUMNS),
+            "lagging": _empty(LAGGING_COLUMNS),
+            "upcoming_classes": _empty(CLASS_COLUMNS),
+        }
+        for pk in teacher_ids
+    }
+
+    owners = {}
+    for row in _stream(_COURSES_SQL.format(**tables), params):
+        course_id, teacher_id = row[0], row[2]
+        owners[course_id] = teacher_id
+        columns = documents[teacher_id]["courses"]
+        for name, value in zip(COURSE_COLUMNS, (row[0], row[1], *row[3:])):
+            columns[name].append(value)
+
+    for row in _stream(_FUNNEL_SQL.format(**tables), params):
+        columns = documents[owners[row[0]]]["funnel"]
+        for name, value in zip(FUNNEL_COLUMNS, row):
+            columns[name].append(value)
+
+    for row in _stream(_LAGGING_SQL.format(**tables), params):
+        columns = documents[owners[row[0]]]["lagging"]
+        values = (row[0], row[1], _full_name(*row[2:5]), *row[5:])
+        for name, value in zip(LAGGING_COLUMNS, values):
+            columns[name].append(value)
+
+    for teacher_id, *values in _stream(
+        _UPCOMING_SQL.format(**tables), params
+    ):
+        columns = documents[teacher_id]["upcoming_classes"]
+        for name, value in zip(CLASS_COLUMNS, values):
+            columns[name].append(value)
+
+    generated_at = now.isoformat()
+    return {
+        pk: TeacherAnalytics(
+            teacher_id=pk,
+            generated_at=generated_at,
+            content=json.dumps(
+                {"generated_at": now, **document},
+                cls=DjangoJSONEncoder,
+                separators=(",", ":"),
+            ).encode("utf-8"),
+        )
+        for pk, document in documents.items()
+    }
+
+
+def refresh_teacher_analytics(
+    teacher_ids: Optional[Iterable[uuid.UUID]] = None,
+) -> List[TeacherAnalytics]:
+    """
+    Recalcula e grava no cache os documentos dos professores.
+
+    Args:
+        teacher_ids: IDs dos professores (padrão: todos os professores
+            com cursos)
+
+    Returns:
+        Lista dos documentos gravados
+    """
+    if teacher_ids is None:
+        teacher_ids = (
+            Course.objects.order_by()
+            .values_list("created_by_id", flat=True)
+            .distinct()
+        )
+    snapshots = build_teacher_analytics(teacher_ids)
+    cache.set_many(
+        {cache_key(pk): snapshot for pk, snapshot in snapshots.items()},
+        getattr(settings, "TEACHER_ANALYTICS_CACHE_TIMEOUT", 3600),
+    )
+    return list(snapshots.values())
+
+
+def get_teacher_analytics(teacher_id: uuid.UUID) -> TeacherAnalytics:
+    """
+    Documento de análise do professor, calculado se não estiver no cache.
+
+    Args:
+        teacher_id: ID do professor
+
+    Returns:
+        TeacherAnalytics
+    """
+    snapshot = cache.get(cache_key(teacher_id))
+    if snapshot is None:
+        snapshot = refresh_teacher_analytics([teacher_id])[0]
+    return snapshot
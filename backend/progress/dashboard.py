@@ -0,0 +1,284 @@
+"""
+Painel do aluno em um número fixo de consultas.
+
+O painel reúne, para um aluno:
+
+- ``courses``: matrículas ativas com o curso e o ``CourseProgress``;
+- ``recent_lessons``: últimas aulas acessadas (``LessonProgress``);
+- ``upcoming_classes``: próximas aulas agendadas (``ScheduledClass``);
+- ``new_achievements``: conquistas ainda não visualizadas;
+- ``notifications``: número e últimas notificações não lidas.
+
+Cada seção é lida com uma única consulta de ``values()`` (as relações
+necessárias entram por JOIN, como em ``select_related``), exceto
+``courses``, que usa duas: matrículas e progressos, unidos em Python. Como
+nenhuma instância de modelo é criada, não há ``__str__`` nem acessos
+preguiçosos a relações, e o número de consultas não depende da quantidade
+de matrículas, aulas ou conquistas. O resultado é serializado de uma vez
+por ``DashboardSerializer``.
+
+Cada seção fica no cache do Django por aluno (``DASHBOARD_CACHE_TIMEOUT``)
+e é descartada após o commit apenas quando algo daquela seção muda para
+aquele aluno (ver ``progress.signals``, ``progress.services`` e
+``progress.heartbeats``). As notificações usam o cache de
+``scheduling.inbox``. Alterações que afetam todos os alunos de um curso
+(título do curso, aulas criadas ou removidas) não percorrem os painéis:
+aparecem quando a entrada expira.
+"""
+import uuid
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from courses.models import Enrollment
+from scheduling.inbox import arecent_unread, aunread_count
+from scheduling.models import ScheduledClass
+
+from .models import CourseProgress, LessonProgress, StudentAchievement
+
+CACHE_KEY_PREFIX = "progress:dashboard"
+
+# Seções guardadas no cache do painel
+SECTIONS = (
+    "courses",
+    "recent_lessons",
+    "upcoming_classes",
+    "new_achievements",
+)
+
+# Itens por seção (as matrículas não têm limite)
+RECENT_LESSONS = 5
+UPCOMING_CLASSES = 5
+NEW_ACHIEVEMENTS = 5
+
+# Status de aulas agendadas que ainda vão acontecer
+UPCOMING_STATUSES = ("scheduled", "confirmed")
+
+
+def cache_key(student_id, section: str) -> str:
+    """Chave de uma seção do painel de um aluno no cache."""
+    return f"{CACHE_KEY_PREFIX}:{student_id}:{section}"
+
+
+def invalidate_dashboard(
+    student_ids: Iterable[uuid.UUID], *sections: str
+) -> None:
+    """
+    Descarta seções do painel dos alunos informados.
+
+    A remoção acontece após o commit da transação atual, para que uma
+    leitura concorrente não volte a gravar a versão antiga no cache.
+
+    Args:
+        student_ids: IDs dos alunos afetados
+        *sections: Seções alteradas (padrão: todas)
+    """
+    keys = [
+        cache_key(pk, section)
+        for pk in set(student_ids)
+        if pk is not None
+        for section in sections or SECTIONS
+    ]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+async def _courses(student_id) -> List[Dict[str, object]]:
+    progress = {
+        row["course_id"]: row
+        async for row in CourseProgress.objects.filter(
+            student_id=student_id
+        )
+        .order_by()
+        .values(
+            "course_id",
+            "status",
+            "progress_percentage",
+            "completed_lessons",
+            "total_lessons",
+            "last_accessed",
+        )
+    }
+    courses = []
+    async for row in (
+        Enrollment.objects.filter(
+            student_id=student_id, is_active=True, course__is_active=True
+        )
+        .order_by("-created_at")
+        .values(
+            "course_id",
+            "course__title",
+            "course__slug",
+            "course__cover_image",
+            "completed",
+            "created_at",
+        )
+    ):
+        course_progress = progress.get(row["course_id"], {})
+        courses.append(
+            {
+                "course_id": row["course_id"],
+                "title": row["course__title"],
+                "slug": row["course__slug"],
+                "cover_image": row["course__cover_image"],
+                "enrolled_at": row["created_at"],
+                "completed": row["completed"],
+                "status": course_progress.get("status", "not_started"),
+                "progress_percentage": course_progress.get(
+                    "progress_percentage", 0
+                ),
+                "completed_lessons": course_progress.get(
+                    "completed_lessons", 0
+                ),
+                "total_lessons": course_progress.get("total_lessons", 0),
+                "last_accessed": course_progress.get("last_accessed"),
+            }
+        )
+    return courses
+
+
+async def _recent_lessons(student_id) -> List[Dict[str, object]]:
+    return [
+        {
+            "lesson_id": row["lesson_id"],
+            "title": row["lesson__title"],
+            "module_title": row["lesson__module__title"],
+            "course_id": row["lesson__module__course_id"],
+            "status": row["status"],
+            "progress_percentage": row["progress_percentage"],
+            "video_progress": row["video_progress"],
+            "last_accessed": row["last_accessed"],
+        }
+        async for row in LessonProgress.objects.filter(student_id=student_id)
+        .order_by("-last_accessed", "id")
+        .values(
+            "lesson_id",
+            "lesson__title",
+            "lesson__module__title",
+            "lesson__module__course_id",
+            "status",
+            "progress_percentage",
+            "video_progress",
+            "last_accessed",
+        )[:RECENT_LESSONS]
+    ]
+
+
+async def _upcoming_classes(student_id) -> List[Dict[str, object]]:
+    now = timezone.localtime()
+    upcoming = Q(date__gt=now.date()) | Q(
+        date=now.date(), end_time__gt=now.time()
+    )
+    return [
+        {
+            "id": row["id"],
+            "date": row["date"],
+            "start_time": row["start_time"],
+            "end_time": row["end_time"],
+            "status": row["status"],
+            "topic": row["topic"],
+            "meeting_link": row["meeting_link"],
+            "teacher_id": row["teacher_id"],
+            "teacher_name": " ".join(
+                part
+                for part in (
+                    row["teacher__first_name"],
+                    row["teacher__last_name"],
+                )
+                if part
+            )
+            or row["teacher__username"],
+        }
+        async for row in ScheduledClass.objects.filter(
+            upcoming, student_id=student_id, status__in=UPCOMING_STATUSES
+        )
+        .order_by("date", "start_time", "id")
+        .values(
+            "id",
+            "date",
+            "start_time",
+            "end_time",
+            "status",
+            "topic",
+            "meeting_link",
+            "teacher_id",
+            "teacher__first_name",
+            "teacher__last_name",
+            "teacher__username",
+        )[:UPCOMING_CLASSES]
+    ]
+
+
+async def _new_achievements(student_id) -> List[Dict[str, object]]:
+    return [
+        {
+            "id": row["id"],
+            "achievement_id": row["achievement_id"],
+            "title": row["achievement__title"],
+            "points": row["achievement__points"],
+            "course_id": row["related_course_id"],
+            "earned_at": row["earned_at"],
+        }
+        async for row in StudentAchievement.objects.filter(
+            student_id=student_id, is_viewed=False
+        )
+        .order_by("-earned_at", "id")
+        .values(
+            "id",
+            "achievement_id",
+            "achievement__title",
+            "achievement__points",
+            "related_course_id",
+            "earned_at",
+        )[:NEW_ACHIEVEMENTS]
+    ]
+
+
+_LOADERS = {
+    "courses": _courses,
+    "recent_lessons": _recent_lessons,
+    "upcoming_classes": _upcoming_classes,
+    "new_achievements": _new_achievements,
+}
+
+
+async def aget_dashboard(student_id: uuid.UUID) -> Dict[str, object]:
+    """
+    Monta o painel de um aluno.
+
+    Com o cache frio, executa no máximo oito consultas (cinco das seções,
+    duas das notificações e, se o aluno ainda não tiver contador de não
+    lidas, uma contagem), qualquer que seja o número de matrículas. Com o
+    cache quente, nenhuma.
+
+    Args:
+        student_id: ID do aluno
+
+    Returns:
+        Dicionário com as seções de ``SECTIONS`` e ``notifications``
+    """
+    keys = {section: cache_key(student_id, section) for section in SECTIONS}
+    cached = await cache.aget_many(keys.values())
+
+    dashboard = {}
+    missing = {}
+    for section, key in keys.items():
+        if key in cached:
+            dashboard[section] = cached[key]
+        else:
+            dashboard[section] = await _LOADERS[section](student_id)
+            missing[key] = dashboard[section]
+    if missing:
+        await cache.aset_many(
+            missing, getattr(settings, "DASHBOARD_CACHE_TIMEOUT", 300)
+        )
+
+    dashboard["notifications"] = {
+        "unread": await aunread_count(student_id),
+        "recent": await arecent_unread(student_id),
+    }
+    return dashboard
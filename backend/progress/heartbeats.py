@@ -0,0 +1,693 @@
+"""
+Ingestão de heartbeats do player de vídeo com coalescência de escritas.
+
+O player envia a posição atual do vídeo com frequência. Em vez de gravar
+cada evento em ``LessonProgress`` (o ``auto_now`` de ``last_accessed``
+força um UPDATE da linha inteira a cada evento), os eventos são:
+
+1. acumulados em um buffer (``HeartbeatBuffer``), coalescidos por
+   ``(aluno, aula)``: maior posição, soma do tempo assistido e último acesso;
+2. descarregados periodicamente (``HeartbeatFlusher``) com um único
+   ``INSERT ... ON CONFLICT DO UPDATE`` de várias linhas, que também deriva
+   o percentual e a conclusão a partir de ``Lesson.duration``.
+
+A view só confirma eventos de aulas de cursos em que o aluno tem matrícula
+ativa (``enrolled_lesson_ids``). O upsert repete a verificação, pois a
+matrícula pode ser desativada antes do flush; esses eventos são
+registrados no log e contados na métrica ``rejected``.
+
+O buffer é plugável (``PROGRESS_HEARTBEAT_BUFFER``); o padrão mantém os
+eventos em memória no próprio processo. Um evento só é confirmado ao
+cliente depois de entrar no buffer, e o buffer é descarregado no
+encerramento normal do processo (``atexit``), então nenhum heartbeat
+confirmado se perde em um desligamento gracioso. Se a gravação falhar, os
+eventos voltam ao buffer para a próxima tentativa, até
+``PROGRESS_HEARTBEAT_MAX_ATTEMPTS`` tentativas; depois disso vão para a
+fila de mensagens mortas (``PROGRESS_HEARTBEAT_DEAD_LETTER``, por padrão um
+arquivo JSON Lines), para que um lote inválido não bloqueie as gravações
+seguintes do processo. O comando ``replay_heartbeats`` regrava esses
+eventos.
+"""
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import AutoField, BigAutoField, SmallAutoField
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.module_loading import import_string
+
+from courses.models import Enrollment, Lesson, Module
+
+from .models import LessonProgress
+
+logger = logging.getLogger(__name__)
+
+HeartbeatKey = Tuple[uuid.UUID, uuid.UUID]
+
+# Maior valor de uma coluna ``integer`` do PostgreSQL (posição e tempo
+# assistido, em segundos)
+MAX_SECONDS = 2**31 - 1
+
+
+@dataclass
+class Heartbeat:
+    """
+    Evento de progresso do player (ou vários eventos já coalescidos).
+
+    Attributes:
+        student_id: ID do aluno
+        lesson_id: ID da aula
+        position: Posição atual do vídeo em segundos
+        watched: Segundos assistidos desde o último heartbeat
+        received_at: Momento em que o evento foi recebido
+        attempts: Tentativas de gravação que já falharam
+    """
+
+    student_id: uuid.UUID
+    lesson_id: uuid.UUID
+    position: int
+    watched: int
+    received_at: datetime
+    attempts: int = 0
+
+    @property
+    def key(self) -> HeartbeatKey:
+        return (self.student_id, self.lesson_id)
+
+    def merge(self, other: "Heartbeat") -> None:
+        """Incorpora outro evento do mesmo aluno e aula."""
+        self.position = max(self.position, other.position)
+        self.watched = min(self.watched + other.watched, MAX_SECONDS)
+        self.received_at = max(self.received_at, other.received_at)
+        self.attempts = max(self.attempts, other.attempts)
+
+
+class HeartbeatBuffer:
+    """
+    Interface dos buffers de heartbeats.
+
+    Implementações devem coalescer eventos por ``(aluno, aula)`` e ser
+    seguras para uso entre threads.
+    """
+
+    def add(self, heartbeats: Iterable[Heartbeat]) -> int:
+        """Adiciona eventos ao buffer; retorna quantos foram aceitos."""
+        raise NotImplementedError
+
+    def drain(self) -> List[Heartbeat]:
+        """Remove e retorna todos os eventos coalescidos."""
+        raise NotImplementedError
+
+    def requeue(self, heartbeats: Iterable[Heartbeat]) -> None:
+        """Devolve eventos cuja gravação falhou."""
+        self.add(heartbeats)
+
+    def __len__(self) -> int:
+        raise NotImplementedError
+
+
+class InMemoryHeartbeatBuffer(HeartbeatBuffer):
+    """Buffer em memória do processo, indexado por ``(aluno, aula)``."""
+
+    def __init__(self):
+        self._pending: Dict[HeartbeatKey, Heartbeat] = {}
+        self._lock = threading.Lock()
+
+    def add(self, heartbeats: Iterable[Heartbeat]) -> int:
+        accepted = 0
+        with self._lock:
+            for heartbeat in heartbeats:
+                current = self._pending.get(heartbeat.key)
+                if current is None:
+                    self._pending[heartbeat.key] = heartbeat
+                else:
+                    current.merge(heartbeat)
+                accepted += 1
+        return accepted
+
+    def drain(self) -> List[Heartbeat]:
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending = {}
+        return pending
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._pending)
+
+
+class HeartbeatDeadLetterStore:
+    """
+    Interface das filas de heartbeats cuja gravação falhou repetidamente.
+
+    Os eventos ficam guardados até serem regravados (``replay_heartbeats``).
+    """
+
+    def add(self, heartbeats: Iterable[Heartbeat]) -> None:
+        """Guarda eventos que não puderam ser gravados."""
+        raise NotImplementedError
+
+    def drain(self) -> List[Heartbeat]:
+        """Remove e retorna todos os eventos guardados."""
+        raise NotImplementedError
+
+
+class FileDeadLetterStore(HeartbeatDeadLetterStore):
+    """
+    Fila em arquivo JSON Lines (``PROGRESS_HEARTBEAT_DEAD_LETTER_PATH``).
+
+    Não depende do banco, que pode ser justamente a causa das falhas. Cada
+    evento é acrescentado em uma linha; ``drain`` renomeia o arquivo antes
+    de lê-lo, de modo que eventos acrescentados durante a leitura vão para
+    um arquivo novo.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(
+            path
+            or getattr(settings, "PROGRESS_HEARTBEAT_DEAD_LETTER_PATH", "")
+            or settings.BASE_DIR / "heartbeats.deadletter.jsonl"
+        )
+        self._lock = threading.Lock()
+
+    def add(self, heartbeats: Iterable[Heartbeat]) -> None:
+        lines = "".join(
+            json.dumps({
+                "student_id": str(heartbeat.student_id),
+                "lesson_id": str(heartbeat.lesson_id),
+                "position": heartbeat.position,
+                "watched": heartbeat.watched,
+                "received_at": heartbeat.received_at.isoformat(),
+            }) + "\n"
+            for heartbeat in heartbeats
+        )
+        if not lines:
+            return
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as file:
+                file.write(lines)
+
+    def drain(self) -> List[Heartbeat]:
+        replaying = self.path.with_name(
+            f"{self.path.name}.{os.getpid()}.replay"
+        )
+        with self._lock:
+            try:
+                os.replace(self.path, replaying)
+            except FileNotFoundError:
+                return []
+
+        heartbeats = []
+        with open(replaying, encoding="utf-8") as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                data = json.loads(line)
+                heartbeats.append(
+                    Heartbeat(
+                        student_id=uuid.UUID(data["student_id"]),
+                        lesson_id=uuid.UUID(data["lesson_id"]),
+                        position=data["position"],
+                        watched=data["watched"],
+                        received_at=parse_datetime(data["received_at"]),
+                    )
+                )
+        replaying.unlink()
+        return heartbeats
+
+
+# Upsert de várias linhas. Uma linha nova já entra concluída, se for o
+# caso; ``xmax = 0`` indica, no RETURNING, que a linha foi inserida (e não
+# atualizada). Em uma linha existente, a conclusão fica para
+# ``_COMPLETE_SQL``.
+_UPSERT_SQL = """
+WITH incoming ({pk_column}student_id, lesson_id, position, watched,
+               received_at) AS (
+    VALUES {values}
+)
+INSERT INTO {table} AS lp (
+    {pk_column}student_id, lesson_id, status, video_progress,
+    progress_percentage, last_accessed, completed_at,
+    total_watched_time, view_count, created_at
+)
+SELECT {pk_value}i.student_id, i.lesson_id,
+       CASE WHEN calc.pct >= %s THEN 'completed' ELSE 'in_progress' END,
+       i.position, calc.pct, i.received_at,
+       CASE WHEN calc.pct >= %s THEN i.received_at END,
+       i.watched, 1, NOW()
+FROM incoming AS i
+JOIN {lesson_table} AS l ON l.id = i.lesson_id
+JOIN {module_table} AS m ON m.id = l.module_id
+JOIN {enrollment_table} AS e
+  ON e.course_id = m.course_id
+ AND e.student_id = i.student_id
+ AND e.is_active
+CROSS JOIN LATERAL (
+    SELECT CASE
+        WHEN l.duration > 0
+            THEN LEAST(i.position::bigint * 100 / (l.duration * 60), 100)
+        ELSE 0
+    END AS pct
+) AS calc
+ON CONFLICT (student_id, lesson_id) DO UPDATE SET
+    video_progress = GREATEST(lp.video_progress, EXCLUDED.video_progress),
+    progress_percentage = GREATEST(
+        lp.progress_percentage, EXCLUDED.progress_percentage
+    ),
+    total_watched_time = lp.total_watched_time
+        + EXCLUDED.total_watched_time,
+    last_accessed = GREATEST(lp.last_accessed, EXCLUDED.last_accessed),
+    status = CASE
+        WHEN lp.status = 'completed' THEN 'completed'
+        ELSE 'in_progress'
+    END
+RETURNING lp.student_id, lp.lesson_id, lp.status, lp.progress_percentage,
+          (lp.xmax = 0) AS inserted
+"""
+
+# Conclui as linhas existentes que atingiram o percentual. A condição
+# ``status <> 'completed'`` é reavaliada sobre a versão mais recente da
+# linha após a espera pelo lock: se outro processo concluiu a mesma aula ao
+# mesmo tempo, apenas um deles recebe a linha de volta.
+_COMPLETE_SQL = """
+UPDATE {table} AS lp
+SET status = 'completed', completed_at = lp.last_accessed
+FROM UNNEST(%s::{student_type}[], %s::{lesson_type}[])
+     AS i (student_id, lesson_id)
+WHERE lp.student_id = i.student_id
+  AND lp.lesson_id = i.lesson_id
+  AND lp.status <> 'completed'
+  AND lp.progress_percentage >= %s
+RETURNING lp.student_id, lp.lesson_id
+"""
+
+
+class HeartbeatFlusher:
+    """
+    Descarrega periodicamente um ``HeartbeatBuffer`` em ``LessonProgress``.
+
+    Mantém métricas de latência e de linhas por flush (ver ``metrics``).
+    Sem ``dead_letters``, eventos que esgotam as tentativas são apenas
+    registrados no log.
+    """
+
+    def __init__(
+        self,
+        buffer: HeartbeatBuffer,
+        interval: float = 5.0,
+        max_pending: int = 5000,
+        completion_threshold: int = 90,
+        max_attempts: int = 5,
+        dead_letters: Optional[HeartbeatDeadLetterStore] = None,
+    ):
+        self.buffer = buffer
+        self.dead_letters = dead_letters
+        self.interval = interval
+        self.max_pending = max_pending
+        self.completion_threshold = completion_threshold
+        self.max_attempts = max_attempts
+
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+        self.events_received = 0
+        self.flushes = 0
+        self.rows_flushed = 0
+        self.last_rows = 0
+        self.last_latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.total_latency_ms = 0.0
+        self.failures = 0
+        self.rejected = 0
+        self.dead_lettered = 0
+        self.dropped = 0
+
+    def submit(self, heartbeats: Iterable[Heartbeat]) -> int:
+        """
+        Registra eventos no buffer e garante que o flush periódico rode.
+
+        Returns:
+            int: Número de eventos aceitos (já seguros para confirmação)
+        """
+        accepted = self.buffer.add(heartbeats)
+        self.events_received += accepted
+        self.start()
+        if len(self.buffer) >= self.max_pending:
+            self._wake.set()
+        return accepted
+
+    def start(self) -> None:
+        """Inicia a thread de flush periódico, se ainda não estiver ativa."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="heartbeat-flusher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        """Interrompe a thread periódica e faz o flush final."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 5)
+            self._thread = None
+        try:
+            self.flush()
+        except Exception:
+            logger.exception(
+                "Falha no flush final; %d heartbeats pendentes perdidos",
+                len(self.buffer),
+            )
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Falha ao gravar heartbeats; nova tentativa")
+            finally:
+                close_old_connections()
+
+    def flush(self) -> int:
+        """
+        Grava todos os eventos pendentes com um único upsert.
+
+        Returns:
+            int: Número de linhas (aluno, aula) gravadas
+        """
+        with self._flush_lock:
+            heartbeats = self.buffer.drain()
+            if not heartbeats:
+                return 0
+
+            started = time.perf_counter()
+            try:
+                completed, written = self._write(heartbeats)
+            except Exception:
+                self.failures += 1
+                self._retry(heartbeats)
+                raise
+            self._reject(
+                [hb for hb in heartbeats if hb.key not in written]
+            )
+
+            latency_ms = (time.perf_counter() - started) * 1000
+            self.flushes += 1
+            self.last_rows = len(heartbeats)
+            self.rows_flushed += len(heartbeats)
+            self.last_latency_ms = latency_ms
+            self.max_latency_ms = max(self.max_latency_ms, latency_ms)
+            self.total_latency_ms += latency_ms
+
+        if completed:
+            logger.debug("%d aulas concluídas via heartbeat", len(completed))
+        return len(written)
+
+    def _reject(self, heartbeats: List[Heartbeat]) -> None:
+        """Registra os eventos ignorados pelo upsert (sem matrícula ativa)."""
+        if not heartbeats:
+            return
+        self.rejected += len(heartbeats)
+        for heartbeat in heartbeats:
+            logger.warning(
+                "Heartbeat ignorado sem matrícula ativa: aluno=%s aula=%s",
+                heartbeat.student_id,
+                heartbeat.lesson_id,
+            )
+
+    def _retry(self, heartbeats: List[Heartbeat]) -> None:
+        """
+        Devolve ao buffer os eventos que ainda podem ser regravados e envia
+        os demais para a fila de mensagens mortas.
+        """
+        retry = []
+        exhausted = []
+        for heartbeat in heartbeats:
+            heartbeat.attempts += 1
+            if heartbeat.attempts < self.max_attempts:
+                retry.append(heartbeat)
+            else:
+                exhausted.append(heartbeat)
+        self.buffer.requeue(retry)
+        if not exhausted:
+            return
+
+        if self.dead_letters is not None:
+            try:
+                self.dead_letters.add(exhausted)
+            except Exception:
+                logger.exception("Falha ao guardar heartbeats não gravados")
+            else:
+                self.dead_lettered += len(exhausted)
+                logger.error(
+                    "%d heartbeats movidos para a fila de mensagens mortas "
+                    "após %d tentativas",
+                    len(exhausted),
+                    self.max_attempts,
+                )
+                return
+
+        self.dropped += len(exhausted)
+        for heartbeat in exhausted:
+            logger.error(
+                "Heartbeat descartado após %d tentativas: aluno=%s "
+                "aula=%s posição=%s",
+                heartbeat.attempts,
+                heartbeat.student_id,
+                heartbeat.lesson_id,
+                heartbeat.position,
+            )
+
+    def _write(
+        self, heartbeats: List[Heartbeat]
+    ) -> Tuple[List[HeartbeatKey], Set[HeartbeatKey]]:
+        """
+        Executa o upsert e propaga as novas conclusões para o curso.
+
+        Returns:
+            As chaves concluídas neste flush e todas as chaves gravadas
+        """
+        from .dashboard import invalidate_dashboard
+        from .services import apply_completion_delta
+
+        meta = LessonProgress._meta
+        pk = meta.pk
+        has_db_pk = isinstance(pk, (AutoField, BigAutoField, SmallAutoField))
+        pk_column = "" if has_db_pk else f"{pk.column}, "
+        pk_value = "" if has_db_pk else f"i.{pk.column}, "
+
+        # Tipos explícitos: o Postgres não infere tipos de VALUES a partir
+        # das colunas de destino
+        student_type = meta.get_field("student").target_field.rel_db_type(
+            connection
+        )
+        lesson_type = meta.get_field("lesson").target_field.rel_db_type(
+            connection
+        )
+        casts = [
+            student_type,
+            lesson_type,
+            "integer",
+            "integer",
+            "timestamptz",
+        ]
+        if not has_db_pk:
+            casts.insert(0, pk.db_type(connection))
+        row_sql = "(" + ", ".join(f"%s::{cast}" for cast in casts) + ")"
+
+        params: List[object] = []
+        for heartbeat in heartbeats:
+            if not has_db_pk:
+                params.append(pk.get_default())
+            params.extend([
+                heartbeat.student_id,
+                heartbeat.lesson_id,
+                heartbeat.position,
+                heartbeat.watched,
+                heartbeat.received_at,
+            ])
+        params.extend([self.completion_threshold, self.completion_threshold])
+
+        sql = _UPSERT_SQL.format(
+            table=meta.db_table,
+            lesson_table=Lesson._meta.db_table,
+            module_table=Module._meta.db_table,
+            enrollment_table=Enrollment._meta.db_table,
+            pk_column=pk_column,
+            pk_value=pk_value,
+            values=", ".join([row_sql] * len(heartbeats)),
+        )
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            completed = []
+            reached = []
+            written = set()
+            for student_id, lesson_id, status, pct, inserted in (
+                cursor.fetchall()
+            ):
+                written.add((student_id, lesson_id))
+                if inserted and status == "completed":
+                    completed.append((student_id, lesson_id))
+                elif (
+                    not inserted
+                    and status != "completed"
+                    and pct >= self.completion_threshold
+                ):
+                    reached.append((student_id, lesson_id))
+            if reached:
+                cursor.execute(
+                    _COMPLETE_SQL.format(
+                        table=meta.db_table,
+                        student_type=student_type,
+                        lesson_type=lesson_type,
+                    ),
+                    [
+                        [student_id for student_id, _ in reached],
+                        [lesson_id for _, lesson_id in reached],
+                        self.completion_threshold,
+                    ],
+                )
+                completed += [(row[0], row[1]) for row in cursor.fetchall()]
+            invalidate_dashboard(
+                {heartbeat.student_id for heartbeat in heartbeats},
+                "recent_lessons",
+            )
+            for student_id, lesson_id in completed:
+                apply_completion_delta(student_id, lesson_id, 1)
+        return completed, written
+
+    def metrics(self) -> Dict[str, float]:
+        """Retorna métricas de ingestão e de flush."""
+        return {
+            "events_received": self.events_received,
+            "pending_rows": len(self.buffer),
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "dead_lettered": self.dead_lettered,
+            "dropped": self.dropped,
+            "rows_flushed": self.rows_flushed,
+            "last_rows_per_flush": self.last_rows,
+            "avg_rows_per_flush": (
+                self.rows_flushed / self.flushes if self.flushes else 0
+            ),
+            "last_flush_latency_ms": self.last_latency_ms,
+            "max_flush_latency_ms": self.max_latency_ms,
+            "avg_flush_latency_ms": (
+                self.total_latency_ms / self.flushes if self.flushes else 0
+            ),
+        }
+
+
+_flusher: Optional[HeartbeatFlusher] = None
+_flusher_lock = threading.Lock()
+
+
+def get_flusher() -> HeartbeatFlusher:
+    """Retorna o ``HeartbeatFlusher`` do processo, criando-o se necessário."""
+    global _flusher
+    if _flusher is None:
+        with _flusher_lock:
+            if _flusher is None:
+                buffer_class = import_string(
+                    getattr(
+                        settings,
+                        "PROGRESS_HEARTBEAT_BUFFER",
+                        "progress.heartbeats.InMemoryHeartbeatBuffer",
+                    )
+                )
+                _flusher = HeartbeatFlusher(
+                    buffer=buffer_class(),
+                    interval=getattr(
+                        settings, "PROGRESS_HEARTBEAT_FLUSH_INTERVAL", 5.0
+                    ),
+                    max_pending=getattr(
+                        settings, "PROGRESS_HEARTBEAT_MAX_PENDING", 5000
+                    ),
+                    completion_threshold=getattr(
+                        settings, "PROGRESS_COMPLETION_THRESHOLD", 90
+                    ),
+                    max_attempts=getattr(
+                        settings, "PROGRESS_HEARTBEAT_MAX_ATTEMPTS", 5
+                    ),
+                    dead_letters=get_dead_letter_store(),
+                )
+                atexit.register(_flusher.stop)
+    return _flusher
+
+
+def get_dead_letter_store() -> HeartbeatDeadLetterStore:
+    """Cria a fila de mensagens mortas configurada."""
+    return import_string(
+        getattr(
+            settings,
+            "PROGRESS_HEARTBEAT_DEAD_LETTER",
+            "progress.heartbeats.FileDeadLetterStore",
+        )
+    )()
+
+
+def enrolled_lesson_ids(
+    student_id: uuid.UUID, lesson_ids: Iterable[uuid.UUID]
+) -> Set[uuid.UUID]:
+    """
+    Aulas, entre ``lesson_ids``, de cursos com matrícula ativa do aluno.
+
+    Uma única consulta; usada antes de confirmar heartbeats.
+    """
+    return set(
+        Lesson.objects.filter(
+            pk__in=set(lesson_ids),
+            module__course__enrollments__student_id=student_id,
+            module__course__enrollments__is_active=True,
+        ).values_list("pk", flat=True)
+    )
+
+
+def record_heartbeats(
+    student_id: uuid.UUID, events: Iterable[dict]
+) -> int:
+    """
+    Registra heartbeats de um aluno no buffer do processo.
+
+    Args:
+        student_id: ID do aluno autenticado
+        events: Dicionários com ``lesson``, ``position`` e ``watched``
+
+    Returns:
+        int: Número de eventos aceitos
+    """
+    now = timezone.now()
+    return get_flusher().submit(
+        Heartbeat(
+            student_id=student_id,
+            lesson_id=event["lesson"],
+            position=event["position"],
+            watched=event.get("watched", 0),
+            received_at=now,
+        )
+        for event in events
+    )
@@ -0,0 +1,68 @@
+"""
+Recalcula o progresso dos alunos nos cursos em lote.
+
+Uso:
+    python manage.py recompute_course_progress
+    python manage.py recompute_course_progress --course <uuid>
+    python manage.py recompute_course_progress --student <uuid> --chunk-size 20
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from progress.models import CourseProgress
+from progress.services import recompute_course_progress
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula aulas concluídas, total de aulas, percentual, status e "
+        "média em quizzes de CourseProgress com UPDATEs em lote por curso."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--course",
+            action="append",
+            default=[],
+            help="ID de curso a recalcular (pode ser repetido)",
+        )
+        parser.add_argument(
+            "--student",
+            action="append",
+            default=[],
+            help="ID de aluno a recalcular (pode ser repetido)",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=50,
+            help="Número de cursos por lote (padrão: 50)",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size deve ser positivo.")
+
+        queryset = CourseProgress.objects.all()
+        if options["course"]:
+            queryset = queryset.filter(course_id__in=options["course"])
+        if options["student"]:
+            queryset = queryset.filter(student_id__in=options["student"])
+
+        def report(number, total_chunks, updated):
+            self.stdout.write(
+                f"Lote {number}/{total_chunks}: {updated} registros"
+            )
+
+        started = time.perf_counter()
+        total = recompute_course_progress(
+            queryset, chunk_size=options["chunk_size"], on_chunk=report
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} registros de progresso recalculados em "
+                f"{elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,91 @@
+"""
+Recalcula a análise dos cursos dos professores e a grava no cache.
+
+Pode ser executado periodicamente (cron) ou como processo contínuo:
+
+    python manage.py refresh_teacher_analytics
+    python manage.py refresh_teacher_analytics --teacher <uuid>
+    python manage.py refresh_teacher_analytics --loop --interval 900
+
+No modo ``--loop``, uma falha em um ciclo é registrada no log e o processo
+segue para o próximo ciclo.
+"""
+import logging
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from progress.analytics import refresh_teacher_analytics
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula, no PostgreSQL, a análise dos alunos dos cursos de cada "
+        "professor e grava os documentos no cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teacher",
+            action="append",
+            default=None,
+            help=(
+                "ID do professor (pode ser repetido; padrão: todos os "
+                "professores com cursos)"
+            ),
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Executa continuamente, aguardando --interval entre ciclos",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=900,
+            help="Segundos entre ciclos no modo --loop (padrão: 900)",
+        )
+
+    def handle(self, *args, **options):
+        if options["interval"] < 1:
+            raise CommandError("--interval deve ser positivo.")
+        if options["teacher"] is not None:
+            try:
+                options["teacher"] = [
+                    uuid.UUID(value) for value in options["teacher"]
+                ]
+            except ValueError as exc:
+                raise CommandError(f"--teacher inválido: {exc}")
+
+        try:
+            while True:
+                # Processo de longa duração: descarta conexões expiradas
+                close_old_connections()
+                if not options["loop"]:
+                    self._run(options)
+                    break
+                try:
+                    self._run(options)
+                except Exception:
+                    logger.exception(
+                        "Falha ao atualizar a análise; nova tentativa em %ds",
+                        options["interval"],
+                    )
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Interrompido.")
+
+    def _run(self, options):
+        started = time.perf_counter()
+        snapshots = refresh_teacher_analytics(options["teacher"])
+        elapsed = time.perf_counter() - started
+        size = sum(len(snapshot.content) for snapshot in snapshots)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Análise de {len(snapshots)} professores atualizada "
+                f"({size} bytes) em {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,56 @@
+"""
+Regrava os heartbeats guardados na fila de mensagens mortas.
+
+Eventos que esgotaram ``PROGRESS_HEARTBEAT_MAX_ATTEMPTS`` tentativas de
+gravação ficam em ``PROGRESS_HEARTBEAT_DEAD_LETTER``. Depois de corrigida a
+causa da falha:
+
+    python manage.py replay_heartbeats
+"""
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from progress.heartbeats import (
+    HeartbeatFlusher,
+    InMemoryHeartbeatBuffer,
+    get_dead_letter_store,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Regrava em LessonProgress os heartbeats guardados na fila de "
+        "mensagens mortas."
+    )
+
+    def handle(self, *args, **options):
+        store = get_dead_letter_store()
+        heartbeats = store.drain()
+        if not heartbeats:
+            self.stdout.write("Nenhum heartbeat pendente.")
+            return
+
+        # Uma única tentativa: em caso de falha os eventos voltam à fila
+        flusher = HeartbeatFlusher(
+            buffer=InMemoryHeartbeatBuffer(),
+            completion_threshold=getattr(
+                settings, "PROGRESS_COMPLETION_THRESHOLD", 90
+            ),
+            max_attempts=1,
+            dead_letters=store,
+        )
+        flusher.buffer.add(heartbeats)
+        try:
+            rows = flusher.flush()
+        except Exception as exc:
+            raise CommandError(
+                f"Falha ao regravar {len(heartbeats)} heartbeats; eles "
+                f"voltaram para a fila: {exc}"
+            )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{rows} heartbeats regravados "
+                f"({flusher.rejected} sem matrícula ativa)."
+            )
+        )
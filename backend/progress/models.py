@@ -3,10 +3,11 @@ from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from typing import cast
 
+from core.base_models import UUIDModel
 from courses.models import Course, Lesson
 
 
-class LessonProgress(models.Model):
+class LessonProgress(UUIDModel):
     """
     Modelo para rastrear o progresso de um aluno em uma aula específica.
     """
@@ -75,11 +76,22 @@ class LessonProgress(models.Model):
     # Metadados
     created_at = models.DateTimeField(_("criado em"), auto_now_add=True)
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Status original, para o ajuste incremental de CourseProgress
+        self._original_status = self.__dict__.get("status")
+
     class Meta:
         verbose_name = _("Progresso de Aula")
         verbose_name_plural = _("Progressos de Aulas")
         unique_together = [["student", "lesson"]]
         ordering = ["lesson__module__order", "lesson__order"]
+        indexes = [
+            # Paginação por chave (core.pagination)
+            models.Index(
+                fields=["-created_at", "id"], name="idx_lessonprog_created_id"
+            ),
+        ]
 
     def __str__(self) -> str:
         """Representação em string do progresso da aula."""
@@ -129,7 +141,7 @@ class LessonProgress(models.Model):
             return None
 
 
-class CourseProgress(models.Model):
+class CourseProgress(UUIDModel):
     """
     Modelo para rastrear o progresso geral de um aluno em um curso.
     Atualizado automaticamente com base no progresso das aulas.
@@ -233,23 +245,30 @@ class CourseProgress(models.Model):
 
     def update_progress(self):
         """
-        Atualiza o progresso geral do curso com base no progresso das aulas.
+        Recalcula o progresso geral do curso a partir do progresso das aulas.
+
+        O progresso é mantido incrementalmente pelos sinais do app (ver
+        ``progress.services``); esta recontagem completa serve como reparo.
+        Apenas aulas ativas são consideradas.
         """
-        # Recupera todas as aulas do curso
+        from django.utils import timezone
+
+        # Recupera todas as aulas ativas do curso
         lessons = Lesson.objects.filter(
-            module__course=self.course
+            module__course_id=self.course_id, is_active=True
         ).count()
 
         # Recupera as aulas concluídas pelo aluno
         completed = LessonProgress.objects.filter(
-            student=self.student, 
-            lesson__module__course=self.course, 
+            student_id=self.student_id,
+            lesson__module__course_id=self.course_id,
+            lesson__is_active=True,
             status="completed"
         ).count()
 
         # Calcula o percentual de progresso
         if lessons > 0:
-            progress = (completed / lessons) * 100
+            progress = min((completed / lessons) * 100, 100)
         else:
             progress = 0
 
@@ -259,17 +278,22 @@ class CourseProgress(models.Model):
         self.progress_percentage = int(progress)
 
         # Atualiza o status
-        if progress == 0:
+        if self.progress_percentage == 0:
             self.status = "not_started"
-        elif progress == 100:
+        elif self.progress_percentage == 100:
             self.status = "completed"
+            if self.completed_at is None:
+                self.completed_at = timezone.now()
         else:
             self.status = "in_progress"
 
+        if self.status != "completed":
+            self.completed_at = None
+
         self.save()
 
 
-class Achievement(models.Model):
+class Achievement(UUIDModel):
     """
     Modelo para conquistas e badges que os alunos podem ganhar.
     """
@@ -324,7 +348,7 @@ class Achievement(models.Model):
         return str(self.title)
 
 
-class StudentAchievement(models.Model):
+class StudentAchievement(UUIDModel):
     """
     Modelo para rastrear as conquistas obtidas pelos alunos.
     """
@@ -0,0 +1,111 @@
+"""
+Serializers do app progress.
+"""
+from rest_framework import serializers
+
+from .heartbeats import MAX_SECONDS
+
+
+class HeartbeatSerializer(serializers.Serializer):
+    """Evento de progresso enviado pelo player de vídeo."""
+
+    lesson = serializers.UUIDField()
+    position = serializers.IntegerField(
+        min_value=0,
+        max_value=MAX_SECONDS,
+        help_text="Posição atual do vídeo em segundos",
+    )
+    watched = serializers.IntegerField(
+        min_value=0,
+        max_value=3600,
+        required=False,
+        default=0,
+        help_text="Segundos assistidos desde o último heartbeat",
+    )
+
+
+class HeartbeatBatchSerializer(serializers.Serializer):
+    """Lote de heartbeats acumulados pelo player."""
+
+    events = HeartbeatSerializer(many=True, allow_empty=False, max_length=500)
+
+
+class DashboardCourseSerializer(serializers.Serializer):
+    """Matrícula do aluno e seu progresso no curso."""
+
+    course_id = serializers.UUIDField()
+    title = serializers.CharField()
+    slug = serializers.SlugField()
+    cover_image = serializers.URLField()
+    enrolled_at = serializers.DateTimeField()
+    completed = serializers.BooleanField()
+    status = serializers.CharField()
+    progress_percentage = serializers.IntegerField()
+    completed_lessons = serializers.IntegerField()
+    total_lessons = serializers.IntegerField()
+    last_accessed = serializers.DateTimeField(allow_null=True)
+
+
+class DashboardLessonSerializer(serializers.Serializer):
+    """Aula acessada recentemente."""
+
+    lesson_id = serializers.UUIDField()
+    title = serializers.CharField()
+    module_title = serializers.CharField()
+    course_id = serializers.UUIDField()
+    status = serializers.CharField()
+    progress_percentage = serializers.IntegerField()
+    video_progress = serializers.IntegerField()
+    last_accessed = serializers.DateTimeField()
+
+
+class DashboardClassSerializer(serializers.Serializer):
+    """Próxima aula agendada."""
+
+    id = serializers.UUIDField()
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    status = serializers.CharField()
+    topic = serializers.CharField()
+    meeting_link = serializers.URLField()
+    teacher_id = serializers.UUIDField()
+    teacher_name = serializers.CharField()
+
+
+class DashboardAchievementSerializer(serializers.Serializer):
+    """Conquista ainda não visualizada."""
+
+    id = serializers.UUIDField()
+    achievement_id = serializers.UUIDField()
+    title = serializers.CharField()
+    points = serializers.IntegerField()
+    course_id = serializers.UUIDField(allow_null=True)
+    earned_at = serializers.DateTimeField()
+
+
+class DashboardNotificationSerializer(serializers.Serializer):
+    """Notificação não lida."""
+
+    id = serializers.UUIDField()
+    scheduled_class_id = serializers.UUIDField()
+    notification_type = serializers.CharField()
+    message = serializers.CharField()
+    sent_at = serializers.DateTimeField()
+
+
+class DashboardNotificationsSerializer(serializers.Serializer):
+    """Notificações não lidas do aluno."""
+
+    unread = serializers.IntegerField()
+    recent = DashboardNotificationSerializer(many=True)
+
+
+class DashboardSerializer(serializers.Serializer):
+    """Painel do aluno (ver ``progress.dashboard``)."""
+
+    courses = DashboardCourseSerializer(many=True)
+    recent_lessons = DashboardLessonSerializer(many=True)
+    upcoming_classes = DashboardClassSerializer(many=True)
+    new_achievements = DashboardAchievementSerializer(many=True)
+    notifications = DashboardNotificationsSerializer()
@@ -0,0 +1,310 @@
+"""
+Serviços do app progress.
+
+Manutenção incremental de ``CourseProgress``: em vez de recontar aulas a
+cada alteração, aplica deltas atômicos (``F()``) em ``completed_lessons`` e
+``total_lessons`` e deriva percentual, status e data de conclusão no mesmo
+UPDATE. ``CourseProgress.update_progress`` continua disponível como
+recontagem completa (reparo).
+"""
+import uuid
+from typing import Callable, Dict, List, Optional
+
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    DateTimeField,
+    F,
+    IntegerField,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest, Least, Now
+from django.db.models.lookups import (
+    GreaterThan,
+    GreaterThanOrEqual,
+    LessThanOrEqual,
+)
+
+from courses.models import Lesson, Module
+from quizzes.models import Quiz, QuizAttempt
+
+from .dashboard import invalidate_dashboard
+from .models import CourseProgress, LessonProgress
+
+
+def derived_progress_fields(completed, total) -> Dict[str, object]:
+    """
+    Expressões de ``progress_percentage``, ``status`` e ``completed_at``.
+
+    ``completed`` e ``total`` são expressões com os *novos* valores de
+    ``completed_lessons`` e ``total_lessons``, para que tudo seja calculado
+    no mesmo UPDATE (no SQL, o lado direito sempre enxerga os valores
+    antigos da linha).
+
+    Args:
+        completed: Expressão com o novo número de aulas concluídas
+        total: Expressão com o novo total de aulas
+
+    Returns:
+        Dicionário de expressões para ``QuerySet.update``
+    """
+    percentage = Case(
+        When(
+            GreaterThan(total, 0),
+            then=Least(completed * Value(100) / total, Value(100)),
+        ),
+        default=Value(0),
+        output_field=IntegerField(),
+    )
+    return {
+        "progress_percentage": percentage,
+        "status": Case(
+            When(LessThanOrEqual(percentage, 0), then=Value("not_started")),
+            When(GreaterThanOrEqual(percentage, 100), then=Value("completed")),
+            default=Value("in_progress"),
+        ),
+        "completed_at": Case(
+            When(
+                GreaterThanOrEqual(percentage, 100),
+                then=Case(
+                    When(completed_at__isnull=True, then=Now()),
+                    default=F("completed_at"),
+                ),
+            ),
+            default=Value(None),
+            output_field=DateTimeField(),
+        ),
+    }
+
+
+def apply_completion_delta(
+    student_id: uuid.UUID, lesson_id: uuid.UUID, delta: int
+) -> int:
+    """
+    Soma ``delta`` em ``completed_lessons`` do curso da aula para o aluno.
+
+    O curso é resolvido no próprio UPDATE (via módulo da aula), e apenas
+    aulas ativas contam. Se o aluno ainda não tem ``CourseProgress`` para o
+    curso, o registro é criado com uma recontagem completa.
+
+    Args:
+        student_id: ID do aluno
+        lesson_id: ID da aula concluída (ou que deixou de estar concluída)
+        delta: +1 ou -1
+
+    Returns:
+        int: Número de registros atualizados (ou criados)
+    """
+    if not delta:
+        return 0
+
+    invalidate_dashboard([student_id], "courses")
+    completed = Greatest(F("completed_lessons") + Value(delta), Value(0))
+    updated = CourseProgress.objects.filter(
+        student_id=student_id,
+        course__modules__lessons__pk=lesson_id,
+        course__modules__lessons__is_active=True,
+    ).update(
+        completed_lessons=completed,
+        last_accessed=Now(),
+        **derived_progress_fields(completed, F("total_lessons")),
+    )
+    if updated or delta < 0:
+        return updated
+
+    course_id = (
+        Lesson.objects.filter(pk=lesson_id, is_active=True)
+        .values_list("module__course_id", flat=True)
+        .first()
+    )
+    if course_id is None:
+        return 0
+    progress, _created = CourseProgress.objects.get_or_create(
+        student_id=student_id, course_id=course_id
+    )
+    progress.update_progress()
+    return 1
+
+
+def apply_lesson_delta(
+    lesson_id: Optional[uuid.UUID],
+    module_id: uuid.UUID,
+    delta: int,
+) -> int:
+    """
+    Aplica a entrada (+1) ou saída (-1) de uma aula ativa em um curso.
+
+    Em um único UPDATE, ajusta ``total_lessons`` de todos os alunos do curso
+    do módulo e ``completed_lessons`` dos alunos que concluíram a aula.
+
+    Args:
+        lesson_id: ID da aula (None quando não há conclusões a considerar)
+        module_id: Módulo ao qual a aula pertence (ou pertencia)
+        delta: +1 ou -1
+
+    Returns:
+        int: Número de registros de progresso atualizados
+    """
+    if not delta:
+        return 0
+
+    total = Greatest(F("total_lessons") + Value(delta), Value(0))
+    completed = F("completed_lessons")
+    if lesson_id is not None:
+        finished = LessonProgress.objects.filter(
+            lesson_id=lesson_id, status="completed"
+        ).values("student_id")
+        completed = Case(
+            When(
+                student_id__in=finished,
+                then=Greatest(
+                    F("completed_lessons") + Value(delta), Value(0)
+                ),
+            ),
+            default=F("completed_lessons"),
+            output_field=IntegerField(),
+        )
+
+    return CourseProgress.objects.filter(
+        course__modules__pk=module_id
+    ).update(
+        total_lessons=total,
+        completed_lessons=completed,
+        **derived_progress_fields(completed, total),
+    )
+
+
+# Recontagem em lote. Cada linha da subconsulta ``stats`` traz os agregados
+# de um CourseProgress; percentual, status e data de conclusão são derivados
+# dela no próprio UPDATE ... FROM.
+_RECOMPUTE_SQL = """
+UPDATE {progress} AS cp
+SET total_lessons = stats.total,
+    completed_lessons = stats.done,
+    progress_percentage = stats.pct,
+    status = CASE
+        WHEN stats.pct <= 0 THEN 'not_started'
+        WHEN stats.pct >= 100 THEN 'completed'
+        ELSE 'in_progress'
+    END,
+    completed_at = CASE
+        WHEN stats.pct >= 100 THEN COALESCE(cp.completed_at, NOW())
+        ELSE NULL
+    END,
+    quiz_average_score = stats.quiz_avg
+FROM (
+    SELECT base.id,
+           COALESCE(lessons.total, 0) AS total,
+           COALESCE(done.total, 0) AS done,
+           CASE
+               WHEN COALESCE(lessons.total, 0) > 0 THEN LEAST(
+                   COALESCE(done.total, 0) * 100 / lessons.total, 100
+               )
+               ELSE 0
+           END AS pct,
+           COALESCE(quiz.average, 0) AS quiz_avg
+    FROM {progress} AS base
+    LEFT JOIN (
+        SELECT m.course_id, COUNT(*) AS total
+        FROM {lesson} AS l
+        JOIN {module} AS m ON m.id = l.module_id
+        WHERE l.is_active AND m.course_id = ANY(%s)
+        GROUP BY m.course_id
+    ) AS lessons ON lessons.course_id = base.course_id
+    LEFT JOIN (
+        SELECT lp.student_id, m.course_id, COUNT(*) AS total
+        FROM {lesson_progress} AS lp
+        JOIN {lesson} AS l ON l.id = lp.lesson_id
+        JOIN {module} AS m ON m.id = l.module_id
+        WHERE lp.status = 'completed'
+          AND l.is_active
+          AND m.course_id = ANY(%s)
+        GROUP BY lp.student_id, m.course_id
+    ) AS done
+        ON done.student_id = base.student_id
+       AND done.course_id = base.course_id
+    LEFT JOIN (
+        SELECT a.student_id, q.course_id,
+               ROUND(AVG(a.score_percentage), 2) AS average
+        FROM {attempt} AS a
+        JOIN {quiz} AS q ON q.id = a.quiz_id
+        WHERE a.status IN ('completed', 'timed_out')
+          AND q.course_id = ANY(%s)
+        GROUP BY a.student_id, q.course_id
+    ) AS quiz
+        ON quiz.student_id = base.student_id
+       AND quiz.course_id = base.course_id
+    WHERE base.course_id = ANY(%s)
+) AS stats
+WHERE cp.id = stats.id AND cp.id IN ({selected})
+"""
+
+
+def recompute_course_progress(
+    queryset=None,
+    chunk_size: int = 50,
+    on_chunk: Optional[Callable[[int, int, int], None]] = None,
+) -> int:
+    """
+    Recalcula ``CourseProgress`` em lote, com um UPDATE ... FROM por lote.
+
+    Reconstrói ``completed_lessons``, ``total_lessons``,
+    ``progress_percentage``, ``status``, ``completed_at`` e
+    ``quiz_average_score`` (média de ``score_percentage`` das tentativas
+    encerradas nos quizzes do curso) para qualquer filtro: um curso, um
+    aluno ou todos os registros. Os registros são processados em lotes de
+    ``chunk_size`` cursos, cada um em sua própria transação.
+
+    Args:
+        queryset: ``CourseProgress`` a recalcular (padrão: todos)
+        chunk_size: Número de cursos por lote
+        on_chunk: Callback ``(lote, total_de_lotes, linhas_atualizadas)``
+            chamado após cada lote
+
+    Returns:
+        int: Número total de registros atualizados
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size deve ser positivo")
+
+    if queryset is None:
+        queryset = CourseProgress.objects.all()
+    queryset = queryset.order_by()
+
+    course_ids: List[uuid.UUID] = list(
+        queryset.values_list("course_id", flat=True).distinct()
+    )
+    chunks = [
+        course_ids[i:i + chunk_size]
+        for i in range(0, len(course_ids), chunk_size)
+    ]
+
+    tables = {
+        "progress": CourseProgress._meta.db_table,
+        "lesson_progress": LessonProgress._meta.db_table,
+        "lesson": Lesson._meta.db_table,
+        "module": Module._meta.db_table,
+        "attempt": QuizAttempt._meta.db_table,
+        "quiz": Quiz._meta.db_table,
+    }
+
+    total = 0
+    for number, chunk in enumerate(chunks, start=1):
+        selected_sql, selected_params = (
+            queryset.filter(course_id__in=chunk)
+            .values("id")
+            .query.sql_with_params()
+        )
+        sql = _RECOMPUTE_SQL.format(selected=selected_sql, **tables)
+        params = [chunk, chunk, chunk, chunk, *selected_params]
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            updated = cursor.rowcount
+
+        total += updated
+        if on_chunk is not None:
+            on_chunk(number, len(chunks), updated)
+
+    return total
@@ -0,0 +1,124 @@
+"""
+Sinais do app progress.
+
+Mantêm ``CourseProgress`` atualizado de forma incremental:
+
+- mudanças de ``LessonProgress`` para/de ``completed`` aplicam +1/-1 em
+  ``completed_lessons`` do curso;
+- criação, remoção e ativação/desativação de ``Lesson`` ajustam
+  ``total_lessons`` (e as conclusões da aula) de todos os alunos do curso.
+
+Também descartam do cache as seções do painel do aluno afetadas por cada
+alteração (ver ``progress.dashboard``).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from courses.models import Enrollment, Lesson
+from scheduling.models import ScheduledClass
+
+from .dashboard import invalidate_dashboard
+from .models import CourseProgress, LessonProgress, StudentAchievement
+from .services import apply_completion_delta, apply_lesson_delta
+
+
+def _completion_delta(before, after) -> int:
+    """Retorna +1, -1 ou 0 conforme a transição de status."""
+    return int(after == "completed") - int(before == "completed")
+
+
+@receiver(post_save, sender=LessonProgress, dispatch_uid="progress_on_save")
+def lesson_progress_saved(sender, instance: LessonProgress, created, **kwargs):
+    """Aplica o delta de conclusão quando o status muda."""
+    invalidate_dashboard([instance.student_id], "recent_lessons")
+    before = None if created else instance._original_status
+    delta = _completion_delta(before, instance.status)
+    if delta:
+        apply_completion_delta(instance.student_id, instance.lesson_id, delta)
+    instance._original_status = instance.status
+
+
+@receiver(
+    post_delete, sender=LessonProgress, dispatch_uid="progress_on_delete"
+)
+def lesson_progress_deleted(sender, instance: LessonProgress, **kwargs):
+    """Desconta a conclusão de um progresso de aula removido."""
+    invalidate_dashboard([instance.student_id], "recent_lessons")
+    if instance.status == "completed":
+        apply_completion_delta(instance.student_id, instance.lesson_id, -1)
+
+
+@receiver(post_save, sender=Lesson, dispatch_uid="progress_lesson_on_save")
+def lesson_saved(sender, instance: Lesson, created, **kwargs):
+    """Ajusta os totais do curso ao criar, mover ou (des)ativar uma aula."""
+    if created:
+        if instance.is_active:
+            apply_lesson_delta(None, instance.module_id, 1)
+    else:
+        was_active = bool(instance._original_is_active)
+        old_module = instance._original_module_id
+        moved = old_module != instance.module_id
+
+        if was_active and (moved or not instance.is_active):
+            apply_lesson_delta(instance.pk, old_module, -1)
+        if instance.is_active and (moved or not was_active):
+            apply_lesson_delta(instance.pk, instance.module_id, 1)
+
+
+@receiver(post_delete, sender=Lesson, dispatch_uid="progress_lesson_on_delete")
+def lesson_deleted(sender, instance: Lesson, **kwargs):
+    """
+    Desconta a aula removida do total do curso.
+
+    As conclusões já foram descontadas pela remoção em cascata dos
+    ``LessonProgress`` (ver ``lesson_progress_deleted``).
+    """
+    if instance._original_is_active:
+        apply_lesson_delta(None, instance.module_id, -1)
+
+
+@receiver(
+    post_save, sender=CourseProgress, dispatch_uid="dashboard_progress_save"
+)
+@receiver(
+    post_delete,
+    sender=CourseProgress,
+    dispatch_uid="dashboard_progress_delete",
+)
+@receiver(
+    post_save, sender=Enrollment, dispatch_uid="dashboard_enrollment_save"
+)
+@receiver(
+    post_delete, sender=Enrollment, dispatch_uid="dashboard_enrollment_delete"
+)
+def course_progress_changed(sender, instance, **kwargs):
+    """Descarta a seção de cursos do painel do aluno."""
+    invalidate_dashboard([instance.student_id], "courses")
+
+
+@receiver(
+    post_save, sender=ScheduledClass, dispatch_uid="dashboard_class_save"
+)
+@receiver(
+    post_delete, sender=ScheduledClass, dispatch_uid="dashboard_class_delete"
+)
+def scheduled_class_changed(sender, instance: ScheduledClass, **kwargs):
+    """Descarta as próximas aulas do painel do aluno."""
+    invalidate_dashboard([instance.student_id], "upcoming_classes")
+
+
+@receiver(
+    post_save,
+    sender=StudentAchievement,
+    dispatch_uid="dashboard_achievement_save",
+)
+@receiver(
+    post_delete,
+    sender=StudentAchievement,
+    dispatch_uid="dashboard_achievement_delete",
+)
+def student_achievement_changed(
+    sender, instance: StudentAchievement, **kwargs
+):
+    """Descarta as conquistas novas do painel do aluno."""
+    invalidate_dashboard([instance.student_id], "new_achievements")
@@ -1,3 +1,518 @@
+import datetime
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.models import Course, Enrollment, Lesson, Module
+from quizzes.models import Quiz, QuizAttempt
+from scheduling.models import ScheduledClass
+from users.models import User
+
+from .analytics import UPCOMING_CLASSES, build_teacher_analytics
+from .dashboard import aget_dashboard
+from .heartbeats import (
+    FileDeadLetterStore,
+    Heartbeat,
+    HeartbeatFlusher,
+    InMemoryHeartbeatBuffer,
+)
+from .models import CourseProgress, LessonProgress
+from .services import recompute_course_progress
+
+
+class DashboardQueryCountTests(TestCase):
+    """O painel do aluno é montado em um número fixo de consultas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        cls.student = User.objects.create(
+            username="aluno", email="aluno@example.com",
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def _enroll(self, count):
+        for _ in range(count):
+            n = Course.objects.count()
+            course = Course.objects.create(
+                title=f"Curso {n}", slug=f"curso-{n}", description="-",
+                created_by=self.teacher,
+            )
+            module = Module.objects.create(
+                course=course, title="Módulo", description="-", order=1
+            )
+            Lesson.objects.create(
+                module=module, title="Aula", description="-",
+                video_url="https://example.com/aula.mp4", duration=60,
+                order=1,
+            )
+            Enrollment.objects.create(student=self.student, course=course)
+            CourseProgress.objects.get_or_create(
+                student=self.student, course=course
+            )
+
+    def _queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            dashboard = async_to_sync(aget_dashboard)(self.student.pk)
+        return len(queries), dashboard
+
+    def test_query_count_does_not_grow_with_enrollments(self):
+        self._enroll(1)
+        few, dashboard = self._queries()
+        self.assertEqual(len(dashboard["courses"]), 1)
+
+        self._enroll(15)
+        many, dashboard = self._queries()
+        self.assertEqual(len(dashboard["courses"]), 16)
+
+        self.assertEqual(few, many)
+        self.assertLessEqual(many, 8)
+
+    def test_cached_dashboard_makes_no_queries(self):
+        self._enroll(3)
+        self._queries()
+        with self.assertNumQueries(0):
+            async_to_sync(aget_dashboard)(self.student.pk)
+
+
+class TeacherAnalyticsTests(TestCase):
+    """A análise do professor é agregada no banco em consultas fixas."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        cls.course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=cls.teacher,
+        )
+        cls.lessons = []
+        for order in (1, 2):
+            module = Module.objects.create(
+                course=cls.course, title=f"Módulo {order}",
+                description="-", order=order,
+            )
+            cls.lessons.append(
+                Lesson.objects.create(
+                    module=module, title="Aula", description="-",
+                    video_url="https://example.com/aula.mp4", duration=60,
+                    order=1,
+                )
+            )
+
+    def _students(self, count, completed=0):
+        """Cria alunos que concluíram as ``completed`` primeiras aulas."""
+        for _ in range(count):
+            n = User.objects.count()
+            student = User.objects.create(
+                username=f"aluno{n}", email=f"aluno{n}@example.com"
+            )
+            for lesson in self.lessons[:completed]:
+                LessonProgress.objects.create(
+                    student=student, lesson=lesson, status="completed"
+                )
+            CourseProgress.objects.get_or_create(
+                student=student, course=self.course
+            )
+
+    def _analytics(self):
+        with CaptureQueriesContext(connection) as queries:
+            analytics = build_teacher_analytics([self.teacher.pk])
+        return len(queries), json.loads(analytics[self.teacher.pk].content)
+
+    def test_query_count_does_not_grow_with_students(self):
+        self._students(2)
+        few, _ = self._analytics()
+        self._students(30)
+        many, analytics = self._analytics()
+
+        self.assertEqual(few, many)
+        self.assertEqual(analytics["courses"]["learners"], [32])
+
+    def test_funnel_counts_students_per_module(self):
+        self._students(3)
+        self._students(4, completed=1)
+        self._students(2, completed=2)
+        _, analytics = self._analytics()
+
+        funnel = analytics["funnel"]
+        self.assertEqual(funnel["title"], ["Módulo 1", "Módulo 2"])
+        self.assertEqual(funnel["started"], [6, 2])
+        self.assertEqual(funnel["completed"], [6, 2])
+        self.assertEqual(funnel["retention"], [None, "0.3333"])
+
+    def test_upcoming_classes_are_limited_per_teacher(self):
+        student = User.objects.create(
+            username="aluno", email="aluno@example.com"
+        )
+        today = timezone.localdate()
+        # Uma aula passada e mais aulas futuras do que o limite
+        for days in [-1, *range(1, UPCOMING_CLASSES + 5)]:
+            ScheduledClass.objects.create(
+                student=student, teacher=self.teacher,
+                date=today + datetime.timedelta(days=days),
+                start_time=datetime.time(23), end_time=datetime.time(23, 59),
+                topic=f"Aula {days}",
+            )
+
+        _, analytics = self._analytics()
+
+        upcoming = analytics["upcoming_classes"]
+        self.assertEqual(len(upcoming["id"]), UPCOMING_CLASSES)
+        self.assertEqual(
+            upcoming["topic"],
+            [f"Aula {days}" for days in range(1, UPCOMING_CLASSES + 1)],
+        )
+
+
+class HeartbeatIngestionTests(TestCase):
+    """Heartbeats confirmados são gravados, recusados ou guardados."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        cls.student = User.objects.create(
+            username="aluno", email="aluno@example.com",
+        )
+        course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=cls.teacher,
+        )
+        module = Module.objects.create(
+            course=course, title="Módulo", description="-", order=1
+        )
+        cls.lesson = Lesson.objects.create(
+            module=module, title="Aula", description="-",
+            video_url="https://example.com/aula.mp4", duration=10, order=1,
+        )
+        cls.enrollment = Enrollment.objects.create(
+            student=cls.student, course=course
+        )
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.dead_letters = FileDeadLetterStore(
+            Path(directory.name) / "heartbeats.jsonl"
+        )
+        self.flusher = HeartbeatFlusher(
+            InMemoryHeartbeatBuffer(),
+            max_attempts=2,
+            dead_letters=self.dead_letters,
+        )
+
+    def _heartbeat(self, position=60):
+        return Heartbeat(
+            student_id=self.student.pk,
+            lesson_id=self.lesson.pk,
+            position=position,
+            watched=30,
+            received_at=timezone.now(),
+        )
+
+    def test_view_refuses_lessons_without_enrollment(self):
+        self.enrollment.is_active = False
+        self.enrollment.save(update_fields=["is_active"])
+        client = APIClient()
+        client.force_authenticate(self.student)
+
+        with mock.patch("progress.views.record_heartbeats") as record:
+            response = client.post(
+                reverse("progress:heartbeats"),
+                {"events": [{"lesson": str(self.lesson.pk), "position": 5}]},
+                format="json",
+            )
+
+        self.assertEqual(response.status_code, 403)
+        record.assert_not_called()
+
+    def test_flush_counts_events_without_enrollment(self):
+        self.flusher.buffer.add([self._heartbeat()])
+        self.enrollment.is_active = False
+        self.enrollment.save(update_fields=["is_active"])
+
+        self.flusher.flush()
+
+        self.assertEqual(self.flusher.metrics()["rejected"], 1)
+        self.assertFalse(
+            LessonProgress.objects.filter(student=self.student).exists()
+        )
+
+    def test_failing_events_go_to_dead_letters_and_replay(self):
+        self.flusher.buffer.add([self._heartbeat(position=600)])
+        with mock.patch.object(
+            HeartbeatFlusher, "_write", side_effect=RuntimeError("falha")
+        ):
+            for _ in range(2):
+                with self.assertRaises(RuntimeError):
+                    self.flusher.flush()
+
+        self.assertEqual(len(self.flusher.buffer), 0)
+        self.assertEqual(self.flusher.metrics()["dead_lettered"], 1)
+        self.assertEqual(self.flusher.metrics()["dropped"], 0)
+
+        replay = HeartbeatFlusher(InMemoryHeartbeatBuffer())
+        replay.buffer.add(self.dead_letters.drain())
+        self.assertEqual(replay.flush(), 1)
+        self.assertEqual(self.dead_letters.drain(), [])
+
+        progress = LessonProgress.objects.get(
+            student=self.student, lesson=self.lesson
+        )
+        self.assertEqual(progress.video_progress, 600)
+        self.assertEqual(progress.status, "completed")
+
+
+class CourseProgressDeltaTests(TestCase):
+    """``CourseProgress`` acompanha conclusões e aulas sem recontagem."""
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        cls.student = User.objects.create(
+            username="aluno", email="aluno@example.com",
+        )
+        cls.course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=teacher,
+        )
+        cls.module = Module.objects.create(
+            course=cls.course, title="Módulo", description="-", order=1
+        )
+        cls.lessons = [cls._lesson(order) for order in range(1, 5)]
+
+    @classmethod
+    def _lesson(cls, order, **kwargs):
+        return Lesson.objects.create(
+            module=cls.module, title=f"Aula {order}", description="-",
+            video_url="https://example.com/aula.mp4", duration=60,
+            order=order, **kwargs,
+        )
+
+    def setUp(self):
+        self.progress, _ = CourseProgress.objects.get_or_create(
+            student=self.student, course=self.course
+        )
+        self.progress.update_progress()
+
+    def _complete(self, lesson):
+        return LessonProgress.objects.create(
+            student=self.student, lesson=lesson, status="completed"
+        )
+
+    def _state(self):
+        self.progress.refresh_from_db()
+        return (
+            self.progress.completed_lessons,
+            self.progress.total_lessons,
+            self.progress.progress_percentage,
+            self.progress.status,
+        )
+
+    def _assert_matches_recount(self):
+        state = self._state()
+        recount = CourseProgress.objects.get(pk=self.progress.pk)
+        recount.update_progress()
+        self.assertEqual(state, self._state())
+
+    def test_completions_move_the_counters(self):
+        self.assertEqual(self._state(), (0, 4, 0, "not_started"))
+
+        first = self._complete(self.lessons[0])
+        self.assertEqual(self._state(), (1, 4, 25, "in_progress"))
+
+        for lesson in self.lessons[1:]:
+            self._complete(lesson)
+        self.assertEqual(self._state(), (4, 4, 100, "completed"))
+        self.assertIsNotNone(self.progress.completed_at)
+
+        first.status = "in_progress"
+        first.save()
+        self.assertEqual(self._state(), (3, 4, 75, "in_progress"))
+        self.assertIsNone(self.progress.completed_at)
+        self._assert_matches_recount()
+
+    def test_lesson_changes_adjust_totals(self):
+        self._complete(self.lessons[0])
+        self._complete(self.lessons[1])
+
+        self._lesson(5)
+        self.assertEqual(self._state(), (2, 5, 40, "in_progress"))
+
+        lesson = self.lessons[0]
+        lesson.is_active = False
+        lesson.save()
+        self.assertEqual(self._state(), (1, 4, 25, "in_progress"))
+
+        lesson.is_active = True
+        lesson.save()
+        self.assertEqual(self._state(), (2, 5, 40, "in_progress"))
+
+        self.lessons[1].delete()
+        self.assertEqual(self._state(), (1, 4, 25, "in_progress"))
+        self._assert_matches_recount()
+
+    def test_inactive_lesson_does_not_count(self):
+        inactive = self._lesson(5, is_active=False)
+        self._complete(inactive)
+        self.assertEqual(self._state(), (0, 4, 0, "not_started"))
+
+    def test_first_completion_creates_missing_progress(self):
+        self.progress.delete()
+        self._complete(self.lessons[0])
+
+        progress = CourseProgress.objects.get(
+            student=self.student, course=self.course
+        )
+        self.assertEqual(
+            (progress.completed_lessons, progress.total_lessons), (1, 4)
+        )
+
+
+class RecomputeCourseProgressTests(TestCase):
+    """Recontagem em lote de ``CourseProgress`` com UPDATE ... FROM."""
+
+    @classmethod
+    def setUpTestData(cls):
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        cls.courses = []
+        cls.lessons = {}
+        for n in range(3):
+            course = Course.objects.create(
+                title=f"Curso {n}", slug=f"curso-{n}", description="-",
+                created_by=teacher,
+            )
+            module = Module.objects.create(
+                course=course, title="Módulo", description="-", order=1
+            )
+            cls.courses.append(course)
+            cls.lessons[course.pk] = [
+                Lesson.objects.create(
+                    module=module, title=f"Aula {order}", description="-",
+                    video_url="https://example.com/aula.mp4", duration=60,
+                    order=order,
+                )
+                for order in (1, 2)
+            ]
+        cls.students = [
+            User.objects.create(
+                username=f"aluno{n}", email=f"aluno{n}@example.com"
+            )
+            for n in range(2)
+        ]
+        for student in cls.students:
+            for course in cls.courses:
+                CourseProgress.objects.get_or_create(
+                    student=student, course=course
+                )
+        # O primeiro aluno concluiu o primeiro curso
+        for lesson in cls.lessons[cls.courses[0].pk]:
+            LessonProgress.objects.create(
+                student=cls.students[0], lesson=lesson, status="completed"
+            )
+        quiz = Quiz.objects.create(
+            title="Quiz", description="-", course=cls.courses[0],
+            created_by=teacher,
+        )
+        for score in (60, 90):
+            QuizAttempt.objects.create(
+                student=cls.students[0], quiz=quiz, status="completed",
+                score_percentage=score,
+            )
+
+    def _corrupt(self):
+        CourseProgress.objects.update(
+            completed_lessons=7, total_lessons=9, progress_percentage=3,
+            status="in_progress",
+        )
+
+    def _state(self, student, course):
+        return CourseProgress.objects.values_list(
+            "completed_lessons", "total_lessons", "progress_percentage",
+            "status",
+        ).get(student=student, course=course)
+
+    def test_recompute_rebuilds_counters_in_chunks(self):
+        self._corrupt()
+        chunks = []
+
+        updated = recompute_course_progress(
+            chunk_size=2, on_chunk=lambda *args: chunks.append(args)
+        )
+
+        self.assertEqual(updated, 6)
+        self.assertEqual([c[:2] for c in chunks], [(1, 2), (2, 2)])
+        self.assertEqual(
+            self._state(self.students[0], self.courses[0]),
+            (2, 2, 100, "completed"),
+        )
+        self.assertEqual(
+            self._state(self.students[1], self.courses[0]),
+            (0, 2, 0, "not_started"),
+        )
+        average = CourseProgress.objects.values_list(
+            "quiz_average_score", flat=True
+        ).get(student=self.students[0], course=self.courses[0])
+        self.assertEqual(str(average), "75.00")
+
+    def test_recompute_only_touches_the_filtered_rows(self):
+        self._corrupt()
+
+        updated = recompute_course_progress(
+            CourseProgress.objects.filter(student=self.students[1])
+        )
+
+        self.assertEqual(updated, 3)
+        self.assertEqual(
+            self._state(self.students[1], self.courses[1]),
+            (0, 2, 0, "not_started"),
+        )
+        self.assertEqual(
+            self._state(self.students[0], self.courses[0]),
+            (7, 9, 3, "in_progress"),
+        )
+
+    def test_command_recomputes_one_course(self):
+        self._corrupt()
+        course = self.courses[0]
+
+        call_command(
+            "recompute_course_progress", "--course", str(course.pk),
+            stdout=mock.Mock(),
+        )
 
-# Create your tests here.
+        self.assertEqual(
+            self._state(self.students[0], course), (2, 2, 100, "completed")
+        )
+        self.assertEqual(
+            self._state(self.students[0], self.courses[1]),
+            (7, 9, 3, "in_progress"),
+        )
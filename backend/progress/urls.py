@@ -0,0 +1,30 @@
+"""
+Rotas da API do app progress.
+"""
+from django.urls import path
+
+from .views import (
+    DashboardProgressView,
+    HeartbeatMetricsView,
+    HeartbeatView,
+    TeacherAnalyticsView,
+)
+
+app_name = "progress"
+
+urlpatterns = [
+    path(
+        "dashboard/", DashboardProgressView.as_view(), name="dashboard"
+    ),
+    path("heartbeats/", HeartbeatView.as_view(), name="heartbeats"),
+    path(
+        "heartbeats/metrics/",
+        HeartbeatMetricsView.as_view(),
+        name="heartbeat-metrics",
+    ),
+    path(
+        "teacher/analytics/",
+        TeacherAnalyticsView.as_view(),
+        name="teacher-analytics",
+    ),
+]
@@ -1,3 +1,108 @@
-from django.shortcuts import render
+"""
+Views da API do app progress.
+"""
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.translation import gettext_lazy as _
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import permissions, status
+from rest_framework.exceptions import PermissionDenied
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from core.async_views import AsyncAPIView
+
+from .analytics import get_teacher_analytics
+from .dashboard import aget_dashboard
+from .heartbeats import enrolled_lesson_ids, get_flusher, record_heartbeats
+from .serializers import DashboardSerializer, HeartbeatBatchSerializer
+
+
+class HeartbeatView(APIView):
+    """
+    Recebe heartbeats do player de vídeo.
+
+    Uma consulta confere se o aluno tem matrícula ativa nos cursos das
+    aulas; o lote inteiro é recusado se alguma não estiver liberada. Os
+    eventos aceitos são apenas acumulados no buffer do processo e gravados
+    em lote pelo ``HeartbeatFlusher``.
+    """
+
+    query_budget = 1
+
+    @swagger_auto_schema(request_body=HeartbeatBatchSerializer)
+    def post(self, request):
+        if not request.user.is_student():
+            raise PermissionDenied(
+                _("Apenas alunos podem registrar o progresso das aulas.")
+            )
+
+        serializer = HeartbeatBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        events = serializer.validated_data["events"]
+
+        lesson_ids = {event["lesson"] for event in events}
+        if enrolled_lesson_ids(request.user.pk, lesson_ids) != lesson_ids:
+            raise PermissionDenied(
+                _("Há aulas de cursos sem matrícula ativa sua.")
+            )
+
+        accepted = record_heartbeats(request.user.pk, events)
+        return Response(
+            {"accepted": accepted}, status=status.HTTP_202_ACCEPTED
+        )
+
+
+class HeartbeatMetricsView(APIView):
+    """Métricas de ingestão e gravação de heartbeats deste processo."""
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(get_flusher().metrics())
+
+
+class DashboardProgressView(AsyncAPIView):
+    """
+    Painel do aluno autenticado (ver ``progress.dashboard``).
+
+    Assíncrona: as consultas usam a API assíncrona do ORM. O número de
+    consultas não depende da quantidade de matrículas.
+    """
+
+    query_budget = 9
+
+    @swagger_auto_schema(responses={200: DashboardSerializer})
+    async def get(self, request):
+        dashboard = await aget_dashboard(request.user.pk)
+        return Response(DashboardSerializer(dashboard).data)
+
+
+class TeacherAnalyticsView(APIView):
+    """
+    Análise dos alunos dos cursos do professor autenticado (ver
+    ``progress.analytics``).
+
+    O corpo é o JSON pré-serializado do cache, renovado periodicamente pelo
+    comando ``refresh_teacher_analytics``.
+    """
+
+    query_budget = 5
+
+    @swagger_auto_schema(
+        responses={200: "Análise dos cursos", 304: "", 403: ""}
+    )
+    def get(self, request):
+        if not (request.user.is_teacher() or request.user.is_admin()):
+            raise PermissionDenied(
+                _("Apenas professores podem ver a análise dos cursos.")
+            )
+
+        analytics = get_teacher_analytics(request.user.pk)
+        if request.headers.get("If-None-Match") == analytics.etag:
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                analytics.content, content_type="application/json"
+            )
+        response["ETag"] = analytics.etag
+        return response
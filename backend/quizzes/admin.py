@@ -45,8 +45,9 @@ class QuizAdmin(admin.ModelAdmin):
     """Admin para gerenciamento de quizzes."""
     list_display = [
         'id', 'title', 'course', 'lesson', 'is_active', 
-        'passing_score', 'time_limit', 'total_questions'
+        'passing_score', 'time_limit', 'total_questions', 'max_score'
     ]
+    list_select_related = ['course', 'lesson']
     list_filter = ['is_active', 'course', 'created_at']
     search_fields = ['title', 'description', 'course__title']
     inlines = [QuestionInline]
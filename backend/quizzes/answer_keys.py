@@ -0,0 +1,123 @@
+"""
+Cache em processo dos gabaritos de quizzes.
+
+Os gabaritos (``QuestionKey``) são indexados por ``(quiz_id,
+content_version)``. A versão é persistida em ``Quiz.content_version`` e
+incrementada pelos sinais de ``Question``/``Answer``, de modo que todos os
+processos passam a ignorar entradas antigas assim que o conteúdo muda, sem
+precisar de um cache compartilhado. O processo que recebeu o sinal também
+descarta suas entradas imediatamente.
+
+O tamanho é limitado por LRU (``QUIZ_ANSWER_KEY_CACHE_SIZE``) e o cache
+mantém contadores de acertos e falhas.
+"""
+import threading
+import uuid
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Callable, Dict, Mapping, Tuple
+
+from django.conf import settings
+
+from .grading import QuestionKey, load_answer_key
+
+AnswerKey = Mapping[uuid.UUID, QuestionKey]
+
+
+class AnswerKeyCache:
+    """
+    Cache LRU de gabaritos, seguro para uso entre threads.
+
+    Os valores armazenados são mapeamentos somente leitura de
+    ``question_id -> QuestionKey`` compostos apenas de frozensets e tuplas.
+    """
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = max(int(maxsize), 0)
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[uuid.UUID, int], AnswerKey]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        quiz_id: uuid.UUID,
+        version: int,
+        loader: Callable[[uuid.UUID], Dict[uuid.UUID, QuestionKey]],
+    ) -> AnswerKey:
+        """
+        Retorna o gabarito do quiz, carregando-o em caso de falha.
+
+        Args:
+            quiz_id: ID do quiz
+            version: ``Quiz.content_version`` conhecido pelo chamador
+            loader: Função que carrega o gabarito do banco
+
+        Returns:
+            Mapeamento somente leitura ``question_id -> QuestionKey``
+        """
+        cache_key = (quiz_id, version)
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                self._entries.move_to_end(cache_key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+
+        entry = MappingProxyType(loader(quiz_id))
+        if self.maxsize == 0:
+            return entry
+
+        with self._lock:
+            # Versões anteriores do mesmo quiz nunca mais serão consultadas
+            for stale in [k for k in self._entries if k[0] == quiz_id]:
+                del self._entries[stale]
+            self._entries[cache_key] = entry
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, quiz_id: uuid.UUID) -> None:
+        """Remove todas as versões em cache de um quiz."""
+        with self._lock:
+            for stale in [k for k in self._entries if k[0] == quiz_id]:
+                del self._entries[stale]
+
+    def clear(self) -> None:
+        """Limpa o cache e zera os contadores."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Retorna os contadores do cache."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
+
+
+answer_key_cache = AnswerKeyCache(
+    maxsize=getattr(settings, "QUIZ_ANSWER_KEY_CACHE_SIZE", 256)
+)
+
+
+def get_answer_key(quiz_id: uuid.UUID, version: int) -> AnswerKey:
+    """
+    Retorna o gabarito de um quiz a partir do cache em processo.
+
+    Args:
+        quiz_id: ID do quiz
+        version: ``Quiz.content_version`` atual
+
+    Returns:
+        Mapeamento somente leitura ``question_id -> QuestionKey``
+    """
+    return answer_key_cache.get(quiz_id, version, load_answer_key)
@@ -0,0 +1,461 @@
+"""
+Motor de correção em lote para tentativas de quiz.
+
+Corrige todas as respostas de uma ``QuizAttempt`` com um número constante
+de consultas ao banco, independentemente da quantidade de questões:
+
+1. respostas da tentativa (``QuestionResponse``), já com a versão do
+   conteúdo do quiz;
+2. respostas selecionadas (tabela intermediária de ``selected_answers``);
+3. gabarito do quiz, apenas quando não está no cache em processo
+   (``quizzes.answer_keys``);
+4. um único ``bulk_update`` com os novos valores de ``is_correct``.
+
+Formato esperado das respostas por tipo de questão:
+
+- ``multiple_choice``: ``selected_answers`` deve ser exatamente o conjunto de
+  respostas corretas;
+- ``true_false``: exatamente uma resposta selecionada, e ela deve ser correta;
+- ``ordering``: ``text_response`` contém uma lista JSON com os IDs das
+  respostas na ordem escolhida pelo aluno, comparada com ``Answer.order``;
+- ``matching``: ``text_response`` contém uma lista JSON de pares de IDs; dois
+  itens formam um par correto quando compartilham o mesmo ``Answer.order``;
+- ``fill_in``: ``text_response`` é comparado (sem diferenciar maiúsculas,
+  espaços extras) com o texto das respostas marcadas como corretas;
+- ``video_response``: depende de avaliação manual e não é alterada.
+"""
+import json
+import uuid
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Tuple,
+)
+
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import (
+    DecimalField,
+    F,
+    FilteredRelation,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf, Round
+
+from core.instrumentation import QueryCounter
+
+# Tipos de questão corrigidos manualmente pelo professor
+MANUAL_GRADING_TYPES = frozenset({"video_response"})
+
+
+@dataclass(frozen=True)
+class QuestionKey:
+    """
+    Gabarito compacto de uma questão.
+
+    Attributes:
+        question_type: Tipo da questão (``Question.TYPE_CHOICES``)
+        correct_ids: IDs das respostas marcadas como corretas
+        ordering: IDs de todas as respostas na ordem correta
+        matching: Pares corretos (conjuntos de IDs com o mesmo ``order``)
+        accepted_texts: Textos aceitos para ``fill_in``, já normalizados
+    """
+
+    question_type: str
+    correct_ids: FrozenSet[uuid.UUID] = frozenset()
+    ordering: Tuple[uuid.UUID, ...] = ()
+    matching: FrozenSet[FrozenSet[uuid.UUID]] = frozenset()
+    accepted_texts: FrozenSet[str] = frozenset()
+
+
+@dataclass
+class GradingResult:
+    """
+    Resultado da correção de uma tentativa.
+
+    Attributes:
+        graded: Número de respostas corrigidas automaticamente
+        correct: Número de respostas corretas entre as corrigidas
+        updated: Número de linhas gravadas no ``bulk_update``
+        skipped: Respostas que dependem de correção manual
+        queries: Número de consultas SQL emitidas pela correção
+    """
+
+    graded: int = 0
+    correct: int = 0
+    updated: int = 0
+    skipped: int = 0
+    queries: int = 0
+    results: Dict[uuid.UUID, bool] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class AttemptScore:
+    """Pontuação calculada de uma tentativa."""
+
+    earned: int
+    max_points: int
+    percentage: Decimal
+
+
+def normalize_text(value: str) -> str:
+    """Normaliza um texto livre para comparação em ``fill_in``."""
+    return " ".join(str(value).split()).casefold()
+
+
+def build_question_keys(
+    rows: Iterable[Tuple[uuid.UUID, uuid.UUID, str, bool, int, str]],
+) -> Dict[uuid.UUID, QuestionKey]:
+    """
+    Monta o gabarito de cada questão a partir das linhas de ``Answer``.
+
+    Args:
+        rows: Tuplas ``(answer_id, question_id, question_type, is_correct,
+            order, text)``
+
+    Returns:
+        Dicionário ``question_id -> QuestionKey``
+    """
+    grouped: Dict[uuid.UUID, List[Tuple]] = {}
+    types: Dict[uuid.UUID, str] = {}
+    for answer_id, question_id, question_type, is_correct, order, text in rows:
+        grouped.setdefault(question_id, []).append(
+            (answer_id, is_correct, order, text)
+        )
+        types[question_id] = question_type
+
+    keys: Dict[uuid.UUID, QuestionKey] = {}
+    for question_id, answers in grouped.items():
+        ordered = sorted(answers, key=lambda a: (a[2], str(a[0])))
+
+        groups: Dict[int, set] = {}
+        for answer_id, _is_correct, order, _text in answers:
+            groups.setdefault(order, set()).add(answer_id)
+
+        keys[question_id] = QuestionKey(
+            question_type=types[question_id],
+            correct_ids=frozenset(a[0] for a in answers if a[1]),
+            ordering=tuple(a[0] for a in ordered),
+            matching=frozenset(frozenset(ids) for ids in groups.values()),
+            accepted_texts=frozenset(
+                normalize_text(a[3]) for a in answers if a[1]
+            ),
+        )
+    return keys
+
+
+def load_answer_key(
+    quiz_id: uuid.UUID, using: str = DEFAULT_DB_ALIAS
+) -> Dict[uuid.UUID, QuestionKey]:
+    """
+    Carrega o gabarito completo de um quiz em uma única consulta.
+
+    Args:
+        quiz_id: ID do quiz
+        using: Alias do banco de dados
+
+    Returns:
+        Dicionário ``question_id -> QuestionKey``
+    """
+    from .models import Answer
+
+    rows = (
+        Answer.objects.using(using)
+        .filter(question__quiz_id=quiz_id)
+        .values_list(
+            "id",
+            "question_id",
+            "question__question_type",
+            "is_correct",
+            "order",
+            "text",
+        )
+        .order_by()
+    )
+    return build_question_keys(rows)
+
+
+def _parse_id_list(raw: str) -> Optional[List[uuid.UUID]]:
+    """Converte uma lista JSON de IDs; retorna None se o formato for inválido."""
+    try:
+        values = json.loads(raw)
+        if not isinstance(values, list):
+            return None
+        return [uuid.UUID(str(value)) for value in values]
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_pairs(raw: str) -> Optional[List[FrozenSet[uuid.UUID]]]:
+    """Converte uma lista JSON de pares de IDs; None se o formato for inválido."""
+    try:
+        values = json.loads(raw)
+        if not isinstance(values, list):
+            return None
+        pairs = []
+        for pair in values:
+            if not isinstance(pair, (list, tuple)) or len(pair) < 2:
+                return None
+            pairs.append(frozenset(uuid.UUID(str(item)) for item in pair))
+        return pairs
+    except (TypeError, ValueError):
+        return None
+
+
+def grade_response(
+    question_type: str,
+    key: Optional[QuestionKey],
+    selected_ids: FrozenSet[uuid.UUID],
+    text_response: str = "",
+) -> Optional[bool]:
+    """
+    Corrige uma resposta em memória a partir do gabarito da questão.
+
+    Args:
+        question_type: Tipo da questão respondida
+        key: Gabarito da questão (None se a questão não tiver respostas)
+        selected_ids: IDs das respostas selecionadas pelo aluno
+        text_response: Resposta em texto do aluno
+
+    Returns:
+        True/False para questões corrigidas automaticamente, ou None quando a
+        questão depende de correção manual
+    """
+    if question_type in MANUAL_GRADING_TYPES:
+        return None
+
+    if key is None:
+        return False
+
+    if question_type == "multiple_choice":
+        return bool(key.correct_ids) and selected_ids == key.correct_ids
+
+    if question_type == "true_false":
+        return len(selected_ids) == 1 and selected_ids <= key.correct_ids
+
+    if question_type == "ordering":
+        sequence = _parse_id_list(text_response or "")
+        return bool(key.ordering) and sequence == list(key.ordering)
+
+    if question_type == "matching":
+        pairs = _parse_pairs(text_response or "")
+        if not pairs or not key.matching:
+            return False
+        return len(pairs) == len(key.matching) and set(pairs) == key.matching
+
+    if question_type == "fill_in":
+        return (
+            bool(text_response)
+            and normalize_text(text_response) in key.accepted_texts
+        )
+
+    return False
+
+
+def grade_attempt(attempt, using: str = DEFAULT_DB_ALIAS) -> GradingResult:
+    """
+    Corrige todas as respostas de uma tentativa com consultas em lote.
+
+    Args:
+        attempt: Instância de ``QuizAttempt`` a ser corrigida
+        using: Alias do banco de dados
+
+    Returns:
+        GradingResult com totais e o número de consultas emitidas
+    """
+    return grade_attempts([attempt.pk], using=using)
+
+
+def grade_attempts(
+    attempt_ids: Iterable[uuid.UUID], using: str = DEFAULT_DB_ALIAS
+) -> GradingResult:
+    """
+    Corrige as respostas de várias tentativas de uma só vez.
+
+    Usa as mesmas consultas de ``grade_attempt`` para o lote inteiro; apenas
+    o carregamento de gabaritos fora do cache cresce com o número de
+    quizzes distintos do lote.
+
+    Args:
+        attempt_ids: IDs das tentativas a corrigir
+        using: Alias do banco de dados
+
+    Returns:
+        GradingResult com totais e o número de consultas emitidas
+    """
+    from .answer_keys import answer_key_cache
+    from .models import QuestionResponse
+
+    attempt_ids = list(attempt_ids)
+    result = GradingResult()
+    if not attempt_ids:
+        return result
+
+    with QueryCounter(using) as counter:
+        responses = list(
+            QuestionResponse.objects.using(using)
+            .filter(attempt_id__in=attempt_ids)
+            .only("id", "question_id", "text_response", "is_correct")
+            .annotate(
+                question_type=F("question__question_type"),
+                quiz_id=F("attempt__quiz_id"),
+                quiz_version=F("attempt__quiz__content_version"),
+            )
+            .order_by()
+        )
+
+        keys: Dict[uuid.UUID, Mapping[uuid.UUID, QuestionKey]] = {}
+        selected: Dict[uuid.UUID, set] = {}
+        if responses:
+            for response in responses:
+                if response.quiz_id not in keys:
+                    keys[response.quiz_id] = answer_key_cache.get(
+                        response.quiz_id,
+                        response.quiz_version,
+                        lambda quiz_id: load_answer_key(quiz_id, using=using),
+                    )
+
+            through = QuestionResponse.selected_answers.through
+            for response_id, answer_id in (
+                through.objects.using(using)
+                .filter(questionresponse__attempt_id__in=attempt_ids)
+                .values_list("questionresponse_id", "answer_id")
+            ):
+                selected.setdefault(response_id, set()).add(answer_id)
+
+        changed = []
+        for response in responses:
+            is_correct = grade_response(
+                response.question_type,
+                keys[response.quiz_id].get(response.question_id),
+                frozenset(selected.get(response.pk, ())),
+                response.text_response,
+            )
+            if is_correct is None:
+                result.skipped += 1
+                continue
+
+            result.graded += 1
+            result.correct += int(is_correct)
+            result.results[response.pk] = is_correct
+            if response.is_correct != is_correct:
+                response.is_correct = is_correct
+                changed.append(response)
+
+        if changed:
+            QuestionResponse.objects.using(using).bulk_update(
+                changed, ["is_correct"]
+            )
+        result.updated = len(changed)
+
+    result.queries = counter.count
+    return result
+
+
+def score_attempt(attempt, using: str = DEFAULT_DB_ALIAS) -> AttemptScore:
+    """
+    Calcula pontos obtidos, pontuação máxima e percentual em uma consulta.
+
+    Percorre as questões do quiz com um LEFT JOIN nas respostas da tentativa
+    (``FilteredRelation``) e agrega tudo no mesmo SELECT. A pontuação
+    considera apenas respostas com ``is_correct=True`` (ou seja, já
+    corrigidas), de modo que uma única opção correta em uma questão de
+    múltipla escolha não conta como acerto.
+
+    Args:
+        attempt: Instância de ``QuizAttempt``
+        using: Alias do banco de dados
+
+    Returns:
+        AttemptScore com os valores calculados
+    """
+    from .models import Question
+
+    decimal = DecimalField(max_digits=12, decimal_places=4)
+    max_points = Sum("points")
+    earned = Sum("points", filter=Q(attempt_response__is_correct=True))
+
+    row = (
+        Question.objects.using(using)
+        .filter(quiz_id=attempt.quiz_id)
+        .alias(
+            attempt_response=FilteredRelation(
+                "responses",
+                condition=Q(responses__attempt_id=attempt.pk),
+            )
+        )
+        .order_by()
+        .aggregate(
+            earned_points=Coalesce(earned, 0),
+            max_points=Coalesce(max_points, 0),
+            percentage=Coalesce(
+                Round(
+                    Cast(earned, decimal) * Value(100) / NullIf(max_points, 0),
+                    2,
+                ),
+                Value(Decimal("0")),
+                output_field=decimal,
+            ),
+        )
+    )
+
+    return AttemptScore(
+        earned=row["earned_points"],
+        max_points=row["max_points"],
+        percentage=Decimal(row["percentage"]).quantize(Decimal("0.01")),
+    )
+
+
+def attempt_score_expressions() -> Dict[str, object]:
+    """
+    Expressões para pontuar tentativas diretamente em um ``UPDATE``.
+
+    Usadas em operações em lote sobre ``QuizAttempt`` (por exemplo,
+    ``QuizAttempt.objects.filter(...).update(**attempt_score_expressions())``),
+    com as mesmas regras de ``score_attempt``.
+
+    Returns:
+        Dicionário com as expressões de ``score`` e ``score_percentage``
+    """
+    from .models import Question, QuestionResponse
+
+    decimal = DecimalField(max_digits=12, decimal_places=4)
+    earned = Coalesce(
+        Subquery(
+            QuestionResponse.objects.filter(
+                attempt=OuterRef("pk"), is_correct=True
+            )
+            .order_by()
+            .values("attempt")
+            .annotate(total=Sum("question__points"))
+            .values("total")
+        ),
+        0,
+    )
+    max_points = Subquery(
+        Question.objects.filter(quiz=OuterRef("quiz_id"))
+        .order_by()
+        .values("quiz")
+        .annotate(total=Sum("points"))
+        .values("total")
+    )
+    return {
+        "score": earned,
+        "score_percentage": Coalesce(
+            Round(
+                Cast(earned, decimal) * Value(100) / NullIf(max_points, 0),
+                2,
+            ),
+            Value(Decimal("0")),
+            output_field=decimal,
+        ),
+    }
@@ -0,0 +1,173 @@
+"""
+Benchmark da paginação por chave (``core.pagination.KeysetPagination``).
+
+Cria ``--rows`` tentativas de quiz temporárias (descartadas ao final via
+rollback), percorre a listagem inteira seguindo os links ``next`` e compara
+o tempo de páginas em várias profundidades com o da paginação por
+``OFFSET`` (mais o ``COUNT(*)`` que ``PageNumberPagination`` faz a cada
+página). Também compara ``COUNT(*)`` com a estimativa usada em
+``?count=1``.
+
+Uso:
+    python manage.py benchmark_pagination --rows 1000000
+"""
+import time
+import uuid
+from urllib.parse import parse_qs, urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from core.pagination import KeysetPagination, estimate_count
+from courses.models import Course
+from quizzes.models import Quiz, QuizAttempt
+
+
+class _Rollback(Exception):
+    """Usada para descartar os dados do benchmark."""
+
+
+class _View:
+    ordering = ("-created_at", "id")
+
+
+class Command(BaseCommand):
+    help = (
+        "Percorre uma listagem de tentativas com paginação por chave e "
+        "compara com OFFSET/COUNT (os dados criados são descartados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=1_000_000,
+            help="Número de tentativas criadas",
+        )
+        parser.add_argument(
+            "--page-size",
+            type=int,
+            default=100,
+            help="Registros por página",
+        )
+
+    def handle(self, *args, **options):
+        rows = options["rows"]
+        page_size = options["page_size"]
+        try:
+            with transaction.atomic():
+                quiz = self._create_fixtures(rows)
+                queryset = QuizAttempt.objects.filter(quiz=quiz)
+                self._run(queryset, rows, page_size)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _create_fixtures(self, rows):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create(
+            username=f"bench-teacher-{suffix}", user_type="teacher"
+        )
+        student = User.objects.create(
+            username=f"bench-student-{suffix}", user_type="student"
+        )
+        course = Course.objects.create(
+            title="Benchmark",
+            slug=f"benchmark-{suffix}",
+            description="Curso temporário de benchmark",
+            created_by=owner,
+        )
+        quiz = Quiz.objects.create(
+            title="Benchmark",
+            description="Quiz temporário de benchmark",
+            course=course,
+            created_by=owner,
+        )
+        template = QuizAttempt.objects.create(student=student, quiz=quiz)
+
+        # Copia a linha modelo com novos ids e datas decrescentes
+        columns = [
+            field.column
+            for field in QuizAttempt._meta.concrete_fields
+            if field.column not in ("id", "created_at")
+        ]
+        table = QuizAttempt._meta.db_table
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {table} (id, created_at, {', '.join(columns)}) "
+                f"SELECT gen_random_uuid(), "
+                f"t.created_at - g * interval '1 second', "
+                f"{', '.join(f't.{column}' for column in columns)} "
+                f"FROM {table} AS t, generate_series(1, %s) AS g "
+                f"WHERE t.id = %s",
+                [rows - 1, template.pk],
+            )
+            cursor.execute(f"ANALYZE {table}")
+        self.stdout.write(
+            f"{rows} tentativas criadas em "
+            f"{time.perf_counter() - started:.1f}s"
+        )
+        return quiz
+
+    def _run(self, queryset, rows, page_size):
+        factory = APIRequestFactory()
+        paginator = KeysetPagination()
+        url = f"/bench/?page_size={page_size}"
+        checkpoints = {1, 10, 100, 1000}
+        checkpoints |= {rows // (page_size * 2), rows // page_size}
+        keyset_ms = {}
+
+        pages = 0
+        started = time.perf_counter()
+        while url:
+            request = Request(factory.get(url))
+            page_started = time.perf_counter()
+            paginator.paginate_queryset(queryset, request, view=_View)
+            elapsed = (time.perf_counter() - page_started) * 1000
+            pages += 1
+            if pages in checkpoints:
+                keyset_ms[pages] = elapsed
+            url = paginator.get_next_link()
+            if url:
+                parts = urlsplit(url)
+                cursor = parse_qs(parts.query)["cursor"][0]
+                url = f"/bench/?page_size={page_size}&cursor={cursor}"
+        total = time.perf_counter() - started
+        self.stdout.write(
+            f"Percurso completo: {pages} páginas em {total:.1f}s "
+            f"({total * 1000 / pages:.2f} ms por página)"
+        )
+
+        ordered = queryset.order_by("-created_at", "id")
+        self.stdout.write(
+            f"{'página':>8} {'linha':>9} {'keyset (ms)':>12} "
+            f"{'OFFSET (ms)':>12} {'OFFSET+COUNT (ms)':>18}"
+        )
+        for page in sorted(keyset_ms):
+            offset = (page - 1) * page_size
+            started = time.perf_counter()
+            list(ordered[offset:offset + page_size])
+            offset_ms = (time.perf_counter() - started) * 1000
+            started = time.perf_counter()
+            queryset.count()
+            count_ms = (time.perf_counter() - started) * 1000
+            self.stdout.write(
+                f"{page:>8} {offset + 1:>9} {keyset_ms[page]:>12.2f} "
+                f"{offset_ms:>12.2f} {offset_ms + count_ms:>18.2f}"
+            )
+
+        started = time.perf_counter()
+        exact = queryset.count()
+        count_ms = (time.perf_counter() - started) * 1000
+        started = time.perf_counter()
+        estimated = estimate_count(queryset)
+        estimate_ms = (time.perf_counter() - started) * 1000
+        self.stdout.write(
+            f"COUNT(*): {exact} em {count_ms:.1f} ms; "
+            f"estimativa: {estimated} em {estimate_ms:.1f} ms"
+        )
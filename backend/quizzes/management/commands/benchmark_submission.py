@@ -0,0 +1,146 @@
+"""
+Benchmark do envio em lote de folhas de respostas.
+
+Cria dados temporários (descartados ao final via rollback), envia uma folha
+de respostas completa para quizzes de tamanhos diferentes e mostra o número
+de consultas e o tempo de cada envio. O número de consultas deve ser o
+mesmo para todos os tamanhos.
+
+Uso:
+    python manage.py benchmark_submission --sizes 10,50,100,200
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from core.instrumentation import QueryCounter
+from courses.models import Course
+from quizzes.answer_keys import answer_key_cache
+from quizzes.models import Answer, Question, Quiz, QuizAttempt
+from quizzes.services import ResponseInput, submit_attempt
+
+
+class _Rollback(Exception):
+    """Usada para descartar os dados do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede consultas e tempo do envio em lote de respostas para quizzes "
+        "de tamanhos diferentes (os dados criados são descartados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default="10,50,100,200",
+            help="Quantidades de questões, separadas por vírgula",
+        )
+        parser.add_argument(
+            "--answers",
+            type=int,
+            default=4,
+            help="Opções de resposta por questão",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",")]
+        except ValueError:
+            raise CommandError("--sizes deve ser uma lista de inteiros.")
+
+        results = []
+        try:
+            with transaction.atomic():
+                owner, student, course = self._create_fixtures()
+                for size in sizes:
+                    results.append(
+                        self._run(size, options["answers"], owner, student, course)
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(
+            f"{'questões':>10} {'consultas':>10} {'frio (ms)':>10} "
+            f"{'quente (ms)':>12}"
+        )
+        for size, queries, cold_ms, warm_ms in results:
+            self.stdout.write(
+                f"{size:>10} {queries:>10} {cold_ms:>10.1f} {warm_ms:>12.1f}"
+            )
+
+        if len({row[1] for row in results}) == 1:
+            self.stdout.write(
+                self.style.SUCCESS("Número de consultas constante.")
+            )
+        else:
+            self.stdout.write(
+                self.style.WARNING("Número de consultas variou com o tamanho.")
+            )
+
+    def _create_fixtures(self):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        owner = User.objects.create(
+            username=f"bench-teacher-{suffix}", user_type="teacher"
+        )
+        student = User.objects.create(
+            username=f"bench-student-{suffix}", user_type="student"
+        )
+        course = Course.objects.create(
+            title="Benchmark",
+            slug=f"benchmark-{suffix}",
+            description="Curso temporário de benchmark",
+            created_by=owner,
+        )
+        return owner, student, course
+
+    def _run(self, size, answers_per_question, owner, student, course):
+        quiz = Quiz.objects.create(
+            title=f"Benchmark {size}",
+            description="Quiz temporário de benchmark",
+            course=course,
+            created_by=owner,
+        )
+        questions = Question.objects.bulk_create(
+            Question(quiz=quiz, text=f"Questão {i}", order=i)
+            for i in range(size)
+        )
+        answers = Answer.objects.bulk_create(
+            Answer(
+                question=question,
+                text=f"Opção {j}",
+                is_correct=(j == 0),
+                order=j,
+            )
+            for question in questions
+            for j in range(answers_per_question)
+        )
+        sheet = [
+            ResponseInput(
+                question_id=question.pk,
+                selected_answer_ids=frozenset(
+                    {answers[i * answers_per_question].pk}
+                ),
+            )
+            for i, question in enumerate(questions)
+        ]
+
+        timings = []
+        queries = 0
+        for warm in (False, True):
+            if not warm:
+                answer_key_cache.invalidate(quiz.pk)
+            attempt = QuizAttempt.objects.create(student=student, quiz=quiz)
+            started = time.perf_counter()
+            with QueryCounter() as counter:
+                submit_attempt(attempt.pk, student.pk, sheet)
+            timings.append((time.perf_counter() - started) * 1000)
+            if not warm:
+                queries = counter.count
+
+        return size, queries, timings[0], timings[1]
@@ -0,0 +1,96 @@
+"""
+Encerra tentativas de quiz cujo tempo limite expirou.
+
+Pode ser executado periodicamente (cron) ou como processo contínuo:
+
+    python manage.py timeout_quiz_attempts --batch-size 500
+    python manage.py timeout_quiz_attempts --dry-run
+    python manage.py timeout_quiz_attempts --loop --interval 60
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quizzes.services import timeout_expired_attempts
+
+
+class Command(BaseCommand):
+    help = (
+        "Corrige e marca como 'timed_out' as tentativas em andamento cujo "
+        "tempo limite do quiz expirou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Número máximo de tentativas por lote (padrão: 500)",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Número máximo de lotes por execução",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Apenas mostra quantas tentativas seriam encerradas",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Executa continuamente, aguardando --interval entre ciclos",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="Segundos entre ciclos no modo --loop (padrão: 60)",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size deve ser positivo.")
+
+        try:
+            while True:
+                self._sweep(options)
+                if not options["loop"]:
+                    break
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Interrompido.")
+
+    def _sweep(self, options):
+        total = 0
+        started = time.perf_counter()
+        for number, batch in enumerate(
+            timeout_expired_attempts(
+                batch_size=options["batch_size"],
+                dry_run=options["dry_run"],
+                max_batches=options["max_batches"],
+            ),
+            start=1,
+        ):
+            if options["dry_run"]:
+                total += len(batch.attempt_ids)
+                self.stdout.write(
+                    f"Lote {number}: {len(batch.attempt_ids)} tentativas "
+                    "seriam encerradas"
+                )
+            else:
+                total += batch.timed_out
+                self.stdout.write(
+                    f"Lote {number}: {batch.timed_out} tentativas encerradas, "
+                    f"{batch.graded_responses} respostas corrigidas"
+                )
+
+        elapsed = time.perf_counter() - started
+        verb = "seriam encerradas" if options["dry_run"] else "encerradas"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{total} tentativas {verb} em {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,44 @@
+# Generated by Django 5.1.6 on 2026-10-17 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0003_auto_20250328_1508'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='question_count',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='total de questões'
+            ),
+        ),
+        migrations.AddField(
+            model_name='quiz',
+            name='max_points',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='pontuação máxima'
+            ),
+        ),
+        # Preenche as estatísticas dos quizzes existentes em um único UPDATE
+        migrations.RunSQL(
+            sql="""
+                UPDATE quizzes
+                SET question_count = stats.total,
+                    max_points = stats.points
+                FROM (
+                    SELECT quiz_id,
+                           COUNT(*) AS total,
+                           COALESCE(SUM(points), 0) AS points
+                    FROM questions
+                    GROUP BY quiz_id
+                ) AS stats
+                WHERE quizzes.id = stats.quiz_id;
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.6 on 2026-10-17 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quizzes', '0004_quiz_question_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quiz',
+            name='content_version',
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name='versão do conteúdo'
+            ),
+        ),
+    ]
@@ -0,0 +1,75 @@
+# Generated by Django 5.1.6 on 2026-10-17 12:00
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Troca o ``default`` das chaves primárias para ``core.ids.default_pk``.
+
+    O default é aplicado apenas no Python: a migração não altera dados nem
+    a estrutura das tabelas.
+    """
+
+    dependencies = [
+        ('quizzes', '0005_quiz_content_version'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='quiz',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='question',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='answer',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='quizattempt',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='questionresponse',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.6 on 2026-10-17 13:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Índices que seguem a ordenação da paginação por chave."""
+
+    atomic = False
+
+    dependencies = [
+        ('quizzes', '0006_default_pk'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='quizattempt',
+            index=models.Index(
+                fields=['-created_at', 'id'],
+                name='idx_attempt_created_id',
+            ),
+        ),
+    ]
@@ -5,21 +5,27 @@ Otimizado para uso com Supabase como banco de dados.
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
-from typing import Optional
 
 from core.base_models import (
+    DatabaseManagedFieldsMixin,
     SupabaseBaseModel, 
-    RelatedObjectCache,
     safe_get_related_str_field
 )
+from core.identity_map import get_related
 from courses.models import Lesson, Course
 
 
-class Quiz(SupabaseBaseModel):
+class Quiz(DatabaseManagedFieldsMixin, SupabaseBaseModel):
     """
     Modelo representando um quiz/teste que contém questões.
+
+    As estatísticas de questões e a versão do conteúdo são mantidas pelo
+    banco e nunca são regravadas por ``save()``: apenas o UPDATE de
+    ``bump_content_version`` avança ``content_version``.
     """
 
+    db_managed_fields = ("question_count", "max_points", "content_version")
+
     title = models.CharField(_("título"), max_length=200)
     description = models.TextField(_("descrição"))
 
@@ -59,17 +65,25 @@ class Quiz(SupabaseBaseModel):
         related_name="quizzes_created",
         verbose_name=_("criado por"),
     )
-    
-    # Cache de objetos relacionados
-    _course_cache: Optional[RelatedObjectCache[Course]] = None
-    _lesson_cache: Optional[RelatedObjectCache[Lesson]] = None
-    _created_by_cache: Optional[RelatedObjectCache] = None
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._course_cache = RelatedObjectCache(Course)
-        self._lesson_cache = RelatedObjectCache(Lesson)
-        self._created_by_cache = RelatedObjectCache(models.Model)
+
+    # Estatísticas desnormalizadas (mantidas por sinais em Question)
+    question_count = models.PositiveIntegerField(
+        _("total de questões"),
+        default=0,
+        editable=False,
+    )
+    max_points = models.PositiveIntegerField(
+        _("pontuação máxima"),
+        default=0,
+        editable=False,
+    )
+
+    # Versão do conteúdo (questões/respostas), usada pelo cache de gabaritos
+    content_version = models.PositiveIntegerField(
+        _("versão do conteúdo"),
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         verbose_name = _("Quiz")
@@ -88,13 +102,72 @@ class Quiz(SupabaseBaseModel):
 
     @property
     def total_questions(self) -> int:
-        """Retorna o número total de questões no quiz."""
-        return self.questions.count()
+        """Retorna o número total de questões no quiz (valor desnormalizado)."""
+        return self.question_count
 
     @property
     def max_score(self) -> int:
-        """Retorna a pontuação máxima possível no quiz."""
-        return sum(question.points for question in self.questions.all())
+        """Retorna a pontuação máxima possível no quiz (valor desnormalizado)."""
+        return self.max_points
+
+    @classmethod
+    def refresh_question_stats(cls, *quiz_ids) -> int:
+        """
+        Recalcula ``question_count`` e ``max_points`` com um único UPDATE.
+
+        Chamado pelos sinais de ``Question``; deve ser chamado manualmente
+        após operações em lote que não disparam sinais (``bulk_create``,
+        ``QuerySet.update``).
+
+        Args:
+            quiz_ids: IDs dos quizzes a recalcular; sem argumentos recalcula
+                todos os quizzes
+
+        Returns:
+            int: Número de quizzes atualizados
+        """
+        from django.db.models import Count, OuterRef, Subquery, Sum
+        from django.db.models.functions import Coalesce
+
+        stats = Question.objects.filter(quiz=OuterRef("pk")).order_by()
+        stats = stats.values("quiz")
+        queryset = cls.objects.all()
+        if quiz_ids:
+            queryset = queryset.filter(pk__in=[pk for pk in quiz_ids if pk])
+
+        return queryset.update(
+            question_count=Coalesce(
+                Subquery(stats.annotate(total=Count("pk")).values("total")),
+                0,
+            ),
+            max_points=Coalesce(
+                Subquery(stats.annotate(total=Sum("points")).values("total")),
+                0,
+            ),
+        )
+
+    @classmethod
+    def bump_content_version(cls, *quiz_ids) -> int:
+        """
+        Incrementa ``content_version`` dos quizzes informados.
+
+        Invalida, em todos os processos, os gabaritos mantidos pelo cache
+        ``quizzes.answer_keys``.
+
+        Args:
+            quiz_ids: IDs dos quizzes cujo conteúdo foi alterado
+
+        Returns:
+            int: Número de quizzes atualizados
+        """
+        from django.db.models import F
+
+        ids = [pk for pk in quiz_ids if pk]
+        if not ids:
+            return 0
+        return cls.objects.filter(pk__in=ids).update(
+            content_version=F("content_version") + 1
+        )
 
 
 class Question(SupabaseBaseModel):
@@ -148,13 +221,11 @@ class Question(SupabaseBaseModel):
 
     # Ordem no quiz
     order = models.PositiveIntegerField(_("ordem"))
-    
-    # Cache de objetos relacionados
-    _quiz_cache: Optional[RelatedObjectCache[Quiz]] = None
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._quiz_cache = RelatedObjectCache(Quiz)
+        # Quiz original, para invalidar as estatísticas ao mover a questão
+        self._original_quiz_id = self.__dict__.get("quiz_id")
 
     class Meta:
         verbose_name = _("Questão")
@@ -169,7 +240,7 @@ class Question(SupabaseBaseModel):
 
     def __str__(self) -> str:
         """Representação em string da questão."""
-        quiz = self._quiz_cache.get(self, "quiz")
+        quiz = get_related(self, "quiz")
         quiz_title = safe_get_related_str_field(
             quiz, 
             "title", 
@@ -216,13 +287,11 @@ class Answer(SupabaseBaseModel):
         blank=True,
         help_text=_("Explicação mostrada quando esta resposta é selecionada"),
     )
-    
-    # Cache de objetos relacionados
-    _question_cache: Optional[RelatedObjectCache[Question]] = None
-    
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._question_cache = RelatedObjectCache(Question)
+        # Questão original, para invalidar o gabarito ao mover a resposta
+        self._original_question_id = self.__dict__.get("question_id")
 
     class Meta:
         verbose_name = _("Resposta")
@@ -236,7 +305,7 @@ class Answer(SupabaseBaseModel):
 
     def __str__(self) -> str:
         """Representação em string da resposta."""
-        question = self._question_cache.get(self, "question")
+        question = get_related(self, "question")
         question_text = ""
         if question:
             question_text = f"Questão {question.order}"
@@ -307,15 +376,6 @@ class QuizAttempt(SupabaseBaseModel):
             "Endereço IP usado durante a tentativa"
         )
     )
-    
-    # Cache de objetos relacionados
-    _student_cache: Optional[RelatedObjectCache] = None
-    _quiz_cache: Optional[RelatedObjectCache[Quiz]] = None
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._student_cache = RelatedObjectCache(models.Model)
-        self._quiz_cache = RelatedObjectCache(Quiz)
 
     class Meta:
         verbose_name = _("Tentativa de Quiz")
@@ -325,14 +385,18 @@ class QuizAttempt(SupabaseBaseModel):
             models.Index(fields=["student"], name="idx_attempt_student"),
             models.Index(fields=["quiz"], name="idx_attempt_quiz"),
             models.Index(fields=["status"], name="idx_attempt_status"),
-            models.Index(fields=["created_at"], name="idx_attempt_date")
+            models.Index(fields=["created_at"], name="idx_attempt_date"),
+            # Paginação por chave (core.pagination)
+            models.Index(
+                fields=["-created_at", "id"], name="idx_attempt_created_id"
+            ),
         ]
         db_table = "quiz_attempts"
 
     def __str__(self) -> str:
         """Representação em string da tentativa de quiz."""
-        student = self._student_cache.get(self, "student")
-        quiz = self._quiz_cache.get(self, "quiz")
+        student = get_related(self, "student")
+        quiz = get_related(self, "quiz")
         
         student_name = ""
         if student and hasattr(student, 'get_full_name'):
@@ -351,43 +415,37 @@ class QuizAttempt(SupabaseBaseModel):
     @property
     def passed(self) -> bool:
         """Verifica se o aluno passou no quiz conforme a nota mínima definida."""
-        quiz = self._quiz_cache.get(self, "quiz")
+        quiz = get_related(self, "quiz")
         if not quiz:
             return False
             
         return self.score_percentage >= quiz.passing_score
         
+    def grade_responses(self):
+        """
+        Corrige todas as respostas da tentativa em lote.
+
+        Returns:
+            GradingResult: Totais da correção e número de consultas emitidas.
+        """
+        from .grading import grade_attempt
+
+        return grade_attempt(self)
+
     def calculate_score(self) -> None:
         """
         Calcula a pontuação e percentual de acertos da tentativa.
         
-        Deve ser chamado quando todas as respostas foram registradas.
+        Deve ser chamado quando todas as respostas foram corrigidas
+        (ver ``grade_responses``). Pontos obtidos, pontuação máxima e
+        percentual são calculados em uma única consulta a partir de
+        ``QuestionResponse.is_correct``.
         """
-        from django.db.models import Sum
-        
-        # Recupera todas as respostas corretas do aluno
-        correct_responses = self.responses.filter(
-            selected_answers__is_correct=True
-        ).distinct()
-        
-        # Calcula a pontuação total das questões respondidas corretamente
-        points = correct_responses.aggregate(
-            total=Sum('question__points')
-        )['total'] or 0
-        
-        # Recupera a pontuação máxima possível
-        quiz = self._quiz_cache.get(self, "quiz")
-        max_points = quiz.max_score if quiz else 0
-        
-        # Atualiza a pontuação
-        self.score = points
-        
-        # Calcula o percentual de acerto
-        if max_points > 0:
-            self.score_percentage = (points / max_points) * 100
-        else:
-            self.score_percentage = 0
-            
+        from .grading import score_attempt
+
+        score = score_attempt(self)
+        self.score = score.earned
+        self.score_percentage = score.percentage
         self.save(update_fields=['score', 'score_percentage'])
 
 
@@ -449,15 +507,6 @@ class QuestionResponse(SupabaseBaseModel):
             "Tempo que o aluno levou para responder em segundos"
         )
     )
-    
-    # Cache de objetos relacionados
-    _attempt_cache: Optional[RelatedObjectCache[QuizAttempt]] = None
-    _question_cache: Optional[RelatedObjectCache[Question]] = None
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._attempt_cache = RelatedObjectCache(QuizAttempt)
-        self._question_cache = RelatedObjectCache(Question)
 
     class Meta:
         verbose_name = _("Resposta a Questão")
@@ -472,8 +521,8 @@ class QuestionResponse(SupabaseBaseModel):
 
     def __str__(self) -> str:
         """Representação em string da resposta do aluno."""
-        attempt = self._attempt_cache.get(self, "attempt")
-        question = self._question_cache.get(self, "question")
+        attempt = get_related(self, "attempt")
+        question = get_related(self, "question")
         
         student_name = ""
         if attempt and hasattr(attempt.student, 'get_full_name'):
@@ -490,37 +539,47 @@ class QuestionResponse(SupabaseBaseModel):
     def check_correctness(self) -> bool:
         """
         Verifica se a resposta está correta e atualiza o status.
-        
+
+        Usa as mesmas regras do motor de correção em lote
+        (``quizzes.grading``). Para corrigir uma tentativa inteira prefira
+        ``QuizAttempt.grade_responses``, que usa um número constante de
+        consultas.
+
         Returns:
             bool: True se a resposta estiver correta, False caso contrário.
         """
-        question = self._question_cache.get(self, "question")
+        from .grading import build_question_keys, grade_response
+
+        question = get_related(self, "question")
         if not question:
             self.is_correct = False
             self.save(update_fields=['is_correct'])
             return False
-            
-        # Verificação baseada no tipo de questão
-        is_correct = False
-        
-        if question.question_type == "multiple_choice":
-            # Todas as respostas selecionadas devem ser corretas e todas as
-            # respostas corretas devem ser selecionadas
-            selected_answers = set(self.selected_answers.all())
-            correct_answers = set(Answer.objects.filter(
-                question=question, is_correct=True
-            ))
-            
-            is_correct = selected_answers == correct_answers
-        
-        elif question.question_type == "true_false":
-            # Apenas uma resposta deve ser selecionada e deve ser a correta
-            selected = self.selected_answers.first()
-            is_correct = selected and selected.is_correct
-            
-        # Outras verificações para outros tipos de perguntas
-        # ...
-        
+
+        keys = build_question_keys(
+            question.answers.order_by().values_list(
+                "id",
+                "question_id",
+                "question__question_type",
+                "is_correct",
+                "order",
+                "text",
+            )
+        )
+        selected_ids = frozenset(
+            self.selected_answers.values_list("id", flat=True)
+        )
+        is_correct = grade_response(
+            question.question_type,
+            keys.get(question.pk),
+            selected_ids,
+            self.text_response,
+        )
+
+        # Questões de correção manual mantêm a avaliação do professor
+        if is_correct is None:
+            return self.is_correct
+
         self.is_correct = is_correct
         self.save(update_fields=['is_correct'])
         return is_correct
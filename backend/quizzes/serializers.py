@@ -0,0 +1,80 @@
+"""
+Serializers do app quizzes.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework import serializers
+
+from .models import QuizAttempt
+from .services import ResponseInput
+
+
+class ResponseItemSerializer(serializers.Serializer):
+    """Resposta do aluno a uma questão dentro da folha de respostas."""
+
+    question = serializers.UUIDField()
+    selected_answers = serializers.ListField(
+        child=serializers.UUIDField(), required=False, default=list
+    )
+    text_response = serializers.CharField(
+        required=False, allow_blank=True, default=""
+    )
+    video_response_url = serializers.URLField(
+        required=False, allow_blank=True, default="", max_length=500
+    )
+    response_time = serializers.IntegerField(
+        required=False, min_value=0, default=0
+    )
+
+    def to_response_input(self, data: dict) -> ResponseInput:
+        """Converte os dados validados para o formato do serviço."""
+        return ResponseInput(
+            question_id=data["question"],
+            selected_answer_ids=frozenset(data["selected_answers"]),
+            text_response=data["text_response"],
+            video_response_url=data["video_response_url"],
+            response_time=data["response_time"],
+        )
+
+
+class AttemptSubmissionSerializer(serializers.Serializer):
+    """Folha de respostas completa de uma tentativa."""
+
+    responses = ResponseItemSerializer(many=True, allow_empty=False)
+
+    def validate_responses(self, value):
+        questions = [item["question"] for item in value]
+        if len(questions) != len(set(questions)):
+            raise serializers.ValidationError(
+                _("Cada questão deve ser respondida apenas uma vez.")
+            )
+        return value
+
+    def to_response_inputs(self):
+        """Retorna as respostas validadas como ``ResponseInput``."""
+        item_serializer = ResponseItemSerializer()
+        return [
+            item_serializer.to_response_input(item)
+            for item in self.validated_data["responses"]
+        ]
+
+
+class QuizAttemptResultSerializer(serializers.ModelSerializer):
+    """Resultado de uma tentativa após o envio das respostas."""
+
+    passed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = QuizAttempt
+        fields = [
+            "id",
+            "quiz",
+            "status",
+            "score",
+            "score_percentage",
+            "passed",
+            "completed_at",
+        ]
+        read_only_fields = fields
+
+    def get_passed(self, obj: QuizAttempt) -> bool:
+        return obj.passed
@@ -0,0 +1,381 @@
+"""
+Serviços do app quizzes.
+
+Concentram as operações de escrita que envolvem vários modelos, para que as
+views permaneçam finas e o número de consultas seja previsível.
+"""
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, FrozenSet, Iterator, List, Optional, Sequence, Tuple
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import DateTimeField, ExpressionWrapper, F, Q, Value
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+
+from .answer_keys import answer_key_cache
+from .grading import (
+    AttemptScore,
+    attempt_score_expressions,
+    grade_attempts,
+    grade_response,
+    load_answer_key,
+    score_attempt,
+)
+from .models import Question, QuestionResponse, QuizAttempt
+
+# Tolerância após o prazo do quiz para envios já em trânsito; o
+# encerramento automático (``expired_attempts_queryset``) espera o mesmo
+# intervalo
+SUBMISSION_GRACE = timedelta(seconds=30)
+
+
+@dataclass(frozen=True)
+class ResponseInput:
+    """
+    Resposta enviada pelo aluno para uma questão.
+
+    Para questões de ordenação e associação, ``text_response`` contém a
+    lista JSON descrita em ``quizzes.grading``.
+    """
+
+    question_id: uuid.UUID
+    selected_answer_ids: FrozenSet[uuid.UUID] = frozenset()
+    text_response: str = ""
+    video_response_url: str = ""
+    response_time: int = 0
+
+
+@dataclass
+class SubmissionResult:
+    """Resultado do envio de uma folha de respostas."""
+
+    attempt: QuizAttempt
+    score: AttemptScore
+    correct: int
+    responses: int
+
+
+def submit_attempt(
+    attempt_id: uuid.UUID,
+    student_id: uuid.UUID,
+    responses: Sequence[ResponseInput],
+    ip_address: Optional[str] = None,
+) -> SubmissionResult:
+    """
+    Registra, corrige e pontua a folha de respostas completa de uma tentativa.
+
+    Tudo acontece em uma única transação e com um número constante de
+    consultas, independentemente do número de questões:
+
+    1. bloqueio da tentativa (``SELECT ... FOR UPDATE``) junto com o quiz;
+    2. questões do quiz (validação);
+    3. gabarito, apenas se não estiver no cache em processo;
+    4. remoção das seleções anteriores da tentativa;
+    5. ``bulk_create`` das ``QuestionResponse`` (upsert por questão), já
+       corrigidas em memória;
+    6. ``bulk_create`` das linhas da tabela intermediária
+       ``selected_answers``;
+    7. cálculo da pontuação (ver ``grading.score_attempt``);
+    8. atualização da tentativa para ``completed``.
+
+    Envios após o tempo limite do quiz (``created_at + time_limit``, mais
+    ``SUBMISSION_GRACE``) são recusados, mas as respostas válidas ficam
+    gravadas sem correção: a transação é confirmada antes do erro e o
+    ``timeout_expired_attempts`` corrige essas respostas ao encerrar a
+    tentativa como ``timed_out``.
+
+    Args:
+        attempt_id: ID da tentativa
+        student_id: ID do aluno dono da tentativa
+        responses: Respostas enviadas, no máximo uma por questão
+        ip_address: Endereço IP do aluno, registrado se ainda não houver
+
+    Returns:
+        SubmissionResult com a tentativa atualizada e a pontuação
+
+    Raises:
+        QuizAttempt.DoesNotExist: Se a tentativa não pertencer ao aluno
+        ValidationError: Se a tentativa não estiver em andamento, se o
+            tempo limite do quiz tiver expirado (as respostas são mantidas)
+            ou se as respostas não corresponderem às questões do quiz
+    """
+    with transaction.atomic():
+        attempt = (
+            QuizAttempt.objects.select_for_update(of=("self",))
+            .select_related("quiz")
+            .get(pk=attempt_id, student_id=student_id)
+        )
+        if attempt.status != "in_progress":
+            raise ValidationError(
+                _("Esta tentativa não está mais em andamento.")
+            )
+        deadline = attempt_deadline(attempt)
+        expired = deadline is not None and timezone.now() > deadline
+
+        question_types: Dict[uuid.UUID, str] = dict(
+            Question.objects.filter(quiz_id=attempt.quiz_id)
+            .order_by()
+            .values_list("id", "question_type")
+        )
+        keys = answer_key_cache.get(
+            attempt.quiz_id, attempt.quiz.content_version, load_answer_key
+        )
+
+        _validate_responses(responses, question_types, keys)
+
+        rows: List[QuestionResponse] = []
+        correct = 0
+        for item in responses:
+            if expired:
+                # Corrigida pelo ``timeout_expired_attempts``
+                is_correct = False
+            else:
+                is_correct = grade_response(
+                    question_types[item.question_id],
+                    keys.get(item.question_id),
+                    item.selected_answer_ids,
+                    item.text_response,
+                )
+            correct += int(bool(is_correct))
+            rows.append(
+                QuestionResponse(
+                    attempt_id=attempt.pk,
+                    question_id=item.question_id,
+                    text_response=item.text_response,
+                    video_response_url=item.video_response_url,
+                    response_time=item.response_time,
+                    is_correct=bool(is_correct),
+                )
+            )
+
+        through = QuestionResponse.selected_answers.through
+        through.objects.filter(
+            questionresponse__attempt_id=attempt.pk
+        ).delete()
+
+        rows = QuestionResponse.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=["attempt", "question"],
+            update_fields=[
+                "text_response",
+                "video_response_url",
+                "response_time",
+                "is_correct",
+                "updated_at",
+            ],
+        )
+
+        links = [
+            through(questionresponse_id=row.pk, answer_id=answer_id)
+            for row, item in zip(rows, responses)
+            for answer_id in item.selected_answer_ids
+        ]
+        if links:
+            through.objects.bulk_create(links)
+
+        if not expired:
+            score = score_attempt(attempt)
+            attempt.score = score.earned
+            attempt.score_percentage = score.percentage
+            attempt.status = "completed"
+            attempt.completed_at = timezone.now()
+            update_fields = [
+                "score",
+                "score_percentage",
+                "status",
+                "completed_at",
+                "updated_at",
+            ]
+            if ip_address and not attempt.ip_address:
+                attempt.ip_address = ip_address
+                update_fields.append("ip_address")
+            attempt.save(update_fields=update_fields)
+
+    if expired:
+        # Fora do bloco atômico: as respostas gravadas acima são mantidas
+        raise ValidationError(_("O tempo limite deste quiz expirou."))
+
+    return SubmissionResult(
+        attempt=attempt,
+        score=score,
+        correct=correct,
+        responses=len(rows),
+    )
+
+
+def attempt_deadline(attempt: QuizAttempt) -> Optional[datetime]:
+    """
+    Último instante em que a tentativa ainda aceita envio.
+
+    Args:
+        attempt: Tentativa com o quiz carregado
+
+    Returns:
+        ``created_at + time_limit + SUBMISSION_GRACE``, ou None se o quiz
+        não tiver tempo limite
+    """
+    if not attempt.quiz.time_limit:
+        return None
+    return (
+        attempt.created_at
+        + timedelta(minutes=attempt.quiz.time_limit)
+        + SUBMISSION_GRACE
+    )
+
+
+def _validate_responses(
+    responses: Sequence[ResponseInput],
+    question_types: Dict[uuid.UUID, str],
+    keys,
+) -> None:
+    """
+    Garante que as respostas pertencem ao quiz da tentativa.
+
+    Raises:
+        ValidationError: Com a lista de problemas encontrados
+    """
+    errors = []
+    seen = set()
+    for item in responses:
+        if item.question_id in seen:
+            errors.append(
+                _("Questão {0} respondida mais de uma vez.").format(
+                    item.question_id
+                )
+            )
+            continue
+        seen.add(item.question_id)
+
+        if item.question_id not in question_types:
+            errors.append(
+                _("Questão {0} não pertence a este quiz.").format(
+                    item.question_id
+                )
+            )
+            continue
+
+        key = keys.get(item.question_id)
+        valid_answers = frozenset(key.ordering) if key else frozenset()
+        if not item.selected_answer_ids <= valid_answers:
+            errors.append(
+                _("Respostas inválidas para a questão {0}.").format(
+                    item.question_id
+                )
+            )
+
+    if errors:
+        raise ValidationError(errors)
+
+
+@dataclass
+class TimeoutBatch:
+    """Resultado do processamento de um lote de tentativas expiradas."""
+
+    attempt_ids: List[uuid.UUID] = field(default_factory=list)
+    graded_responses: int = 0
+    timed_out: int = 0
+
+
+def expired_attempts_queryset(now: Optional[datetime] = None):
+    """
+    Tentativas em andamento cujo prazo (``created_at + time_limit``, mais
+    ``SUBMISSION_GRACE``) expirou.
+
+    O filtro ``status = 'in_progress'`` usa ``idx_attempt_status`` e o limite
+    superior em ``created_at`` (ao menos um minuto atrás, o menor
+    ``time_limit`` possível) permite o uso de ``idx_attempt_date``; o prazo
+    exato de cada quiz é verificado na mesma consulta.
+
+    Args:
+        now: Instante de referência (padrão: agora)
+    """
+    now = now or timezone.now()
+    deadline = ExpressionWrapper(
+        F("created_at") + F("quiz__time_limit") * Value(timedelta(minutes=1)),
+        output_field=DateTimeField(),
+    )
+    return (
+        QuizAttempt.objects.filter(
+            status="in_progress",
+            created_at__lt=now - timedelta(minutes=1),
+            quiz__time_limit__gt=0,
+        )
+        .alias(deadline=deadline)
+        .filter(deadline__lt=now - SUBMISSION_GRACE)
+        .order_by("created_at", "id")
+    )
+
+
+def timeout_expired_attempts(
+    batch_size: int = 500,
+    dry_run: bool = False,
+    now: Optional[datetime] = None,
+    max_batches: Optional[int] = None,
+) -> Iterator[TimeoutBatch]:
+    """
+    Encerra, em lotes, as tentativas cujo tempo limite expirou.
+
+    Para cada lote (em sua própria transação):
+
+    1. seleciona até ``batch_size`` tentativas expiradas, bloqueando-as com
+       ``SKIP LOCKED`` para não disputar com envios em andamento;
+    2. corrige as respostas já enviadas (``grading.grade_attempts``);
+    3. pontua e marca as tentativas como ``timed_out`` em um único UPDATE.
+
+    O percurso usa paginação por chave ``(created_at, id)``, portanto
+    funciona também em modo de simulação, quando nada é alterado.
+
+    Args:
+        batch_size: Número máximo de tentativas por lote
+        dry_run: Apenas lista as tentativas que seriam encerradas
+        now: Instante de referência (padrão: agora)
+        max_batches: Limite opcional de lotes processados
+
+    Yields:
+        TimeoutBatch para cada lote processado
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size deve ser positivo")
+
+    now = now or timezone.now()
+    cursor: Optional[Tuple[datetime, uuid.UUID]] = None
+    batches = 0
+
+    while max_batches is None or batches < max_batches:
+        with transaction.atomic():
+            queryset = expired_attempts_queryset(now)
+            if cursor is not None:
+                queryset = queryset.filter(
+                    Q(created_at__gt=cursor[0])
+                    | Q(created_at=cursor[0], id__gt=cursor[1])
+                )
+            if not dry_run:
+                queryset = queryset.select_for_update(
+                    skip_locked=True, of=("self",)
+                )
+            rows = list(queryset.values_list("id", "created_at")[:batch_size])
+            if not rows:
+                return
+
+            batch = TimeoutBatch(attempt_ids=[row[0] for row in rows])
+            cursor = (rows[-1][1], rows[-1][0])
+
+            if not dry_run:
+                batch.graded_responses = grade_attempts(
+                    batch.attempt_ids
+                ).graded
+                batch.timed_out = QuizAttempt.objects.filter(
+                    pk__in=batch.attempt_ids, status="in_progress"
+                ).update(
+                    status="timed_out",
+                    completed_at=now,
+                    updated_at=now,
+                    **attempt_score_expressions(),
+                )
+
+        batches += 1
+        yield batch
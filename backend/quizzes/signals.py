@@ -0,0 +1,60 @@
+"""
+Sinais do app quizzes.
+
+Mantêm as estatísticas desnormalizadas de ``Quiz`` (``question_count`` e
+``max_points``) atualizadas quando questões são criadas, alteradas ou
+removidas, e incrementam ``Quiz.content_version`` sempre que questões ou
+respostas mudam, invalidando o cache de gabaritos (``answer_keys``).
+"""
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .answer_keys import answer_key_cache
+from .models import Answer, Question, Quiz
+
+
+def _invalidate_quizzes(*quiz_ids) -> None:
+    """Incrementa a versão do conteúdo e descarta o gabarito local."""
+    Quiz.bump_content_version(*quiz_ids)
+    for quiz_id in quiz_ids:
+        if quiz_id:
+            answer_key_cache.invalidate(quiz_id)
+
+
+def _invalidate_questions(*question_ids) -> None:
+    """Incrementa a versão dos quizzes das questões em um único UPDATE."""
+    ids = [pk for pk in question_ids if pk]
+    if ids:
+        Quiz.objects.filter(questions__pk__in=ids).update(
+            content_version=F("content_version") + 1
+        )
+
+
+@receiver(post_save, sender=Question, dispatch_uid="quiz_stats_on_save")
+def refresh_quiz_stats_on_save(sender, instance: Question, **kwargs) -> None:
+    """Recalcula as estatísticas do quiz da questão (e do anterior, se mudou)."""
+    quiz_ids = {instance.quiz_id, instance._original_quiz_id}
+    Quiz.refresh_question_stats(*quiz_ids)
+    _invalidate_quizzes(*quiz_ids)
+    instance._original_quiz_id = instance.quiz_id
+
+
+@receiver(post_delete, sender=Question, dispatch_uid="quiz_stats_on_delete")
+def refresh_quiz_stats_on_delete(sender, instance: Question, **kwargs) -> None:
+    """Recalcula as estatísticas do quiz após a remoção de uma questão."""
+    Quiz.refresh_question_stats(instance.quiz_id)
+    _invalidate_quizzes(instance.quiz_id)
+
+
+@receiver(post_save, sender=Answer, dispatch_uid="answer_key_on_save")
+def invalidate_answer_key_on_save(sender, instance: Answer, **kwargs) -> None:
+    """Invalida o gabarito do quiz ao criar ou alterar uma resposta."""
+    _invalidate_questions(instance.question_id, instance._original_question_id)
+    instance._original_question_id = instance.question_id
+
+
+@receiver(post_delete, sender=Answer, dispatch_uid="answer_key_on_delete")
+def invalidate_answer_key_on_delete(sender, instance: Answer, **kwargs) -> None:
+    """Invalida o gabarito do quiz após a remoção de uma resposta."""
+    _invalidate_questions(instance.question_id)
@@ -1,3 +1,515 @@
-from django.test import TestCase
+import datetime
+import json
+import uuid
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from courses.models import Course
+from users.models import User
+
+from .answer_keys import AnswerKeyCache, answer_key_cache, get_answer_key
+from .grading import (
+    build_question_keys,
+    grade_attempt,
+    grade_attempts,
+    grade_response,
+    score_attempt,
+)
+from .models import Answer, Question, QuestionResponse, Quiz, QuizAttempt
+from .services import (
+    ResponseInput,
+    expired_attempts_queryset,
+    submit_attempt,
+    timeout_expired_attempts,
+)
+
+
+class QuizManagedFieldsTests(TestCase):
+    """Campos do quiz mantidos pelo banco não são regravados por save()."""
+
+    def setUp(self):
+        self.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=self.teacher,
+        )
+        self.quiz = Quiz.objects.create(
+            title="Quiz", description="-", course=course,
+            created_by=self.teacher,
+        )
+
+    def test_stale_save_keeps_stats_and_version(self):
+        stale = Quiz.objects.get(pk=self.quiz.pk)
+        Question.objects.create(
+            quiz=self.quiz, text="Pergunta", points=3, order=1
+        )
+
+        stale.title = "Quiz editado"
+        stale.save()
+
+        self.quiz.refresh_from_db()
+        self.assertEqual(self.quiz.title, "Quiz editado")
+        self.assertEqual(self.quiz.question_count, 1)
+        self.assertEqual(self.quiz.max_points, 3)
+        self.assertEqual(self.quiz.content_version, 1)
+
+
+class SubmitAttemptTimeLimitTests(TestCase):
+    """Envios após o tempo limite do quiz são recusados."""
+
+    def setUp(self):
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.student = User.objects.create(
+            username="aluno", email="aluno@example.com"
+        )
+        course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=teacher,
+        )
+        self.quiz = Quiz.objects.create(
+            title="Quiz", description="-", course=course,
+            created_by=teacher, time_limit=10,
+        )
+        self.question = Question.objects.create(
+            quiz=self.quiz, text="Pergunta", points=2, order=1
+        )
+        self.answer = Answer.objects.create(
+            question=self.question, text="Certa", is_correct=True, order=1
+        )
+
+    def _attempt(self, minutes_ago):
+        return QuizAttempt.objects.create(
+            student=self.student, quiz=self.quiz,
+            created_at=timezone.now() - datetime.timedelta(
+                minutes=minutes_ago
+            ),
+        )
+
+    def test_submission_within_time_limit_is_graded(self):
+        attempt = self._attempt(minutes_ago=5)
+        result = submit_attempt(attempt.pk, self.student.pk, [])
+        self.assertEqual(result.attempt.status, "completed")
+
+    def test_late_submission_is_rejected_but_keeps_responses(self):
+        attempt = self._attempt(minutes_ago=11)
+        responses = [
+            ResponseInput(
+                question_id=self.question.pk,
+                selected_answer_ids=frozenset({self.answer.pk}),
+            )
+        ]
+        with self.assertRaises(ValidationError):
+            submit_attempt(attempt.pk, self.student.pk, responses)
+
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, "in_progress")
+        response = QuestionResponse.objects.get(attempt=attempt)
+        self.assertFalse(response.is_correct)
+        self.assertEqual(
+            list(response.selected_answers.all()), [self.answer]
+        )
+
+        # O encerramento automático corrige as respostas mantidas
+        list(timeout_expired_attempts())
+        attempt.refresh_from_db()
+        self.assertEqual(attempt.status, "timed_out")
+        self.assertEqual(attempt.score, 2)
+
+
+class GradingQueryCountTests(TestCase):
+    """A correção em lote emite as mesmas consultas para qualquer quiz."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        cls.student = User.objects.create(
+            username="aluno", email="aluno@example.com"
+        )
+        cls.course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=cls.teacher,
+        )
+
+    def setUp(self):
+        answer_key_cache.clear()
+
+    def _attempt(self, questions):
+        """Tentativa com ``questions`` questões, metade respondida certo."""
+        quiz = Quiz.objects.create(
+            title=f"Quiz {questions}", description="-", course=self.course,
+            created_by=self.teacher,
+        )
+        attempt = QuizAttempt.objects.create(student=self.student, quiz=quiz)
+        for order in range(questions):
+            question = Question.objects.create(
+                quiz=quiz, text="Pergunta", points=1, order=order
+            )
+            right = Answer.objects.create(
+                question=question, text="Certa", is_correct=True, order=1
+            )
+            wrong = Answer.objects.create(
+                question=question, text="Errada", order=2
+            )
+            response = QuestionResponse.objects.create(
+                attempt=attempt, question=question
+            )
+            response.selected_answers.add(
+                right if order % 2 == 0 else wrong
+            )
+        return attempt
+
+    def test_query_count_does_not_grow_with_questions(self):
+        few = self._attempt(5)
+        many = self._attempt(50)
+
+        with self.assertNumQueries(4):
+            few_result = grade_attempt(few)
+        with self.assertNumQueries(4):
+            many_result = grade_attempt(many)
+
+        self.assertEqual(few_result.queries, many_result.queries)
+        self.assertEqual((few_result.graded, few_result.correct), (5, 3))
+        self.assertEqual((many_result.graded, many_result.correct), (50, 25))
+
+    def test_cached_answer_key_skips_its_query(self):
+        attempt = self._attempt(5)
+        grade_attempt(attempt)
+        with self.assertNumQueries(2):
+            # Nada muda: sem gabarito (cache) e sem bulk_update
+            result = grade_attempt(attempt)
+        self.assertEqual(result.updated, 0)
+
+    def test_batch_grading_uses_the_same_queries(self):
+        attempts = [self._attempt(5), self._attempt(20)]
+        result = grade_attempts([attempt.pk for attempt in attempts])
+        # Respostas, seleções, um gabarito por quiz e o bulk_update
+        self.assertEqual(result.queries, 5)
+        self.assertEqual(result.graded, 25)
+
+    def test_score_attempt_is_one_query(self):
+        few = self._attempt(5)
+        many = self._attempt(50)
+        grade_attempts([few.pk, many.pk])
+
+        with self.assertNumQueries(1):
+            score = score_attempt(few)
+        self.assertEqual((score.earned, score.max_points), (3, 5))
+        self.assertEqual(str(score.percentage), "60.00")
+        with self.assertNumQueries(1):
+            score = score_attempt(many)
+        self.assertEqual((score.earned, score.max_points), (25, 50))
+
+
+class GradeResponseTests(SimpleTestCase):
+    """Correção em memória de cada tipo de questão."""
+
+    def setUp(self):
+        self.a, self.b, self.c, self.d = (uuid.uuid4() for _ in range(4))
+
+    def _key(self, question_type, answers):
+        """Gabarito a partir de tuplas ``(id, is_correct, order, text)``."""
+        question_id = uuid.uuid4()
+        rows = [
+            (answer_id, question_id, question_type, is_correct, order, text)
+            for answer_id, is_correct, order, text in answers
+        ]
+        return build_question_keys(rows)[question_id]
+
+    def test_multiple_choice_requires_exact_set(self):
+        key = self._key(
+            "multiple_choice",
+            [(self.a, True, 1, ""), (self.b, True, 2, ""),
+             (self.c, False, 3, "")],
+        )
+        for selected, expected in (
+            ({self.a, self.b}, True),
+            ({self.a}, False),
+            ({self.a, self.b, self.c}, False),
+        ):
+            self.assertIs(
+                grade_response("multiple_choice", key, frozenset(selected)),
+                expected,
+            )
+
+    def test_true_false_requires_one_correct_answer(self):
+        key = self._key(
+            "true_false", [(self.a, True, 1, ""), (self.b, False, 2, "")]
+        )
+        self.assertTrue(
+            grade_response("true_false", key, frozenset({self.a}))
+        )
+        self.assertFalse(
+            grade_response("true_false", key, frozenset({self.a, self.b}))
+        )
+        self.assertFalse(grade_response("true_false", key, frozenset()))
+
+    def test_ordering_compares_sequence(self):
+        key = self._key(
+            "ordering",
+            [(self.b, False, 2, ""), (self.a, False, 1, ""),
+             (self.c, False, 3, "")],
+        )
+        right = json.dumps([str(self.a), str(self.b), str(self.c)])
+        wrong = json.dumps([str(self.b), str(self.a), str(self.c)])
+        self.assertTrue(grade_response("ordering", key, frozenset(), right))
+        self.assertFalse(grade_response("ordering", key, frozenset(), wrong))
+        self.assertFalse(
+            grade_response("ordering", key, frozenset(), "não é JSON")
+        )
+
+    def test_matching_compares_pairs(self):
+        key = self._key(
+            "matching",
+            [(self.a, False, 1, ""), (self.b, False, 1, ""),
+             (self.c, False, 2, ""), (self.d, False, 2, "")],
+        )
+        right = json.dumps(
+            [[str(self.b), str(self.a)], [str(self.c), str(self.d)]]
+        )
+        wrong = json.dumps(
+            [[str(self.a), str(self.c)], [str(self.b), str(self.d)]]
+        )
+        self.assertTrue(grade_response("matching", key, frozenset(), right))
+        self.assertFalse(grade_response("matching", key, frozenset(), wrong))
+        self.assertFalse(
+            grade_response("matching", key, frozenset(), json.dumps([]))
+        )
+
+    def test_fill_in_normalizes_text(self):
+        key = self._key(
+            "fill_in",
+            [(self.a, True, 1, "Bom  Dia"), (self.b, False, 2, "Boa noite")],
+        )
+        self.assertTrue(
+            grade_response("fill_in", key, frozenset(), "  bom dia ")
+        )
+        self.assertFalse(
+            grade_response("fill_in", key, frozenset(), "boa noite")
+        )
+        self.assertFalse(grade_response("fill_in", key, frozenset(), ""))
+
+    def test_video_response_is_graded_manually(self):
+        self.assertIsNone(
+            grade_response("video_response", None, frozenset(), "")
+        )
+
+    def test_question_without_answers_is_wrong(self):
+        self.assertFalse(
+            grade_response("multiple_choice", None, frozenset({self.a}))
+        )
+
+
+class AnswerKeyCacheTests(SimpleTestCase):
+    """Cache LRU de gabaritos indexado por ``(quiz, versão)``."""
+
+    def setUp(self):
+        self.loads = []
+
+    def _loader(self, quiz_id):
+        self.loads.append(quiz_id)
+        return {quiz_id: f"gabarito {len(self.loads)}"}
+
+    def test_same_version_is_loaded_once(self):
+        cache = AnswerKeyCache(maxsize=4)
+        quiz = uuid.uuid4()
+
+        first = cache.get(quiz, 1, self._loader)
+        second = cache.get(quiz, 1, self._loader)
+
+        self.assertIs(first, second)
+        self.assertEqual(self.loads, [quiz])
+        self.assertEqual(
+            cache.stats(), {"hits": 1, "misses": 1, "size": 1, "maxsize": 4}
+        )
+        with self.assertRaises(TypeError):
+            first[quiz] = "alterado"
+
+    def test_new_version_replaces_the_old_one(self):
+        cache = AnswerKeyCache(maxsize=4)
+        quiz = uuid.uuid4()
+
+        cache.get(quiz, 1, self._loader)
+        key = cache.get(quiz, 2, self._loader)
+
+        self.assertEqual(key[quiz], "gabarito 2")
+        self.assertEqual(cache.stats()["size"], 1)
+
+    def test_least_recently_used_quiz_is_evicted(self):
+        cache = AnswerKeyCache(maxsize=2)
+        a, b, c = (uuid.uuid4() for _ in range(3))
+
+        cache.get(a, 1, self._loader)
+        cache.get(b, 1, self._loader)
+        cache.get(a, 1, self._loader)
+        cache.get(c, 1, self._loader)
+        cache.get(a, 1, self._loader)
+        cache.get(b, 1, self._loader)
+
+        self.assertEqual(self.loads, [a, b, c, b])
+
+    def test_invalidate_and_disabled_cache(self):
+        cache = AnswerKeyCache(maxsize=4)
+        quiz = uuid.uuid4()
+        cache.get(quiz, 1, self._loader)
+        cache.invalidate(quiz)
+        cache.get(quiz, 1, self._loader)
+
+        disabled = AnswerKeyCache(maxsize=0)
+        disabled.get(quiz, 1, self._loader)
+        disabled.get(quiz, 1, self._loader)
+
+        self.assertEqual(len(self.loads), 4)
+        self.assertEqual(disabled.stats()["size"], 0)
+
+
+class AnswerKeyVersionTests(TestCase):
+    """Alterações de questões e respostas avançam a versão do gabarito."""
+
+    def setUp(self):
+        answer_key_cache.clear()
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=teacher,
+        )
+        self.quiz = Quiz.objects.create(
+            title="Quiz", description="-", course=course, created_by=teacher,
+        )
+        self.question = Question.objects.create(
+            quiz=self.quiz, text="Pergunta", points=1, order=1
+        )
+        self.right = Answer.objects.create(
+            question=self.question, text="Certa", is_correct=True, order=1
+        )
+        self.wrong = Answer.objects.create(
+            question=self.question, text="Errada", order=2
+        )
+
+    def _key(self):
+        self.quiz.refresh_from_db(fields=["content_version"])
+        return get_answer_key(self.quiz.pk, self.quiz.content_version)[
+            self.question.pk
+        ]
+
+    def test_answer_change_is_seen_without_clearing_the_cache(self):
+        self.assertEqual(self._key().correct_ids, {self.right.pk})
+        version = self.quiz.content_version
+
+        self.wrong.is_correct = True
+        self.wrong.save()
+
+        self.assertEqual(
+            self._key().correct_ids, {self.right.pk, self.wrong.pk}
+        )
+        self.assertEqual(self.quiz.content_version, version + 1)
+        self.assertEqual(answer_key_cache.stats()["misses"], 2)
+
+
+class TimeoutExpiredAttemptsTests(TestCase):
+    """Encerramento em lote das tentativas com tempo limite expirado."""
+
+    def setUp(self):
+        answer_key_cache.clear()
+        teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.student = User.objects.create(
+            username="aluno", email="aluno@example.com"
+        )
+        self.course = Course.objects.create(
+            title="Curso", slug="curso", description="-",
+            created_by=teacher,
+        )
+        self.quiz = Quiz.objects.create(
+            title="Quiz", description="-", course=self.course,
+            created_by=teacher, time_limit=10,
+        )
+        self.untimed = Quiz.objects.create(
+            title="Sem limite", description="-", course=self.course,
+            created_by=teacher,
+        )
+        self.question = Question.objects.create(
+            quiz=self.quiz, text="Pergunta", points=4, order=1
+        )
+        self.answer = Answer.objects.create(
+            question=self.question, text="Certa", is_correct=True, order=1
+        )
+        self.now = timezone.now()
+
+    def _attempt(self, minutes_ago, quiz=None, status="in_progress"):
+        return QuizAttempt.objects.create(
+            student=self.student, quiz=quiz or self.quiz, status=status,
+            created_at=self.now - datetime.timedelta(minutes=minutes_ago),
+        )
+
+    def test_expired_attempts_are_graded_and_timed_out(self):
+        expired = self._attempt(minutes_ago=20)
+        response = QuestionResponse.objects.create(
+            attempt=expired, question=self.question
+        )
+        response.selected_answers.add(self.answer)
+        running = self._attempt(minutes_ago=5)
+        untimed = self._attempt(minutes_ago=600, quiz=self.untimed)
+        finished = self._attempt(minutes_ago=30, status="completed")
+
+        batches = list(timeout_expired_attempts(now=self.now))
+
+        self.assertEqual([b.attempt_ids for b in batches], [[expired.pk]])
+        self.assertEqual(batches[0].graded_responses, 1)
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, "timed_out")
+        self.assertEqual(expired.score, 4)
+        self.assertEqual(str(expired.score_percentage), "100.00")
+        for attempt, status in (
+            (running, "in_progress"),
+            (untimed, "in_progress"),
+            (finished, "completed"),
+        ):
+            attempt.refresh_from_db()
+            self.assertEqual(attempt.status, status)
+
+    def test_grace_period_delays_the_timeout(self):
+        attempt = self._attempt(minutes_ago=10)
+        self.assertFalse(
+            expired_attempts_queryset(self.now).filter(pk=attempt.pk).exists()
+        )
+        later = self.now + datetime.timedelta(minutes=1)
+        self.assertTrue(
+            expired_attempts_queryset(later).filter(pk=attempt.pk).exists()
+        )
+
+    def test_batches_and_dry_run(self):
+        attempts = [self._attempt(minutes_ago=20 + n) for n in range(5)]
+
+        preview = list(
+            timeout_expired_attempts(batch_size=2, dry_run=True, now=self.now)
+        )
+        self.assertEqual([len(b.attempt_ids) for b in preview], [2, 2, 1])
+        self.assertFalse(
+            QuizAttempt.objects.filter(
+                pk__in=[a.pk for a in attempts], status="timed_out"
+            ).exists()
+        )
+
+        batches = list(timeout_expired_attempts(batch_size=2, now=self.now))
+        self.assertEqual(sum(b.timed_out for b in batches), 5)
+        # Mais antigas primeiro (paginação por created_at, id)
+        self.assertEqual(
+            [pk for b in batches for pk in b.attempt_ids],
+            [a.pk for a in reversed(attempts)],
+        )
@@ -0,0 +1,16 @@
+"""
+Rotas da API do app quizzes.
+"""
+from django.urls import path
+
+from .views import AttemptSubmitView
+
+app_name = "quizzes"
+
+urlpatterns = [
+    path(
+        "attempts/<uuid:pk>/submit/",
+        AttemptSubmitView.as_view(),
+        name="attempt-submit",
+    ),
+]
@@ -1,3 +1,48 @@
-from django.shortcuts import render
+"""
+Views da API do app quizzes.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.http import Http404
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from .models import QuizAttempt
+from .serializers import AttemptSubmissionSerializer, QuizAttemptResultSerializer
+from .services import submit_attempt
+
+
+class AttemptSubmitView(APIView):
+    """
+    Recebe a folha de respostas completa de uma tentativa.
+
+    Todas as respostas são gravadas, corrigidas e pontuadas em uma única
+    transação, com número constante de consultas.
+    """
+
+    @swagger_auto_schema(
+        request_body=AttemptSubmissionSerializer,
+        responses={200: QuizAttemptResultSerializer},
+    )
+    def post(self, request, pk):
+        serializer = AttemptSubmissionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        try:
+            result = submit_attempt(
+                attempt_id=pk,
+                student_id=request.user.pk,
+                responses=serializer.to_response_inputs(),
+                ip_address=request.META.get("REMOTE_ADDR"),
+            )
+        except QuizAttempt.DoesNotExist:
+            raise Http404
+        except DjangoValidationError as exc:
+            raise ValidationError({"responses": exc.messages})
+
+        data = QuizAttemptResultSerializer(result.attempt).data
+        data["correct_responses"] = result.correct
+        data["max_score"] = result.score.max_points
+        return Response(data, status=status.HTTP_200_OK)
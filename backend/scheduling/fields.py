@@ -0,0 +1,24 @@
+"""
+Campos de modelo do app scheduling.
+"""
+from django.contrib.postgres import forms
+from django.contrib.postgres.fields.ranges import ContinuousRangeField
+from django.db import models
+from django.db.backends.postgresql.psycopg_any import DateTimeRange
+
+
+class LocalDateTimeRangeField(ContinuousRangeField):
+    """
+    Intervalo de data e hora sem fuso (``tsrange``).
+
+    As aulas guardam ``date`` + ``time`` locais; um ``tstzrange`` exigiria
+    converter o fuso, o que não é permitido em colunas geradas (a expressão
+    precisa ser imutável).
+    """
+
+    base_field = models.DateTimeField
+    range_type = DateTimeRange
+    form_field = forms.DateTimeRangeField
+
+    def db_type(self, connection):
+        return "tsrange"
@@ -0,0 +1,264 @@
+"""
+Caixa de entrada de notificações de aula.
+
+O número de não lidas de cada usuário fica em ``NotificationInbox`` e é
+ajustado na mesma transação que altera as notificações:
+
+- criar, ler ou remover uma ``ClassNotification`` pelo ORM aplica +1/-1
+  com um UPDATE na linha do contador (ver ``scheduling.signals``);
+- ``mark_read`` marca todas (ou as indicadas) como lidas com um único
+  UPDATE e desconta o número de linhas alteradas;
+- inserções em lote (``bulk_create``, ver ``scheduling.reminders``)
+  recontam os destinatários afetados com ``refresh_unread_counts``, que usa
+  o índice parcial das não lidas.
+
+``unread_count`` serve o número a partir do cache do Django; cada ajuste
+descarta a entrada após o commit, como em ``courses.tree``. As últimas não
+lidas (``arecent_unread``, usadas no painel do aluno) ficam em cache junto
+e são descartadas nos mesmos pontos.
+"""
+import uuid
+from typing import Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ClassNotification, NotificationInbox
+
+CACHE_KEY_PREFIX = "scheduling:unread"
+RECENT_CACHE_KEY_PREFIX = "scheduling:unread-recent"
+
+# Quantidade de não lidas servidas por ``arecent_unread``
+RECENT_LIMIT = 5
+
+# Campos das últimas não lidas
+RECENT_FIELDS = (
+    "id",
+    "scheduled_class_id",
+    "notification_type",
+    "message",
+    "sent_at",
+)
+
+# Recalcula (e cria, se preciso) o contador de cada usuário a partir das
+# notificações não lidas (índice idx_notification_unread)
+_REFRESH_SQL = """
+INSERT INTO {inbox} (user_id, unread_count, updated_at)
+SELECT u.id, COUNT(n.id), NOW()
+FROM UNNEST(%s::uuid[]) AS u (id)
+LEFT JOIN {notification} AS n
+       ON n.recipient_id = u.id AND NOT n.read
+GROUP BY u.id
+ON CONFLICT (user_id) DO UPDATE
+SET unread_count = EXCLUDED.unread_count,
+    updated_at = EXCLUDED.updated_at
+RETURNING user_id, unread_count
+"""
+
+
+def cache_key(user_id) -> str:
+    """Chave do número de não lidas de um usuário no cache."""
+    return f"{CACHE_KEY_PREFIX}:{user_id}"
+
+
+def recent_cache_key(user_id) -> str:
+    """Chave das últimas não lidas de um usuário no cache."""
+    return f"{RECENT_CACHE_KEY_PREFIX}:{user_id}"
+
+
+def invalidate_unread_count(user_ids: Iterable[uuid.UUID]) -> None:
+    """
+    Descarta do cache o número (e as últimas) não lidas dos usuários
+    informados.
+
+    A remoção acontece após o commit da transação atual, para que uma
+    leitura concorrente não volte a gravar o valor antigo no cache.
+    """
+    keys = []
+    for pk in set(user_ids):
+        if pk is not None:
+            keys += [cache_key(pk), recent_cache_key(pk)]
+    if keys:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def refresh_unread_counts(user_ids: Iterable[uuid.UUID]) -> dict:
+    """
+    Recalcula o contador de não lidas dos usuários informados.
+
+    Args:
+        user_ids: IDs dos usuários
+
+    Returns:
+        Dicionário ``{user_id: não lidas}``
+    """
+    user_ids = list({pk for pk in user_ids if pk is not None})
+    if not user_ids:
+        return {}
+    sql = _REFRESH_SQL.format(
+        inbox=NotificationInbox._meta.db_table,
+        notification=ClassNotification._meta.db_table,
+    )
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, [user_ids])
+        counts = dict(cursor.fetchall())
+        invalidate_unread_count(user_ids)
+    return counts
+
+
+def apply_unread_delta(user_id: uuid.UUID, delta: int) -> None:
+    """
+    Soma ``delta`` no contador de não lidas do usuário.
+
+    Um usuário ainda sem contador tem o valor calculado a partir das
+    notificações (que já incluem a alteração da transação atual). Em um
+    desconto (``delta < 0``) o contador ausente não é criado: ao remover
+    um usuário, a linha do contador é apagada antes das notificações em
+    cascata, e recriá-la violaria a chave estrangeira no commit. O valor é
+    recalculado na próxima leitura.
+
+    Args:
+        user_id: ID do destinatário
+        delta: +1 (não lida criada) ou -1 (lida ou removida)
+    """
+    if not delta or user_id is None:
+        return
+    updated = NotificationInbox.objects.filter(user_id=user_id).update(
+        unread_count=Greatest(F("unread_count") + Value(delta), Value(0)),
+        updated_at=timezone.now(),
+    )
+    if not updated and delta > 0:
+        refresh_unread_counts([user_id])
+        return
+    invalidate_unread_count([user_id])
+
+
+def unread_count(user_id: uuid.UUID) -> int:
+    """
+    Número de notificações não lidas do usuário.
+
+    Em um acerto no cache, nenhuma consulta é feita ao banco; em uma falha,
+    uma leitura pela chave primária do contador.
+
+    Args:
+        user_id: ID do usuário
+
+    Returns:
+        int: Notificações não lidas
+    """
+    key = cache_key(user_id)
+    count = cache.get(key)
+    if count is not None:
+        return count
+
+    count = (
+        NotificationInbox.objects.filter(user_id=user_id)
+        .values_list("unread_count", flat=True)
+        .first()
+    )
+    if count is None:
+        count = refresh_unread_counts([user_id]).get(user_id, 0)
+    cache.set(
+        key,
+        count,
+        getattr(settings, "NOTIFICATION_UNREAD_CACHE_TIMEOUT", 300),
+    )
+    return count
+
+
+async def aunread_count(user_id: uuid.UUID) -> int:
+    """
+    Versão assíncrona de ``unread_count``.
+
+    Sem contador para o usuário, conta as notificações não lidas (índice
+    parcial ``idx_notification_unread``) sem criar o contador, que fica
+    para a próxima escrita síncrona.
+    """
+    key = cache_key(user_id)
+    count = await cache.aget(key)
+    if count is not None:
+        return count
+
+    count = await (
+        NotificationInbox.objects.filter(user_id=user_id)
+        .values_list("unread_count", flat=True)
+        .afirst()
+    )
+    if count is None:
+        count = await ClassNotification.objects.filter(
+            recipient_id=user_id, read=False
+        ).acount()
+    await cache.aset(
+        key,
+        count,
+        getattr(settings, "NOTIFICATION_UNREAD_CACHE_TIMEOUT", 300),
+    )
+    return count
+
+
+async def arecent_unread(user_id: uuid.UUID) -> List[Dict[str, object]]:
+    """
+    Últimas ``RECENT_LIMIT`` notificações não lidas do usuário.
+
+    Em uma falha no cache, uma consulta pelo índice parcial
+    ``idx_notification_unread``.
+
+    Args:
+        user_id: ID do usuário
+
+    Returns:
+        Lista de dicionários com ``RECENT_FIELDS``, das mais recentes
+    """
+    key = recent_cache_key(user_id)
+    rows = await cache.aget(key)
+    if rows is not None:
+        return rows
+
+    rows = [
+        row
+        async for row in ClassNotification.objects.filter(
+            recipient_id=user_id, read=False
+        )
+        .order_by("-sent_at", "id")
+        .values(*RECENT_FIELDS)[:RECENT_LIMIT]
+    ]
+    await cache.aset(
+        key,
+        rows,
+        getattr(settings, "NOTIFICATION_UNREAD_CACHE_TIMEOUT", 300),
+    )
+    return rows
+
+
+def mark_read(
+    user_id: uuid.UUID, notification_ids: Optional[Iterable[uuid.UUID]] = None
+) -> int:
+    """
+    Marca como lidas as notificações do usuário com um único UPDATE.
+
+    Notificações de outros usuários e as já lidas são ignoradas.
+
+    Args:
+        user_id: ID do destinatário
+        notification_ids: Notificações a marcar (padrão: todas)
+
+    Returns:
+        int: Número de notificações marcadas agora
+    """
+    queryset = ClassNotification.objects.filter(
+        recipient_id=user_id, read=False
+    )
+    if notification_ids is not None:
+        notification_ids = list(notification_ids)
+        if not notification_ids:
+            return 0
+        queryset = queryset.filter(pk__in=notification_ids)
+
+    with transaction.atomic():
+        marked = queryset.update(read=True, read_at=timezone.now())
+        apply_unread_delta(user_id, -marked)
+    return marked
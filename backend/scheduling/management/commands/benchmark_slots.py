@@ -0,0 +1,167 @@
+"""
+Benchmark do cálculo de horários livres (``scheduling.slots``).
+
+Cria ``--teachers`` professores temporários (descartados ao final via
+rollback) com janelas semanais de disponibilidade e aulas marcadas em
+parte dos horários, e mede ``free_slots`` para todos os professores no
+período pedido, junto com o número de consultas.
+
+Uso:
+    python manage.py benchmark_slots --teachers 200 --days 28
+"""
+import datetime
+import random
+import statistics
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from scheduling.models import ScheduledClass, TeacherAvailability
+from scheduling.slots import free_slots
+
+# Janelas semanais de cada professor: (dia da semana, início, fim)
+WINDOWS = [
+    (weekday, datetime.time(8), datetime.time(12))
+    for weekday in range(5)
+] + [
+    (weekday, datetime.time(14), datetime.time(18))
+    for weekday in range(5)
+] + [(5, datetime.time(9), datetime.time(12))]
+
+
+class _Rollback(Exception):
+    """Usada para descartar os dados do benchmark."""
+
+
+class Command(BaseCommand):
+    help = (
+        "Mede o cálculo de horários livres de vários professores (os dados "
+        "criados são descartados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--teachers",
+            type=int,
+            default=200,
+            help="Número de professores criados",
+        )
+        parser.add_argument(
+            "--days", type=int, default=28, help="Dias do período"
+        )
+        parser.add_argument(
+            "--length",
+            type=int,
+            default=50,
+            help="Duração dos horários em minutos",
+        )
+        parser.add_argument(
+            "--booked",
+            type=float,
+            default=0.3,
+            help="Fração dos horários já ocupados por aulas",
+        )
+        parser.add_argument(
+            "--repeat", type=int, default=20, help="Execuções medidas"
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                start = timezone.localdate() + datetime.timedelta(days=1)
+                teacher_ids = self._create_fixtures(
+                    options["teachers"],
+                    start,
+                    options["days"],
+                    options["booked"],
+                )
+                self._run(teacher_ids, start, options)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+    def _create_fixtures(self, teachers, start, days, booked):
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        users = User.objects.bulk_create(
+            User(
+                username=f"bench-teacher-{suffix}-{n}",
+                email=f"bench-teacher-{suffix}-{n}@example.com",
+                user_type="teacher",
+            )
+            for n in range(teachers)
+        )
+        student = User.objects.create(
+            username=f"bench-student-{suffix}", user_type="student"
+        )
+        TeacherAvailability.objects.bulk_create(
+            TeacherAvailability(
+                teacher=teacher,
+                weekday=weekday,
+                start_time=window_start,
+                end_time=window_end,
+            )
+            for teacher in users
+            for weekday, window_start, window_end in WINDOWS
+        )
+
+        rng = random.Random(42)
+        classes = []
+        for teacher in users:
+            for n in range(days):
+                day = start + datetime.timedelta(days=n)
+                for weekday, window_start, window_end in WINDOWS:
+                    if weekday != day.weekday():
+                        continue
+                    for hour in range(window_start.hour, window_end.hour):
+                        if rng.random() < booked:
+                            classes.append(
+                                ScheduledClass(
+                                    student=student,
+                                    teacher=teacher,
+                                    date=day,
+                                    start_time=datetime.time(hour),
+                                    end_time=datetime.time(hour, 50),
+                                    status=rng.choice(
+                                        ["scheduled", "confirmed", "cancelled"]
+                                    ),
+                                    topic="Benchmark",
+                                )
+                            )
+        ScheduledClass.objects.bulk_create(classes, batch_size=5000)
+        with connection.cursor() as cursor:
+            for model in (TeacherAvailability, ScheduledClass):
+                cursor.execute(f"ANALYZE {model._meta.db_table}")
+        self.stdout.write(
+            f"{teachers} professores, {len(classes)} aulas criadas"
+        )
+        return [teacher.pk for teacher in users]
+
+    def _run(self, teacher_ids, start, options):
+        kwargs = {
+            "start": start,
+            "days": options["days"],
+            "length": options["length"],
+            "teacher_ids": teacher_ids,
+        }
+        with CaptureQueriesContext(connection) as context:
+            result = free_slots(**kwargs)
+        total = sum(len(slots) for slots in result.values())
+
+        timings = []
+        for _ in range(options["repeat"]):
+            started = time.perf_counter()
+            free_slots(**kwargs)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{total} horários livres de {len(result)} professores com "
+            f"{len(context.captured_queries)} consultas: "
+            f"p50 {statistics.median(timings):.1f} ms, p95 {p95:.1f} ms"
+        )
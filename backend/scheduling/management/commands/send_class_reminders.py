@@ -0,0 +1,93 @@
+"""
+Gera lembretes das aulas que começam em breve.
+
+Pode ser executado periodicamente (cron) ou como processo contínuo:
+
+    python manage.py send_class_reminders
+    python manage.py send_class_reminders --lookahead 30
+    python manage.py send_class_reminders --loop --interval 60
+
+No modo ``--loop``, uma falha em um ciclo (conexão perdida, deadlock) é
+registrada no log e o processo segue para o próximo ciclo; como a geração
+é idempotente, o ciclo seguinte cobre os lembretes que faltaram.
+"""
+import logging
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections
+
+from scheduling.reminders import send_class_reminders
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = (
+        "Cria lembretes (para aluno e professor) das aulas que começam "
+        "dentro da antecedência configurada."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lookahead",
+            type=int,
+            default=settings.CLASS_REMINDER_LOOKAHEAD,
+            help=(
+                "Antecedência em minutos (padrão: "
+                "CLASS_REMINDER_LOOKAHEAD)"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Lembretes inseridos por lote (padrão: 1000)",
+        )
+        parser.add_argument(
+            "--loop",
+            action="store_true",
+            help="Executa continuamente, aguardando --interval entre ciclos",
+        )
+        parser.add_argument(
+            "--interval",
+            type=int,
+            default=60,
+            help="Segundos entre ciclos no modo --loop (padrão: 60)",
+        )
+
+    def handle(self, *args, **options):
+        if options["lookahead"] < 1 or options["batch_size"] < 1:
+            raise CommandError("--lookahead e --batch-size devem ser positivos.")
+
+        try:
+            while True:
+                # Processo de longa duração: descarta conexões expiradas
+                close_old_connections()
+                if not options["loop"]:
+                    self._run(options)
+                    break
+                try:
+                    self._run(options)
+                except Exception:
+                    logger.exception(
+                        "Falha ao gerar lembretes; nova tentativa em %ds",
+                        options["interval"],
+                    )
+                time.sleep(options["interval"])
+        except KeyboardInterrupt:
+            self.stdout.write("Interrompido.")
+
+    def _run(self, options):
+        started = time.perf_counter()
+        run = send_class_reminders(
+            lookahead=options["lookahead"], batch_size=options["batch_size"]
+        )
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{run.classes} aulas, {run.notifications} lembretes "
+                f"novos, {run.duplicates} já existentes ({run.skipped} "
+                f"destinatários sem lembretes) em {elapsed:.2f}s."
+            )
+        )
@@ -0,0 +1,193 @@
+"""
+Teste de carga da marcação de aulas (``scheduling.services.book_class``).
+
+Dispara ``--writers`` threads, cada uma com sua própria conexão, tentando
+marcar aulas em horários sorteados que se sobrepõem. Na primeira fase
+todas disputam o mesmo professor (cada thread com seu aluno); na segunda,
+o mesmo aluno (cada thread com seu professor). Ao final, uma consulta
+independente das restrições procura aulas sobrepostas, que devem ser zero.
+
+Os dados precisam ser gravados de fato (as threads não enxergam uma
+transação aberta) e são removidos ao final.
+
+Uso:
+    python manage.py stress_booking --writers 50 --attempts 20
+"""
+import datetime
+import random
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from scheduling.models import ScheduledClass
+from scheduling.services import CONFLICT_CONSTRAINTS, book_class
+
+CONFLICT_CODES = {
+    constraint.violation_error_code
+    for constraint in CONFLICT_CONSTRAINTS.values()
+}
+
+# Aulas sobrepostas não canceladas, do mesmo professor ou do mesmo aluno
+OVERLAP_SQL = """
+SELECT COUNT(*)
+FROM {table} AS a
+JOIN {table} AS b
+  ON a.{side}_id = b.{side}_id
+ AND a.id < b.id
+ AND a.date = b.date
+ AND a.start_time < b.end_time
+ AND b.start_time < a.end_time
+WHERE a.status <> 'cancelled'
+  AND b.status <> 'cancelled'
+  AND a.{side}_id = ANY(%s)
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Marca aulas concorrentemente e verifica que não há sobreposição "
+        "(os dados criados são removidos ao final)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--writers",
+            type=int,
+            default=50,
+            help="Número de threads concorrentes",
+        )
+        parser.add_argument(
+            "--attempts",
+            type=int,
+            default=20,
+            help="Marcações tentadas por thread em cada fase",
+        )
+        parser.add_argument(
+            "--length", type=int, default=50, help="Duração das aulas"
+        )
+
+    def handle(self, *args, **options):
+        writers = options["writers"]
+        User = get_user_model()
+        suffix = uuid.uuid4().hex[:8]
+        teachers = User.objects.bulk_create(
+            User(
+                username=f"stress-teacher-{suffix}-{n}",
+                email=f"stress-teacher-{suffix}-{n}@example.com",
+                user_type="teacher",
+            )
+            for n in range(writers)
+        )
+        students = User.objects.bulk_create(
+            User(
+                username=f"stress-student-{suffix}-{n}",
+                email=f"stress-student-{suffix}-{n}@example.com",
+                user_type="student",
+            )
+            for n in range(writers)
+        )
+        date = timezone.localdate() + datetime.timedelta(days=7)
+
+        overlaps = 0
+        try:
+            phases = (
+                (
+                    "professor",
+                    "teacher",
+                    teachers[0].pk,
+                    [(student.pk, teachers[0].pk) for student in students],
+                ),
+                (
+                    "aluno",
+                    "student",
+                    students[0].pk,
+                    [(students[0].pk, teacher.pk) for teacher in teachers],
+                ),
+            )
+            for label, side, shared_id, pairs in phases:
+                outcome, elapsed = self._run(pairs, date, options)
+                with connection.cursor() as cursor:
+                    cursor.execute(
+                        OVERLAP_SQL.format(
+                            table=ScheduledClass._meta.db_table, side=side
+                        ),
+                        [[shared_id]],
+                    )
+                    found = cursor.fetchone()[0]
+                overlaps += found
+                self.stdout.write(
+                    f"Mesmo {label}: {sum(outcome.values())} tentativas em "
+                    f"{elapsed:.2f}s, {outcome['created']} marcadas, "
+                    f"{outcome['conflict']} conflitos, "
+                    f"{outcome['error']} erros; "
+                    f"sobreposições: {found}"
+                )
+        finally:
+            User.objects.filter(
+                pk__in=[user.pk for user in teachers + students]
+            ).delete()
+
+        if overlaps:
+            raise CommandError(f"{overlaps} aulas sobrepostas encontradas.")
+        self.stdout.write(self.style.SUCCESS("Nenhuma aula sobreposta."))
+
+    def _run(self, pairs, date, options):
+        length = options["length"]
+        attempts = options["attempts"]
+        barrier = threading.Barrier(len(pairs))
+        outcome = Counter(created=0, conflict=0, error=0)
+        errors = []
+        lock = threading.Lock()
+
+        def writer(seed, student_id, teacher_id):
+            rng = random.Random(seed)
+            results = Counter()
+            try:
+                barrier.wait()
+                for _ in range(attempts):
+                    # Inícios a cada 5 minutos entre 08:00 e 12:00
+                    start = 8 * 60 + rng.randrange(0, 4 * 60, 5)
+                    end = start + length
+                    try:
+                        book_class(
+                            student_id=student_id,
+                            teacher_id=teacher_id,
+                            date=date,
+                            start_time=datetime.time(*divmod(start, 60)),
+                            end_time=datetime.time(*divmod(end, 60)),
+                            topic="Teste de carga",
+                            check_availability=False,
+                        )
+                        results["created"] += 1
+                    except ValidationError as exc:
+                        if getattr(exc, "code", None) in CONFLICT_CODES:
+                            results["conflict"] += 1
+                        else:
+                            results["error"] += 1
+                    except Exception as exc:
+                        results["error"] += 1
+                        errors.append(repr(exc))
+            finally:
+                connection.close()
+                with lock:
+                    outcome.update(results)
+
+        threads = [
+            threading.Thread(target=writer, args=(n, student_id, teacher_id))
+            for n, (student_id, teacher_id) in enumerate(pairs)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for message, count in Counter(errors).most_common(5):
+            self.stderr.write(f"{count}x {message}")
+        return outcome, time.perf_counter() - started
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.6 on 2026-10-17 12:00
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Troca o ``default`` das chaves primárias para ``core.ids.default_pk``.
+
+    O default é aplicado apenas no Python: a migração não altera dados nem
+    a estrutura das tabelas.
+    """
+
+    dependencies = [
+        ('scheduling', '0003_auto_20250328_1508'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='teacheravailability',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='scheduledclass',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='classnotification',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
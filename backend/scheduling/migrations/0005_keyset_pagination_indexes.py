@@ -0,0 +1,31 @@
+# Generated by Django 5.1.6 on 2026-10-17 13:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Índices que seguem a ordenação da paginação por chave."""
+
+    atomic = False
+
+    dependencies = [
+        ('scheduling', '0004_default_pk'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='scheduledclass',
+            index=models.Index(
+                fields=['date', 'start_time', 'id'],
+                name='idx_class_date_time_id',
+            ),
+        ),
+        AddIndexConcurrently(
+            model_name='classnotification',
+            index=models.Index(
+                fields=['-sent_at', 'id'],
+                name='idx_notification_sent_id',
+            ),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.1.6 on 2026-10-17 15:00
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """Índice das aulas de um professor por data (horários livres)."""
+
+    atomic = False
+
+    dependencies = [
+        ('scheduling', '0005_keyset_pagination_indexes'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='scheduledclass',
+            index=models.Index(
+                fields=['teacher', 'date'], name='idx_class_teacher_date'
+            ),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.1.6 on 2026-10-17 16:00
+
+import django.contrib.postgres.constraints
+import django.db.models.expressions
+import scheduling.fields
+from django.contrib.postgres.operations import BtreeGistExtension
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Impede aulas sobrepostas do mesmo professor ou do mesmo aluno.
+
+    Aulas não canceladas que já se sobrepõem fazem a criação das
+    restrições falhar; resolva-as (cancelando ou remarcando) antes de
+    aplicar a migração.
+    """
+
+    dependencies = [
+        ('scheduling', '0006_class_teacher_date_index'),
+    ]
+
+    operations = [
+        BtreeGistExtension(),
+        migrations.AddField(
+            model_name='scheduledclass',
+            name='period',
+            field=models.GeneratedField(
+                db_persist=True,
+                expression=django.db.models.expressions.Func(
+                    django.db.models.expressions.ExpressionWrapper(
+                        django.db.models.expressions.CombinedExpression(
+                            models.F('date'), '+', models.F('start_time')
+                        ),
+                        output_field=models.DateTimeField(),
+                    ),
+                    django.db.models.expressions.ExpressionWrapper(
+                        django.db.models.expressions.CombinedExpression(
+                            models.F('date'), '+', models.F('end_time')
+                        ),
+                        output_field=models.DateTimeField(),
+                    ),
+                    function='TSRANGE',
+                    output_field=scheduling.fields.LocalDateTimeRangeField(),
+                ),
+                output_field=scheduling.fields.LocalDateTimeRangeField(),
+                verbose_name='período',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledclass',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(('status', 'cancelled'), _negated=True),
+                expressions=[('teacher', '='), ('period', '&&')],
+                name='excl_class_teacher_overlap',
+                violation_error_code='teacher_conflict',
+                violation_error_message=(
+                    'O professor já tem uma aula nesse horário.'
+                ),
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduledclass',
+            constraint=django.contrib.postgres.constraints.ExclusionConstraint(
+                condition=models.Q(('status', 'cancelled'), _negated=True),
+                expressions=[('student', '='), ('period', '&&')],
+                name='excl_class_student_overlap',
+                violation_error_code='student_conflict',
+                violation_error_message=(
+                    'O aluno já tem uma aula nesse horário.'
+                ),
+            ),
+        ),
+    ]
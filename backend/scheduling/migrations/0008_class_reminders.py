@@ -0,0 +1,28 @@
+# Generated by Django 5.1.6 on 2026-10-17 17:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0007_class_overlap_constraints'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='classnotification',
+            name='scheduled_for',
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name='aula em'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='classnotification',
+            constraint=models.UniqueConstraint(
+                condition=models.Q(('notification_type', 'reminder')),
+                fields=('scheduled_class', 'recipient', 'scheduled_for'),
+                name='uniq_class_reminder',
+            ),
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.1.6 on 2026-10-17 18:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+# Cria os contadores de quem já tem notificações não lidas
+BACKFILL_SQL = """
+INSERT INTO scheduling_notificationinbox (user_id, unread_count, updated_at)
+SELECT recipient_id, COUNT(*), NOW()
+FROM scheduling_classnotification
+WHERE NOT read
+GROUP BY recipient_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('scheduling', '0008_class_reminders'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='classnotification',
+            index=models.Index(
+                condition=models.Q(('read', False)),
+                fields=['recipient', '-sent_at', 'id'],
+                name='idx_notification_unread',
+            ),
+        ),
+        migrations.CreateModel(
+            name='NotificationInbox',
+            fields=[
+                ('user', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE,
+                    primary_key=True,
+                    related_name='notification_inbox',
+                    serialize=False,
+                    to=settings.AUTH_USER_MODEL,
+                    verbose_name='usuário',
+                )),
+                ('unread_count', models.PositiveIntegerField(
+                    default=0, editable=False, verbose_name='não lidas'
+                )),
+                ('updated_at', models.DateTimeField(
+                    auto_now=True, verbose_name='atualizado em'
+                )),
+            ],
+            options={
+                'verbose_name': 'Caixa de Notificações',
+                'verbose_name_plural': 'Caixas de Notificações',
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
@@ -1,10 +1,40 @@
-from django.db import models
+import datetime
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.contrib.postgres.fields import RangeOperators
+from django.db import models, transaction
+from django.db.backends.postgresql.psycopg_any import DateTimeRange
+from django.db.models import DateTimeField, ExpressionWrapper, F, Func, Q
 from django.utils.translation import gettext_lazy as _
 from django.conf import settings
 from django.utils import timezone
 
+from core.base_models import UUIDModel
+
+from .fields import LocalDateTimeRangeField
+
+
+def class_period():
+    """
+    Expressão ``tsrange(date + start_time, date + end_time, '[)')``.
+
+    Usada na coluna gerada ``ScheduledClass.period``. O intervalo é aberto
+    no fim: uma aula que termina às 10:00 não conflita com outra que começa
+    às 10:00.
+    """
+    return Func(
+        ExpressionWrapper(
+            F("date") + F("start_time"), output_field=DateTimeField()
+        ),
+        ExpressionWrapper(
+            F("date") + F("end_time"), output_field=DateTimeField()
+        ),
+        function="TSRANGE",
+        output_field=LocalDateTimeRangeField(),
+    )
 
-class TeacherAvailability(models.Model):
+
+class TeacherAvailability(UUIDModel):
     """
     Modelo representando a disponibilidade de horários de um professor.
     """
@@ -67,7 +97,7 @@ class TeacherAvailability(models.Model):
             )
 
 
-class ScheduledClass(models.Model):
+class ScheduledClass(UUIDModel):
     """
     Modelo representando uma aula agendada entre aluno e professor.
     """
@@ -127,10 +157,57 @@ class ScheduledClass(models.Model):
     created_at = models.DateTimeField(_("criado em"), auto_now_add=True)
     updated_at = models.DateTimeField(_("atualizado em"), auto_now=True)
 
+    # Intervalo da aula (coluna gerada), usado nas restrições de conflito
+    period = models.GeneratedField(
+        expression=class_period(),
+        output_field=LocalDateTimeRangeField(),
+        db_persist=True,
+        verbose_name=_("período"),
+    )
+
     class Meta:
         verbose_name = _("Aula Agendada")
         verbose_name_plural = _("Aulas Agendadas")
         ordering = ["date", "start_time"]
+        constraints = [
+            # Um professor (ou aluno) não pode ter duas aulas não canceladas
+            # com horários sobrepostos. Exige a extensão btree_gist.
+            ExclusionConstraint(
+                name="excl_class_teacher_overlap",
+                expressions=[
+                    ("teacher", RangeOperators.EQUAL),
+                    ("period", RangeOperators.OVERLAPS),
+                ],
+                condition=~Q(status="cancelled"),
+                violation_error_code="teacher_conflict",
+                violation_error_message=_(
+                    "O professor já tem uma aula nesse horário."
+                ),
+            ),
+            ExclusionConstraint(
+                name="excl_class_student_overlap",
+                expressions=[
+                    ("student", RangeOperators.EQUAL),
+                    ("period", RangeOperators.OVERLAPS),
+                ],
+                condition=~Q(status="cancelled"),
+                violation_error_code="student_conflict",
+                violation_error_message=_(
+                    "O aluno já tem uma aula nesse horário."
+                ),
+            ),
+        ]
+        indexes = [
+            # Paginação por chave (core.pagination)
+            models.Index(
+                fields=["date", "start_time", "id"],
+                name="idx_class_date_time_id",
+            ),
+            # Aulas de um professor em um período (scheduling.slots)
+            models.Index(
+                fields=["teacher", "date"], name="idx_class_teacher_date"
+            ),
+        ]
 
     def __str__(self) -> str:
         return (
@@ -170,8 +247,53 @@ class ScheduledClass(models.Model):
                 {"date": _("Não é possível agendar aulas para datas passadas.")}
             )
 
+    def validate_constraints(self, exclude=None):
+        """
+        Valida as restrições, incluindo as de conflito de horário.
+
+        ``ExclusionConstraint.validate`` não sabe calcular uma coluna gerada
+        para uma instância não salva, então o período é montado aqui a
+        partir de ``date``, ``start_time`` e ``end_time``. É apenas uma
+        verificação antecipada para formulários: a garantia contra
+        requisições concorrentes é a restrição no banco.
+        """
+        from django.core.exceptions import ValidationError
+
+        exclude = set(exclude or ())
+        super().validate_constraints(exclude=exclude | {"period"})
+        if {"date", "start_time", "end_time"} & exclude or not (
+            self.date and self.start_time and self.end_time
+        ):
+            return
+        if self.status == "cancelled" or self.start_time >= self.end_time:
+            return
+
+        period = DateTimeRange(
+            datetime.datetime.combine(self.date, self.start_time),
+            datetime.datetime.combine(self.date, self.end_time),
+        )
+        for constraint in self._meta.constraints:
+            if not isinstance(constraint, ExclusionConstraint):
+                continue
+            side = constraint.expressions[0][0]
+            if side in exclude:
+                continue
+            conflicts = (
+                ScheduledClass.objects.filter(
+                    **{f"{side}_id": getattr(self, f"{side}_id")},
+                    period__overlap=period,
+                )
+                .exclude(status="cancelled")
+                .exclude(pk=self.pk)
+            )
+            if conflicts.exists():
+                raise ValidationError(
+                    constraint.get_violation_error_message(),
+                    code=constraint.violation_error_code,
+                )
+
 
-class ClassNotification(models.Model):
+class ClassNotification(UUIDModel):
     """
     Modelo para notificações relacionadas a aulas agendadas.
     """
@@ -203,6 +325,12 @@ class ClassNotification(models.Model):
 
     message = models.TextField(_("mensagem"))
 
+    # Início da aula ao qual um lembrete se refere: uma aula remarcada
+    # recebe um novo lembrete
+    scheduled_for = models.DateTimeField(
+        _("aula em"), null=True, blank=True, editable=False
+    )
+
     sent_at = models.DateTimeField(_("enviado em"), auto_now_add=True)
     read = models.BooleanField(_("lido"), default=False)
     read_at = models.DateTimeField(_("lido em"), null=True, blank=True)
@@ -211,15 +339,78 @@ class ClassNotification(models.Model):
         verbose_name = _("Notificação de Aula")
         verbose_name_plural = _("Notificações de Aulas")
         ordering = ["-sent_at"]
+        constraints = [
+            # Um lembrete por destinatário e horário da aula
+            # (scheduling.reminders grava com ON CONFLICT DO NOTHING)
+            models.UniqueConstraint(
+                fields=["scheduled_class", "recipient", "scheduled_for"],
+                condition=Q(notification_type="reminder"),
+                name="uniq_class_reminder",
+            ),
+        ]
+        indexes = [
+            # Paginação por chave (core.pagination)
+            models.Index(
+                fields=["-sent_at", "id"], name="idx_notification_sent_id"
+            ),
+            # Não lidas de cada destinatário (contagem e caixa de entrada
+            # filtrada); as lidas, a maioria, ficam fora do índice
+            models.Index(
+                fields=["recipient", "-sent_at", "id"],
+                condition=Q(read=False),
+                name="idx_notification_unread",
+            ),
+        ]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Valores originais, usados pelos sinais que mantêm o contador de
+        # não lidas (ver scheduling.inbox)
+        self._original_recipient_id = self.__dict__.get("recipient_id")
+        self._original_read = self.__dict__.get("read")
 
     def __str__(self) -> str:
         return (
             f"{self.get_notification_type_display()} - {self.recipient.get_full_name()}"
         )
 
+    def save(self, *args, **kwargs):
+        """Salva e ajusta o contador de não lidas na mesma transação."""
+        with transaction.atomic(using=kwargs.get("using")):
+            super().save(*args, **kwargs)
+
     def mark_as_read(self):
         """Marca a notificação como lida."""
         if not self.read:
             self.read = True
             self.read_at = timezone.now()
             self.save(update_fields=["read", "read_at"])
+
+
+class NotificationInbox(models.Model):
+    """
+    Contador de notificações não lidas de um usuário.
+
+    Mantido na mesma transação que cria, lê ou remove as notificações (ver
+    ``scheduling.inbox``), para que o contador do sino não precise contar
+    as notificações a cada requisição.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="notification_inbox",
+        verbose_name=_("usuário"),
+    )
+    unread_count = models.PositiveIntegerField(
+        _("não lidas"), default=0, editable=False
+    )
+    updated_at = models.DateTimeField(_("atualizado em"), auto_now=True)
+
+    class Meta:
+        verbose_name = _("Caixa de Notificações")
+        verbose_name_plural = _("Caixas de Notificações")
+
+    def __str__(self) -> str:
+        return f"{self.user} - {self.unread_count}"
@@ -0,0 +1,219 @@
+"""
+Lembretes de aula.
+
+``send_class_reminders`` busca, em uma única consulta, as aulas marcadas ou
+confirmadas que começam na janela ``[agora, agora + antecedência)``, já
+com os nomes e as preferências de notificação do aluno e do professor (via
+JOIN, sem consultas por usuário), e grava os lembretes dos dois lados com
+``bulk_create(ignore_conflicts=True)``.
+
+A restrição ``uniq_class_reminder`` (aula, destinatário, horário da aula)
+torna a execução idempotente: rodar de novo sobre a mesma janela não
+duplica lembretes, e uma aula remarcada recebe um lembrete novo. Os IDs
+são gerados em Python, então cada lote confere quais deles chegaram ao
+banco para contar só os lembretes realmente inseridos. Como
+``bulk_create`` não dispara sinais, cada lote reconta, na mesma transação,
+as não lidas dos destinatários desses lembretes (``scheduling.inbox``).
+
+Preferências respeitadas:
+
+- ``User.email_notifications`` desligado: nenhum lembrete;
+- ``UserProfile.notification_preferences["class_reminders"]`` igual a
+  ``false``: nenhum lembrete de aula (ausente vale ``true``).
+"""
+import datetime
+from dataclasses import dataclass
+from typing import Iterator, List, Optional
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+
+from .inbox import refresh_unread_counts
+from .models import ClassNotification, ScheduledClass
+
+# Status de aulas que recebem lembrete
+REMINDER_STATUSES = ("scheduled", "confirmed")
+
+# Chave em UserProfile.notification_preferences
+PREFERENCE_KEY = "class_reminders"
+
+_PARTICIPANT_FIELDS = (
+    "id",
+    "first_name",
+    "last_name",
+    "username",
+    "email_notifications",
+    "profile__notification_preferences",
+)
+
+
+@dataclass
+class ReminderRun:
+    """
+    Resultado de uma execução do gerador de lembretes.
+
+    Attributes:
+        classes: Aulas encontradas na janela
+        notifications: Lembretes inseridos nesta execução
+        duplicates: Lembretes que já existiam (ignorados pela restrição de
+            unicidade)
+        skipped: Destinatários que desativaram os lembretes
+    """
+
+    classes: int = 0
+    notifications: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+
+
+def upcoming_classes(
+    start: datetime.datetime, end: datetime.datetime
+) -> QuerySet:
+    """
+    Aulas que começam em ``[start, end)``.
+
+    ``date`` e ``start_time`` são locais (``TIME_ZONE``). A condição tem um
+    limite redundante em ``date`` para que o PostgreSQL percorra apenas o
+    trecho da janela no índice ``(date, start_time, id)``.
+
+    Args:
+        start: Início da janela (com fuso)
+        end: Fim da janela (com fuso)
+
+    Returns:
+        Queryset de ScheduledClass não canceladas na janela
+    """
+    start = timezone.localtime(start)
+    end = timezone.localtime(end)
+    return ScheduledClass.objects.filter(
+        Q(date__gte=start.date(), date__lte=end.date())
+        & (
+            Q(date__gt=start.date())
+            | Q(date=start.date(), start_time__gte=start.time())
+        )
+        & (
+            Q(date__lt=end.date())
+            | Q(date=end.date(), start_time__lt=end.time())
+        ),
+        status__in=REMINDER_STATUSES,
+    )
+
+
+def wants_class_reminders(email_notifications, preferences) -> bool:
+    """Indica se o usuário aceita lembretes de aula."""
+    if not email_notifications:
+        return False
+    if not isinstance(preferences, dict):
+        return True
+    return preferences.get(PREFERENCE_KEY, True) is not False
+
+
+def _display_name(row: dict, prefix: str) -> str:
+    name = f"{row[f'{prefix}first_name']} {row[f'{prefix}last_name']}"
+    return name.strip() or row[f"{prefix}username"]
+
+
+def _message(row: dict, other: str, starts_at: datetime.datetime) -> str:
+    return (
+        f"Lembrete: aula \"{row['topic']}\" com {other} em "
+        f"{starts_at:%d/%m} às {starts_at:%H:%M}."
+    )
+
+
+def build_reminders(rows, run: ReminderRun) -> Iterator[ClassNotification]:
+    """
+    Lembretes de aluno e professor para as linhas de ``_reminder_rows``.
+
+    Args:
+        rows: Dicionários com os dados da aula e dos participantes
+        run: Acumula as aulas e os destinatários ignorados
+
+    Yields:
+        ClassNotification ainda não salvas
+    """
+    tz = timezone.get_current_timezone()
+    for row in rows:
+        run.classes += 1
+        starts_at = timezone.make_aware(
+            datetime.datetime.combine(row["date"], row["start_time"]), tz
+        )
+        for side, other in (("student", "teacher"), ("teacher", "student")):
+            if not wants_class_reminders(
+                row[f"{side}__email_notifications"],
+                row[f"{side}__profile__notification_preferences"],
+            ):
+                run.skipped += 1
+                continue
+            yield ClassNotification(
+                scheduled_class_id=row["id"],
+                recipient_id=row[f"{side}__id"],
+                notification_type="reminder",
+                scheduled_for=starts_at,
+                message=_message(
+                    row, _display_name(row, f"{other}__"), starts_at
+                ),
+            )
+
+
+def _reminder_rows(queryset: QuerySet):
+    fields = ["id", "date", "start_time", "topic"]
+    for side in ("student", "teacher"):
+        fields += [f"{side}__{name}" for name in _PARTICIPANT_FIELDS]
+    return queryset.order_by().values(*fields)
+
+
+def send_class_reminders(
+    now: Optional[datetime.datetime] = None,
+    lookahead: Optional[int] = None,
+    batch_size: int = 1000,
+) -> ReminderRun:
+    """
+    Gera os lembretes das aulas que começam nos próximos minutos.
+
+    Args:
+        now: Início da janela (padrão: agora)
+        lookahead: Antecedência em minutos (padrão:
+            ``CLASS_REMINDER_LOOKAHEAD``)
+        batch_size: Linhas lidas e inseridas por lote
+
+    Returns:
+        ReminderRun com os totais da execução
+    """
+    now = now or timezone.now()
+    if lookahead is None:
+        lookahead = settings.CLASS_REMINDER_LOOKAHEAD
+    end = now + datetime.timedelta(minutes=lookahead)
+
+    run = ReminderRun()
+    rows = _reminder_rows(upcoming_classes(now, end)).iterator(
+        chunk_size=batch_size
+    )
+    batch: List[ClassNotification] = []
+    for notification in build_reminders(rows, run):
+        batch.append(notification)
+        if len(batch) >= batch_size:
+            _insert(batch, batch_size, run)
+            batch = []
+    if batch:
+        _insert(batch, batch_size, run)
+    return run
+
+
+def _insert(
+    batch: List[ClassNotification], batch_size: int, run: ReminderRun
+) -> None:
+    with transaction.atomic():
+        ClassNotification.objects.bulk_create(
+            batch, batch_size=batch_size, ignore_conflicts=True
+        )
+        # Linhas em conflito não são gravadas: seus IDs não existem
+        recipients = list(
+            ClassNotification.objects.filter(
+                pk__in=[notification.pk for notification in batch]
+            ).values_list("recipient_id", flat=True)
+        )
+        refresh_unread_counts(recipients)
+    run.notifications += len(recipients)
+    run.duplicates += len(batch) - len(recipients)
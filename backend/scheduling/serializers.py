@@ -0,0 +1,120 @@
+"""
+Serializers do app scheduling.
+"""
+from rest_framework import serializers
+
+from .models import ClassNotification, ScheduledClass
+
+
+class FreeSlotsQuerySerializer(serializers.Serializer):
+    """Parâmetros da consulta de horários livres."""
+
+    teacher = serializers.UUIDField(
+        required=False, help_text="Professor (padrão: todos)"
+    )
+    start = serializers.DateField(
+        required=False, help_text="Primeiro dia (padrão: hoje)"
+    )
+    days = serializers.IntegerField(min_value=1, max_value=62, default=28)
+    length = serializers.IntegerField(
+        min_value=10,
+        max_value=240,
+        default=50,
+        help_text="Duração dos horários em minutos",
+    )
+
+
+class SlotSerializer(serializers.Serializer):
+    """Horário livre de um professor."""
+
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+
+
+class TeacherSlotsSerializer(serializers.Serializer):
+    """Horários livres de um professor."""
+
+    teacher = serializers.UUIDField()
+    slots = SlotSerializer(many=True)
+
+
+class BookingSerializer(serializers.Serializer):
+    """Pedido de marcação de aula feito pelo aluno."""
+
+    teacher = serializers.UUIDField()
+    date = serializers.DateField()
+    start_time = serializers.TimeField()
+    end_time = serializers.TimeField()
+    topic = serializers.CharField(max_length=200)
+    notes = serializers.CharField(required=False, allow_blank=True, default="")
+
+
+class ScheduledClassSerializer(serializers.ModelSerializer):
+    """Aula marcada."""
+
+    class Meta:
+        model = ScheduledClass
+        fields = (
+            "id",
+            "student",
+            "teacher",
+            "date",
+            "start_time",
+            "end_time",
+            "status",
+            "topic",
+            "notes",
+            "meeting_link",
+            "created_at",
+        )
+        read_only_fields = fields
+
+
+class ClassNotificationSerializer(serializers.ModelSerializer):
+    """Notificação de aula da caixa de entrada."""
+
+    class Meta:
+        model = ClassNotification
+        fields = (
+            "id",
+            "scheduled_class",
+            "notification_type",
+            "message",
+            "scheduled_for",
+            "sent_at",
+            "read",
+            "read_at",
+        )
+        read_only_fields = fields
+
+
+class NotificationListQuerySerializer(serializers.Serializer):
+    """Parâmetros da listagem de notificações."""
+
+    unread = serializers.BooleanField(
+        required=False, default=False, help_text="Apenas não lidas"
+    )
+
+
+class MarkReadSerializer(serializers.Serializer):
+    """Notificações a marcar como lidas."""
+
+    ids = serializers.ListField(
+        child=serializers.UUIDField(),
+        required=False,
+        max_length=500,
+        help_text="Notificações a marcar (padrão: todas)",
+    )
+
+
+class UnreadCountSerializer(serializers.Serializer):
+    """Número de notificações não lidas."""
+
+    unread = serializers.IntegerField()
+
+
+class MarkReadResultSerializer(UnreadCountSerializer):
+    """Resultado da marcação de notificações como lidas."""
+
+    marked = serializers.IntegerField()
@@ -0,0 +1,181 @@
+"""
+Serviços do app scheduling.
+
+Marcação de aulas sem conflito de horário. Quem garante que um professor
+(ou aluno) não tenha duas aulas sobrepostas são as restrições de exclusão
+de ``ScheduledClass`` no PostgreSQL: duas requisições simultâneas para o
+mesmo horário não conseguem ambas gravar, sem verificação prévia em Python
+nem travas. Aqui a violação da restrição vira um ``ValidationError`` com o
+código do conflito (``teacher_conflict`` ou ``student_conflict``).
+"""
+import datetime
+import uuid
+from typing import Optional
+
+from django.contrib.postgres.constraints import ExclusionConstraint
+from django.core.exceptions import ValidationError
+from django.db import (
+    IntegrityError,
+    OperationalError,
+    connection,
+    transaction,
+)
+from django.utils.translation import gettext_lazy as _
+
+from .models import ScheduledClass, TeacherAvailability
+
+# Gravações que não passam por _save (admin, scripts) ainda podem disputar
+# o mesmo horário sem as travas consultivas; nesse caso o PostgreSQL aborta
+# uma delas com "deadlock detected" e a nova tentativa já vê a outra aula
+DEADLOCK_DETECTED = "40P01"
+DEADLOCK_RETRIES = 3
+
+# Restrições de conflito de horário, pelo nome
+CONFLICT_CONSTRAINTS = {
+    constraint.name: constraint
+    for constraint in ScheduledClass._meta.constraints
+    if isinstance(constraint, ExclusionConstraint)
+}
+
+
+def _conflict_error(exc: IntegrityError) -> Optional[ValidationError]:
+    """Converte a violação de uma restrição de conflito, se for o caso."""
+    diag = getattr(exc.__cause__, "diag", None)
+    constraint = CONFLICT_CONSTRAINTS.get(
+        getattr(diag, "constraint_name", None)
+    )
+    if constraint is None:
+        return None
+    return ValidationError(
+        constraint.get_violation_error_message(),
+        code=constraint.violation_error_code,
+    )
+
+
+def book_class(
+    student_id: uuid.UUID,
+    teacher_id: uuid.UUID,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+    topic: str,
+    notes: str = "",
+    check_availability: bool = True,
+) -> ScheduledClass:
+    """
+    Marca uma aula entre aluno e professor.
+
+    Args:
+        student_id: ID do aluno
+        teacher_id: ID do professor
+        date: Data da aula
+        start_time: Horário de início
+        end_time: Horário de término
+        topic: Tema da aula
+        notes: Observações do aluno
+        check_availability: Exige que o horário caiba em uma janela de
+            disponibilidade ativa do professor
+
+    Returns:
+        ScheduledClass criada
+
+    Raises:
+        ValidationError: Se os horários forem inválidos, estiverem fora da
+            disponibilidade do professor ou conflitarem com outra aula
+            (códigos ``teacher_conflict`` e ``student_conflict``)
+    """
+    scheduled_class = ScheduledClass(
+        student_id=student_id,
+        teacher_id=teacher_id,
+        date=date,
+        start_time=start_time,
+        end_time=end_time,
+        topic=topic,
+        notes=notes,
+    )
+    scheduled_class.clean()
+
+    if check_availability and not TeacherAvailability.objects.filter(
+        teacher_id=teacher_id,
+        is_active=True,
+        weekday=date.weekday(),
+        start_time__lte=start_time,
+        end_time__gte=end_time,
+    ).exists():
+        raise ValidationError(
+            _("O professor não atende nesse horário."), code="unavailable"
+        )
+
+    return _save(scheduled_class)
+
+
+def reschedule_class(
+    scheduled_class: ScheduledClass,
+    date: datetime.date,
+    start_time: datetime.time,
+    end_time: datetime.time,
+) -> ScheduledClass:
+    """
+    Muda o horário de uma aula, mantendo professor e aluno.
+
+    Raises:
+        ValidationError: Se a aula estiver cancelada ou concluída, se os
+            horários forem inválidos ou se conflitarem com outra aula
+    """
+    if scheduled_class.status in ("cancelled", "completed"):
+        raise ValidationError(
+            _("Não é possível remarcar esta aula."), code="invalid_status"
+        )
+    scheduled_class.date = date
+    scheduled_class.start_time = start_time
+    scheduled_class.end_time = end_time
+    scheduled_class.clean()
+    return _save(scheduled_class)
+
+
+def cancel_class(scheduled_class: ScheduledClass) -> ScheduledClass:
+    """Cancela uma aula, liberando o horário do professor e do aluno."""
+    if scheduled_class.status != "cancelled":
+        scheduled_class.status = "cancelled"
+        scheduled_class.save(update_fields=["status", "updated_at"])
+    return scheduled_class
+
+
+def _lock_participants(scheduled_class: ScheduledClass) -> None:
+    """
+    Enfileira as marcações do mesmo professor ou aluno.
+
+    Duas inserções conflitantes verificam a restrição de exclusão ao mesmo
+    tempo, cada uma esperando a outra: o PostgreSQL detecta o deadlock e
+    aborta uma delas após ``deadlock_timeout``. Com travas consultivas da
+    transação (sempre na mesma ordem), a segunda espera a primeira terminar
+    e recebe direto a violação da restrição. A restrição continua sendo a
+    garantia; as travas apenas evitam a disputa.
+    """
+    keys = sorted(
+        {str(scheduled_class.teacher_id), str(scheduled_class.student_id)}
+    )
+    with connection.cursor() as cursor:
+        for key in keys:
+            cursor.execute(
+                "SELECT pg_advisory_xact_lock(hashtextextended(%s, 0))",
+                [key],
+            )
+
+
+def _save(scheduled_class: ScheduledClass) -> ScheduledClass:
+    for attempt in range(DEADLOCK_RETRIES + 1):
+        try:
+            with transaction.atomic():
+                _lock_participants(scheduled_class)
+                scheduled_class.save()
+            return scheduled_class
+        except IntegrityError as exc:
+            error = _conflict_error(exc)
+            if error is None:
+                raise
+            raise error from exc
+        except OperationalError as exc:
+            pgcode = getattr(exc.__cause__, "pgcode", None)
+            if pgcode != DEADLOCK_DETECTED or attempt == DEADLOCK_RETRIES:
+                raise
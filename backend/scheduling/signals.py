@@ -0,0 +1,40 @@
+"""
+Sinais do app scheduling.
+
+Mantêm ``NotificationInbox.unread_count`` a partir das notificações criadas,
+lidas ou removidas pelo ORM (ver ``scheduling.inbox``).
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .inbox import apply_unread_delta
+from .models import ClassNotification
+
+
+@receiver(
+    post_save, sender=ClassNotification, dispatch_uid="notification_on_save"
+)
+def notification_saved(sender, instance: ClassNotification, created, **kwargs):
+    """Conta a notificação ao criar, ler, desmarcar ou trocar o destinatário."""
+    was_unread = not created and instance._original_read is False
+    old_recipient = instance._original_recipient_id
+    moved = not created and old_recipient != instance.recipient_id
+
+    if was_unread and (moved or instance.read):
+        apply_unread_delta(old_recipient, -1)
+    if not instance.read and (created or moved or not was_unread):
+        apply_unread_delta(instance.recipient_id, 1)
+
+    instance._original_recipient_id = instance.recipient_id
+    instance._original_read = instance.read
+
+
+@receiver(
+    post_delete,
+    sender=ClassNotification,
+    dispatch_uid="notification_on_delete",
+)
+def notification_deleted(sender, instance: ClassNotification, **kwargs):
+    """Desconta uma notificação não lida removida."""
+    if instance._original_read is False:
+        apply_unread_delta(instance.recipient_id, -1)
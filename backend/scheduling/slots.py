@@ -0,0 +1,278 @@
+"""
+Horários livres dos professores.
+
+``TeacherAvailability`` guarda janelas semanais (ex.: segunda, 08:00 às
+12:00) e ``ScheduledClass`` as aulas já marcadas. ``free_slots`` expande as
+janelas em cada dia do período, retira os intervalos das aulas não
+canceladas e divide o que sobra em horários do tamanho pedido.
+
+Tudo é feito com duas consultas (janelas e aulas de todos os professores
+pedidos), cada uma devolvendo uma linha por professor com os intervalos já
+convertidos em minutos desde o início do período e ordenados pelo banco
+(``array_agg``). Janelas e aulas de cada professor ficam em listas
+ordenadas e a subtração é uma varredura única com dois ponteiros (sem laços
+aninhados entre janelas e aulas).
+
+Datas e horários seguem os campos dos modelos: ``date`` + ``time`` no fuso
+``TIME_ZONE``.
+"""
+import datetime
+import uuid
+from collections import defaultdict
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db.models import DateField, F, Func, IntegerField, Value
+from django.utils import timezone
+
+from .models import ScheduledClass, TeacherAvailability
+
+MINUTES_PER_DAY = 24 * 60
+
+# Status que não ocupam o horário do professor
+FREE_STATUSES = ("cancelled",)
+
+Interval = Tuple[int, int]
+
+# Objetos time de cada minuto do dia, reaproveitados em todos os horários
+_TIMES = [datetime.time(m // 60, m % 60) for m in range(MINUTES_PER_DAY)]
+
+
+class Slot(NamedTuple):
+    """Horário livre de um professor."""
+
+    date: datetime.date
+    start_time: datetime.time
+    end_time: datetime.time
+
+
+def _minutes(
+    time_field: str,
+    since: Optional[datetime.date] = None,
+    ceil: bool = False,
+):
+    """
+    Minuto do dia de ``time_field``, calculado no banco.
+
+    Com ``since``, soma os minutos dos dias entre ``since`` e ``date``
+    (posição absoluta no período). Segundos são arredondados para dentro
+    das janelas (``ceil`` no início, para baixo no fim) e para fora das
+    aulas.
+    """
+    rounding = "CEIL" if ceil else "FLOOR"
+    minutes = Func(
+        F(time_field),
+        template=f"{rounding}(EXTRACT(EPOCH FROM %(expressions)s) / 60)::int",
+        output_field=IntegerField(),
+    )
+    if since is None:
+        return minutes
+    # date - date no PostgreSQL é o número de dias (inteiro)
+    days = Func(
+        F("date"),
+        Value(since, output_field=DateField()),
+        arg_joiner=" - ",
+        template="(%(expressions)s)",
+        output_field=IntegerField(),
+    )
+    return days * Value(MINUTES_PER_DAY) + minutes
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """
+    Une intervalos sobrepostos ou encostados.
+
+    Args:
+        intervals: Intervalos ``(início, fim)`` em qualquer ordem
+
+    Returns:
+        Lista ordenada de intervalos disjuntos
+    """
+    merged: List[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def subtract_intervals(
+    free: List[Interval], busy: List[Interval]
+) -> List[Interval]:
+    """
+    Retira de ``free`` os trechos ocupados por ``busy``.
+
+    Ambas as listas devem estar ordenadas pelo início e ``free`` deve ser
+    disjunta. Uma única varredura: O(len(free) + len(busy)).
+
+    Args:
+        free: Intervalos disponíveis
+        busy: Intervalos ocupados (podem se sobrepor)
+
+    Returns:
+        Lista ordenada dos trechos livres restantes
+    """
+    result: List[Interval] = []
+    i = 0
+    for start, end in free:
+        # Aulas que terminam antes desta janela não afetam as seguintes
+        while i < len(busy) and busy[i][1] <= start:
+            i += 1
+        j = i
+        cursor = start
+        while j < len(busy) and busy[j][0] < end:
+            busy_start, busy_end = busy[j]
+            if busy_start > cursor:
+                result.append((cursor, busy_start))
+            if busy_end > cursor:
+                cursor = busy_end
+            j += 1
+        if cursor < end:
+            result.append((cursor, end))
+    return result
+
+
+def free_slots(
+    start: Optional[datetime.date] = None,
+    days: int = 28,
+    length: int = 50,
+    step: Optional[int] = None,
+    teacher_ids: Optional[Iterable[uuid.UUID]] = None,
+    now: Optional[datetime.datetime] = None,
+) -> Dict[uuid.UUID, List[Slot]]:
+    """
+    Horários livres de um ou de todos os professores em um período.
+
+    Args:
+        start: Primeiro dia do período (padrão: hoje)
+        days: Número de dias do período
+        length: Duração de cada horário em minutos
+        step: Intervalo entre inícios de horários consecutivos dentro de um
+            trecho livre (padrão: ``length``, horários em sequência)
+        teacher_ids: Professores consultados (padrão: todos com
+            disponibilidade ativa)
+        now: Horários que começam antes deste instante são descartados
+            (padrão: agora)
+
+    Returns:
+        Dicionário ``{teacher_id: [Slot, ...]}`` em ordem cronológica;
+        professores sem horários livres ficam de fora
+
+    Raises:
+        ValueError: Se ``days``, ``length`` ou ``step`` não forem positivos
+    """
+    if days < 1 or length < 1 or (step is not None and step < 1):
+        raise ValueError("days, length e step devem ser positivos")
+    step = step or length
+
+    now = timezone.localtime(now)
+    start = start or now.date()
+    end = start + datetime.timedelta(days=days - 1)
+    # Minuto (desde o início do período) antes do qual nada é oferecido
+    cutoff = (now.date() - start).days * MINUTES_PER_DAY + (
+        now.hour * 60 + now.minute + bool(now.second or now.microsecond)
+    )
+
+    # Uma linha por professor, com os intervalos já convertidos em minutos
+    # e ordenados pelo banco (ver _minutes)
+    windows = (
+        TeacherAvailability.objects.filter(is_active=True)
+        .values("teacher_id")
+        .annotate(
+            starts=ArrayAgg(
+                _minutes("start_time", ceil=True),
+                ordering=("weekday", "start_time"),
+            ),
+            ends=ArrayAgg(
+                _minutes("end_time"), ordering=("weekday", "start_time")
+            ),
+            weekdays=ArrayAgg("weekday", ordering=("weekday", "start_time")),
+        )
+        .order_by()
+    )
+    classes = (
+        ScheduledClass.objects.filter(date__range=(start, end))
+        .exclude(status__in=FREE_STATUSES)
+        .values("teacher_id")
+        .annotate(
+            starts=ArrayAgg(
+                _minutes("start_time", since=start),
+                ordering=("date", "start_time"),
+            ),
+            ends=ArrayAgg(
+                _minutes("end_time", since=start, ceil=True),
+                ordering=("date", "start_time"),
+            ),
+        )
+        .order_by()
+    )
+    if teacher_ids is not None:
+        teacher_ids = list(teacher_ids)
+        windows = windows.filter(teacher_id__in=teacher_ids)
+        classes = classes.filter(teacher_id__in=teacher_ids)
+
+    weekly: Dict[uuid.UUID, Dict[int, List[Interval]]] = {}
+    for row in windows:
+        by_weekday = defaultdict(list)
+        for weekday, window_start, window_end in zip(
+            row["weekdays"], row["starts"], row["ends"]
+        ):
+            by_weekday[weekday].append((window_start, window_end))
+        weekly[row["teacher_id"]] = by_weekday
+
+    busy: Dict[uuid.UUID, List[Interval]] = {
+        row["teacher_id"]: list(zip(row["starts"], row["ends"]))
+        for row in classes
+    }
+
+    # Dia da semana e deslocamento em minutos de cada dia do período
+    calendar = [
+        ((start + datetime.timedelta(days=n)).weekday(), n * MINUTES_PER_DAY)
+        for n in range(days)
+    ]
+    dates = [start + datetime.timedelta(days=n) for n in range(days)]
+
+    result: Dict[uuid.UUID, List[Slot]] = {}
+    for teacher_id, by_weekday in weekly.items():
+        by_weekday = {
+            weekday: merge_intervals(intervals)
+            for weekday, intervals in by_weekday.items()
+        }
+        free = [
+            (offset + window_start, offset + window_end)
+            for weekday, offset in calendar
+            for window_start, window_end in by_weekday.get(weekday, ())
+        ]
+        free = subtract_intervals(free, busy.get(teacher_id, []))
+
+        slots = []
+        for free_start, free_end in free:
+            slot_start = max(free_start, cutoff)
+            if slot_start > free_start:
+                # Mantém o alinhamento dos horários ao início do trecho
+                slot_start += (free_start - slot_start) % step
+            while slot_start + length <= free_end:
+                day, minute = divmod(slot_start, MINUTES_PER_DAY)
+                slots.append(
+                    Slot(dates[day], _TIMES[minute], _TIMES[minute + length])
+                )
+                slot_start += step
+        if slots:
+            result[teacher_id] = slots
+    return result
+
+
+def teacher_free_slots(teacher_id: uuid.UUID, **kwargs) -> List[Slot]:
+    """
+    Horários livres de um professor (ver ``free_slots``).
+
+    Args:
+        teacher_id: ID do professor
+        **kwargs: Mesmos parâmetros de ``free_slots``
+
+    Returns:
+        Lista de Slot em ordem cronológica
+    """
+    return free_slots(teacher_ids=[teacher_id], **kwargs).get(teacher_id, [])
@@ -1,3 +1,320 @@
-from django.test import TestCase
+import datetime
+from unittest import mock
 
-# Create your tests here.
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+
+from users.models import User, UserProfile
+
+from .models import (
+    ClassNotification,
+    NotificationInbox,
+    ScheduledClass,
+    TeacherAvailability,
+)
+from .reminders import send_class_reminders
+from .services import book_class, cancel_class, reschedule_class
+from .slots import Slot, free_slots, merge_intervals, subtract_intervals
+
+
+class NotificationInboxTests(TestCase):
+    """Contador de não lidas mantido pelos sinais de ``ClassNotification``."""
+
+    def setUp(self):
+        self.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.student = User.objects.create(
+            username="aluno", email="aluno@example.com",
+        )
+        self.scheduled_class = ScheduledClass.objects.create(
+            student=self.student, teacher=self.teacher,
+            date=datetime.date.today() + datetime.timedelta(days=1),
+            start_time=datetime.time(10), end_time=datetime.time(11),
+            topic="Conversação",
+        )
+
+    def _notify(self, count):
+        for _ in range(count):
+            ClassNotification.objects.create(
+                scheduled_class=self.scheduled_class,
+                recipient=self.student,
+                notification_type="scheduled",
+                message="Aula agendada",
+            )
+
+    def test_unread_count_follows_notifications(self):
+        self._notify(2)
+        inbox = NotificationInbox.objects.get(user=self.student)
+        self.assertEqual(inbox.unread_count, 2)
+
+    def test_delete_user_with_unread_notifications(self):
+        self._notify(2)
+        self.student.delete()
+
+        # Restrições adiadas seriam verificadas apenas no commit
+        connection.check_constraints()
+        self.assertFalse(
+            NotificationInbox.objects.filter(user_id=self.student.pk).exists()
+        )
+
+
+class ClassReminderTests(TestCase):
+    """Lembretes gerados em lote, uma única vez por aula e destinatário."""
+
+    def setUp(self):
+        self.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.student = User.objects.create(
+            username="aluno", email="aluno@example.com",
+        )
+        self.date = datetime.date.today() + datetime.timedelta(days=1)
+        self.scheduled_class = ScheduledClass.objects.create(
+            student=self.student, teacher=self.teacher, date=self.date,
+            start_time=datetime.time(10), end_time=datetime.time(11),
+            topic="Conversação",
+        )
+        self.now = timezone.make_aware(
+            datetime.datetime.combine(self.date, datetime.time(9, 30))
+        )
+
+    def _reminders(self):
+        return ClassNotification.objects.filter(
+            scheduled_class=self.scheduled_class, notification_type="reminder"
+        )
+
+    def test_rerun_does_not_duplicate_reminders(self):
+        first = send_class_reminders(now=self.now, lookahead=60)
+        second = send_class_reminders(now=self.now, lookahead=60)
+
+        self.assertEqual((first.classes, first.notifications), (1, 2))
+        self.assertEqual((second.notifications, second.duplicates), (0, 2))
+        self.assertEqual(
+            set(self._reminders().values_list("recipient_id", flat=True)),
+            {self.student.pk, self.teacher.pk},
+        )
+        self.assertEqual(
+            NotificationInbox.objects.get(user=self.student).unread_count,
+            ClassNotification.objects.filter(
+                recipient=self.student, read=False
+            ).count(),
+        )
+
+    def test_class_outside_window_gets_no_reminder(self):
+        run = send_class_reminders(now=self.now, lookahead=20)
+        self.assertEqual(run.classes, 0)
+        self.assertFalse(self._reminders().exists())
+
+    def test_preferences_turn_reminders_off(self):
+        self.teacher.email_notifications = False
+        self.teacher.save(update_fields=["email_notifications"])
+        UserProfile.objects.update_or_create(
+            user=self.student,
+            defaults={"notification_preferences": {"class_reminders": False}},
+        )
+
+        run = send_class_reminders(now=self.now, lookahead=60)
+
+        self.assertEqual((run.notifications, run.skipped), (0, 2))
+        self.assertFalse(self._reminders().exists())
+
+    def test_loop_survives_a_failing_cycle(self):
+        command = "scheduling.management.commands.send_class_reminders"
+        run = send_class_reminders(now=self.now, lookahead=60)
+        # O primeiro ciclo falha, o segundo roda e a pausa seguinte encerra
+        with mock.patch(
+            f"{command}.send_class_reminders",
+            side_effect=[RuntimeError("conexão perdida"), run],
+        ) as send, mock.patch(
+            f"{command}.time.sleep", side_effect=[None, KeyboardInterrupt]
+        ), mock.patch(
+            # Fecharia a conexão da transação do teste
+            f"{command}.close_old_connections"
+        ), self.assertLogs(command, "ERROR"):
+            call_command("send_class_reminders", "--loop", stdout=mock.Mock())
+
+        self.assertEqual(send.call_count, 2)
+
+
+class IntervalTests(SimpleTestCase):
+    """União e subtração de intervalos em minutos."""
+
+    def test_merge_joins_overlapping_and_touching_intervals(self):
+        self.assertEqual(
+            merge_intervals([(50, 60), (0, 10), (10, 20), (15, 18), (30, 40)]),
+            [(0, 20), (30, 40), (50, 60)],
+        )
+
+    def test_subtract_removes_busy_parts(self):
+        free = [(0, 100), (200, 300), (400, 500)]
+        busy = [(-10, 10), (50, 60), (55, 70), (250, 450)]
+
+        self.assertEqual(
+            subtract_intervals(free, busy),
+            [(10, 50), (70, 100), (200, 250), (450, 500)],
+        )
+
+    def test_subtract_without_busy_keeps_free(self):
+        self.assertEqual(subtract_intervals([(0, 10)], []), [(0, 10)])
+        self.assertEqual(subtract_intervals([(0, 10)], [(0, 10)]), [])
+
+
+class FreeSlotsTests(TestCase):
+    """Horários livres a partir das janelas semanais e das aulas."""
+
+    def setUp(self):
+        self.teacher = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.student = User.objects.create(
+            username="aluno", email="aluno@example.com",
+        )
+        today = datetime.date.today()
+        self.monday = today + datetime.timedelta(days=7 - today.weekday())
+        for start, end in ((8, 12), (11, 13)):
+            TeacherAvailability.objects.create(
+                teacher=self.teacher, weekday=0,
+                start_time=datetime.time(start),
+                end_time=datetime.time(end),
+            )
+        for start, status in ((9, "scheduled"), (11, "cancelled")):
+            ScheduledClass.objects.create(
+                student=self.student, teacher=self.teacher,
+                date=self.monday, start_time=datetime.time(start),
+                end_time=datetime.time(start + 1), topic="Conversação",
+                status=status,
+            )
+
+    def _slots(self, now, **kwargs):
+        return free_slots(
+            start=self.monday, days=7, length=60,
+            teacher_ids=[self.teacher.pk], now=timezone.make_aware(now),
+            **kwargs,
+        ).get(self.teacher.pk, [])
+
+    def _hours(self, slots):
+        return [(slot.start_time.hour, slot.end_time.hour) for slot in slots]
+
+    def test_busy_classes_are_removed_from_merged_windows(self):
+        yesterday = datetime.datetime.combine(
+            self.monday - datetime.timedelta(days=1), datetime.time(12)
+        )
+
+        with self.assertNumQueries(2):
+            slots = self._slots(yesterday)
+
+        self.assertTrue(all(slot.date == self.monday for slot in slots))
+        self.assertEqual(
+            self._hours(slots), [(8, 9), (10, 11), (11, 12), (12, 13)]
+        )
+
+    def test_slots_before_now_are_skipped_keeping_alignment(self):
+        now = datetime.datetime.combine(self.monday, datetime.time(10, 30))
+
+        self.assertEqual(self._hours(self._slots(now)), [(11, 12), (12, 13)])
+
+    def test_step_offers_overlapping_starts(self):
+        yesterday = datetime.datetime.combine(
+            self.monday - datetime.timedelta(days=1), datetime.time(12)
+        )
+        slots = self._slots(yesterday, step=30)
+
+        self.assertEqual(
+            [slot.start_time for slot in slots][:3],
+            [datetime.time(8), datetime.time(10), datetime.time(10, 30)],
+        )
+        self.assertIsInstance(slots[0], Slot)
+
+    def test_invalid_arguments_are_rejected(self):
+        with self.assertRaises(ValueError):
+            free_slots(days=0)
+
+
+class BookClassTests(TestCase):
+    """Conflitos de horário barrados pelas restrições de exclusão."""
+
+    def setUp(self):
+        self.teacher, self.other_teacher = [
+            User.objects.create(
+                username=name, email=f"{name}@example.com",
+                user_type="teacher",
+            )
+            for name in ("professor", "professora")
+        ]
+        self.student, self.other_student = [
+            User.objects.create(username=name, email=f"{name}@example.com")
+            for name in ("aluno", "aluna")
+        ]
+        self.date = datetime.date.today() + datetime.timedelta(days=1)
+
+    def _book(self, student, teacher, start, end):
+        return book_class(
+            student.pk, teacher.pk, self.date,
+            datetime.time(*start), datetime.time(*end), "Conversação",
+            check_availability=False,
+        )
+
+    def _assert_conflict(self, code, *args):
+        with self.assertRaises(ValidationError) as raised:
+            self._book(*args)
+        self.assertEqual(raised.exception.code, code)
+
+    def test_teacher_overlap_is_rejected(self):
+        self._book(self.student, self.teacher, (10,), (11,))
+
+        self._assert_conflict(
+            "teacher_conflict",
+            self.other_student, self.teacher, (10, 30), (11, 30),
+        )
+
+    def test_student_overlap_is_rejected(self):
+        self._book(self.student, self.teacher, (10,), (11,))
+
+        self._assert_conflict(
+            "student_conflict",
+            self.student, self.other_teacher, (9, 30), (10, 30),
+        )
+
+    def test_back_to_back_classes_are_allowed(self):
+        self._book(self.student, self.teacher, (10,), (11,))
+        self._book(self.student, self.teacher, (11,), (12,))
+
+        self.assertEqual(
+            ScheduledClass.objects.filter(teacher=self.teacher).count(), 2
+        )
+
+    def test_cancelled_class_frees_the_slot(self):
+        booked = self._book(self.student, self.teacher, (10,), (11,))
+        cancel_class(booked)
+
+        self._book(self.other_student, self.teacher, (10,), (11,))
+
+    def test_reschedule_into_a_busy_slot_is_rejected(self):
+        self._book(self.student, self.teacher, (10,), (11,))
+        other = self._book(self.other_student, self.teacher, (14,), (15,))
+
+        with self.assertRaises(ValidationError) as raised:
+            reschedule_class(
+                other, self.date, datetime.time(10, 30), datetime.time(11)
+            )
+        self.assertEqual(raised.exception.code, "teacher_conflict")
+
+    def test_outside_availability_is_rejected(self):
+        TeacherAvailability.objects.create(
+            teacher=self.teacher, weekday=self.date.weekday(),
+            start_time=datetime.time(8), end_time=datetime.time(12),
+        )
+
+        with self.assertRaises(ValidationError) as raised:
+            book_class(
+                self.student.pk, self.teacher.pk, self.date,
+                datetime.time(11), datetime.time(13), "Conversação",
+            )
+        self.assertEqual(raised.exception.code, "unavailable")
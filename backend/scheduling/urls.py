@@ -0,0 +1,40 @@
+"""
+Rotas da API do app scheduling.
+"""
+from django.urls import path
+
+from .views import (
+    BookingView,
+    CancelClassView,
+    FreeSlotsView,
+    MarkNotificationsReadView,
+    NotificationListView,
+    UnreadCountView,
+)
+
+app_name = "scheduling"
+
+urlpatterns = [
+    path("slots/", FreeSlotsView.as_view(), name="free-slots"),
+    path("classes/", BookingView.as_view(), name="class-booking"),
+    path(
+        "classes/<uuid:pk>/cancel/",
+        CancelClassView.as_view(),
+        name="class-cancel",
+    ),
+    path(
+        "notifications/",
+        NotificationListView.as_view(),
+        name="notification-list",
+    ),
+    path(
+        "notifications/unread-count/",
+        UnreadCountView.as_view(),
+        name="notification-unread-count",
+    ),
+    path(
+        "notifications/read/",
+        MarkNotificationsReadView.as_view(),
+        name="notification-mark-read",
+    ),
+]
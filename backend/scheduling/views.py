@@ -1,3 +1,218 @@
-from django.shortcuts import render
+"""
+Views da API do app scheduling.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import Q
+from django.shortcuts import get_object_or_404
+from django.utils.translation import gettext_lazy as _
+from drf_yasg.utils import swagger_auto_schema
+from rest_framework import status
+from rest_framework.exceptions import (
+    APIException,
+    PermissionDenied,
+    ValidationError,
+)
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Create your views here.
+from core.async_views import AsyncAPIView
+from core.pagination import KeysetPagination
+
+from .inbox import aunread_count, mark_read, unread_count
+from .models import ClassNotification, ScheduledClass
+from .serializers import (
+    BookingSerializer,
+    ClassNotificationSerializer,
+    FreeSlotsQuerySerializer,
+    MarkReadResultSerializer,
+    MarkReadSerializer,
+    NotificationListQuerySerializer,
+    ScheduledClassSerializer,
+    TeacherSlotsSerializer,
+    UnreadCountSerializer,
+)
+from .services import CONFLICT_CONSTRAINTS, book_class, cancel_class
+from .slots import free_slots
+
+CONFLICT_CODES = {
+    constraint.violation_error_code
+    for constraint in CONFLICT_CONSTRAINTS.values()
+}
+
+
+class BookingConflict(APIException):
+    """O horário pedido conflita com outra aula."""
+
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = _("Horário indisponível.")
+    default_code = "conflict"
+
+
+def _api_error(exc: DjangoValidationError) -> APIException:
+    """Converte um erro do serviço de marcação em erro da API."""
+    if getattr(exc, "code", None) in CONFLICT_CODES:
+        return BookingConflict({"detail": exc.messages[0], "code": exc.code})
+    if hasattr(exc, "error_dict"):
+        return ValidationError(exc.message_dict)
+    return ValidationError({"detail": exc.messages, "code": exc.code})
+
+
+class FreeSlotsView(APIView):
+    """
+    Horários livres de um professor ou de todos os professores.
+
+    Calculados a partir das janelas de disponibilidade menos as aulas não
+    canceladas (ver ``scheduling.slots``).
+    """
+
+    query_budget = 3
+
+    @swagger_auto_schema(
+        query_serializer=FreeSlotsQuerySerializer,
+        responses={200: TeacherSlotsSerializer(many=True)},
+    )
+    def get(self, request):
+        params = FreeSlotsQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        data = params.validated_data
+        teacher = data.get("teacher")
+
+        result = free_slots(
+            start=data.get("start"),
+            days=data["days"],
+            length=data["length"],
+            teacher_ids=[teacher] if teacher else None,
+        )
+        # Montado direto (mesmo formato de TeacherSlotsSerializer): com
+        # todos os professores são dezenas de milhares de horários
+        return Response(
+            [
+                {
+                    "teacher": str(teacher_id),
+                    "slots": [
+                        {
+                            "date": slot.date.isoformat(),
+                            "start_time": slot.start_time.isoformat(),
+                            "end_time": slot.end_time.isoformat(),
+                        }
+                        for slot in slots
+                    ],
+                }
+                for teacher_id, slots in result.items()
+            ]
+        )
+
+
+class BookingView(APIView):
+    """
+    Marca uma aula para o aluno autenticado.
+
+    Conflitos de horário (do professor ou do próprio aluno) são detectados
+    pelo banco e respondidos com 409.
+    """
+
+    query_budget = 5
+
+    @swagger_auto_schema(
+        request_body=BookingSerializer,
+        responses={201: ScheduledClassSerializer, 409: "Conflito de horário"},
+    )
+    def post(self, request):
+        if not request.user.is_student():
+            raise PermissionDenied(_("Apenas alunos podem marcar aulas."))
+        serializer = BookingSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            scheduled_class = book_class(
+                student_id=request.user.pk,
+                teacher_id=data["teacher"],
+                date=data["date"],
+                start_time=data["start_time"],
+                end_time=data["end_time"],
+                topic=data["topic"],
+                notes=data["notes"],
+            )
+        except DjangoValidationError as exc:
+            raise _api_error(exc)
+
+        return Response(
+            ScheduledClassSerializer(scheduled_class).data,
+            status=status.HTTP_201_CREATED,
+        )
+
+
+class CancelClassView(APIView):
+    """Cancela uma aula do aluno ou do professor autenticado."""
+
+    @swagger_auto_schema(responses={200: ScheduledClassSerializer})
+    def post(self, request, pk):
+        scheduled_class = get_object_or_404(
+            ScheduledClass,
+            Q(student=request.user) | Q(teacher=request.user),
+            pk=pk,
+        )
+        cancel_class(scheduled_class)
+        return Response(ScheduledClassSerializer(scheduled_class).data)
+
+
+class NotificationListView(AsyncAPIView):
+    """
+    Notificações de aula do usuário autenticado, das mais recentes.
+
+    ``?unread=1`` lista apenas as não lidas.
+    """
+
+    pagination_class = KeysetPagination
+    query_budget = 2
+
+    @swagger_auto_schema(
+        query_serializer=NotificationListQuerySerializer,
+        responses={200: ClassNotificationSerializer(many=True)},
+    )
+    async def get(self, request):
+        params = NotificationListQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        queryset = ClassNotification.objects.filter(recipient=request.user)
+        if params.validated_data["unread"]:
+            # Atendida pelo índice parcial idx_notification_unread
+            queryset = queryset.filter(read=False)
+
+        page = await self.apaginate_queryset(queryset)
+        return self.get_paginated_response(
+            ClassNotificationSerializer(page, many=True).data
+        )
+
+
+class UnreadCountView(AsyncAPIView):
+    """Número de notificações não lidas (servido do cache)."""
+
+    query_budget = 3
+
+    @swagger_auto_schema(responses={200: UnreadCountSerializer})
+    async def get(self, request):
+        return Response({"unread": await aunread_count(request.user.pk)})
+
+
+class MarkNotificationsReadView(APIView):
+    """
+    Marca como lidas as notificações indicadas ou, sem ``ids``, todas as
+    notificações do usuário autenticado.
+    """
+
+    query_budget = 4
+
+    @swagger_auto_schema(
+        request_body=MarkReadSerializer,
+        responses={200: MarkReadResultSerializer},
+    )
+    def post(self, request):
+        serializer = MarkReadSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        marked = mark_read(
+            request.user.pk, serializer.validated_data.get("ids")
+        )
+        return Response(
+            {"marked": marked, "unread": unread_count(request.user.pk)}
+        )
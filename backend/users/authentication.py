@@ -0,0 +1,194 @@
+"""
+Autenticação JWT sem consulta ao banco a cada requisição.
+
+``JWTAuthentication`` valida o token (HS256, apenas CPU) e depois busca o
+usuário no banco só para montar ``request.user``. ``CachedJWTAuthentication``
+faz a mesma validação, mas monta o usuário a partir de um cache curto e de
+tamanho limitado (alias ``users`` de ``CACHES``), indexado pelo ID:
+
+- o cache guarda apenas os campos de ``AUTH_USER_FIELDS`` (tipo de usuário,
+  ativo, acesso administrativo);
+- ``request.user`` é uma instância de ``User`` com esses campos carregados
+  e os demais adiados (``User.from_db``): ``is_student()``, ``is_teacher()``,
+  ``is_staff`` e filtros como ``filter(student=request.user)`` não fazem
+  consultas; ler outro campo carrega-o do banco, como em ``only()``;
+- ``User.save`` e ``User.delete`` removem a entrada após o commit (ver
+  ``users.signals``). ``QuerySet.update`` não dispara sinais: nesses casos,
+  chame ``invalidate_cached_user``. ``AUTH_USER_CACHE_TIMEOUT`` limita o
+  tempo em que outros processos podem usar uma versão antiga.
+
+Tem também a versão assíncrona (``aauthenticate``), usada pelas views de
+``core.async_views``.
+"""
+import uuid
+from typing import Optional, Sequence
+
+from django.core.cache import InvalidCacheBackendError, caches
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import User
+
+CACHE_ALIAS = "users"
+CACHE_KEY_PREFIX = "users:auth"
+
+# Campos carregados em request.user
+AUTH_USER_FIELDS = (
+    "id",
+    "username",
+    "email",
+    "user_type",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+)
+
+
+def cache_key(user_id) -> str:
+    """Chave dos campos de autenticação de um usuário no cache."""
+    return f"{CACHE_KEY_PREFIX}:{user_id}"
+
+
+def _cache():
+    try:
+        return caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        raise ImproperlyConfigured(
+            f"CachedJWTAuthentication requer o cache '{CACHE_ALIAS}' em "
+            "CACHES."
+        )
+
+
+def _field_names() -> Sequence[str]:
+    """
+    Campos em cache, na ordem de ``_meta.concrete_fields`` (a esperada por
+    ``Model.from_db``).
+    """
+    wanted = set(AUTH_USER_FIELDS)
+    if jwt_settings.CHECK_REVOKE_TOKEN:
+        wanted.add("password")
+    return tuple(
+        field.attname
+        for field in User._meta.concrete_fields
+        if field.attname in wanted
+    )
+
+
+def _build(values: Optional[tuple]) -> Optional[User]:
+    if values is None:
+        return None
+    return User.from_db(DEFAULT_DB_ALIAS, _field_names(), values)
+
+
+def get_cached_user(user_id: uuid.UUID) -> Optional[User]:
+    """
+    Usuário com os campos de autenticação, do cache ou do banco.
+
+    Args:
+        user_id: ID do usuário
+
+    Returns:
+        User com apenas ``AUTH_USER_FIELDS`` carregados ou None se não
+        existir
+    """
+    cache = _cache()
+    key = cache_key(user_id)
+    values = cache.get(key)
+    if values is None:
+        values = (
+            User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id})
+            .values_list(*_field_names())
+            .first()
+        )
+        if values is not None:
+            cache.set(key, values)
+    return _build(values)
+
+
+async def aget_cached_user(user_id: uuid.UUID) -> Optional[User]:
+    """Versão assíncrona de ``get_cached_user``."""
+    cache = _cache()
+    key = cache_key(user_id)
+    values = await cache.aget(key)
+    if values is None:
+        values = await (
+            User.objects.filter(**{jwt_settings.USER_ID_FIELD: user_id})
+            .values_list(*_field_names())
+            .afirst()
+        )
+        if values is not None:
+            await cache.aset(key, values)
+    return _build(values)
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """
+    Remove o usuário do cache após o commit da transação atual.
+
+    Args:
+        user_id: ID do usuário alterado ou removido
+    """
+    key = cache_key(user_id)
+    transaction.on_commit(lambda: _cache().delete(key))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """``JWTAuthentication`` com o usuário montado a partir do cache."""
+
+    def get_user(self, validated_token) -> User:
+        """Mesmas verificações de ``JWTAuthentication.get_user``."""
+        return self._check(
+            get_cached_user(self._user_id(validated_token)), validated_token
+        )
+
+    async def aauthenticate(self, request):
+        """Versão assíncrona de ``authenticate``."""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return await self.aget_user(validated_token), validated_token
+
+    async def aget_user(self, validated_token) -> User:
+        """Versão assíncrona de ``get_user``."""
+        return self._check(
+            await aget_cached_user(self._user_id(validated_token)),
+            validated_token,
+        )
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[jwt_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            )
+
+    def _check(self, user: Optional[User], validated_token) -> User:
+        if user is None:
+            raise AuthenticationFailed(
+                _("User not found"), code="user_not_found"
+            )
+        if jwt_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(
+                _("User is inactive"), code="user_inactive"
+            )
+        if jwt_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            jwt_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(
+                _("The user's password has been changed."),
+                code="password_changed",
+            )
+        return user
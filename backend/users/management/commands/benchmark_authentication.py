@@ -0,0 +1,125 @@
+"""
+Benchmark da autenticação JWT (``users.authentication``).
+
+Cria um aluno temporário (descartado ao final via rollback) e executa
+``--requests`` requisições autenticadas a uma view que verifica
+``is_student()``/``is_teacher()``, com ``JWTAuthentication`` (busca o
+usuário no banco a cada requisição) e com ``CachedJWTAuthentication``.
+Reporta requisições por segundo e consultas por requisição.
+
+A view é chamada diretamente (sem middlewares): a diferença medida é a da
+autenticação. Contra o Supabase, cada consulta evitada também economiza a
+latência de rede até o banco.
+
+Uso:
+    python manage.py benchmark_authentication --requests 5000
+"""
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+from rest_framework.views import APIView
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from users.authentication import (
+    CACHE_ALIAS,
+    CachedJWTAuthentication,
+    cache_key,
+)
+
+BACKENDS = {
+    "JWTAuthentication": JWTAuthentication,
+    "CachedJWTAuthentication": CachedJWTAuthentication,
+}
+
+
+class _Rollback(Exception):
+    """Usada para descartar os dados do benchmark."""
+
+
+class _ProbeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        return Response(
+            {
+                "student": request.user.is_student(),
+                "teacher": request.user.is_teacher(),
+            }
+        )
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara requisições autenticadas por segundo com e sem o cache de "
+        "usuários da autenticação JWT (os dados criados são descartados)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=5000,
+            help="Requisições por autenticador",
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        try:
+            with transaction.atomic():
+                user = get_user_model().objects.create(
+                    username=f"benchmark-{uuid.uuid4().hex[:12]}",
+                    email=f"{uuid.uuid4().hex[:12]}@benchmark.local",
+                    user_type="student",
+                )
+                token = str(AccessToken.for_user(user))
+                for name, backend in BACKENDS.items():
+                    results[name] = self._run(
+                        backend, token, options["requests"]
+                    )
+                raise _Rollback
+        except _Rollback:
+            pass
+        finally:
+            if results:
+                caches[CACHE_ALIAS].delete(cache_key(user.pk))
+
+        self.stdout.write(
+            f"{'autenticação':<24} {'req/s':>9} {'µs/req':>8} "
+            f"{'consultas/req':>14}"
+        )
+        for name, (rps, queries) in results.items():
+            self.stdout.write(
+                f"{name:<24} {rps:>9.0f} {1_000_000 / rps:>8.1f} "
+                f"{queries:>14.2f}"
+            )
+        baseline = results["JWTAuthentication"][0]
+        cached = results["CachedJWTAuthentication"][0]
+        self.stdout.write(
+            self.style.SUCCESS(f"Ganho: {cached / baseline:.2f}x")
+        )
+
+    def _run(self, backend, token, requests):
+        """Executa as requisições e retorna (req/s, consultas por req)."""
+        view = _ProbeView.as_view(authentication_classes=[backend])
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {token}"
+        )
+        # Aquecimento (inclui a primeira leitura do cache)
+        for _ in range(50):
+            assert view(request).status_code == 200
+
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for _ in range(requests):
+                view(request)
+            elapsed = time.perf_counter() - started
+        return requests / elapsed, len(queries) / requests
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.6 on 2026-10-17 12:00
+
+import core.ids
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Troca o ``default`` das chaves primárias para ``core.ids.default_pk``.
+
+    O default é aplicado apenas no Python: a migração não altera dados nem
+    a estrutura das tabelas.
+    """
+
+    dependencies = [
+        ('users', '0002_alter_user_options_alter_user_id_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+        migrations.AlterField(
+            model_name='userprofile',
+            name='id',
+            field=models.UUIDField(
+                default=core.ids.default_pk,
+                editable=False,
+                help_text='Identificador único universal',
+                primary_key=True,
+                serialize=False,
+            ),
+        ),
+    ]
@@ -5,9 +5,9 @@ Otimizado para uso com Supabase como banco de dados.
 from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.utils.translation import gettext_lazy as _
-from typing import Optional
 
-from core.base_models import SupabaseBaseModel, RelatedObjectCache
+from core.base_models import SupabaseBaseModel
+from core.identity_map import get_related
 
 
 class User(SupabaseBaseModel, AbstractUser):
@@ -123,17 +123,10 @@ class UserProfile(SupabaseBaseModel):
         blank=True,
         help_text=_("Horários em que o professor está disponível")
     )
-    
-    # Campos para caching
-    _user_cache: Optional[RelatedObjectCache[User]] = None
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._user_cache = RelatedObjectCache(User)
 
     def __str__(self) -> str:
         """Representação em string do perfil de usuário."""
-        user = self._user_cache.get(self, "user")
+        user = get_related(self, "user")
         if user:
             if user.get_full_name():
                 return f"Perfil de {user.get_full_name()}"
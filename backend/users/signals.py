@@ -0,0 +1,24 @@
+"""
+Sinais do app users.
+
+Removem do cache de autenticação (ver ``users.authentication``) os
+usuários alterados ou removidos pelo ORM.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .authentication import invalidate_cached_user
+from .models import User
+
+
+@receiver(post_save, sender=User, dispatch_uid="user_auth_on_save")
+def user_saved(sender, instance: User, created, **kwargs):
+    """Descarta os campos de autenticação em cache do usuário salvo."""
+    if not created:
+        invalidate_cached_user(instance.pk)
+
+
+@receiver(post_delete, sender=User, dispatch_uid="user_auth_on_delete")
+def user_deleted(sender, instance: User, **kwargs):
+    """Descarta os campos de autenticação em cache do usuário removido."""
+    invalidate_cached_user(instance.pk)
@@ -1,3 +1,83 @@
+from django.core.cache import caches
 from django.test import TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import (
+    AuthenticationFailed,
+    InvalidToken,
+)
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from .authentication import (
+    CACHE_ALIAS,
+    CachedJWTAuthentication,
+    invalidate_cached_user,
+)
+from .models import User
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    """Usuário do token montado a partir do cache de autenticação."""
+
+    def setUp(self):
+        caches[CACHE_ALIAS].clear()
+        self.addCleanup(caches[CACHE_ALIAS].clear)
+        self.user = User.objects.create(
+            username="professor", email="professor@example.com",
+            user_type="teacher",
+        )
+        self.token = AccessToken.for_user(self.user)
+
+    def _authenticate(self, token=None):
+        request = APIRequestFactory().get(
+            "/", HTTP_AUTHORIZATION=f"Bearer {token or self.token}"
+        )
+        user, _token = CachedJWTAuthentication().authenticate(request)
+        return user
+
+    def test_second_request_makes_no_queries(self):
+        with self.assertNumQueries(1):
+            self._authenticate()
+
+        with self.assertNumQueries(0):
+            user = self._authenticate()
+            self.assertEqual(user.pk, self.user.pk)
+            self.assertTrue(user.is_teacher())
+            self.assertFalse(user.is_staff)
+
+    def test_save_invalidates_after_commit(self):
+        self._authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self._authenticate()
+        self.assertEqual(raised.exception.detail["code"], "user_inactive")
+
+    def test_queryset_update_requires_explicit_invalidation(self):
+        self._authenticate()
+
+        User.objects.filter(pk=self.user.pk).update(user_type="student")
+        self.assertTrue(self._authenticate().is_teacher())
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_cached_user(self.user.pk)
+        self.assertTrue(self._authenticate().is_student())
+
+    def test_deleted_user_is_rejected(self):
+        self._authenticate()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+
+        with self.assertRaises(AuthenticationFailed) as raised:
+            self._authenticate()
+        self.assertEqual(raised.exception.detail["code"], "user_not_found")
+
+    def test_token_without_user_id_is_rejected(self):
+        token = AccessToken.for_user(self.user)
+        del token["user_id"]
+
+        with self.assertRaises(InvalidToken):
+            self._authenticate(token)